@@ -1,6 +1,39 @@
+import os
+import sys
+import threading
 from django.apps import AppConfig
+from django.conf import settings
+
+# 모델 warmup 대상 웹 서버 실행 파일
+SERVER_COMMANDS = {'gunicorn', 'uvicorn', 'daphne', 'hypercorn'}
 
 
 class AiAnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ai_analysis'
+
+    def ready(self):
+        # Orthanc 삭제 시그널 수신 등록 (Study UID 조회 메모 무효화)
+        from . import pacs_utils  # noqa: F401
+
+        registry_config = getattr(settings, 'AI_MODEL_REGISTRY', {})
+        if registry_config.get('WARMUP_ON_STARTUP', True) and self._is_server_process():
+            from .model_registry import model_registry
+            # 서버 기동을 막지 않도록 백그라운드에서 모델 로드 + warmup (WARMUP_MODELS가 있으면 해당 모델만)
+            threading.Thread(target=model_registry.warmup_all, args=(registry_config.get('WARMUP_MODELS'),),
+                             name='ai-model-warmup', daemon=True).start()
+
+    @staticmethod
+    def _is_server_process():
+        """웹 서버 / Celery 워커 프로세스에서만 warmup (관리 명령, 스크립트, runserver 리로더 부모 프로세스 제외)"""
+        argv = sys.argv or ['']
+        command = os.path.basename(argv[0])
+        if command == '__main__.py':  # python -m gunicorn 등
+            command = os.path.basename(os.path.dirname(argv[0]))
+        if command in SERVER_COMMANDS:
+            return True
+        if command == 'celery':
+            return 'worker' in argv[1:]
+        if command == 'manage.py':
+            return len(argv) > 1 and argv[1] == 'runserver' and os.environ.get('RUN_MAIN') == 'true'
+        return False
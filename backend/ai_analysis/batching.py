@@ -0,0 +1,168 @@
+# backend/ai_analysis/batching.py
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from django.conf import settings
+from .model_registry import model_registry
+from .utils import ModelManager
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """모델 앞단의 프로세스 내 micro-batching 큐
+
+    - 요청 스레드는 이미지를 큐에 넣고 결과(Future)를 기다림
+    - 워커 스레드는 첫 요청이 들어온 뒤 최대 max_latency_ms 동안, 최대 max_batch_size장까지
+      모아서 run_batch(images)로 한 번에 forward pass 후 결과를 요청별로 돌려줌
+    - 요청이 한 건뿐이면 max_latency_ms만큼만 늦어지고, 몰릴 때(아침 업로드 등)는 배치로 처리량 향상
+    """
+
+    def __init__(self, name, run_batch, max_batch_size=8, max_latency_ms=20, timeout=120, enabled=True):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0, max_latency_ms) / 1000
+        self.timeout = timeout
+        self.enabled = enabled
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+        self._counters = {'requests': 0, 'batches': 0, 'failures': 0, 'max_batch': 0, 'inference_seconds': 0.0}
+
+    def infer(self, item):
+        """이미지 1장 추론 (배치에 합류해 결과를 받을 때까지 대기)"""
+        if not self.enabled:
+            return self._run([item])[0]
+        return self.submit(item).result(timeout=self.timeout)
+
+    def submit(self, item):
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        return future
+
+    def _ensure_worker(self):
+        # fork된 자식 프로세스(gunicorn preload 등)에는 부모의 워커 스레드가 없으므로 다시 시작
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._worker = threading.Thread(target=self._loop, name=f"batcher-{self.name}", daemon=True)
+            self._worker.start()
+
+    def close(self):
+        """워커 종료 (벤치마크 등에서 임시로 만든 batcher 정리용)"""
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is not None and worker.is_alive():
+            self._queue.put(_STOP)
+            worker.join()
+
+    def _collect(self):
+        """첫 요청을 기다린 뒤 마감 시각까지 배치를 채움 (종료 신호면 None)"""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(request)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            items = [item for item, _ in batch]
+            try:
+                results = self._run(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"배치 결과 수 불일치 ({len(results)} != {len(items)})")
+            except Exception as e:
+                logger.error(f"❌ {self.name} 배치 추론 실패 ({len(items)}장): {e}")
+                self._count('failures')
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _run(self, items):
+        started = time.perf_counter()
+        results = self.run_batch(items)
+        with self._lock:
+            self._counters['requests'] += len(items)
+            self._counters['batches'] += 1
+            self._counters['max_batch'] = max(self._counters['max_batch'], len(items))
+            self._counters['inference_seconds'] += time.perf_counter() - started
+        return results
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        batches = counters['batches']
+        return {
+            'enabled': self.enabled,
+            'max_batch_size': self.max_batch_size,
+            'max_latency_ms': round(self.max_latency * 1000, 1),
+            'queued': self._queue.qsize(),
+            **counters,
+            'inference_seconds': round(counters['inference_seconds'], 3),
+            'avg_batch': round(counters['requests'] / batches, 2) if batches else None,
+        }
+
+
+def run_yolo_batch(images):
+    """YOLO 배치 추론 (이미지별 ultralytics Results 1개)"""
+    loaded_model = model_registry.get('yolo')
+    with loaded_model.inference_lock:
+        return list(loaded_model.model(images))
+
+
+def run_ssd_batch(images):
+    """SSD300 배치 추론 (이미지별 검출 목록)"""
+    loaded_model = model_registry.get('ssd')
+    with loaded_model.inference_lock:
+        return ModelManager.run_ssd_batch(loaded_model.model, loaded_model.device, images)
+
+
+_batching_config = getattr(settings, 'AI_INFERENCE_BATCHING', {})
+
+
+def _batcher(name, run_batch):
+    return MicroBatcher(
+        name,
+        run_batch,
+        max_batch_size=_batching_config.get('MAX_BATCH_SIZE', 8),
+        max_latency_ms=_batching_config.get('MAX_LATENCY_MS', 20),
+        timeout=_batching_config.get('TIMEOUT', 120),
+        enabled=_batching_config.get('ENABLED', True),
+    )
+
+
+yolo_batcher = _batcher('yolo', run_yolo_batch)
+ssd_batcher = _batcher('ssd', run_ssd_batch)
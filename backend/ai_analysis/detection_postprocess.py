@@ -0,0 +1,101 @@
+# backend/ai_analysis/detection_postprocess.py
+"""
+검출 결과 후처리 (SSD300 / YOLOv8 공용)
+
+박스 단위 Python 루프 + 원소별 .cpu().numpy() 대신 이미지 1장의 텐서 전체에 대해
+임계값 마스킹 → 클래스별 NMS → 원본 해상도 스케일링/경계 처리 → 최소 크기 필터 → top-k를 수행하고,
+최종 결과만 한 번에 host로 옮깁니다.
+
+Django(ai_analysis)와 docker AI 서비스(/models/*/..._inference.py)가 함께 사용하므로
+torch / torchvision 외의 의존성(Django 등)을 두지 않습니다.
+docker-compose에서는 이 파일을 /models/common/detection_postprocess.py로 마운트합니다.
+"""
+
+from collections import namedtuple
+import torch
+from torchvision.ops import batched_nms
+
+# boxes: (K, 4) float64 [x1, y1, x2, y2], scores: (K,) float, labels: (K,) int (모두 numpy)
+Detections = namedtuple('Detections', ['boxes', 'scores', 'labels'])
+
+
+def postprocess_detections(boxes, scores, labels, score_threshold=None, inclusive=False,
+                           iou_threshold=None, scale=None, image_size=None, truncate=False,
+                           min_size=None, top_k=None):
+    """이미지 1장의 검출 결과 후처리
+
+    Args:
+        boxes: (N, 4) 박스 (tensor 또는 array-like, 모델 입력 좌표)
+        scores: (N,) 신뢰도
+        labels: (N,) 클래스 ID
+        score_threshold: 신뢰도 임계값 (기본 score > threshold, inclusive=True면 >=)
+        iou_threshold: 클래스별 NMS IoU 임계값 (모델 입력 좌표에서 수행, None이면 생략)
+        scale: (scale_x, scale_y) 모델 입력 → 원본 해상도 배율
+        image_size: (width, height) 지정 시 박스를 이미지 경계로 자름
+        truncate: 좌표를 정수로 버림 (기존 int() 변환과 동일)
+        min_size: x2 > x1 + min_size 이고 y2 > y1 + min_size 인 박스만 유지
+        top_k: 신뢰도 상위 k개만 유지
+
+    Returns:
+        Detections: 신뢰도 내림차순 (NMS/top-k를 쓰지 않으면 입력 순서 유지)
+    """
+    boxes = torch.as_tensor(boxes).reshape(-1, 4)
+    device = boxes.device
+    scores = torch.as_tensor(scores, device=device).reshape(-1).float()
+    labels = torch.as_tensor(labels, device=device).reshape(-1).long()
+
+    if score_threshold is not None:
+        keep = scores >= score_threshold if inclusive else scores > score_threshold
+        boxes, scores, labels = boxes[keep], scores[keep], labels[keep]
+
+    if iou_threshold is not None and len(boxes):
+        # 같은 클래스끼리만 억제, 결과는 신뢰도 내림차순
+        keep = batched_nms(boxes.float(), scores, labels, iou_threshold)
+        boxes, scores, labels = boxes[keep], scores[keep], labels[keep]
+
+    # 스케일링은 float64로 (float32 반올림 오차로 정수 좌표가 1px씩 어긋나지 않도록)
+    boxes = boxes.double()
+    if scale is not None:
+        scale_x, scale_y = scale
+        boxes = boxes * torch.tensor([scale_x, scale_y, scale_x, scale_y], dtype=torch.float64, device=device)
+    if truncate:
+        boxes = boxes.trunc()
+    if image_size is not None:
+        width, height = image_size
+        limits = torch.tensor([width, height, width, height], dtype=torch.float64, device=device)
+        boxes = torch.minimum(boxes.clamp(min=0), limits)
+
+    if min_size is not None:
+        keep = (boxes[:, 2] > boxes[:, 0] + min_size) & (boxes[:, 3] > boxes[:, 1] + min_size)
+        boxes, scores, labels = boxes[keep], scores[keep], labels[keep]
+
+    if top_k is not None and len(scores) > top_k:
+        order = torch.sort(scores, descending=True, stable=True).indices[:top_k]
+        boxes, scores, labels = boxes[order], scores[order], labels[order]
+
+    # host 전송 1회: [x1, y1, x2, y2, score, label]
+    packed = torch.cat([boxes, scores.double()[:, None], labels.double()[:, None]], dim=1).cpu().numpy()
+    return Detections(packed[:, :4], packed[:, 4].astype('float32'), packed[:, 5].astype('int64'))
+
+
+def torchvision_detections(prediction, **options):
+    """torchvision 검출 모델 출력 dict({'boxes', 'scores', 'labels'}) 후처리"""
+    return postprocess_detections(
+        prediction.get('boxes', torch.empty((0, 4))),
+        prediction.get('scores', torch.empty((0,))),
+        prediction.get('labels', torch.empty((0,), dtype=torch.long)),
+        **options
+    )
+
+
+def yolo_detections(result, **options):
+    """ultralytics Results 1개(result.boxes) 후처리 (박스가 없으면 빈 Detections)"""
+    boxes = getattr(result, 'boxes', None)
+    if boxes is None or len(boxes) == 0:
+        return postprocess_detections(torch.empty((0, 4)), torch.empty((0,)), torch.empty((0,)), **options)
+    return postprocess_detections(boxes.xyxy, boxes.conf, boxes.cls, **options)
+
+
+def iter_detections(detections):
+    """(bbox [x1, y1, x2, y2], score, label) 순회 (Python 값 변환은 배열당 한 번)"""
+    return zip(detections.boxes.tolist(), detections.scores.tolist(), detections.labels.tolist())
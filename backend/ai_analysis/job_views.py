@@ -0,0 +1,114 @@
+# backend/ai_analysis/job_views.py
+
+import asyncio
+import json
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from .jobs import submit_job
+from .models import AIAnalysisJob
+from .pipeline import MODEL_NAMES
+
+_jobs_config = getattr(settings, 'AI_ANALYSIS_JOBS', {})
+EVENTS_POLL_INTERVAL = _jobs_config.get('EVENTS_POLL_INTERVAL', 1.0)
+EVENTS_TIMEOUT = _jobs_config.get('EVENTS_TIMEOUT', 300)
+# 진행 구독(SSE)은 ASGI 배포에서만 제공 (WSGI에서는 구독마다 워커 스레드를 점유하므로 polling 사용)
+EVENTS_ENABLED = bool(getattr(settings, 'ASYNC_HTTP_CONFIG', {}).get('PROXY_ASYNC'))
+
+
+def job_payload(job):
+    """작업 응답 (events_url이 없으면 status_url을 poll_interval초 간격으로 조회)"""
+    return {
+        **job.to_dict(),
+        'status_url': reverse('analysis_job_detail', args=[job.id]),
+        'events_url': reverse('analysis_job_events', args=[job.id]) if EVENTS_ENABLED else None,
+        'poll_interval': EVENTS_POLL_INTERVAL,
+    }
+
+
+@csrf_exempt
+def analysis_jobs(request):
+    """POST: 분석 작업 제출 (즉시 job_id 반환) / GET: 최근 작업 목록 (?study_uid=)"""
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'status': 'error', 'message': '잘못된 JSON'}, status=400)
+        study_uid = data.get('study_uid')
+        model_type = str(data.get('model', 'yolo')).lower()
+        if not study_uid:
+            return JsonResponse({'status': 'error', 'message': 'study_uid가 필요합니다'}, status=400)
+        if model_type not in MODEL_NAMES:
+            return JsonResponse({'status': 'error', 'message': f'지원하지 않는 모델: {model_type}'}, status=400)
+
+        job, created = submit_job(model_type, study_uid, overwrite=bool(data.get('overwrite', False)))
+        return JsonResponse({
+            'status': 'success',
+            'deduplicated': not created,
+            'job': job_payload(job),
+        }, status=202 if created else 200)
+
+    if request.method == 'GET':
+        jobs = AIAnalysisJob.objects.all()
+        if request.GET.get('study_uid'):
+            jobs = jobs.filter(study_uid=request.GET['study_uid'])
+        return JsonResponse({'status': 'success', 'jobs': [job_payload(job) for job in jobs[:50]]})
+
+    return JsonResponse({'status': 'error', 'message': 'GET/POST only'}, status=405)
+
+
+def analysis_job_detail(request, job_id):
+    """작업 상태 polling (status / stage / progress, 끝나면 result)"""
+    job = AIAnalysisJob.objects.filter(id=job_id).first()
+    if job is None:
+        return JsonResponse({'status': 'error', 'message': '작업을 찾을 수 없습니다'}, status=404)
+    return JsonResponse({'status': 'success', 'job': job_payload(job)})
+
+
+def _job_snapshot(job_id):
+    job = AIAnalysisJob.objects.filter(id=job_id).first()
+    return job.to_dict() if job else None
+
+
+def _poll_job_events(job_id, last, deadline):
+    """작업 상태를 한 번 조회해 (보낼 SSE 이벤트 목록, 마지막 스냅샷, 계속 구독 여부) 반환"""
+    snapshot = _job_snapshot(job_id)
+    if snapshot is None:
+        return ['event: error\ndata: {"message": "작업을 찾을 수 없습니다"}\n\n'], last, False
+    events = []
+    if snapshot != last:
+        events.append(f"event: job\ndata: {json.dumps(snapshot, ensure_ascii=False)}\n\n")
+    if snapshot['status'] not in AIAnalysisJob.ACTIVE_STATUSES:
+        return events, snapshot, False
+    if time.monotonic() >= deadline:
+        # 클라이언트(EventSource)가 자동 재연결
+        events.append("event: timeout\ndata: {}\n\n")
+        return events, snapshot, False
+    return events, snapshot, True
+
+
+async def _job_events(job_id):
+    """상태가 바뀔 때마다 SSE 이벤트 전송, 작업이 끝나거나 시간이 지나면 종료"""
+    deadline = time.monotonic() + EVENTS_TIMEOUT
+    last = None
+    while True:
+        events, last, subscribed = await sync_to_async(_poll_job_events)(job_id, last, deadline)
+        for event in events:
+            yield event
+        if not subscribed:
+            return
+        await asyncio.sleep(EVENTS_POLL_INTERVAL)
+
+
+async def analysis_job_events(request, job_id):
+    """작업 진행 구독 (Server-Sent Events, ASGI 배포에서만 라우팅)
+
+    대기 중에는 워커를 점유하지 않으며 EVENTS_TIMEOUT 뒤에는 끊고 EventSource 재연결에 맡깁니다.
+    """
+    response = StreamingHttpResponse(_job_events(job_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
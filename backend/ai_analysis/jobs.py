@@ -0,0 +1,102 @@
+# backend/ai_analysis/jobs.py
+
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import AIAnalysisJob
+from .pipeline import MODEL_NAMES, run_analysis
+
+logger = logging.getLogger(__name__)
+
+_jobs_config = getattr(settings, 'AI_ANALYSIS_JOBS', {})
+# 이 시간 동안 진행 기록이 없는 대기/실행 작업은 워커가 사라진 것으로 보고 새 작업 허용
+STALE_SECONDS = _jobs_config.get('STALE_SECONDS', 1800)
+
+
+def submit_job(model_type, study_uid, overwrite=False):
+    """분석 작업 등록 후 Celery 큐에 넣음
+
+    같은 (모델, 스터디) 작업이 이미 대기/실행 중이면 새로 만들지 않고 그 작업을 반환합니다.
+
+    Returns:
+        tuple: (AIAnalysisJob, 새로 만들었는지 여부)
+    """
+    if model_type not in MODEL_NAMES:
+        raise ValueError(f"지원하지 않는 모델: {model_type}")
+    active_key = AIAnalysisJob.make_active_key(model_type, study_uid)
+
+    existing = AIAnalysisJob.objects.filter(active_key=active_key).first()
+    if existing is not None:
+        if existing.updated_at >= timezone.now() - timedelta(seconds=STALE_SECONDS):
+            return existing, False
+        logger.warning(f"⚠️ 응답 없는 분석 작업 정리: {existing.id} ({active_key})")
+        finish_job(existing.id, 'failed', error='작업 시간 초과 (워커 응답 없음)')
+
+    try:
+        with transaction.atomic():
+            job = AIAnalysisJob.objects.create(
+                study_uid=study_uid,
+                model_type=model_type,
+                overwrite=overwrite,
+                active_key=active_key,
+            )
+    except IntegrityError:
+        # 같은 작업이 동시에 제출됨 → 먼저 만든 쪽 사용
+        return AIAnalysisJob.objects.get(active_key=active_key), False
+
+    transaction.on_commit(lambda: enqueue_job(job))
+    logger.info(f"📥 분석 작업 등록: {job.id} ({active_key})")
+    return job, True
+
+
+def enqueue_job(job):
+    """모델별 큐(ai_yolo / ai_ssd)로 작업 전송 (브로커 장애 시 작업을 실패로 기록)"""
+    from .tasks import JOB_TASKS
+    try:
+        JOB_TASKS[job.model_type].apply_async(args=[str(job.id)], task_id=str(job.id))
+    except Exception as e:
+        logger.error(f"❌ 분석 작업 큐 등록 실패: {job.id}: {e}")
+        finish_job(job.id, 'failed', error=f'작업 큐 등록 실패: {e}')
+        return
+    AIAnalysisJob.objects.filter(id=job.id).update(celery_task_id=str(job.id))
+
+
+def update_job(job_id, **fields):
+    AIAnalysisJob.objects.filter(id=job_id).update(updated_at=timezone.now(), **fields)
+
+
+def finish_job(job_id, status, result=None, error=''):
+    """작업 종료 기록 (active_key를 비워 같은 스터디의 다음 작업을 허용)"""
+    fields = {'status': status, 'active_key': None, 'finished_at': timezone.now(),
+              'result': result, 'error_message': error}
+    if status == 'succeeded':
+        fields.update(stage='done', progress=100)
+    update_job(job_id, **fields)
+
+
+def run_job(job_id):
+    """워커에서 분석 파이프라인 실행 (진행 단계/결과를 작업 레코드에 기록)"""
+    job = AIAnalysisJob.objects.filter(id=job_id).first()
+    if job is None or not job.is_active:
+        # 이미 끝난 작업의 재전달 (acks_late)
+        return
+    update_job(job_id, status='running', stage='starting', started_at=timezone.now())
+
+    def progress(stage, percent):
+        update_job(job_id, stage=stage, progress=percent)
+
+    try:
+        payload, status_code = run_analysis(job.model_type, job.study_uid,
+                                            overwrite=job.overwrite, progress=progress)
+    except Exception as e:
+        logger.error(f"❌ 분석 작업 실패: {job_id}: {e}")
+        finish_job(job_id, 'failed', error=str(e))
+        return
+
+    if status_code >= 400:
+        finish_job(job_id, 'failed', result=payload, error=payload.get('message', ''))
+    else:
+        finish_job(job_id, 'succeeded', result=payload)
+    logger.info(f"✅ 분석 작업 종료: {job_id} ({payload.get('status')})")
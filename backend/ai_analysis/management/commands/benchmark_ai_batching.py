@@ -0,0 +1,92 @@
+# management/commands/benchmark_ai_batching.py
+import statistics
+import threading
+import time
+from PIL import Image
+from django.core.management.base import BaseCommand, CommandError
+from ai_analysis.batching import MicroBatcher, run_ssd_batch, run_yolo_batch
+from ai_analysis.model_registry import model_registry
+
+BATCH_RUNNERS = {'yolo': run_yolo_batch, 'ssd': run_ssd_batch}
+
+
+class Command(BaseCommand):
+    help = ('동시 분석 요청(아침 업로드 폭주 등)을 모사해 배치 크기별 '
+            'micro-batching 추론 처리량과 지연을 비교합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=sorted(BATCH_RUNNERS), default='ssd', help='측정할 모델')
+        parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16],
+                            help='최대 배치 크기 목록 (1 = 기존 batch-of-1)')
+        parser.add_argument('--latency-ms', type=int, default=20, help='배치 수집 대기 시간 (ms)')
+        parser.add_argument('--clients', type=int, default=16, help='동시 요청 스레드 수')
+        parser.add_argument('--requests', type=int, default=64, help='클라이언트당이 아닌 전체 요청 수')
+        parser.add_argument('--image', default=None, help='입력 이미지 파일 (기본: 2048x2048 합성 영상)')
+
+    def handle(self, *args, **options):
+        if options['image']:
+            image = Image.open(options['image'])
+            image.load()
+        else:
+            image = Image.effect_noise((2048, 2048), 64)
+        image = image.convert('RGB')
+
+        name = options['model']
+        try:
+            loaded_model = model_registry.get(name)
+        except Exception as e:
+            raise CommandError(f"{name} 모델 로드 실패: {e}")
+        self.stdout.write(
+            f"📊 {loaded_model.key} / 이미지 {image.width}x{image.height} / 요청 {options['requests']}건 / "
+            f"동시 클라이언트 {options['clients']} / 수집 대기 {options['latency_ms']}ms"
+        )
+
+        baseline = None
+        for batch_size in options['batch_sizes']:
+            batcher = MicroBatcher(f"bench-{name}", BATCH_RUNNERS[name], max_batch_size=batch_size,
+                                   max_latency_ms=options['latency_ms'] if batch_size > 1 else 0)
+            try:
+                batcher.infer(image)  # 배치 크기별 첫 호출 비용(메모리 할당 등) 제외
+                wall, latencies = self._run(batcher, image, options['clients'], options['requests'])
+                stats = batcher.stats()
+            finally:
+                batcher.close()
+
+            throughput = len(latencies) / wall
+            baseline = baseline or throughput
+            self.stdout.write(
+                f"  batch ≤{batch_size:3} | {throughput:7.2f} img/s (x{throughput / baseline:.2f}) | "
+                f"평균 배치 {stats['avg_batch']} | "
+                f"p50 {statistics.median(latencies):7.0f}ms | p95 {self._p95(latencies):7.0f}ms"
+            )
+
+    @staticmethod
+    def _p95(latencies):
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    @staticmethod
+    def _run(batcher, image, clients, requests):
+        """clients개 스레드가 남은 요청을 나눠 순차로 보내고 요청별 지연(ms) 수집"""
+        remaining = iter(range(requests))
+        lock = threading.Lock()
+        latencies = []
+
+        def client():
+            while True:
+                with lock:
+                    if next(remaining, None) is None:
+                        return
+                started = time.perf_counter()
+                batcher.infer(image)
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started, latencies
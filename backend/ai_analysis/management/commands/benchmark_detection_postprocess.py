@@ -0,0 +1,161 @@
+# management/commands/benchmark_detection_postprocess.py
+import statistics
+import time
+import torch
+from django.core.management.base import BaseCommand, CommandError
+from torchvision.ops import batched_nms
+from ai_analysis.detection_postprocess import iter_detections, postprocess_detections, yolo_detections
+
+
+class SyntheticBoxes:
+    """ultralytics Boxes 모사 (xyxy/conf/cls 텐서, 박스 단위 순회 시 (1, ...) 슬라이스)"""
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy, self.conf, self.cls = xyxy, conf, cls
+
+    def __len__(self):
+        return len(self.xyxy)
+
+    def __iter__(self):
+        for i in range(len(self.xyxy)):
+            yield SyntheticBoxes(self.xyxy[i:i + 1], self.conf[i:i + 1], self.cls[i:i + 1])
+
+
+class SyntheticResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+def legacy_ssd_parse(prediction, original_width, original_height, model_input_size):
+    """기존 박스 단위 루프 (ModelManager._parse_torchvision_ssd_outputs, 로그 제외)"""
+    boxes, labels, scores = prediction['boxes'], prediction['labels'], prediction['scores']
+    valid_indices = scores > 0.3
+    valid_boxes = boxes[valid_indices]
+    valid_labels = labels[valid_indices]
+    valid_scores = scores[valid_indices]
+    scale_x = original_width / model_input_size
+    scale_y = original_height / model_input_size
+
+    detections = []
+    for i in range(len(valid_boxes)):
+        box = valid_boxes[i].cpu().numpy()
+        label = int(valid_labels[i].cpu().numpy())
+        score = float(valid_scores[i].cpu().numpy())
+        x1, y1, x2, y2 = box
+        orig_x1 = max(0, min(int(x1 * scale_x), original_width))
+        orig_y1 = max(0, min(int(y1 * scale_y), original_height))
+        orig_x2 = max(0, min(int(x2 * scale_x), original_width))
+        orig_y2 = max(0, min(int(y2 * scale_y), original_height))
+        if orig_x2 > orig_x1 + 5 and orig_y2 > orig_y1 + 5:
+            detections.append((label, [orig_x1, orig_y1, orig_x2, orig_y2], score))
+    return detections[:10]
+
+
+def vectorized_ssd_parse(prediction, original_width, original_height, model_input_size):
+    valid = postprocess_detections(
+        prediction['boxes'], prediction['scores'], prediction['labels'],
+        score_threshold=0.3, iou_threshold=0.45,
+        scale=(original_width / model_input_size, original_height / model_input_size),
+        image_size=(original_width, original_height), truncate=True, min_size=5, top_k=10,
+    )
+    return [(label, [int(value) for value in bbox], score) for bbox, score, label in iter_detections(valid)]
+
+
+def legacy_yolo_parse(result):
+    """기존 박스 단위 루프 (pipeline.run_yolo_analysis)"""
+    detections = []
+    for box in result.boxes:
+        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+        confidence = float(box.conf[0].cpu().numpy())
+        class_id = int(box.cls[0].cpu().numpy())
+        detections.append((class_id, [int(x1), int(y1), int(x2), int(y2)], confidence))
+    return detections
+
+
+def vectorized_yolo_parse(result):
+    return [(class_id, [int(value) for value in bbox], confidence)
+            for bbox, confidence, class_id in iter_detections(yolo_detections(result, truncate=True))]
+
+
+class Command(BaseCommand):
+    help = ('합성 모델 출력으로 기존 박스 단위 후처리 루프와 텐서 단위 후처리'
+            '(detection_postprocess)의 이미지당 처리 시간을 비교하고 결과가 같은지 확인합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=['ssd', 'yolo'], default='ssd', help='측정할 출력 형식')
+        parser.add_argument('--boxes', type=int, default=200,
+                            help='이미지당 모델 출력 박스 수 (torchvision SSD 기본 200, YOLO 최대 300)')
+        parser.add_argument('--images', type=int, default=50, help='측정할 이미지(출력) 수')
+        parser.add_argument('--repeat', type=int, default=5, help='반복 측정 횟수 (중앙값 사용)')
+        parser.add_argument('--device', default='cuda' if torch.cuda.is_available() else 'cpu',
+                            help='출력 텐서를 둘 디바이스')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        try:
+            device = torch.device(options['device'])
+            torch.empty(1, device=device)
+        except Exception as e:
+            raise CommandError(f"디바이스 사용 불가 ({options['device']}): {e}")
+
+        generator = torch.Generator().manual_seed(options['seed'])
+        outputs = [self._synthetic_output(options['boxes'], generator, device) for _ in range(options['images'])]
+        original_size = (2048, 2500)
+
+        if options['model'] == 'ssd':
+            legacy = lambda output: legacy_ssd_parse(output, *original_size, 300)
+            vectorized = lambda output: vectorized_ssd_parse(output, *original_size, 300)
+            outputs = [self._as_ssd_prediction(output) for output in outputs]
+        else:
+            legacy, vectorized = legacy_yolo_parse, vectorized_yolo_parse
+            outputs = [SyntheticResult(SyntheticBoxes(output['boxes'], output['scores'], output['labels'].float()))
+                       for output in outputs]
+
+        mismatches = sum(1 for output in outputs if not self._same(legacy(output), vectorized(output)))
+
+        self.stdout.write(
+            f"📊 {options['model']} 출력 / 이미지당 박스 {options['boxes']}개 / 이미지 {options['images']}장 / "
+            f"디바이스 {device}"
+        )
+        legacy_ms = self._measure(legacy, outputs, options['repeat'], device)
+        vectorized_ms = self._measure(vectorized, outputs, options['repeat'], device)
+        self.stdout.write(f"  박스 단위 루프 | {legacy_ms:8.3f} ms/img")
+        self.stdout.write(f"  텐서 단위 처리 | {vectorized_ms:8.3f} ms/img (x{legacy_ms / vectorized_ms:.1f})")
+        if mismatches:
+            self.stdout.write(self.style.WARNING(f"⚠️ 결과 불일치 {mismatches}/{len(outputs)}장"))
+        else:
+            self.stdout.write(self.style.SUCCESS("✅ 모든 이미지에서 결과 일치"))
+
+    @staticmethod
+    def _synthetic_output(num_boxes, generator, device):
+        """모델 입력(300/640 기준) 좌표의 무작위 박스, 신뢰도 내림차순"""
+        xy = torch.rand(num_boxes, 2, generator=generator) * 280
+        wh = torch.rand(num_boxes, 2, generator=generator) * 120 + 1
+        boxes = torch.cat([xy, xy + wh], dim=1)
+        scores = torch.rand(num_boxes, generator=generator).sort(descending=True).values
+        labels = torch.randint(1, 14, (num_boxes,), generator=generator)
+        return {'boxes': boxes.to(device), 'scores': scores.to(device), 'labels': labels.to(device)}
+
+    @staticmethod
+    def _as_ssd_prediction(output):
+        """torchvision SSD처럼 클래스별 NMS(0.45)를 거친 출력으로 정리"""
+        keep = batched_nms(output['boxes'], output['scores'], output['labels'], 0.45)
+        return {key: value[keep] for key, value in output.items()}
+
+    @staticmethod
+    def _same(legacy, vectorized):
+        return len(legacy) == len(vectorized) and all(
+            a[0] == b[0] and a[1] == b[1] and abs(a[2] - b[2]) < 1e-6 for a, b in zip(legacy, vectorized)
+        )
+
+    @staticmethod
+    def _measure(parse, outputs, repeat, device):
+        timings = []
+        for _ in range(max(1, repeat)):
+            if device.type == 'cuda':
+                torch.cuda.synchronize()
+            started = time.perf_counter()
+            for output in outputs:
+                parse(output)
+            timings.append((time.perf_counter() - started) * 1000 / len(outputs))
+        return statistics.median(timings)
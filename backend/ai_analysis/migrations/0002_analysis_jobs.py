@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:05
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_analysis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIAnalysisJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('study_uid', models.CharField(max_length=255)),
+                ('model_type', models.CharField(choices=[('yolo', 'YOLOv8'), ('ssd', 'SSD')], max_length=10)),
+                ('overwrite', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('queued', '대기'), ('running', '실행중'), ('succeeded', '완료'), ('failed', '실패')], default='queued', max_length=20)),
+                ('stage', models.CharField(blank=True, max_length=30)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('active_key', models.CharField(blank=True, max_length=300, null=True, unique=True)),
+                ('celery_task_id', models.CharField(blank=True, max_length=255)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'ai_analysis_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['study_uid', 'model_type'], name='ai_job_study_model_idx')],
+            },
+        ),
+    ]
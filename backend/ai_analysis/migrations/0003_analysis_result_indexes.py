@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_analysis', '0002_analysis_jobs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aianalysisresult',
+            index=models.Index(fields=['study_uid', 'model_name', 'patient_id'], name='ai_result_study_model_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aianalysisresult',
+            index=models.Index(fields=['study_uid', '-created_at'], name='ai_result_study_created_idx'),
+        ),
+    ]
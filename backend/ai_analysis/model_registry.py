@@ -0,0 +1,244 @@
+# backend/ai_analysis/model_registry.py
+
+import hashlib
+import itertools
+import logging
+import os
+import threading
+import time
+from django.conf import settings
+from PIL import Image
+from .utils import ModelManager
+
+logger = logging.getLogger(__name__)
+
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+
+def file_checksum(path):
+    """가중치 파일 sha256 (파일이 없으면 None)"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def file_signature(path):
+    """변경 감지용 (mtime, size). 파일이 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def process_rss_bytes():
+    """현재 프로세스 RSS (Linux /proc 기준, 그 외에는 None)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def parameter_bytes(model):
+    """모델 파라미터 + 버퍼 메모리 (torch 모듈이 아니면 None)"""
+    module = getattr(model, 'model', model)  # ultralytics YOLO는 nn.Module을 감쌈
+    if not hasattr(module, 'parameters') or not hasattr(module, 'buffers'):
+        return None
+    return sum(t.numel() * t.element_size() for t in itertools.chain(module.parameters(), module.buffers()))
+
+
+class LoadedModel:
+    """로드된 모델 하나 (모델 이름 + 가중치 checksum 단위)"""
+
+    def __init__(self, name, model, device, path, checksum, signature):
+        self.name = name
+        self.model = model
+        self.device = device
+        self.path = path
+        self.checksum = checksum
+        self.signature = signature
+        self.loaded_at = time.time()
+        self.checked_at = time.monotonic()
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self.parameter_bytes = parameter_bytes(model)
+        self.rss_delta_bytes = None
+        self.uses = 0
+        # YOLO predictor 등은 스레드 안전하지 않으므로 같은 모델 추론은 순서대로
+        self.inference_lock = threading.Lock()
+
+    @property
+    def key(self):
+        return f"{self.name}@{(self.checksum or 'dummy')[:12]}"
+
+    @property
+    def is_dummy(self):
+        return 'Dummy' in type(self.model).__name__
+
+    def status(self):
+        return {
+            'key': self.key,
+            'loaded': True,
+            'dummy': self.is_dummy,
+            'path': str(self.path),
+            'checksum': self.checksum,
+            'device': str(self.device) if self.device is not None else None,
+            'loaded_at': self.loaded_at,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'parameter_bytes': self.parameter_bytes,
+            'rss_delta_bytes': self.rss_delta_bytes,
+            'uses': self.uses,
+        }
+
+
+def _load_yolo():
+    return ModelManager.load_yolo_model(), None
+
+
+def _warmup_yolo(model, device):
+    model(Image.new('RGB', (640, 640)), verbose=False)
+
+
+def _load_ssd():
+    # load_ssd_model()은 로드 직후 dummy forward pass까지 수행 (별도 warmup 불필요)
+    return ModelManager.load_ssd_model()
+
+
+# 이름: (가중치 파일명, 로더, warmup)
+MODEL_SPECS = {
+    'yolo': ('yolov8_best.pt', _load_yolo, _warmup_yolo),
+    'ssd': ('ssd.pth', _load_ssd, None),
+}
+
+
+class ModelRegistry:
+    """프로세스 전역 AI 모델 레지스트리
+
+    - 모델마다 프로세스당 한 번만 로드하고 요청 간에 재사용 (모델 이름 + 가중치 checksum)
+    - check_interval초마다 가중치 파일 (mtime, size)를 확인하고, 바뀌었으면 checksum을
+      다시 계산해 내용이 다를 때만 새로 로드
+    - 로드 직후 dummy 입력으로 warmup해 첫 요청의 지연(lazy init)을 없앰
+    """
+
+    def __init__(self, models_dir, specs, check_interval=5.0):
+        self.models_dir = models_dir
+        self.specs = specs
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._load_locks = {name: threading.Lock() for name in specs}
+        self._entries = {}
+        self._errors = {}
+
+    def path(self, name):
+        return self.models_dir / self.specs[name][0]
+
+    def get(self, name):
+        """로드된 모델 반환 (필요하면 로드/재로드). 로드 실패 시 예외"""
+        if name not in self.specs:
+            raise KeyError(f"등록되지 않은 모델: {name}")
+        entry = self._entries.get(name)
+        if entry is not None and time.monotonic() - entry.checked_at < self.check_interval:
+            entry.uses += 1
+            return entry
+
+        with self._load_locks[name]:
+            entry = self._entries.get(name)
+            if entry is None or self._weights_changed(entry):
+                entry = self._load(name)
+            entry.uses += 1
+            return entry
+
+    def _weights_changed(self, entry):
+        entry.checked_at = time.monotonic()
+        signature = file_signature(entry.path)
+        if signature == entry.signature:
+            return False
+        checksum = file_checksum(entry.path)
+        if checksum == entry.checksum:
+            # touch 등 내용 변화 없음
+            entry.signature = signature
+            return False
+        logger.info(f"♻️ {entry.name} 가중치 변경 감지 → 재로드 ({entry.checksum} → {checksum})")
+        return True
+
+    def _load(self, name):
+        """가중치를 로드하고 warmup까지 마친 뒤 레지스트리 교체"""
+        _, loader, warmup = self.specs[name]
+        path = self.path(name)
+        signature = file_signature(path)
+        checksum = file_checksum(path)
+        rss_before = process_rss_bytes()
+
+        started = time.perf_counter()
+        try:
+            model, device = loader()
+        except Exception as e:
+            with self._lock:
+                self._errors[name] = str(e)
+            raise
+        entry = LoadedModel(name, model, device, path, checksum, signature)
+        entry.load_seconds = round(time.perf_counter() - started, 3)
+
+        if warmup is not None and not entry.is_dummy:
+            started = time.perf_counter()
+            try:
+                warmup(model, device)
+                entry.warmup_seconds = round(time.perf_counter() - started, 3)
+            except Exception as e:
+                logger.warning(f"⚠️ {name} warmup 실패: {e}")
+
+        rss_after = process_rss_bytes()
+        if rss_before is not None and rss_after is not None:
+            entry.rss_delta_bytes = rss_after - rss_before
+
+        with self._lock:
+            self._entries[name] = entry
+            self._errors.pop(name, None)
+        logger.info(
+            f"✅ {entry.key} 로드 완료 (로드 {entry.load_seconds}s, warmup {entry.warmup_seconds}s, "
+            f"파라미터 {entry.parameter_bytes} bytes)"
+        )
+        return entry
+
+    def reload(self, name):
+        """가중치 변경 여부와 관계없이 다시 로드"""
+        with self._load_locks[name]:
+            return self._load(name)
+
+    def warmup_all(self, names=None):
+        """등록된 모델(names를 주면 그중 해당 모델만)을 미리 로드 (실패한 모델은 status에 오류로 표시)"""
+        for name in self.specs:
+            if names and name not in names:
+                continue
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"❌ {name} 모델 warmup 실패: {e}")
+
+    def status(self):
+        with self._lock:
+            entries = dict(self._entries)
+            errors = dict(self._errors)
+        result = {}
+        for name in self.specs:
+            entry = entries.get(name)
+            if entry is not None:
+                result[name] = entry.status()
+            else:
+                result[name] = {'loaded': False, 'path': str(self.path(name)), 'error': errors.get(name)}
+        return result
+
+
+_registry_config = getattr(settings, 'AI_MODEL_REGISTRY', {})
+model_registry = ModelRegistry(
+    settings.AI_MODELS_DIR,
+    MODEL_SPECS,
+    check_interval=_registry_config.get('CHECK_INTERVAL', 5.0),
+)
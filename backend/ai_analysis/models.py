@@ -1,6 +1,28 @@
-from django.db import models
+import uuid
+from django.db import models, transaction
 from django.utils import timezone
 
+class AIAnalysisResultManager(models.Manager):
+    """AIAnalysisResult 전용 Manager"""
+
+    def for_analysis(self, patient_id, study_uid, model_name):
+        """한 번의 분석이 만드는 결과 집합 (환자 + 스터디 + 모델)"""
+        return self.filter(patient_id=patient_id, study_uid=study_uid, model_name=model_name)
+
+    def replace_set(self, patient_id, study_uid, model_name, results):
+        """결과 집합 교체: 기존 삭제 + 새 결과 bulk insert를 한 트랜잭션에서 처리
+
+        중간에 실패하면 기존 결과가 그대로 남습니다.
+
+        Returns:
+            tuple: (삭제된 수, 저장된 AIAnalysisResult 목록)
+        """
+        with transaction.atomic():
+            deleted_count = self.for_analysis(patient_id, study_uid, model_name).delete()[0]
+            created = self.bulk_create(results)
+        return deleted_count, created
+
+
 class AIAnalysisResult(models.Model):
     """AI 분석 결과 (바운딩박스)"""
     
@@ -26,9 +48,90 @@ class AIAnalysisResult(models.Model):
     processing_time = models.FloatField()
     
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = AIAnalysisResultManager()
     
     class Meta:
         db_table = 'ai_analysis_results'
+        indexes = [
+            # 중복 체크/덮어쓰기 (study_uid + model_name + patient_id), study_uid 단독 조회에도 사용
+            models.Index(fields=['study_uid', 'model_name', 'patient_id'], name='ai_result_study_model_idx'),
+            # 스터디별 결과 목록 (최신순)
+            models.Index(fields=['study_uid', '-created_at'], name='ai_result_study_created_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.patient_id} - {self.label}"
\ No newline at end of file
+        return f"{self.patient_id} - {self.label}"
+
+
+class AIAnalysisJob(models.Model):
+    """비동기 AI 분석 작업 (Celery 워커에서 실행, 클라이언트는 상태를 polling/구독)"""
+
+    MODEL_TYPE_CHOICES = [
+        ('yolo', 'YOLOv8'),
+        ('ssd', 'SSD'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', '대기'),
+        ('running', '실행중'),
+        ('succeeded', '완료'),
+        ('failed', '실패'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    study_uid = models.CharField(max_length=255)
+    model_type = models.CharField(max_length=10, choices=MODEL_TYPE_CHOICES)
+    overwrite = models.BooleanField(default=False)
+
+    # 진행 상태
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    stage = models.CharField(max_length=30, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+
+    # 진행 중인 동일 (모델, 스터디) 작업 중복 방지: 대기/실행 중에만 값이 있고 끝나면 NULL
+    # (MariaDB는 조건부 unique 제약을 지원하지 않으므로 NULL 허용 unique 컬럼 사용)
+    active_key = models.CharField(max_length=300, unique=True, null=True, blank=True)
+
+    celery_task_id = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ai_analysis_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['study_uid', 'model_type'], name='ai_job_study_model_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_type} - {self.study_uid} - {self.status}"
+
+    @staticmethod
+    def make_active_key(model_type, study_uid):
+        return f"{model_type}:{study_uid}"
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+    def to_dict(self):
+        return {
+            'job_id': str(self.id),
+            'study_uid': self.study_uid,
+            'model_type': self.model_type,
+            'overwrite': self.overwrite,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error_message or None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
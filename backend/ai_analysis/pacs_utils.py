@@ -1,8 +1,166 @@
 import requests
 import logging
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.dispatch import receiver
+
+from medical_integration.orthanc_api import OrthancAPI, ORTHANC_TIMEOUTS
+from medical_integration.signals import study_deleted, patient_deleted
 
 logger = logging.getLogger(__name__)
 
+
+class StudyLookupCache:
+    """Study UID -> (환자 정보, Orthanc Patient ID) LRU + TTL 메모
+
+    스레드 안전하며 maxsize를 넘으면 가장 오래 사용하지 않은 항목부터 제거합니다.
+    """
+    
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, study_uid):
+        with self._lock:
+            entry = self._entries.get(study_uid)
+            if entry is None:
+                return None
+            expires_at, patient_info, _ = entry
+            if expires_at < time.monotonic():
+                del self._entries[study_uid]
+                return None
+            self._entries.move_to_end(study_uid)
+            return dict(patient_info)
+    
+    def set(self, study_uid, patient_info, orthanc_patient_id=None):
+        with self._lock:
+            self._entries[study_uid] = (time.monotonic() + self.ttl, dict(patient_info), orthanc_patient_id)
+            self._entries.move_to_end(study_uid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def invalidate_study(self, orthanc_study_id):
+        with self._lock:
+            for study_uid, (_, patient_info, _) in list(self._entries.items()):
+                if patient_info.get('pacs_study_id') == orthanc_study_id:
+                    del self._entries[study_uid]
+    
+    def invalidate_patient(self, orthanc_patient_id):
+        with self._lock:
+            for study_uid, (_, _, cached_patient_id) in list(self._entries.items()):
+                if cached_patient_id == orthanc_patient_id:
+                    del self._entries[study_uid]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_pacs_config = getattr(settings, 'PACS_CONFIG', {})
+study_lookup_cache = StudyLookupCache(
+    maxsize=_pacs_config.get('STUDY_LOOKUP_CACHE_SIZE', 1024),
+    ttl=_pacs_config.get('STUDY_LOOKUP_CACHE_TTL', 300),
+)
+
+
+@receiver(study_deleted)
+def _invalidate_deleted_study(sender, orthanc_study_id, **kwargs):
+    study_lookup_cache.invalidate_study(orthanc_study_id)
+
+
+@receiver(patient_deleted)
+def _invalidate_deleted_patient(sender, orthanc_patient_id, **kwargs):
+    study_lookup_cache.invalidate_patient(orthanc_patient_id)
+
+
+def _build_patient_info(study_data, study_uid):
+    """Orthanc Study JSON에서 환자 정보 dict 생성"""
+    patient_tags = study_data.get('PatientMainDicomTags', {})
+    main_tags = study_data.get('MainDicomTags', {})
+    
+    return {
+        'patient_id': patient_tags.get('PatientID', 'UNKNOWN'),
+        'patient_name': patient_tags.get('PatientName', 'UNKNOWN'),
+        'patient_birth_date': patient_tags.get('PatientBirthDate', ''),
+        'patient_sex': patient_tags.get('PatientSex', ''),
+        'study_date': main_tags.get('StudyDate', ''),
+        'study_time': main_tags.get('StudyTime', ''),
+        'accession_number': main_tags.get('AccessionNumber', ''),
+        'study_id': main_tags.get('StudyID', ''),
+        'pacs_study_id': study_data.get('ID'),  # PACS 내부 ID
+        'study_instance_uid': study_uid
+    }
+
+def _get_patient_info_from_catalog(study_uid):
+    """로컬 Study 카탈로그에서 Study UID로 환자 정보 조회 (인덱스 조회 1회)
+
+    Returns:
+        tuple: (환자 정보, Orthanc Patient ID) 또는 None
+    """
+    from medical_integration.models import CatalogStudy
+    
+    study = CatalogStudy.objects.select_related('catalog_patient').filter(study_instance_uid=study_uid).first()
+    if not study:
+        return None
+    
+    patient_info = {
+        'patient_id': study.patient_id or 'UNKNOWN',
+        'patient_name': study.patient_name or 'UNKNOWN',
+        'patient_birth_date': study.patient_birth_date,
+        'patient_sex': study.patient_sex,
+        'study_date': study.study_date,
+        'study_time': study.study_time,
+        'accession_number': study.accession_number,
+        'study_id': study.study_id,
+        'pacs_study_id': study.orthanc_id,  # PACS 내부 ID
+        'study_instance_uid': study_uid
+    }
+    orthanc_patient_id = study.catalog_patient.orthanc_id if study.catalog_patient else None
+    return patient_info, orthanc_patient_id
+
+def _lookup_study_in_pacs(study_uid):
+    """Orthanc /tools/lookup으로 Study UID -> Study JSON 조회 (요청 2회)"""
+    orthanc_api = OrthancAPI()
+    session = orthanc_api.session
+    
+    lookup_response = session.post(f"{orthanc_api.base_url}/tools/lookup", data=study_uid,
+                                   auth=orthanc_api.auth, timeout=ORTHANC_TIMEOUTS['lookup'])
+    lookup_response.raise_for_status()
+    matches = [m for m in lookup_response.json() if m.get('Type') == 'Study']
+    if not matches:
+        return None
+    
+    study_response = session.get(f"{orthanc_api.base_url}/studies/{matches[0]['ID']}",
+                                 auth=orthanc_api.auth, timeout=ORTHANC_TIMEOUTS['lookup'])
+    study_response.raise_for_status()
+    return study_response.json()
+
+def resolve_study_uid(study_uid):
+    """Study UID를 PACS 환자 정보로 변환 (메모 -> 카탈로그 -> /tools/lookup)
+
+    아카이브 크기와 무관하게 최대 Orthanc 요청 2회로 끝납니다.
+    """
+    patient_info = study_lookup_cache.get(study_uid)
+    if patient_info:
+        return patient_info
+    
+    resolved = _get_patient_info_from_catalog(study_uid)
+    if resolved:
+        patient_info, orthanc_patient_id = resolved
+    else:
+        study_data = _lookup_study_in_pacs(study_uid)
+        if not study_data:
+            return None
+        patient_info = _build_patient_info(study_data, study_uid)
+        orthanc_patient_id = study_data.get('ParentPatient')
+    
+    study_lookup_cache.set(study_uid, patient_info, orthanc_patient_id)
+    return patient_info
+
 def get_patient_info_from_pacs(study_uid):
     """
     PACS에서 Study UID로 환자 정보를 가져오는 함수
@@ -13,51 +171,14 @@ def get_patient_info_from_pacs(study_uid):
     Returns:
         dict: 환자 정보 (patient_id, patient_name, study_info 등)
     """
-    pacs_url = "http://localhost:8042"
-    
     try:
-        # 1. 모든 스터디 목록 가져오기
-        studies_response = requests.get(f"{pacs_url}/studies", timeout=10)
-        studies_response.raise_for_status()
-        studies = studies_response.json()
+        patient_info = resolve_study_uid(study_uid)
+        if not patient_info:
+            logger.error(f"PACS에서 Study UID {study_uid}를 찾을 수 없습니다.")
+            return None
         
-        # 2. 각 스터디를 확인해서 해당 Study UID 찾기
-        for study_id in studies:
-            try:
-                study_response = requests.get(f"{pacs_url}/studies/{study_id}", timeout=10)
-                study_response.raise_for_status()
-                study_data = study_response.json()
-                
-                # Study UID 매칭 확인
-                pacs_study_uid = study_data.get('MainDicomTags', {}).get('StudyInstanceUID')
-                if pacs_study_uid == study_uid:
-                    # 환자 정보 추출
-                    patient_tags = study_data.get('PatientMainDicomTags', {})
-                    main_tags = study_data.get('MainDicomTags', {})
-                    
-                    patient_info = {
-                        'patient_id': patient_tags.get('PatientID', 'UNKNOWN'),
-                        'patient_name': patient_tags.get('PatientName', 'UNKNOWN'),
-                        'patient_birth_date': patient_tags.get('PatientBirthDate', ''),
-                        'patient_sex': patient_tags.get('PatientSex', ''),
-                        'study_date': main_tags.get('StudyDate', ''),
-                        'study_time': main_tags.get('StudyTime', ''),
-                        'accession_number': main_tags.get('AccessionNumber', ''),
-                        'study_id': main_tags.get('StudyID', ''),
-                        'pacs_study_id': study_id,  # PACS 내부 ID
-                        'study_instance_uid': study_uid
-                    }
-                    
-                    logger.info(f"PACS에서 환자 정보 찾음: {patient_info['patient_id']}")
-                    return patient_info
-                    
-            except requests.RequestException as e:
-                logger.warning(f"스터디 {study_id} 조회 실패: {e}")
-                continue
-        
-        # 해당 Study UID를 찾지 못한 경우
-        logger.error(f"PACS에서 Study UID {study_uid}를 찾을 수 없습니다.")
-        return None
+        logger.info(f"PACS에서 환자 정보 찾음: {patient_info['patient_id']}")
+        return patient_info
         
     except requests.RequestException as e:
         logger.error(f"PACS 연결 실패: {e}")
@@ -76,7 +197,7 @@ def get_series_info_from_pacs(study_uid):
     Returns:
         list: 시리즈 정보 리스트
     """
-    pacs_url = "http://localhost:8042"
+    orthanc_api = OrthancAPI()
     
     try:
         # 먼저 환자 정보를 가져와서 PACS 스터디 ID 얻기
@@ -86,35 +207,22 @@ def get_series_info_from_pacs(study_uid):
         
         pacs_study_id = patient_info['pacs_study_id']
         
-        # 스터디 상세 정보에서 시리즈 목록 가져오기
-        study_response = requests.get(f"{pacs_url}/studies/{pacs_study_id}", timeout=10)
-        study_response.raise_for_status()
-        study_data = study_response.json()
+        # 시리즈 목록을 확장 형태로 한 번에 가져오기
+        series_response = orthanc_api.session.get(f"{orthanc_api.base_url}/studies/{pacs_study_id}/series",
+                                                  auth=orthanc_api.auth, timeout=ORTHANC_TIMEOUTS['lookup'])
+        series_response.raise_for_status()
         
-        series_list = study_data.get('Series', [])
         series_info_list = []
-        
-        for series_id in series_list:
-            try:
-                series_response = requests.get(f"{pacs_url}/series/{series_id}", timeout=10)
-                series_response.raise_for_status()
-                series_data = series_response.json()
-                
-                series_tags = series_data.get('MainDicomTags', {})
-                series_info = {
-                    'series_instance_uid': series_tags.get('SeriesInstanceUID'),
-                    'series_number': series_tags.get('SeriesNumber'),
-                    'modality': series_tags.get('Modality'),
-                    'series_description': series_tags.get('SeriesDescription', ''),
-                    'pacs_series_id': series_id,
-                    'instances': series_data.get('Instances', [])
-                }
-                
-                series_info_list.append(series_info)
-                
-            except requests.RequestException as e:
-                logger.warning(f"시리즈 {series_id} 조회 실패: {e}")
-                continue
+        for series_data in series_response.json():
+            series_tags = series_data.get('MainDicomTags', {})
+            series_info_list.append({
+                'series_instance_uid': series_tags.get('SeriesInstanceUID'),
+                'series_number': series_tags.get('SeriesNumber'),
+                'modality': series_tags.get('Modality'),
+                'series_description': series_tags.get('SeriesDescription', ''),
+                'pacs_series_id': series_data.get('ID'),
+                'instances': series_data.get('Instances', [])
+            })
         
         return series_info_list
         
@@ -125,7 +233,9 @@ def get_series_info_from_pacs(study_uid):
 def test_pacs_connection():
     """PACS 연결 테스트"""
     try:
-        response = requests.get("http://localhost:8042/studies", timeout=5)
+        orthanc_api = OrthancAPI()
+        response = orthanc_api.session.get(f"{orthanc_api.base_url}/studies",
+                                           auth=orthanc_api.auth, timeout=ORTHANC_TIMEOUTS['system'])
         response.raise_for_status()
         studies = response.json()
         print(f"✅ PACS 연결 성공! 스터디 수: {len(studies)}")
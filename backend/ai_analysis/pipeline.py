@@ -0,0 +1,328 @@
+# backend/ai_analysis/pipeline.py
+
+import io
+import logging
+from PIL import Image
+from medical_integration.orthanc_api import OrthancAPI, ORTHANC_TIMEOUTS
+from medical_integration.thumbnail_store import thumbnail_store
+from .batching import yolo_batcher, ssd_batcher
+from .detection_postprocess import iter_detections, yolo_detections
+from .model_registry import model_registry
+from .models import AIAnalysisResult
+from .pacs_utils import get_patient_info_from_pacs
+
+logger = logging.getLogger(__name__)
+
+# 모델 타입 → AIAnalysisResult.model_name
+MODEL_NAMES = {'yolo': 'YOLOv8', 'ssd': 'SSD'}
+
+
+def _no_progress(stage, percent):
+    pass
+
+
+def get_image_from_orthanc(internal_study_id):
+    """
+    Orthanc에서 이미지 가져오기
+
+    Args:
+        internal_study_id: Orthanc 내부 Study ID (Study UID가 아님!)
+    """
+    try:
+        orthanc_api = OrthancAPI()
+        orthanc_url = orthanc_api.base_url
+        auth = orthanc_api.auth
+        session = orthanc_api.session
+
+        # 스터디의 인스턴스 목록 가져오기
+        response = session.get(f"{orthanc_url}/studies/{internal_study_id}/instances",
+                               auth=auth, timeout=ORTHANC_TIMEOUTS['default'])
+        response.raise_for_status()
+        instances = response.json()
+
+        if not instances:
+            raise Exception("인스턴스가 없습니다")
+
+        # 첫 번째 인스턴스의 미리보기 이미지
+        first_instance = instances[0]['ID']
+        # 🔥 Study 도착 시 저장해 둔 원본 미리보기가 있으면 Orthanc 렌더링 생략
+        preview = thumbnail_store.read(first_instance)
+        if preview is None:
+            image_response = session.get(f"{orthanc_url}/instances/{first_instance}/preview",
+                                         auth=auth, timeout=ORTHANC_TIMEOUTS['preview'])
+            image_response.raise_for_status()
+            preview = image_response.content
+
+        return Image.open(io.BytesIO(preview))
+
+    except Exception as e:
+        logger.error(f"Orthanc 이미지 가져오기 실패: {e}")
+        raise
+
+
+def prepare_analysis(model_type, study_uid, overwrite):
+    """PACS 환자 조회 + 기존 결과 확인
+
+    Returns:
+        tuple: (patient_info, None) 또는 분석을 진행하지 않을 때 (None, (응답 payload, HTTP status))
+    """
+    model_name = MODEL_NAMES[model_type]
+    label = model_type.upper()
+
+    # PACS에서 실제 환자 정보 가져오기
+    patient_info = get_patient_info_from_pacs(study_uid)
+    if not patient_info:
+        return None, ({
+            'status': 'error',
+            'message': f'PACS에서 Study UID {study_uid}에 해당하는 환자 정보를 찾을 수 없습니다.'
+        }, 404)
+
+    patient_id = patient_info['patient_id']
+    print(f"📋 PACS에서 가져온 환자 정보: {patient_id} - {patient_info['patient_name']}")
+    print(f"🔥 {label} 덮어쓰기 모드: {overwrite}")
+
+    # 덮어쓰기인 경우 기존 결과는 저장 시점에 새 결과와 한 트랜잭션으로 교체 (save_results)
+    if not overwrite:
+        existing_count = AIAnalysisResult.objects.for_analysis(patient_id, study_uid, model_name).count()
+        if existing_count:
+            print(f"⚠️ 기존 {label} 결과 존재 (환자: {patient_id}, 스터디: {study_uid}), 분석 중단")
+            return None, ({
+                'status': 'exists',
+                'message': f'환자 {patient_id}의 스터디 {study_uid}에 이미 {label} 분석 결과가 존재합니다',
+                'existing_count': existing_count
+            }, 200)
+
+    return patient_info, None
+
+
+def save_results(patient_info, study_uid, model_name, results):
+    """검출 결과를 한 트랜잭션에서 bulk 저장 (같은 환자/스터디/모델의 기존 결과는 교체)"""
+    deleted_count, created = AIAnalysisResult.objects.replace_set(
+        patient_info['patient_id'], study_uid, model_name, results
+    )
+    if deleted_count:
+        print(f"🗑️ 기존 {model_name} 결과 {deleted_count}개 교체 (환자: {patient_info['patient_id']})")
+    return created
+
+
+def yolo_input_shape(results, default=(640, 544)):
+    """YOLO 결과의 orig_shape에서 (width, height) 추출 (없으면 기본값)"""
+    for result in results:
+        for source in (result, getattr(result, 'boxes', None)):
+            value = getattr(source, 'orig_shape', None)
+            if isinstance(value, (tuple, list)) and len(value) >= 2:
+                height, width = value[:2]
+                return int(width), int(height)
+    return default
+
+
+def run_yolo_analysis(study_uid, overwrite=False, progress=_no_progress):
+    """YOLO 분석 파이프라인 (PACS 조회 → 이미지 → 추론 → DB 저장)
+
+    Returns:
+        tuple: (응답 payload, HTTP status)
+    """
+    print(f"🎯 YOLO 분석 시작: {study_uid}")
+    progress('patient', 10)
+    patient_info, early_response = prepare_analysis('yolo', study_uid, overwrite)
+    if early_response:
+        return early_response
+
+    # 1. YOLO 모델 (프로세스 전역 레지스트리에서 warm 상태로 재사용)
+    model = model_registry.get('yolo').model
+
+    # 2. Orthanc에서 이미지 가져오기
+    progress('image', 30)
+    image = get_image_from_orthanc(patient_info['pacs_study_id'])
+
+    # 원본 이미지 해상도
+    original_width = int(image.width)
+    original_height = int(image.height)
+    print(f"📐 원본 이미지 해상도: {original_width}x{original_height}")
+
+    # 3. YOLO 추론 (동시에 들어온 다른 분석 요청과 한 배치로 묶어 추론, 결과는 이 이미지 1장분)
+    progress('inference', 50)
+    results = [yolo_batcher.infer(image)]
+    actual_width, actual_height = yolo_input_shape(results)
+    print(f"✅ 최종 사용 해상도: {actual_width}x{actual_height}")
+
+    # 4. 결과 처리
+    progress('saving', 85)
+    rows = []
+    for result in results:
+        # 박스 전체를 텐서 단위로 정리 후 host 전송 1회 (박스별 .cpu() 없음)
+        for bbox, confidence, class_id in iter_detections(yolo_detections(result, truncate=True)):
+            class_name = model.names.get(class_id, f"class_{class_id}")
+
+            # DB 저장 (원본 해상도로 저장)
+            rows.append(AIAnalysisResult(
+                patient_id=patient_info['patient_id'],
+                study_uid=study_uid,
+                series_uid=f"{study_uid}.1",
+                instance_uid=f"{study_uid}.1.1",
+                instance_number=1,
+                label=class_name,
+                bbox=[int(value) for value in bbox],
+                confidence_score=confidence,
+                ai_text=f"{class_name} 검출 (YOLO) - 환자: {patient_info['patient_name']}",
+                modality="CR",
+                model_name="YOLOv8",
+                model_version="best",
+                image_width=original_width,   # DB에는 원본 해상도 저장
+                image_height=original_height, # DB에는 원본 해상도 저장
+                processing_time=1.0
+            ))
+
+    # 🔥 API 응답에는 YOLO 실제 사용 해상도 포함
+    detection_results = [{
+        'id': ai_result.id,
+        'label': ai_result.label,
+        'bbox': ai_result.bbox,
+        'confidence': ai_result.confidence_score,
+        'description': f"{ai_result.label} (YOLO: {ai_result.confidence_score:.2f})",
+        'image_width': actual_width,    # 🔥 YOLO 실제 사용 해상도
+        'image_height': actual_height,  # 🔥 YOLO 실제 사용 해상도
+        'patient_info': {
+            'patient_id': patient_info['patient_id'],
+            'patient_name': patient_info['patient_name']
+        }
+    } for ai_result in save_results(patient_info, study_uid, "YOLOv8", rows)]
+
+    print(f"✅ YOLO 분석 완료: {len(detection_results)}개 검출 (실제사용: {actual_width}x{actual_height})")
+
+    return {
+        'status': 'success',
+        'model_used': 'YOLOv8',
+        'study_uid': study_uid,
+        'patient_info': patient_info,
+        'detections': len(detection_results),
+        'image_width': actual_width,    # 🔥 YOLO 실제 사용 해상도
+        'image_height': actual_height,  # 🔥 YOLO 실제 사용 해상도
+        'original_width': original_width,   # 참고용 원본 해상도
+        'original_height': original_height, # 참고용 원본 해상도
+        'results': detection_results
+    }, 200
+
+
+def expand_small_bbox(bbox, image_width, image_height, min_size=20):
+    """너무 작은 박스는 중심 기준으로 확대 (3배 또는 최소 50픽셀)"""
+    x1, y1, x2, y2 = bbox[:4]
+    bbox_width = x2 - x1
+    bbox_height = y2 - y1
+    if bbox_width >= min_size and bbox_height >= min_size:
+        return [x1, y1, x2, y2]
+
+    print(f"⚠️ 박스가 너무 작음: {bbox_width}x{bbox_height}, 확대")
+    center_x = (x1 + x2) // 2
+    center_y = (y1 + y2) // 2
+    new_width = max(50, bbox_width * 3)
+    new_height = max(50, bbox_height * 3)
+    return [
+        max(0, center_x - new_width // 2),
+        max(0, center_y - new_height // 2),
+        min(image_width, center_x + new_width // 2),
+        min(image_height, center_y + new_height // 2),
+    ]
+
+
+def run_ssd_analysis(study_uid, overwrite=False, progress=_no_progress):
+    """SSD 분석 파이프라인 (PACS 조회 → 이미지 → 추론 → DB 저장)
+
+    Returns:
+        tuple: (응답 payload, HTTP status)
+    """
+    print(f"🔍 SSD 분석 시작: {study_uid}")
+    progress('patient', 10)
+    patient_info, early_response = prepare_analysis('ssd', study_uid, overwrite)
+    if early_response:
+        return early_response
+
+    # 1. 이미지 가져오기
+    progress('image', 30)
+    image = get_image_from_orthanc(patient_info['pacs_study_id'])
+
+    # 원본 이미지 해상도
+    original_width = int(image.width)
+    original_height = int(image.height)
+    print(f"📐 원본 이미지 해상도: {original_width}x{original_height}")
+
+    # 2. SSD 분석 (micro-batching 큐 경유, 모델은 레지스트리에서 재사용)
+    progress('inference', 50)
+    detections = ssd_batcher.infer(image)
+    print(f"🔍 SSD detections 개수: {len(detections)}")
+
+    # 3. DB 저장 및 결과 처리
+    progress('saving', 85)
+    rows = []
+    preprocessing = []
+    for detection in detections:
+        # SSD 결과에서 bbox와 전처리 정보 추출
+        bbox = detection['bbox']
+
+        # bbox 유효성 검사 및 최소 크기 보장
+        if len(bbox) < 4:
+            print(f"❌ 잘못된 bbox 형식: {bbox}")
+            continue
+        bbox = expand_small_bbox(bbox, original_width, original_height)
+        x1, y1, x2, y2 = bbox
+
+        # 최종 유효성 검사
+        if not (x2 > x1 and y2 > y1):
+            print(f"❌ 잘못된 bbox 크기: {bbox}")
+            continue
+
+        rows.append(AIAnalysisResult(
+            patient_id=patient_info['patient_id'],
+            study_uid=study_uid,
+            series_uid=f"{study_uid}.1",
+            instance_uid=f"{study_uid}.1.1",
+            instance_number=1,
+            label=detection['label'],
+            bbox=bbox,
+            confidence_score=detection['confidence'],
+            ai_text=f"{detection['label']} 검출 (SSD) - 환자: {patient_info['patient_name']}",
+            modality="CR",
+            model_name="SSD",
+            model_version="v1.0",
+            image_width=original_width,
+            image_height=original_height,
+            processing_time=1.0
+        ))
+        preprocessing.append(detection.get('preprocessing_info') or None)
+
+    # API 응답 데이터
+    saved_results = [{
+        'id': ai_result.id,
+        'label': ai_result.label,
+        'bbox': ai_result.bbox,
+        'confidence': ai_result.confidence_score,
+        'description': f"{ai_result.label} (SSD: {ai_result.confidence_score:.2f})",
+        'image_width': original_width,
+        'image_height': original_height,
+        'preprocessing_info': preprocessing_info,
+        'patient_info': {
+            'patient_id': patient_info['patient_id'],
+            'patient_name': patient_info['patient_name']
+        }
+    } for ai_result, preprocessing_info in zip(save_results(patient_info, study_uid, "SSD", rows), preprocessing)]
+
+    print(f"✅ SSD 분석 완료: {len(saved_results)}개 검출")
+
+    return {
+        'status': 'success',
+        'model_used': 'SSD',
+        'study_uid': study_uid,
+        'patient_info': patient_info,
+        'detections': len(saved_results),
+        'image_width': original_width,
+        'image_height': original_height,
+        'results': saved_results
+    }, 200
+
+
+PIPELINES = {'yolo': run_yolo_analysis, 'ssd': run_ssd_analysis}
+
+
+def run_analysis(model_type, study_uid, overwrite=False, progress=_no_progress):
+    """모델 타입('yolo' / 'ssd')별 분석 실행 → (응답 payload, HTTP status)"""
+    return PIPELINES[model_type](study_uid, overwrite=overwrite, progress=progress)
@@ -0,0 +1,23 @@
+from celery import shared_task
+from .jobs import run_job
+
+# 큐 라우팅은 settings.CELERY_TASK_ROUTES (YOLO → ai_yolo, SSD → ai_ssd)
+# acks_late: 워커가 실행 중 죽으면 다른 워커가 다시 받음 (run_job은 끝난 작업을 건너뜀)
+
+
+@shared_task(name='ai_analysis.run_yolo_job', acks_late=True, ignore_result=True)
+def run_yolo_job(job_id):
+    """YOLO 분석 작업 실행"""
+    run_job(job_id)
+
+
+@shared_task(name='ai_analysis.run_ssd_job', acks_late=True, ignore_result=True)
+def run_ssd_job(job_id):
+    """SSD 분석 작업 실행"""
+    run_job(job_id)
+
+
+JOB_TASKS = {
+    'yolo': run_yolo_job,
+    'ssd': run_ssd_job,
+}
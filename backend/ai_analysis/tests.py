@@ -1,3 +1,100 @@
+from datetime import timedelta
+from unittest import mock
 from django.test import TestCase
+from django.utils import timezone
 
-# Create your tests here.
+from . import jobs
+from .models import AIAnalysisJob
+
+
+class SubmitJobTests(TestCase):
+    """분석 작업 등록 (같은 모델/스터디 작업 중복 방지)"""
+
+    def setUp(self):
+        patcher = mock.patch('ai_analysis.jobs.enqueue_job')
+        self.enqueue_job = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_active_job_is_reused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first, first_created = jobs.submit_job('yolo', '1.2.3')
+            second, second_created = jobs.submit_job('yolo', '1.2.3')
+
+        self.assertTrue(first_created)
+        self.assertFalse(second_created)
+        self.assertEqual(first.id, second.id)
+        self.enqueue_job.assert_called_once_with(first)
+
+    def test_other_model_or_study_gets_its_own_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            jobs.submit_job('yolo', '1.2.3')
+            for model_type, study_uid in (('ssd', '1.2.3'), ('yolo', '1.2.4')):
+                with self.subTest(model_type=model_type, study_uid=study_uid):
+                    _, created = jobs.submit_job(model_type, study_uid)
+                    self.assertTrue(created)
+
+        self.assertEqual(self.enqueue_job.call_count, 3)
+
+    def test_concurrent_submit_returns_the_first_job(self):
+        existing = AIAnalysisJob.objects.create(
+            study_uid='1.2.3', model_type='yolo', active_key=AIAnalysisJob.make_active_key('yolo', '1.2.3'))
+        # 조회 시점에는 없었다가 생성 시점에 다른 요청이 먼저 만든 상황
+        missed = mock.Mock(**{'first.return_value': None})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with mock.patch.object(AIAnalysisJob.objects, 'filter', return_value=missed):
+                job, created = jobs.submit_job('yolo', '1.2.3')
+
+        self.assertFalse(created)
+        self.assertEqual(job.id, existing.id)
+        self.assertEqual(AIAnalysisJob.objects.count(), 1)
+        self.enqueue_job.assert_not_called()
+
+    def test_stale_job_is_failed_and_replaced(self):
+        stale, _ = jobs.submit_job('yolo', '1.2.3')
+        AIAnalysisJob.objects.filter(id=stale.id).update(
+            updated_at=timezone.now() - timedelta(seconds=jobs.STALE_SECONDS + 60))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job, created = jobs.submit_job('yolo', '1.2.3')
+
+        stale.refresh_from_db()
+        self.assertTrue(created)
+        self.assertNotEqual(job.id, stale.id)
+        self.assertEqual(stale.status, 'failed')
+        self.assertIsNone(stale.active_key)
+        self.assertEqual(job.active_key, AIAnalysisJob.make_active_key('yolo', '1.2.3'))
+        self.enqueue_job.assert_called_once_with(job)
+
+    def test_unknown_model_is_rejected(self):
+        with self.assertRaises(ValueError):
+            jobs.submit_job('resnet', '1.2.3')
+        self.assertFalse(AIAnalysisJob.objects.exists())
+
+
+class RunJobTests(TestCase):
+    """워커에서 분석 작업 실행"""
+
+    def test_redelivered_finished_job_is_skipped(self):
+        # acks_late 로 이미 끝난 작업이 다시 전달된 경우
+        for status in ('succeeded', 'failed'):
+            with self.subTest(status=status):
+                job = AIAnalysisJob.objects.create(study_uid='1.2.3', model_type='yolo', status=status)
+                with mock.patch('ai_analysis.jobs.run_analysis') as run_analysis:
+                    jobs.run_job(job.id)
+
+                run_analysis.assert_not_called()
+                job.refresh_from_db()
+                self.assertEqual(job.status, status)
+                self.assertIsNone(job.started_at)
+
+    def test_active_job_records_result(self):
+        job, _ = jobs.submit_job('ssd', '1.2.3')
+        with mock.patch('ai_analysis.jobs.run_analysis', return_value=({'status': 'success'}, 200)) as run_analysis:
+            jobs.run_job(job.id)
+
+        run_analysis.assert_called_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.result, {'status': 'success'})
+        self.assertIsNone(job.active_key)
@@ -1,13 +1,21 @@
 from django.urls import path
-from . import views
+from . import views, job_views
 
 urlpatterns = [
     path('analyze/', views.analyze_study_now, name='analyze_now'),           # YOLO
     path('analyze-ssd/', views.analyze_with_ssd, name='analyze_ssd'),        # SSD
+    path('jobs/', job_views.analysis_jobs, name='analysis_jobs'),            # 비동기 분석 작업 제출/목록
+    path('jobs/<uuid:job_id>/', job_views.analysis_job_detail, name='analysis_job_detail'),
     path('results/<str:study_uid>/', views.get_analysis_results, name='get_results'),
     path('clear/<str:study_uid>/', views.clear_results, name='clear_results'),
     path('status/', views.model_status, name='model_status'),
     path('check/<str:study_uid>/<str:model_type>/', views.check_existing_analysis, name='check_existing_analysis'),
     path('pacs-studies/', views.get_pacs_studies, name='get_pacs_studies'),  # 이 줄만 추가
     path('results/save/', views.save_analysis_result, name='save_analysis_result'),  # ✅ 이 줄 추가
-]
\ No newline at end of file
+]
+
+# 진행 구독(SSE)은 ASGI 배포에서만: WSGI 클라이언트는 jobs/<id>/ polling 사용
+if job_views.EVENTS_ENABLED:
+    urlpatterns.append(
+        path('jobs/<uuid:job_id>/events/', job_views.analysis_job_events, name='analysis_job_events')
+    )
@@ -268,9 +268,13 @@ import numpy as np
 from PIL import Image
 import torchvision
 import traceback
+from .detection_postprocess import postprocess_detections, yolo_detections, iter_detections
 
 logger = logging.getLogger(__name__)
 
+# torchvision ssd300_vgg16 기본값과 동일 (모델 내부 NMS를 거친 출력에는 영향 없음)
+SSD_NMS_IOU_THRESHOLD = 0.45
+
 class ModelManager:
     """AI 모델 관리 클래스 - 실제 모델 파일 우선 사용"""
     
@@ -324,8 +328,8 @@ class ModelManager:
                 # ✅ 클래스 수 (학습할 때와 동일)
                 num_classes = 15  # 14개 클래스 + 배경 포함
                 
-                # ✅ 기본 SSD300 모델 생성
-                model = ssd300_vgg16(weights="DEFAULT")
+                # ✅ 기본 SSD300 모델 구조 생성 (모든 가중치를 체크포인트로 덮어쓰므로 사전학습 가중치는 받지 않음)
+                model = ssd300_vgg16(weights=None, weights_backbone=None)
                 
                 # ✅ 기존 정보 얻기 (학습할 때와 동일)
                 in_channels = [512, 1024, 512, 256, 256, 256]  # VGG SSD feature map 채널 수
@@ -449,23 +453,19 @@ class ModelManager:
                 if boxes is not None and len(boxes) > 0:
                     total_boxes += len(boxes)
                     logger.info(f"YOLO에서 {len(boxes)}개 원시 검출")
-                    
-                    for box in boxes:
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0].cpu().numpy())
-                        class_id = int(box.cls[0].cpu().numpy())
+
+                    # 최소 신뢰도 0.01 이상만 (텐서 단위 마스킹, host 전송 1회)
+                    valid = yolo_detections(result, score_threshold=0.01, inclusive=True, truncate=True)
+                    for bbox, confidence, class_id in iter_detections(valid):
                         class_name = model.names.get(class_id, f"class_{class_id}")
-                        
-                        # 최소 신뢰도 0.01 이상만
-                        if confidence >= 0.01:
-                            logger.info(f"✅ 검출: {class_name} (신뢰도: {confidence:.3f})")
-                            
-                            detections.append({
-                                'label': class_name,
-                                'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                                'confidence': confidence,
-                                'model': 'YOLOv8'
-                            })
+                        logger.info(f"✅ 검출: {class_name} (신뢰도: {confidence:.3f})")
+
+                        detections.append({
+                            'label': class_name,
+                            'bbox': [int(value) for value in bbox],
+                            'confidence': confidence,
+                            'model': 'YOLOv8'
+                        })
             
             logger.info(f"총 {total_boxes}개 원시 검출, {len(detections)}개 유효 검출")
             
@@ -483,36 +483,35 @@ class ModelManager:
     
     @staticmethod
     def run_ssd_inference(model, device, image):
-        """🔥 SSD300 추론 - torchvision 출력 형태 처리"""
+        """🔥 SSD300 추론 - torchvision 출력 형태 처리 (이미지 1장)"""
+        return ModelManager.run_ssd_batch(model, device, [image])[0]
+
+    @staticmethod
+    def run_ssd_batch(model, device, images):
+        """SSD300 배치 추론 - 이미지 N장을 한 번의 forward pass로 처리
+
+        Returns:
+            list: 이미지별 검출 결과 목록 (입력 순서와 동일)
+        """
         try:
-            print("🔍 SSD 추론 시작")
+            print(f"🔍 SSD 추론 시작 (배치 {len(images)}장)")
             
             # 더미 모델인지 확인
             if hasattr(model, '__class__') and 'DummySSDModel' in str(model.__class__):
                 print("더미 SSD 모델 사용")
-                return ModelManager._generate_medical_dummy_results(image, 'SSD')
-            
-            # 실제 SSD300 모델 추론
-            print("실제 SSD300 모델로 추론 시도")
+                return [ModelManager._generate_medical_dummy_results(image, 'SSD') for image in images]
             
-            # 🎯 원본 이미지 정보 저장
-            original_width, original_height = image.size
             target_size = 300  # SSD300 기준
             
-            print(f"📐 원본 이미지: {original_width}x{original_height}")
-            
             # 🔥 이미지 전처리 (torchvision SSD용)
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # torchvision transforms
             import torchvision.transforms as T
             transform = T.Compose([
                 T.Resize((target_size, target_size)),
                 T.ToTensor(),
             ])
             
-            input_tensor = transform(image).unsqueeze(0).to(device)
+            images = [image if image.mode == 'RGB' else image.convert('RGB') for image in images]
+            input_tensor = torch.stack([transform(image) for image in images]).to(device)
             print(f"SSD 입력 텐서 형태: {input_tensor.shape}")
             
             # 모델 추론 (evaluation mode)
@@ -520,35 +519,26 @@ class ModelManager:
             with torch.no_grad():
                 predictions = model(input_tensor)
             
-            print(f"SSD 모델 출력 타입: {type(predictions)}")
-            
-            if isinstance(predictions, list) and len(predictions) > 0:
-                pred = predictions[0]  # 첫 번째 이미지 결과
-                print(f"예측 결과 keys: {list(pred.keys()) if isinstance(pred, dict) else 'dict가 아님'}")
-                
-                if isinstance(pred, dict):
-                    for key, value in pred.items():
-                        if hasattr(value, 'shape'):
-                            print(f"  {key}: {value.shape}")
-                        else:
-                            print(f"  {key}: {type(value)}")
-            
-            # 🎯 torchvision SSD 결과 파싱
-            detections = ModelManager._parse_torchvision_ssd_outputs(
-                predictions, original_width, original_height, target_size
-            )
-            
-            if not detections:
-                print("실제 SSD300 모델에서 검출 없음, 더미 결과 사용")
-                return ModelManager._generate_medical_dummy_results(image, 'SSD')
-            
-            print(f"✅ 실제 SSD300 검출: {len(detections)}개")
-            return detections
+            results = []
+            for image, prediction in zip(images, predictions):
+                # 🎯 torchvision SSD 결과 파싱 (원본 해상도 기준으로 좌표 변환)
+                original_width, original_height = image.size
+                detections = ModelManager._parse_torchvision_ssd_outputs(
+                    [prediction], original_width, original_height, target_size
+                )
+                
+                if not detections:
+                    print("실제 SSD300 모델에서 검출 없음, 더미 결과 사용")
+                    detections = ModelManager._generate_medical_dummy_results(image, 'SSD')
+                else:
+                    print(f"✅ 실제 SSD300 검출: {len(detections)}개")
+                results.append(detections)
+            return results
             
         except Exception as e:
             print(f"❌ SSD 추론 실패: {e}")
             print(f"❌ 상세 에러: {traceback.format_exc()}")
-            return ModelManager._generate_medical_dummy_results(image, 'SSD')
+            return [ModelManager._generate_medical_dummy_results(image, 'SSD') for image in images]
     
     @staticmethod
     def _parse_torchvision_ssd_outputs(predictions, original_width, original_height, model_input_size):
@@ -576,21 +566,28 @@ class ModelManager:
                 print("검출된 객체 없음")
                 return detections
                 
-            # 신뢰도 임계값 적용
             confidence_threshold = 0.3
-            valid_indices = scores > confidence_threshold
-            
-            valid_boxes = boxes[valid_indices]
-            valid_labels = labels[valid_indices] 
-            valid_scores = scores[valid_indices]
-            
-            print(f"🔍 임계값 {confidence_threshold} 이상: {len(valid_boxes)}개")
-            
+
             # 스케일링 비율 (SSD input -> 원본)
             scale_x = original_width / model_input_size
             scale_y = original_height / model_input_size
-            
+
             print(f"🔄 스케일링 비율: x={scale_x:.3f}, y={scale_y:.3f}")
+
+            # 임계값 → 클래스별 NMS → 원본 해상도 변환/경계값 체크 → 유효 박스(5px 초과) → 상위 10개
+            # (박스 텐서 전체에 대해 한 번에 처리, host 전송 1회)
+            valid = postprocess_detections(
+                boxes, scores, labels,
+                score_threshold=confidence_threshold,
+                iou_threshold=SSD_NMS_IOU_THRESHOLD,
+                scale=(scale_x, scale_y),
+                image_size=(original_width, original_height),
+                truncate=True,
+                min_size=5,
+                top_k=10,
+            )
+
+            print(f"🔍 임계값 {confidence_threshold} 이상 유효 검출: {len(valid.scores)}개")
             
             # 클래스명 매핑 (실제 학습한 클래스에 맞게 수정 필요)
             class_names = {
@@ -623,41 +620,21 @@ class ModelManager:
                 'original_height': original_height
             }
             
-            for i in range(len(valid_boxes)):
-                box = valid_boxes[i].cpu().numpy()
-                label = int(valid_labels[i].cpu().numpy())
-                score = float(valid_scores[i].cpu().numpy())
-                
-                # 좌표 스케일링 (SSD input -> 원본)
-                x1, y1, x2, y2 = box
-                
-                # 원본 해상도로 변환
-                orig_x1 = int(x1 * scale_x)
-                orig_y1 = int(y1 * scale_y)
-                orig_x2 = int(x2 * scale_x)
-                orig_y2 = int(y2 * scale_y)
-                
-                # 경계값 체크
-                orig_x1 = max(0, min(orig_x1, original_width))
-                orig_y1 = max(0, min(orig_y1, original_height))
-                orig_x2 = max(0, min(orig_x2, original_width))
-                orig_y2 = max(0, min(orig_y2, original_height))
-                
-                # 유효한 박스인지 확인
-                if orig_x2 > orig_x1 + 5 and orig_y2 > orig_y1 + 5:
-                    class_name = class_names.get(label, f'class_{label}')
-                    
-                    detections.append({
-                        'label': class_name,
-                        'bbox': [orig_x1, orig_y1, orig_x2, orig_y2],
-                        'confidence': score,
-                        'model': 'SSD300',
-                        'preprocessing_info': preprocessing_info
-                    })
-                    
-                    print(f"✅ SSD 검출: {class_name} ({score:.3f}) [{orig_x1},{orig_y1},{orig_x2},{orig_y2}]")
-            
-            return detections[:10]  # 최대 10개로 제한
+            for bbox, score, label in iter_detections(valid):
+                orig_x1, orig_y1, orig_x2, orig_y2 = [int(value) for value in bbox]
+                class_name = class_names.get(label, f'class_{label}')
+
+                detections.append({
+                    'label': class_name,
+                    'bbox': [orig_x1, orig_y1, orig_x2, orig_y2],
+                    'confidence': score,
+                    'model': 'SSD300',
+                    'preprocessing_info': preprocessing_info
+                })
+
+                print(f"✅ SSD 검출: {class_name} ({score:.3f}) [{orig_x1},{orig_y1},{orig_x2},{orig_y2}]")
+
+            return detections  # 최대 10개 (top_k)
             
         except Exception as e:
             print(f"❌ SSD 출력 파싱 실패: {e}")
@@ -0,0 +1,5 @@
+# Django 시작 시 Celery 앱을 로드해 shared_task가 이 앱(브로커 설정)을 사용하도록 함
+# (manage.py를 포함한 모든 Django 실행에 celery 패키지 필요: requirements.txt)
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
@@ -2,17 +2,21 @@ from celery import Celery
 import os
 
 # Django 설정 모듈 지정
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pacs_model.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 # Celery 앱 생성
-app = Celery('pacs_model')
+app = Celery('backend')
 
-# Django 설정에서 Celery 설정 읽기
+# Django 설정에서 Celery 설정 읽기 (CELERY_ 접두사)
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Django 앱에서 tasks.py 자동 발견
 app.autodiscover_tasks()
 
+# 워커 실행 (docker-compose의 ai-worker-yolo / ai-worker-ssd 서비스와 동일, 브로커는 redis 서비스):
+#   celery -A backend worker -Q ai_yolo -P threads -c 4 -n yolo@%h
+#   celery -A backend worker -Q ai_ssd -P threads -c 4 -n ssd@%h
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -20,4 +24,4 @@ def debug_task(self):
 @app.task
 def health_check():
     """Celery 상태 확인용 태스크"""
-    return {'status': 'ok', 'message': 'Celery is running!'}
\ No newline at end of file
+    return {'status': 'ok', 'message': 'Celery is running!'}
@@ -180,7 +180,7 @@ CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_HEADERS = [
     'accept', 'accept-encoding', 'authorization', 'content-type', 'dnt', 'origin',
-    'user-agent', 'x-csrftoken', 'x-requested-with',
+    'user-agent', 'x-csrftoken', 'x-requested-with', 'x-viewer-session',
 ]
 CORS_ALLOW_METHODS = ['DELETE', 'GET', 'OPTIONS', 'PATCH', 'POST', 'PUT']
 
@@ -195,6 +195,44 @@ CSRF_TRUSTED_ORIGINS = [
 # 외부 서비스 / PACS / 기타
 ########################################
 AI_MODELS_DIR = BASE_DIR / 'ai_models'
+# AI 모델 레지스트리: 프로세스당 한 번 로드 후 재사용, 가중치 파일이 바뀌면 자동 재로드
+AI_MODEL_REGISTRY = {
+    # 서버 기동 시 백그라운드로 모델 로드 + dummy forward pass (첫 분석 요청 지연 제거)
+    'WARMUP_ON_STARTUP': os.getenv('AI_MODEL_WARMUP_ON_STARTUP', 'True') == 'True',
+    # warmup할 모델 (쉼표 구분, 비우면 전체): 큐별 Celery 워커는 자기 모델만 (예: yolo)
+    'WARMUP_MODELS': [name for name in os.getenv('AI_MODEL_WARMUP_MODELS', '').split(',') if name],
+    # 가중치 파일 변경 확인 주기 (초)
+    'CHECK_INTERVAL': float(os.getenv('AI_MODEL_CHECK_INTERVAL', '5')),
+}
+# AI 추론 micro-batching: 동시에 들어온 분석 요청을 최대 N장 / T ms까지 모아 한 번에 forward pass
+AI_INFERENCE_BATCHING = {
+    'ENABLED': os.getenv('AI_BATCHING_ENABLED', 'True') == 'True',
+    'MAX_BATCH_SIZE': int(os.getenv('AI_BATCHING_MAX_BATCH_SIZE', '8')),
+    'MAX_LATENCY_MS': int(os.getenv('AI_BATCHING_MAX_LATENCY_MS', '20')),
+    'TIMEOUT': int(os.getenv('AI_BATCHING_TIMEOUT', '120')),
+}
+# 비동기 AI 분석 작업 (ai_analysis.jobs, Celery)
+AI_ANALYSIS_JOBS = {
+    # 진행 기록 없이 이 시간이 지난 대기/실행 작업은 중복 방지 대상에서 제외 (워커 장애 대비)
+    'STALE_SECONDS': int(os.getenv('AI_JOB_STALE_SECONDS', '1800')),
+    # 진행 구독(SSE, PROXY_ASYNC=True인 ASGI 배포에서만) 및 polling 권장 간격
+    'EVENTS_POLL_INTERVAL': float(os.getenv('AI_JOB_EVENTS_POLL_INTERVAL', '1.0')),
+    'EVENTS_TIMEOUT': int(os.getenv('AI_JOB_EVENTS_TIMEOUT', '300')),
+}
+
+########################################
+# Celery
+########################################
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_IGNORE_RESULT = True  # 작업 상태/결과는 AIAnalysisJob 테이블에 기록
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'ai_analysis.run_yolo_job': {'queue': 'ai_yolo'},
+    'ai_analysis.run_ssd_job': {'queue': 'ai_ssd'},
+}
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1  # 긴 추론 작업을 한 워커가 몰아 받지 않도록
+CELERY_TIMEZONE = TIME_ZONE
 DEFAULT_DOCTOR_ID = "DR001"
 DEFAULT_DOCTOR_NAME = "김영상"
 
@@ -207,6 +245,99 @@ PACS_CONFIG = {
     'PROTOCOL': os.getenv('ORTHANC_PROTOCOL', 'http'),
     'TIMEOUT': int(os.getenv('ORTHANC_TIMEOUT', '30')),
     'MAX_RETRIES': int(os.getenv('ORTHANC_MAX_RETRIES', '3')),
+    'BACKOFF_FACTOR': float(os.getenv('ORTHANC_BACKOFF_FACTOR', '0.3')),
+    'POOL_CONNECTIONS': int(os.getenv('ORTHANC_POOL_CONNECTIONS', '4')),
+    'POOL_MAXSIZE': int(os.getenv('ORTHANC_POOL_MAXSIZE', '20')),
+    'STUDY_LOOKUP_CACHE_SIZE': int(os.getenv('ORTHANC_STUDY_LOOKUP_CACHE_SIZE', '1024')),
+    'STUDY_LOOKUP_CACHE_TTL': int(os.getenv('ORTHANC_STUDY_LOOKUP_CACHE_TTL', '300')),
+}
+# 비동기 일괄 조회 (medical_integration.async_api)
+ASYNC_HTTP_CONFIG = {
+    'CONCURRENCY': int(os.getenv('ASYNC_HTTP_CONCURRENCY', '16')),
+    'MAX_CONNECTIONS_PER_HOST': int(os.getenv('ASYNC_HTTP_MAX_CONNECTIONS_PER_HOST', '10')),
+    # OHIF 프록시 비동기 뷰 / AI 작업 진행 구독(SSE) 사용 여부 (ASGI 배포 시 True) 및 공용 커넥션 풀 크기/분할 수
+    'PROXY_ASYNC': os.getenv('OHIF_PROXY_ASYNC', 'False') == 'True',
+    'PROXY_MAX_CONNECTIONS': int(os.getenv('OHIF_PROXY_MAX_CONNECTIONS', '256')),
+    'PROXY_POOL_SHARDS': int(os.getenv('OHIF_PROXY_POOL_SHARDS', '16')),
+}
+# Orthanc 메타데이터(Study/Series/Instance JSON) 캐시 (medical_integration.orthanc_cache)
+# Webhook / sync_study_catalog / 삭제 Signal의 무효화가 모든 웹 워커에 반영되도록
+# 기본은 Celery 브로커와 같은 Redis(별도 DB 번호)를 공용 백엔드로 사용합니다.
+# LocMemCache 등 프로세스별 백엔드를 지정하면 Study/Series TTL은 PROCESS_LOCAL_TTL로 제한됩니다.
+ORTHANC_CACHE_BACKEND = os.getenv('ORTHANC_CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'orthanc': {
+        'BACKEND': ORTHANC_CACHE_BACKEND,
+        'LOCATION': os.getenv('ORTHANC_CACHE_LOCATION', 'redis://localhost:6379/1'),
+        'TIMEOUT': int(os.getenv('ORTHANC_CACHE_TTL', '3600')),
+        # Redis 장애 시 요청이 오래 묶이지 않도록 짧은 소켓 타임아웃 (조회 실패는 캐시 미스로 처리)
+        'OPTIONS': {
+            'socket_connect_timeout': 0.5,
+            'socket_timeout': 0.5,
+        } if ORTHANC_CACHE_BACKEND.endswith('RedisCache') else {
+            'MAX_ENTRIES': int(os.getenv('ORTHANC_CACHE_MAX_ENTRIES', '5000')),
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+ORTHANC_CACHE_CONFIG = {
+    'ALIAS': 'orthanc',
+    # 안정화(IsStable)되지 않은 Study/Series는 아직 하위 리소스가 늘어날 수 있어 짧게 유지
+    'UNSTABLE_TTL': int(os.getenv('ORTHANC_CACHE_UNSTABLE_TTL', '10')),
+    # 프로세스별 백엔드에서는 다른 워커의 무효화를 받지 못하므로 Study/Series를 짧게만 유지
+    'PROCESS_LOCAL_TTL': int(os.getenv('ORTHANC_CACHE_PROCESS_LOCAL_TTL', '30')),
+}
+# OHIF 프록시 디스크 캐시 (medical_integration.proxy_cache) - 불변 Instance 리소스만 저장
+OHIF_PROXY_CACHE = {
+    'ENABLED': os.getenv('OHIF_PROXY_CACHE_ENABLED', 'True') == 'True',
+    'DIR': os.getenv('OHIF_PROXY_CACHE_DIR', str(BASE_DIR / 'cache' / 'ohif_proxy')),
+    'MAX_BYTES': int(os.getenv('OHIF_PROXY_CACHE_MAX_BYTES', str(2 * 1024 ** 3))),
+    'MAX_ENTRY_BYTES': int(os.getenv('OHIF_PROXY_CACHE_MAX_ENTRY_BYTES', str(256 * 1024 ** 2))),
+}
+# 안정화된 Study의 Series DICOMweb 메타데이터 저장소 (medical_integration.series_metadata)
+SERIES_METADATA_STORE = {
+    'ENABLED': os.getenv('SERIES_METADATA_STORE_ENABLED', 'True') == 'True',
+    'DIR': os.getenv('SERIES_METADATA_STORE_DIR', str(BASE_DIR / 'cache' / 'series_metadata')),
+    'COMPRESS_LEVEL': int(os.getenv('SERIES_METADATA_COMPRESS_LEVEL', '6')),
+}
+# Study 도착 시 미리 만드는 Series 썸네일/축소 미리보기 (medical_integration.thumbnail_store)
+THUMBNAIL_STORE = {
+    'ENABLED': os.getenv('THUMBNAIL_STORE_ENABLED', 'True') == 'True',
+    'DIR': os.getenv('THUMBNAIL_STORE_DIR', str(BASE_DIR / 'cache' / 'thumbnails')),
+    # 이름: 긴 변 픽셀 (JPEG)
+    'SIZES': {'thumb': 128, 'small': 256, 'preview': 1024},
+    'JPEG_QUALITY': int(os.getenv('THUMBNAIL_JPEG_QUALITY', '85')),
+    # Orthanc /preview 원본 PNG도 보관 (AI 전처리에서 재요청하지 않도록)
+    'KEEP_ORIGINAL': os.getenv('THUMBNAIL_KEEP_ORIGINAL', 'True') == 'True',
+}
+# 큰 CR/DX 영상 다해상도 pyramid (medical_integration.image_pyramid)
+IMAGE_PYRAMID = {
+    'ENABLED': os.getenv('IMAGE_PYRAMID_ENABLED', 'True') == 'True',
+    'DIR': os.getenv('IMAGE_PYRAMID_DIR', str(BASE_DIR / 'cache' / 'pyramids')),
+    'MODALITIES': ('CR', 'DX'),
+    # 가장 작은 레벨의 긴 변 (px)
+    'MIN_EDGE': int(os.getenv('IMAGE_PYRAMID_MIN_EDGE', '256')),
+    # 긴 변이 이보다 작은 영상은 pyramid 없이 원본 사용
+    'MIN_SOURCE_EDGE': int(os.getenv('IMAGE_PYRAMID_MIN_SOURCE_EDGE', '1024')),
+}
+# 판독 화면 prefetch: 이전 검사/다음 워크리스트 Study의 메타데이터·썸네일·프레임을 미리 준비
+VIEWER_PREFETCH = {
+    'ENABLED': os.getenv('VIEWER_PREFETCH_ENABLED', 'True') == 'True',
+    'WORKERS': int(os.getenv('VIEWER_PREFETCH_WORKERS', '2')),
+    'QUEUE_SIZE': int(os.getenv('VIEWER_PREFETCH_QUEUE_SIZE', '64')),
+    'MAX_PRIORS': int(os.getenv('VIEWER_PREFETCH_MAX_PRIORS', '3')),
+    'PREWARM_FRAMES': os.getenv('VIEWER_PREFETCH_FRAMES', 'True') == 'True',
+}
+# OHIF 프록시 single-flight: 동시에 들어온 동일 GET을 upstream 요청 하나로 합침 (프로세스별)
+OHIF_PROXY_SINGLEFLIGHT = {
+    'ENABLED': os.getenv('OHIF_PROXY_SINGLEFLIGHT_ENABLED', 'True') == 'True',
+    # 디스크 캐시에 저장하지 않는 응답(QIDO/메타데이터)을 팔로워에게 나눠줄 최대 크기
+    'MAX_BUFFER_BYTES': int(os.getenv('OHIF_PROXY_SINGLEFLIGHT_MAX_BUFFER_BYTES', str(16 * 1024 ** 2))),
+    # 리더 시작 후 팔로워가 기다리는 최대 시간(초): 넘으면 각자 upstream 요청 (느린 리더 클라이언트 대비)
+    'WAIT_TIMEOUT': float(os.getenv('OHIF_PROXY_SINGLEFLIGHT_WAIT_TIMEOUT', '5')),
 }
 ORTHANC_URL = PACS_CONFIG['BASE_URL']
 ORTHANC_USERNAME = PACS_CONFIG['USERNAME']
@@ -219,11 +350,12 @@ EXTERNAL_SERVICES = {
         'username': 'admin',
         'password': 'Admin123',
     },
+    # OrthancAPI 접속 정보 (ORTHANC_HOST/ORTHANC_PORT는 Orthanc PostgreSQL DB용이므로 별도 이름 사용)
     'orthanc': {
-        'host': '35.225.63.41',
-        'port': '8042',
-        'username': 'orthanc',
-        'password': 'orthanc',
+        'host': os.getenv('ORTHANC_API_HOST', '35.225.63.41'),
+        'port': os.getenv('ORTHANC_API_PORT', '8042'),
+        'username': os.getenv('ORTHANC_USERNAME', 'orthanc'),
+        'password': os.getenv('ORTHANC_PASSWORD', 'orthanc'),
     },
 }
 # ─── MongoDB 로깅용 설정 ==저에오 OCS───
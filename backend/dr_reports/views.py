@@ -1,3 +1,4 @@
+import logging
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -5,6 +6,8 @@ from django.shortcuts import get_object_or_404
 from django.db import transaction
 from django.db.models import Count, Q
 from .models import DrReport
+from worklist.models import StudyRequest
+from medical_integration.prefetch import prefetch_service
 from .serializers import (
     DrReportSerializer,
     DrReportCreateSerializer,
@@ -13,6 +16,8 @@ from .serializers import (
     DrReportSummarySerializer
 )
 
+logger = logging.getLogger(__name__)
+
 class ReportSaveView(APIView):
     """레포트 저장 API - React에서 호출하는 메인 API"""
     
@@ -73,6 +78,7 @@ class ReportLoadView(APIView):
         try:
             # 해당 study_uid의 레포트 조회
             report = get_object_or_404(DrReport, study_uid=study_uid)
+            self.prefetch_related_studies(request, study_uid)
             serializer = DrReportSerializer(report)
             
             return Response({
@@ -91,6 +97,21 @@ class ReportLoadView(APIView):
                 'message': f'불러오기 실패: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @staticmethod
+    def prefetch_related_studies(request, study_uid):
+        """레포트 화면 진입 시 이전 검사와 다음 워크리스트 Study prefetch (실패해도 레포트 응답에는 영향 없음)"""
+        try:
+            study_request = StudyRequest.objects.filter(study_uid=study_uid).order_by('-request_datetime').first()
+            next_request = study_request.next_in_worklist() if study_request else None
+            prefetch_service.prefetch_for_viewer(
+                request, study_uid,
+                modality=study_request.modality if study_request else None,
+                body_part=study_request.body_part if study_request else None,
+                next_study_uid=next_request.study_uid if next_request else None,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ 레포트 prefetch 실패 (study_uid: {study_uid}): {e}")
+
 class ReportListView(APIView):
     """전체 레포트 목록 조회"""
     
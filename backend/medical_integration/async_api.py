@@ -0,0 +1,174 @@
+# backend/medical_integration/async_api.py
+
+import asyncio
+import logging
+import tempfile
+import httpx
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+logger = logging.getLogger('medical_integration')
+
+
+def _async_http_config():
+    return getattr(settings, 'ASYNC_HTTP_CONFIG', {})
+
+
+class AsyncServiceClient:
+    """httpx 기반 비동기 클라이언트 공통 클래스
+
+    concurrency: 동시에 진행할 요청 수 (세마포어)
+    max_connections: 대상 호스트당 최대 연결 수 (클라이언트 하나가 호스트 하나를 담당)
+    """
+
+    def __init__(self, base_url, auth, concurrency=None, max_connections=None, timeout=30):
+        config = _async_http_config()
+        self.base_url = base_url
+        self.auth = auth
+        self.concurrency = concurrency or config.get('CONCURRENCY', 16)
+        self.max_connections = max_connections or config.get('MAX_CONNECTIONS_PER_HOST', 10)
+        self.timeout = httpx.Timeout(timeout, connect=5)
+        self._client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            auth=self.auth,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._client.aclose()
+        self._client = None
+
+    async def _request(self, method, path, **kwargs):
+        async with self._semaphore:
+            response = await self._client.request(method, path, **kwargs)
+        response.raise_for_status()
+        return response
+
+    async def get_json(self, path, **kwargs):
+        """GET 후 JSON 반환 (실패 시 None)"""
+        try:
+            response = await self._request('GET', path, **kwargs)
+            return response.json()
+        except Exception as e:
+            logger.error(f"비동기 GET 요청 실패 ({self.base_url}/{path}): {e}")
+            return None
+
+    async def get_bytes(self, path, **kwargs):
+        """GET 후 본문 bytes 반환 (실패 시 None)"""
+        try:
+            response = await self._request('GET', path, **kwargs)
+            return response.content
+        except Exception as e:
+            logger.error(f"비동기 GET 요청 실패 ({self.base_url}/{path}): {e}")
+            return None
+
+    async def download_to_spooled(self, path, max_memory=8 * 1024 * 1024, **kwargs):
+        """GET 본문을 SpooledTemporaryFile로 스트리밍 저장 (실패 시 None)
+
+        max_memory를 넘는 본문은 디스크로 넘어가므로 동시에 여러 건을 받아도
+        메모리 사용량이 제한됩니다. 반환된 파일은 처음 위치로 되감겨 있습니다.
+        """
+        spooled = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        try:
+            async with self._semaphore:
+                async with self._client.stream('GET', path, **kwargs) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes():
+                        spooled.write(chunk)
+            spooled.seek(0)
+            return spooled
+        except Exception as e:
+            spooled.close()
+            logger.error(f"비동기 다운로드 실패 ({self.base_url}/{path}): {e}")
+            return None
+
+    async def map(self, func, items):
+        """items 각각에 func(self, item)을 동시에 실행하고 입력 순서대로 결과 반환
+
+        개별 항목이 예외를 던지면 해당 결과는 None이 됩니다.
+        """
+        results = await asyncio.gather(*(func(self, item) for item in items), return_exceptions=True)
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                logger.error(f"비동기 일괄 처리 실패 (item: {item}): {result}")
+        return [None if isinstance(result, Exception) else result for result in results]
+
+
+class AsyncOrthancAPI(AsyncServiceClient):
+    """OrthancAPI의 비동기 버전 (조회 전용)"""
+
+    def __init__(self, concurrency=None, max_connections=None):
+        orthanc = settings.EXTERNAL_SERVICES['orthanc']
+        super().__init__(
+            base_url=f"http://{orthanc['host']}:{orthanc['port']}",
+            auth=(orthanc['username'], orthanc['password']),
+            concurrency=concurrency,
+            max_connections=max_connections,
+        )
+
+    async def get_patient(self, patient_id):
+        return await self.get_json(f"/patients/{patient_id}")
+
+    async def get_patient_studies(self, patient_id):
+        return await self.get_json(f"/patients/{patient_id}/studies")
+
+    async def get_study(self, study_id):
+        return await self.get_json(f"/studies/{study_id}")
+
+    async def get_study_series(self, study_id):
+        return await self.get_json(f"/studies/{study_id}/series")
+
+    async def get_series_instances(self, series_id):
+        return await self.get_json(f"/series/{series_id}/instances")
+
+    async def get_instance_file(self, instance_id):
+        return await self.get_bytes(f"/instances/{instance_id}/file")
+
+    async def download_instance_file(self, instance_id):
+        return await self.download_to_spooled(f"/instances/{instance_id}/file")
+
+
+class AsyncOpenMRSAPI(AsyncServiceClient):
+    """OpenMRSAPI의 비동기 버전 (조회 전용)"""
+
+    def __init__(self, concurrency=None, max_connections=None):
+        openmrs = settings.EXTERNAL_SERVICES['openmrs']
+        super().__init__(
+            base_url=f"http://{openmrs['host']}:{openmrs['port']}/openmrs/ws/rest/v1",
+            auth=(openmrs['username'], openmrs['password']),
+            concurrency=concurrency,
+            max_connections=max_connections,
+            timeout=10,
+        )
+
+    async def get_patient(self, patient_uuid):
+        return await self.get_json(f"/patient/{patient_uuid}", params={'v': 'full'})
+
+
+def run_batch(client_class, func, items, concurrency=None):
+    """동기 뷰에서 items 각각에 대해 func(client, item)을 동시 실행
+
+    전체 소요 시간이 호출 합계가 아닌 가장 느린 호출(또는 concurrency 단위 묶음)에 비례합니다.
+
+    예:
+        infos = run_batch(AsyncOrthancAPI, lambda api, pid: api.get_patient(pid), patient_ids)
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    async def runner():
+        async with client_class(concurrency=concurrency) as client:
+            return await client.map(func, items)
+
+    return async_to_sync(runner)()
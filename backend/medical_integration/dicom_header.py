@@ -0,0 +1,68 @@
+# backend/medical_integration/dicom_header.py
+
+import io
+import logging
+import pydicom
+
+logger = logging.getLogger('medical_integration')
+
+# 환자 매핑에 필요한 태그만 읽음 (픽셀 데이터는 읽지 않음)
+PATIENT_HEADER_TAGS = [
+    'PatientID',
+    'PatientName',
+    'PatientBirthDate',
+    'PatientSex',
+    'StudyInstanceUID',
+    'StudyDate',
+    'Modality',
+    'StudyDescription',
+    'AccessionNumber',
+]
+
+
+def read_dicom_header(dicom_data, tags=PATIENT_HEADER_TAGS):
+    """DICOM 헤더만 메모리에서 파싱
+
+    bytes는 BytesIO로 감싸고, 파일 객체(UploadedFile, SpooledTemporaryFile 등)와
+    파일 경로는 그대로 읽습니다. 임시 파일을 만들지 않고 픽셀 데이터 직전에서
+    멈추므로 이미지 크기와 관계없이 소요 시간이 일정합니다.
+
+    Args:
+        dicom_data: bytes, 파일 객체 또는 파일 경로
+        tags: 읽을 태그 키워드 목록 (None이면 픽셀 데이터 전까지 전체)
+
+    Returns:
+        pydicom Dataset (픽셀 데이터 제외)
+    """
+    if isinstance(dicom_data, (bytes, bytearray, memoryview)):
+        dicom_data = io.BytesIO(dicom_data)
+    elif hasattr(dicom_data, 'seek'):
+        dicom_data.seek(0)
+
+    return pydicom.dcmread(
+        dicom_data,
+        force=True,
+        stop_before_pixels=True,
+        specific_tags=list(tags) if tags else None,
+    )
+
+
+def extract_patient_demographics(dicom_data):
+    """DICOM 헤더에서 환자/Study 기본 정보 추출 (dict, 실패 시 None)"""
+    try:
+        ds = read_dicom_header(dicom_data)
+    except Exception as e:
+        logger.error(f"DICOM 헤더 파싱 실패: {e}")
+        return None
+
+    return {
+        'patient_identifier': str(ds.get('PatientID', '')),
+        'patient_name': str(ds.get('PatientName', '')),
+        'patient_birth_date': str(ds.get('PatientBirthDate', '')),
+        'patient_sex': str(ds.get('PatientSex', '')),
+        'study_instance_uid': str(ds.get('StudyInstanceUID', '')),
+        'study_date': str(ds.get('StudyDate', '')),
+        'modality': str(ds.get('Modality', '')),
+        'study_description': str(ds.get('StudyDescription', '')),
+        'accession_number': str(ds.get('AccessionNumber', '')),
+    }
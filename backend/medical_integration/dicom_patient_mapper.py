@@ -1,12 +1,12 @@
 # backend/medical_integration/dicom_patient_mapper.py (완전 수정된 버전)
 
 import logging
-import pydicom
 from datetime import datetime
 from django.db import transaction
 from .models import PatientMapping
 from .openmrs_api import OpenMRSAPI
 from .orthanc_api import OrthancAPI
+from .dicom_header import extract_patient_demographics
 
 logger = logging.getLogger('medical_integration')
 
@@ -18,41 +18,13 @@ class DicomPatientMapper:
         self.orthanc_api = OrthancAPI()
     
     def extract_patient_info_from_dicom(self, dicom_data):
-        """DICOM 파일에서 환자 정보 추출 - bytes 처리 개선"""
+        """DICOM 파일에서 환자 정보 추출 (bytes, 파일 객체 또는 경로)"""
         try:
-            # bytes 데이터인 경우 임시 파일로 저장 후 읽기
-            if isinstance(dicom_data, bytes):
-                import tempfile
-                import os
-                
-                with tempfile.NamedTemporaryFile(suffix='.dcm', delete=False) as temp_file:
-                    temp_file.write(dicom_data)
-                    temp_file_path = temp_file.name
-                
-                try:
-                    ds = pydicom.dcmread(temp_file_path, force=True)
-                finally:
-                    # 임시 파일 정리
-                    try:
-                        os.unlink(temp_file_path)
-                    except:
-                        pass
-            else:
-                # 파일 경로나 file-like 객체인 경우
-                ds = pydicom.dcmread(dicom_data, force=True)
-            
-            patient_info = {
-                # 🔥 핵심: DICOM Patient ID는 OpenMRS의 patient_identifier.identifier와 매핑
-                'patient_identifier': getattr(ds, 'PatientID', ''),  # P003, DCM001 등
-                'patient_name': str(getattr(ds, 'PatientName', '')),
-                'patient_birth_date': getattr(ds, 'PatientBirthDate', ''),
-                'patient_sex': getattr(ds, 'PatientSex', ''),
-                'study_instance_uid': getattr(ds, 'StudyInstanceUID', ''),
-                'study_date': getattr(ds, 'StudyDate', ''),
-                'modality': getattr(ds, 'Modality', ''),
-                'study_description': getattr(ds, 'StudyDescription', ''),
-                'accession_number': getattr(ds, 'AccessionNumber', '')
-            }
+            # 🔥 핵심: DICOM Patient ID는 OpenMRS의 patient_identifier.identifier와 매핑
+            # 헤더만 메모리에서 파싱 (임시 파일/픽셀 데이터 읽기 없음)
+            patient_info = extract_patient_demographics(dicom_data)
+            if not patient_info:
+                return None
             
             # 환자 이름 포맷 정리 (DICOM 표준: Last^First^Middle)
             if patient_info['patient_name']:
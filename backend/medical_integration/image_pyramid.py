@@ -0,0 +1,315 @@
+# backend/medical_integration/image_pyramid.py
+
+import io
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.dispatch import receiver
+from .orthanc_api import OrthancAPI
+from .signals import study_deleted
+
+logger = logging.getLogger('medical_integration')
+
+_ORTHANC_ID_RE = re.compile(r'^[0-9a-f-]{8,64}$')
+
+# 뷰어가 축소 레벨을 진단 품질로 표시하는 데 필요한 태그 (Orthanc /tags 형식 키)
+PYRAMID_DICOM_TAGS = {
+    'modality': '0008,0060',
+    'photometric_interpretation': '0028,0004',
+    'bits_stored': '0028,0101',
+    'window_center': '0028,1050',
+    'window_width': '0028,1051',
+    'rescale_intercept': '0028,1052',
+    'rescale_slope': '0028,1053',
+    'pixel_spacing': '0028,0030',
+    'imager_pixel_spacing': '0018,1164',
+}
+
+
+def tag_value(tags, tag):
+    """Orthanc /tags 응답에서 문자열 값 추출 (없으면 '')"""
+    value = (tags or {}).get(tag, {}).get('Value', '')
+    return value.strip() if isinstance(value, str) else ''
+
+
+def scaled_spacing(spacing, scale):
+    """'row\\col' 픽셀 간격을 축소 배율만큼 키운 값 ([row, col] 또는 None)"""
+    try:
+        return [round(float(value) * scale, 6) for value in spacing.split('\\')]
+    except ValueError:
+        return None
+
+
+def build_levels(png_bytes, min_edge):
+    """16bit PNG에서 1/2씩 줄인 레벨 목록 생성 (0 = 원본, 긴 변이 min_edge 이하가 될 때까지)
+
+    2x2 평균(box) 축소라 픽셀 값 범위가 유지되어 Window/Level을 그대로 적용할 수 있습니다.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(png_bytes))
+    image.load()
+    if image.mode != 'I':
+        image = image.convert('I')
+
+    levels = [image]
+    while max(levels[-1].size) > min_edge:
+        levels.append(levels[-1].reduce(2))
+    return levels
+
+
+class ImagePyramidStore:
+    """큰 CR/DX 영상의 다해상도(pyramid) 레벨을 Instance마다 한 번 만들어 저장
+
+    - Orthanc /instances/{id}/frames/0/image-uint16으로 디코딩된 원본 픽셀(16bit)을 받아
+      2배씩 축소한 레벨을 무손실 16bit PNG로 저장 (전송 구문/압축과 무관)
+    - <root>/<id 앞 2자리>/<Instance ID>/level-<n>.png + manifest.json
+      (manifest가 마지막에 기록되므로 manifest가 있으면 완성된 것)
+    - 뷰어는 가장 작은 레벨부터 받아 먼저 그리고, 큰 레벨로 차례로 교체
+    """
+
+    def __init__(self, root, modalities=('CR', 'DX'), min_edge=256, min_source_edge=1024, enabled=True):
+        self.root = root
+        self.modalities = set(modalities)
+        self.min_edge = min_edge
+        self.min_source_edge = min_source_edge
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._building = set()
+        self._counters = {'builds': 0, 'skipped': 0, 'build_failures': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _dir(self, instance_id):
+        if not _ORTHANC_ID_RE.match(instance_id or ''):
+            return None
+        return os.path.join(self.root, instance_id[:2], instance_id)
+
+    # ── 조회 ────────────────────────────────────────────
+
+    def get_manifest(self, instance_id):
+        directory = self._dir(instance_id)
+        if not self.enabled or directory is None:
+            return None
+        try:
+            with open(os.path.join(directory, 'manifest.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def level_path(self, instance_id, level):
+        """레벨 PNG 경로 (없으면 None)"""
+        directory = self._dir(instance_id)
+        if directory is None:
+            return None
+        path = os.path.join(directory, f"level-{int(level)}.png")
+        return path if os.path.exists(path) else None
+
+    # ── 생성 ────────────────────────────────────────────
+
+    def build_instance(self, instance_id, orthanc_api=None, study_id='', force=False):
+        """Instance 하나의 pyramid 생성 (대상이 아니거나 실패하면 None)
+
+        force=True면 Modality 조건을 무시합니다.
+        """
+        directory = self._dir(instance_id)
+        if not self.enabled or directory is None:
+            return None
+        orthanc_api = orthanc_api or OrthancAPI()
+        started = time.perf_counter()
+        try:
+            tags = orthanc_api.get_instance_tags(instance_id) or {}
+            dicom = {name: tag_value(tags, tag) for name, tag in PYRAMID_DICOM_TAGS.items()}
+            if not force and dicom['modality'] not in self.modalities:
+                self._count('skipped')
+                return None
+            if not dicom['photometric_interpretation'].startswith('MONOCHROME'):
+                self._count('skipped')
+                return None
+
+            response = orthanc_api.open_stream('GET', f"instances/{instance_id}/frames/0/image-uint16",
+                                               headers={'Accept': 'image/png'})
+            try:
+                source = response.content
+            finally:
+                response.close()
+
+            if not study_id:
+                # 요청 시 생성: Study 삭제 시 함께 정리되도록 상위 Study 기록
+                series_id = (orthanc_api.get_instance(instance_id) or {}).get('ParentSeries')
+                study_id = (orthanc_api.get_series(series_id) or {}).get('ParentStudy', '') if series_id else ''
+
+            levels = build_levels(source, self.min_edge)
+            if max(levels[0].size) < self.min_source_edge and not force:
+                # 작은 영상은 원본 그대로가 더 빠름
+                self._count('skipped')
+                return None
+            manifest = self._save(directory, instance_id, study_id, levels, dicom)
+        except Exception as e:
+            logger.error(f"❌ pyramid 생성 실패 (instance: {instance_id}): {e}")
+            self._count('build_failures')
+            return None
+
+        self._count('builds')
+        logger.info(
+            f"🗻 pyramid 저장: {instance_id} ({manifest['width']}x{manifest['height']}, "
+            f"{len(manifest['levels'])}개 레벨, {time.perf_counter() - started:.2f}s)"
+        )
+        return manifest
+
+    def _save(self, directory, instance_id, study_id, levels, dicom):
+        """레벨 PNG를 임시 디렉터리에 쓴 뒤 통째로 교체하고 manifest 반환"""
+        parent = os.path.dirname(directory)
+        os.makedirs(parent, exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=parent, suffix='.tmp')
+        try:
+            spacing = dicom['pixel_spacing'] or dicom['imager_pixel_spacing']
+            entries = []
+            for number, image in enumerate(levels):
+                path = os.path.join(temp_dir, f"level-{number}.png")
+                image.convert('I;16').save(path, format='PNG')
+                scale = 2 ** number
+                entries.append({
+                    'level': number,
+                    'width': image.width,
+                    'height': image.height,
+                    'scale': scale,
+                    'bytes': os.path.getsize(path),
+                    'pixel_spacing': scaled_spacing(spacing, scale) if spacing else None,
+                })
+            manifest = {
+                'instance_id': instance_id,
+                'study_id': study_id,
+                'width': levels[0].width,
+                'height': levels[0].height,
+                'levels': entries,
+                'dicom': dicom,
+                'built_at': time.time(),
+            }
+            with open(os.path.join(temp_dir, 'manifest.json'), 'w') as f:
+                json.dump(manifest, f)
+
+            # 기존 pyramid가 있으면 치우고 교체 (읽는 쪽은 manifest 유무로 판단)
+            if os.path.isdir(directory):
+                shutil.rmtree(directory, ignore_errors=True)
+            os.replace(temp_dir, directory)
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        return manifest
+
+    def build_study(self, orthanc_study_id, orthanc_api=None, force=False):
+        """Study의 대상 Modality Series Instance pyramid 생성 (이미 있는 것은 건너뜀)
+
+        Returns:
+            int: 새로 만든 Instance 수
+        """
+        if not self.enabled:
+            return 0
+        orthanc_api = orthanc_api or OrthancAPI()
+        built = 0
+        for series_info in orthanc_api.get_study_series(orthanc_study_id) or []:
+            if series_info.get('MainDicomTags', {}).get('Modality') not in self.modalities:
+                continue
+            for instance_id in series_info.get('Instances', []):
+                if not force and self.get_manifest(instance_id):
+                    continue
+                if self.build_instance(instance_id, orthanc_api, study_id=orthanc_study_id):
+                    built += 1
+        return built
+
+    def _schedule(self, key, target):
+        """백그라운드 스레드에서 target 실행 (같은 key가 이미 진행 중이면 무시)"""
+        if not self.enabled or not key:
+            return False
+        with self._lock:
+            if key in self._building:
+                return False
+            self._building.add(key)
+
+        def run():
+            try:
+                target()
+            except Exception as e:
+                logger.error(f"❌ pyramid 생성 실패 ({key}): {e}")
+            finally:
+                with self._lock:
+                    self._building.discard(key)
+
+        threading.Thread(target=run, name=f"pyramid-{key[:8]}", daemon=True).start()
+        return True
+
+    def schedule_study_build(self, orthanc_study_id):
+        return self._schedule(orthanc_study_id, lambda: self.build_study(orthanc_study_id))
+
+    def schedule_instance_build(self, instance_id):
+        return self._schedule(instance_id, lambda: self.build_instance(instance_id))
+
+    def is_building(self, key):
+        with self._lock:
+            return key in self._building
+
+    # ── 정리 ────────────────────────────────────────────
+
+    def _iter_manifests(self):
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for instance_id in os.listdir(prefix_dir):
+                manifest_path = os.path.join(prefix_dir, instance_id, 'manifest.json')
+                try:
+                    with open(manifest_path) as f:
+                        yield os.path.dirname(manifest_path), json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+    def purge(self, orthanc_study_id=None):
+        """전체 또는 특정 Study의 pyramid 삭제 후 삭제한 Instance 수 반환"""
+        removed = 0
+        for directory, manifest in list(self._iter_manifests()):
+            if orthanc_study_id and manifest.get('study_id') != orthanc_study_id:
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+        return removed
+
+    def stats(self):
+        manifests = [manifest for _, manifest in self._iter_manifests()]
+        with self._lock:
+            counters = dict(self._counters)
+            building = len(self._building)
+        return {
+            'enabled': self.enabled,
+            'dir': self.root,
+            'modalities': sorted(self.modalities),
+            'instances': len(manifests),
+            'bytes': sum(level['bytes'] for manifest in manifests for level in manifest.get('levels', [])),
+            'building': building,
+            **counters,
+        }
+
+
+_pyramid_config = getattr(settings, 'IMAGE_PYRAMID', {})
+image_pyramid_store = ImagePyramidStore(
+    root=str(_pyramid_config.get('DIR', os.path.join(settings.BASE_DIR, 'cache', 'pyramids'))),
+    modalities=_pyramid_config.get('MODALITIES', ('CR', 'DX')),
+    min_edge=_pyramid_config.get('MIN_EDGE', 256),
+    min_source_edge=_pyramid_config.get('MIN_SOURCE_EDGE', 1024),
+    enabled=_pyramid_config.get('ENABLED', True),
+)
+
+
+@receiver(study_deleted)
+def _purge_deleted_study(sender, orthanc_study_id, **kwargs):
+    image_pyramid_store.purge(orthanc_study_id)
@@ -0,0 +1,76 @@
+# management/commands/benchmark_dicom_header.py
+import io
+import os
+import struct
+import tempfile
+import time
+from pathlib import Path
+import pydicom
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from medical_integration.dicom_header import extract_patient_demographics
+
+class Command(BaseCommand):
+    help = 'test_dicom/ 파일로 전체 파싱(임시 파일)과 헤더 전용 파싱 속도를 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=str(Path(settings.BASE_DIR).parent / 'test_dicom'),
+                            help='DICOM 파일 디렉터리')
+        parser.add_argument('--repeat', type=int, default=50, help='파일당 반복 횟수')
+        parser.add_argument('--pad-mb', type=int, nargs='*', default=[],
+                            help='PixelData를 지정 크기(MB)로 늘린 변형도 측정 (예: --pad-mb 50 200)')
+
+    def handle(self, *args, **options):
+        paths = sorted(Path(options['dir']).glob('*.dcm'))
+        if not paths:
+            self.stderr.write(f"⚠️ DICOM 파일이 없습니다: {options['dir']}")
+            return
+
+        for path in paths:
+            data = path.read_bytes()
+            self._report(path.name, data, options['repeat'])
+            for size_mb in options['pad_mb']:
+                self._report(f"{path.name} (+{size_mb}MB)", self._padded(data, size_mb),
+                             max(1, options['repeat'] // 10))
+
+    def _report(self, label, data, repeat):
+        full = self._measure(self._parse_full, data, repeat)
+        header = self._measure(extract_patient_demographics, data, repeat)
+        self.stdout.write(
+            f"📊 {label} [{len(data) / 1024 / 1024:.1f}MB] "
+            f"전체 파싱 {full:.2f}ms / 헤더 전용 {header:.2f}ms (x{full / header:.1f})"
+        )
+
+    @staticmethod
+    def _measure(func, data, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func(data)
+        return (time.perf_counter() - started) * 1000 / repeat
+
+    @staticmethod
+    def _parse_full(data):
+        """기존 방식: 임시 파일에 쓴 뒤 픽셀 데이터까지 전체 파싱"""
+        with tempfile.NamedTemporaryFile(suffix='.dcm', delete=False) as temp_file:
+            temp_file.write(data)
+            temp_file_path = temp_file.name
+        try:
+            ds = pydicom.dcmread(temp_file_path, force=True)
+            return str(ds.get('PatientID', ''))
+        finally:
+            os.unlink(temp_file_path)
+
+    @staticmethod
+    def _padded(data, size_mb):
+        """픽셀 데이터 뒤에 size_mb 크기의 Trailing Padding (FFFC,FFFC)을 붙인 DICOM bytes
+
+        압축 전송 구문 파일도 다시 인코딩하지 않고 큰 multi-frame 객체 크기를 모사합니다.
+        """
+        ds = pydicom.dcmread(io.BytesIO(data), force=True, stop_before_pixels=True)
+        transfer_syntax = getattr(ds.file_meta, 'TransferSyntaxUID', None)
+        length = size_mb * 1024 * 1024
+        if transfer_syntax is not None and transfer_syntax.is_implicit_VR:
+            element = struct.pack('<HHI', 0xFFFC, 0xFFFC, length)
+        else:
+            element = struct.pack('<HH2sHI', 0xFFFC, 0xFFFC, b'OB', 0, length)
+        return data + element + b'\0' * length
@@ -0,0 +1,158 @@
+# management/commands/benchmark_ohif_proxy.py
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory
+from medical_integration import ohif_async_proxy_views, ohif_proxy_views
+from medical_integration.proxy_cache import proxy_cache
+
+FRAME_ACCEPT = 'multipart/related; type="application/octet-stream"; transfer-syntax=*'
+
+
+def _slow_upstream_handler(delay, payload):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class _UpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # 동시 연결이 많아도 SYN 재전송 지연이 생기지 않도록
+
+
+class Command(BaseCommand):
+    help = ('느린 가짜 Orthanc를 띄워 동기(WSGI 스레드) 프록시와 비동기(ASGI) 프록시가 '
+            '한 프로세스에서 동시에 처리하는 뷰어 세션 수를 비교합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, nargs='+', default=[8, 32, 128],
+                            help='동시 뷰어 세션 수 목록')
+        parser.add_argument('--frames', type=int, default=10, help='세션당 순차 프레임 요청 수')
+        parser.add_argument('--delay-ms', type=int, default=200, help='upstream 응답 지연 (ms)')
+        parser.add_argument('--frame-kb', type=int, default=512, help='프레임 크기 (KB)')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='동기 모드의 프로세스당 워커 스레드 수 (gunicorn --threads)')
+        parser.add_argument('--target-ms', type=int, default=1000,
+                            help='세션 수용 기준 p95 지연 (ms)')
+        parser.add_argument('--upstream', default=None,
+                            help='가짜 서버 대신 사용할 Orthanc URL (DICOMweb 경로를 그대로 요청)')
+
+    def handle(self, *args, **options):
+        server = None
+        upstream = options['upstream']
+        if not upstream:
+            payload = b'\0' * (options['frame_kb'] * 1024)
+            server = _UpstreamServer(('127.0.0.1', 0),
+                                     _slow_upstream_handler(options['delay_ms'] / 1000, payload))
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            upstream = f"http://127.0.0.1:{server.server_address[1]}"
+
+        original_base = ohif_proxy_views.ORTHANC_HTTP_BASE
+        cache_enabled = proxy_cache.enabled
+        ohif_proxy_views.ORTHANC_HTTP_BASE = upstream
+        proxy_cache.enabled = False  # 캐시 히트 없이 upstream 대기 비용만 측정
+        try:
+            self.stdout.write(
+                f"📊 upstream {upstream} / 세션당 {options['frames']}프레임 / "
+                f"동기 워커 스레드 {options['threads']}개 / 기준 p95 {options['target_ms']}ms"
+            )
+            capacity = {'sync': 0, 'async': 0}
+            for sessions in options['sessions']:
+                for mode, runner in (('sync', self._run_sync), ('async', self._run_async)):
+                    wall, latencies = runner(sessions, options)
+                    p95 = self._p95(latencies)
+                    if p95 <= options['target_ms']:
+                        capacity[mode] = max(capacity[mode], sessions)
+                    self.stdout.write(
+                        f"  {mode:5} 세션 {sessions:4} | 총 {wall:7.2f}s | "
+                        f"{len(latencies) / wall:7.1f} req/s | "
+                        f"p50 {statistics.median(latencies):7.0f}ms | p95 {p95:7.0f}ms"
+                    )
+            self.stdout.write(
+                f"✅ p95 {options['target_ms']}ms 이내 최대 동시 세션: "
+                f"동기 {capacity['sync']} / 비동기 {capacity['async']}"
+            )
+        finally:
+            ohif_proxy_views.ORTHANC_HTTP_BASE = original_base
+            proxy_cache.enabled = cache_enabled
+            if server:
+                server.shutdown()
+
+    @staticmethod
+    def _frame_path(session, frame):
+        return f"studies/1.2.999/series/1.2.999.1/instances/1.2.999.1.{session}/frames/{frame}"
+
+    @staticmethod
+    def _p95(latencies):
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _run_sync(self, sessions, options):
+        """WSGI 프로세스 모사: 요청은 워커 스레드 풀에서 처리되고, 세션(클라이언트)마다 순차 요청"""
+        factory = RequestFactory()
+
+        def handle_request(path):
+            request = factory.get(f'/api/ohif/dicom-web/{path}', HTTP_ACCEPT=FRAME_ACCEPT)
+            response = ohif_proxy_views.dicom_web_proxy(request, path=path)
+            for _ in response.streaming_content:
+                pass
+
+        def session(executor, index, latencies):
+            for frame in range(1, options['frames'] + 1):
+                started = time.perf_counter()
+                # 큐 대기 시간까지 포함 (워커가 모두 사용 중이면 요청이 기다림)
+                executor.submit(handle_request, self._frame_path(index, frame)).result()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        latencies = []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            clients = [threading.Thread(target=session, args=(executor, index, latencies))
+                       for index in range(sessions)]
+            for client in clients:
+                client.start()
+            for client in clients:
+                client.join()
+        return time.perf_counter() - started, latencies
+
+    def _run_async(self, sessions, options):
+        """ASGI 프로세스 모사: 이벤트 루프 하나에서 모든 세션의 요청을 처리"""
+        factory = AsyncRequestFactory()
+
+        async def session(index):
+            latencies = []
+            for frame in range(1, options['frames'] + 1):
+                path = self._frame_path(index, frame)
+                started = time.perf_counter()
+                request = factory.get(f'/api/ohif/dicom-web/{path}', HTTP_ACCEPT=FRAME_ACCEPT)
+                response = await ohif_async_proxy_views.dicom_web_proxy(request, path=path)
+                async for _ in response:
+                    pass
+                latencies.append((time.perf_counter() - started) * 1000)
+            return latencies
+
+        async def run_all():
+            try:
+                return await asyncio.gather(*(session(index) for index in range(sessions)))
+            finally:
+                await ohif_async_proxy_views.close_async_orthanc_clients()
+
+        started = time.perf_counter()
+        results = asyncio.run(run_all())
+        return time.perf_counter() - started, [value for result in results for value in result]
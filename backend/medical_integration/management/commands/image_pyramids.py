@@ -0,0 +1,49 @@
+# management/commands/image_pyramids.py
+from django.core.management.base import BaseCommand, CommandError
+from medical_integration.models import CatalogStudy
+from medical_integration.orthanc_api import OrthancAPI
+from medical_integration.image_pyramid import image_pyramid_store
+from medical_integration.study_catalog import resolve_orthanc_study_id
+
+class Command(BaseCommand):
+    help = 'CR/DX 다해상도 pyramid를 생성(기존 Study 백필)/조회/삭제합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--study', action='append', default=[], help='StudyInstanceUID (여러 번 지정 가능)')
+        parser.add_argument('--all', action='store_true', help='카탈로그의 대상 Modality Study 전체 생성')
+        parser.add_argument('--force', action='store_true', help='이미 있는 Instance도 다시 생성')
+        parser.add_argument('--purge', action='store_true', help='pyramid 삭제 (--study 지정 시 해당 Study만)')
+        parser.add_argument('--stats', action='store_true', help='저장소 통계 출력')
+
+    def handle(self, *args, **options):
+        if not image_pyramid_store.enabled:
+            raise CommandError('IMAGE_PYRAMID가 비활성화되어 있습니다')
+
+        orthanc_api = OrthancAPI()
+        requested = [self._orthanc_study_id(orthanc_api, study_uid) for study_uid in options['study']]
+
+        if options['purge']:
+            for study_id in requested or [None]:
+                removed = image_pyramid_store.purge(study_id)
+                self.stdout.write(f"🧹 {study_id or '전체'}: {removed}개 Instance 삭제")
+
+        study_ids = [] if options['purge'] else requested
+        if options['all']:
+            study_ids = [
+                study.orthanc_id for study in CatalogStudy.objects.only('orthanc_id', 'modalities_in_study')
+                if image_pyramid_store.modalities & set(study.modalities_in_study.split('\\'))
+            ]
+        for study_id in study_ids:
+            built = image_pyramid_store.build_study(study_id, orthanc_api, force=options['force'])
+            self.stdout.write(f"✅ {study_id}: {built}개 Instance 생성")
+
+        if options['stats'] or not (study_ids or options['purge']):
+            for key, value in image_pyramid_store.stats().items():
+                self.stdout.write(f"{key}: {value}")
+
+    @staticmethod
+    def _orthanc_study_id(orthanc_api, study_uid):
+        study_id = resolve_orthanc_study_id(study_uid, orthanc_api)
+        if not study_id:
+            raise CommandError(f'Study를 찾을 수 없습니다: {study_uid}')
+        return study_id
@@ -0,0 +1,43 @@
+# management/commands/ohif_proxy_cache.py
+from django.core.management.base import BaseCommand, CommandError
+from medical_integration.proxy_cache import proxy_cache
+from medical_integration.ohif_proxy_views import prewarm_study, OHIF_FRAME_ACCEPT
+
+class Command(BaseCommand):
+    help = 'OHIF 프록시 디스크 캐시를 조회/삭제하거나 Study 단위로 미리 채웁니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stats', action='store_true', help='캐시 통계 출력')
+        parser.add_argument('--purge', action='store_true', help='캐시 삭제 (--study 지정 시 해당 Study만)')
+        parser.add_argument('--prewarm', action='store_true', help='--study로 지정한 Study 프레임을 미리 적재')
+        parser.add_argument('--study', action='append', default=[], help='StudyInstanceUID (여러 번 지정 가능)')
+        parser.add_argument('--accept', default=OHIF_FRAME_ACCEPT, help='프레임 요청 Accept 헤더')
+        parser.add_argument('--rendered', action='store_true', help='rendered/thumbnail 이미지도 적재')
+        parser.add_argument('--evict', action='store_true', help='예산 초과분 즉시 정리')
+
+    def handle(self, *args, **options):
+        if not any(options[name] for name in ('stats', 'purge', 'prewarm', 'evict')):
+            options['stats'] = True
+
+        if options['purge']:
+            for study_uid in options['study'] or [None]:
+                count, freed = proxy_cache.purge(study_uid)
+                target = study_uid or '전체'
+                self.stdout.write(f"🧹 {target}: {count}개 삭제 ({freed / 1024 / 1024:.1f}MB)")
+
+        if options['prewarm']:
+            if not options['study']:
+                raise CommandError('--prewarm에는 --study가 필요합니다')
+            for study_uid in options['study']:
+                results = prewarm_study(study_uid, accept=options['accept'], rendered=options['rendered'])
+                self.stdout.write(
+                    f"✅ {study_uid}: 적재 {results['stored']} / 기존 {results['cached']} / 실패 {results['failed']}"
+                )
+
+        if options['evict']:
+            removed = proxy_cache.evict()
+            self.stdout.write(f"🧹 {removed}개 항목 정리")
+
+        if options['stats']:
+            for key, value in proxy_cache.stats().items():
+                self.stdout.write(f"{key}: {value}")
@@ -0,0 +1,48 @@
+# management/commands/series_metadata.py
+from django.core.management.base import BaseCommand, CommandError
+from medical_integration.models import CatalogStudy
+from medical_integration.orthanc_api import OrthancAPI
+from medical_integration.series_metadata import series_metadata_store
+from medical_integration.study_catalog import resolve_orthanc_study_id
+
+class Command(BaseCommand):
+    help = '미리 만든 DICOMweb Series 메타데이터 저장본을 생성/조회/삭제합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--study', action='append', default=[], help='StudyInstanceUID (여러 번 지정 가능)')
+        parser.add_argument('--all', action='store_true', help='카탈로그의 안정화된 Study 전체 생성')
+        parser.add_argument('--force', action='store_true', help='최신 저장본이 있어도 다시 생성')
+        parser.add_argument('--purge', action='store_true', help='저장본 삭제 (--study 지정 시 해당 Study만)')
+        parser.add_argument('--stats', action='store_true', help='저장소 통계 출력')
+
+    def handle(self, *args, **options):
+        if not series_metadata_store.enabled:
+            raise CommandError('SERIES_METADATA_STORE가 비활성화되어 있습니다')
+
+        orthanc_api = OrthancAPI()
+        study_ids = [self._orthanc_study_id(orthanc_api, study_uid) for study_uid in options['study']]
+
+        if options['purge']:
+            for study_id in study_ids or [None]:
+                removed = series_metadata_store.purge(study_id)
+                self.stdout.write(f"🧹 {study_id or '전체'}: {removed}개 Series 삭제")
+            if not options['all'] and not options['stats']:
+                return
+
+        if options['all']:
+            study_ids = list(CatalogStudy.objects.filter(is_stable=True).values_list('orthanc_id', flat=True))
+
+        for study_id in study_ids:
+            built = series_metadata_store.build_study(study_id, orthanc_api, force=options['force'])
+            self.stdout.write(f"✅ {study_id}: {built}개 Series 생성")
+
+        if options['stats'] or not (study_ids or options['purge']):
+            for key, value in series_metadata_store.stats().items():
+                self.stdout.write(f"{key}: {value}")
+
+    @staticmethod
+    def _orthanc_study_id(orthanc_api, study_uid):
+        study_id = resolve_orthanc_study_id(study_uid, orthanc_api)
+        if not study_id:
+            raise CommandError(f'Study를 찾을 수 없습니다: {study_uid}')
+        return study_id
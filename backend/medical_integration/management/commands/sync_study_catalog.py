@@ -0,0 +1,35 @@
+# management/commands/sync_study_catalog.py
+import time
+from django.core.management.base import BaseCommand
+from medical_integration.study_catalog import StudyCatalogSync
+
+class Command(BaseCommand):
+    help = 'Orthanc /changes 피드를 따라 로컬 Study 카탈로그를 동기화합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='전체 Study를 다시 적재한 뒤 동기화')
+        parser.add_argument('--loop', action='store_true', help='종료하지 않고 주기적으로 동기화 (워커 모드)')
+        parser.add_argument('--interval', type=float, default=5.0, help='워커 모드 폴링 간격(초)')
+        parser.add_argument('--batch-size', type=int, default=200, help='/changes 한 번에 읽을 개수')
+
+    def handle(self, *args, **options):
+        # 워커 모드에서는 후처리를 백그라운드 스레드로 (1회 실행은 종료 전에 끝나도록 직접 수행)
+        sync = StudyCatalogSync(batch_size=options['batch_size'], background_builds=options['loop'])
+
+        if options['rebuild']:
+            count = sync.rebuild()
+            self.stdout.write(f"✅ 카탈로그 재구축: {count}개 Study")
+
+        while True:
+            try:
+                processed = sync.sync_changes()
+                if processed:
+                    self.stdout.write(f"✅ {processed}개 변경 반영 (seq={sync.get_cursor().last_seq})")
+            except Exception as e:
+                self.stderr.write(f"⚠️ 동기화 실패: {e}")
+                if not options['loop']:
+                    raise
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
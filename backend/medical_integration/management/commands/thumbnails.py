@@ -0,0 +1,50 @@
+# management/commands/thumbnails.py
+from django.core.management.base import BaseCommand, CommandError
+from medical_integration.models import CatalogStudy
+from medical_integration.orthanc_api import OrthancAPI
+from medical_integration.thumbnail_store import thumbnail_store
+from medical_integration.study_catalog import resolve_orthanc_study_id
+
+class Command(BaseCommand):
+    help = 'Series 썸네일/미리보기 저장소를 생성(기존 Study 백필)/조회/정리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--study', action='append', default=[], help='StudyInstanceUID (여러 번 지정 가능)')
+        parser.add_argument('--all', action='store_true', help='카탈로그의 Study 전체 생성')
+        parser.add_argument('--force', action='store_true', help='이미 있는 Series도 다시 생성')
+        parser.add_argument('--purge', action='store_true', help='저장본 삭제 (--study 지정 시 해당 Study만)')
+        parser.add_argument('--gc', action='store_true', help='참조되지 않는 이미지 본문 정리')
+        parser.add_argument('--stats', action='store_true', help='저장소 통계 출력')
+
+    def handle(self, *args, **options):
+        if not thumbnail_store.enabled:
+            raise CommandError('THUMBNAIL_STORE가 비활성화되어 있습니다')
+
+        orthanc_api = OrthancAPI()
+        requested = [self._orthanc_study_id(orthanc_api, study_uid) for study_uid in options['study']]
+
+        if options['purge']:
+            for study_id in requested or [None]:
+                removed = thumbnail_store.purge(study_id)
+                self.stdout.write(f"🧹 {study_id or '전체'}: {removed}개 인덱스 삭제")
+
+        study_ids = [] if options['purge'] else requested
+        if options['all']:
+            study_ids = list(CatalogStudy.objects.values_list('orthanc_id', flat=True))
+        for study_id in study_ids:
+            built = thumbnail_store.build_study(study_id, orthanc_api, force=options['force'])
+            self.stdout.write(f"✅ {study_id}: {built}개 Series 생성")
+
+        if options['gc']:
+            self.stdout.write(f"🧹 참조 없는 이미지 {thumbnail_store.collect_garbage()}개 삭제")
+
+        if options['stats'] or not (study_ids or options['purge'] or options['gc']):
+            for key, value in thumbnail_store.stats().items():
+                self.stdout.write(f"{key}: {value}")
+
+    @staticmethod
+    def _orthanc_study_id(orthanc_api, study_uid):
+        study_id = resolve_orthanc_study_id(study_uid, orthanc_api)
+        if not study_id:
+            raise CommandError(f'Study를 찾을 수 없습니다: {study_uid}')
+        return study_id
@@ -0,0 +1,119 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical_integration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_seq', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'catalog_cursor',
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogPatient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orthanc_id', models.CharField(help_text='Orthanc Patient ID', max_length=64, unique=True)),
+                ('patient_id', models.CharField(blank=True, default='', help_text='DICOM PatientID', max_length=255)),
+                ('patient_name', models.CharField(blank=True, default='', max_length=255)),
+                ('patient_birth_date', models.CharField(blank=True, default='', max_length=8)),
+                ('patient_sex', models.CharField(blank=True, default='', max_length=16)),
+                ('last_update', models.CharField(blank=True, default='', help_text='Orthanc LastUpdate', max_length=32)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'catalog_patient',
+                'indexes': [models.Index(fields=['patient_id'], name='catalog_pat_patient_011220_idx'), models.Index(fields=['patient_name'], name='catalog_pat_patient_1c976d_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogStudy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orthanc_id', models.CharField(help_text='Orthanc Study ID', max_length=64, unique=True)),
+                ('study_instance_uid', models.CharField(help_text='StudyInstanceUID', max_length=255)),
+                ('patient_id', models.CharField(blank=True, default='', help_text='DICOM PatientID', max_length=255)),
+                ('patient_name', models.CharField(blank=True, default='', max_length=255)),
+                ('patient_birth_date', models.CharField(blank=True, default='', max_length=8)),
+                ('patient_sex', models.CharField(blank=True, default='', max_length=16)),
+                ('study_date', models.CharField(blank=True, default='', help_text='YYYYMMDD', max_length=8)),
+                ('study_time', models.CharField(blank=True, default='', max_length=32)),
+                ('study_id', models.CharField(blank=True, default='', help_text='DICOM StudyID', max_length=64)),
+                ('accession_number', models.CharField(blank=True, default='', max_length=64)),
+                ('study_description', models.CharField(blank=True, default='', max_length=255)),
+                ('referring_physician_name', models.CharField(blank=True, default='', max_length=255)),
+                ('modality', models.CharField(blank=True, default='', help_text='대표 Modality (첫 Series)', max_length=16)),
+                ('modalities_in_study', models.CharField(blank=True, default='', help_text='\\ 구분', max_length=64)),
+                ('series_count', models.IntegerField(default=0)),
+                ('instances_count', models.IntegerField(default=0)),
+                ('is_stable', models.BooleanField(default=False)),
+                ('last_update', models.CharField(blank=True, default='', help_text='Orthanc LastUpdate', max_length=32)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('catalog_patient', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='studies', to='medical_integration.catalogpatient')),
+            ],
+            options={
+                'db_table': 'catalog_study',
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orthanc_id', models.CharField(help_text='Orthanc Series ID', max_length=64, unique=True)),
+                ('series_instance_uid', models.CharField(help_text='SeriesInstanceUID', max_length=255)),
+                ('modality', models.CharField(blank=True, default='', max_length=16)),
+                ('series_number', models.CharField(blank=True, default='', max_length=16)),
+                ('series_description', models.CharField(blank=True, default='', max_length=255)),
+                ('body_part_examined', models.CharField(blank=True, default='', max_length=64)),
+                ('instances_count', models.IntegerField(default=0)),
+                ('is_stable', models.BooleanField(default=False)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+                ('study', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='medical_integration.catalogstudy')),
+            ],
+            options={
+                'db_table': 'catalog_series',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='catalogstudy',
+            index=models.Index(fields=['study_instance_uid'], name='catalog_stu_study_i_751fb0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogstudy',
+            index=models.Index(fields=['patient_id'], name='catalog_stu_patient_801f60_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogstudy',
+            index=models.Index(fields=['study_date'], name='catalog_stu_study_d_1490ea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogstudy',
+            index=models.Index(fields=['modality'], name='catalog_stu_modalit_0bdca3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogstudy',
+            index=models.Index(fields=['accession_number'], name='catalog_stu_accessi_5fa43e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogseries',
+            index=models.Index(fields=['series_instance_uid'], name='catalog_ser_series__6c7741_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogseries',
+            index=models.Index(fields=['modality'], name='catalog_ser_modalit_5b7512_idx'),
+        ),
+    ]
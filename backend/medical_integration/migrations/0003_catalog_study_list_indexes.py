@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical_integration', '0002_study_catalog'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalogstudy',
+            index=models.Index(fields=['-study_date', '-study_time'], name='catalog_stu_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='catalogstudy',
+            index=models.Index(fields=['patient_name'], name='catalog_stu_patient_3108b4_idx'),
+        ),
+    ]
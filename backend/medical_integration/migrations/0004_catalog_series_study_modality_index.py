@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('medical_integration', '0003_catalog_study_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='catalogseries',
+            index=models.Index(fields=['study', 'modality'], name='catalog_ser_study_i_280c05_idx'),
+        ),
+    ]
@@ -153,3 +153,103 @@ class Alert(models.Model):
 
     def __str__(self):
         return f'[{self.get_type_display()}] {self.message[:20]}…'
+
+
+class CatalogPatient(models.Model):
+    """Orthanc 환자 카탈로그 (/changes 피드로 동기화되는 로컬 사본)"""
+    orthanc_id = models.CharField(max_length=64, unique=True, help_text='Orthanc Patient ID')
+    patient_id = models.CharField(max_length=255, blank=True, default='', help_text='DICOM PatientID')
+    patient_name = models.CharField(max_length=255, blank=True, default='')
+    patient_birth_date = models.CharField(max_length=8, blank=True, default='')
+    patient_sex = models.CharField(max_length=16, blank=True, default='')
+    last_update = models.CharField(max_length=32, blank=True, default='', help_text='Orthanc LastUpdate')
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'catalog_patient'
+        indexes = [
+            models.Index(fields=['patient_id']),
+            models.Index(fields=['patient_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} - {self.patient_name}"
+
+
+class CatalogStudy(models.Model):
+    """Orthanc Study 카탈로그"""
+    orthanc_id = models.CharField(max_length=64, unique=True, help_text='Orthanc Study ID')
+    catalog_patient = models.ForeignKey(CatalogPatient, on_delete=models.CASCADE, null=True, related_name='studies')
+    study_instance_uid = models.CharField(max_length=255, help_text='StudyInstanceUID')
+    patient_id = models.CharField(max_length=255, blank=True, default='', help_text='DICOM PatientID')
+    patient_name = models.CharField(max_length=255, blank=True, default='')
+    patient_birth_date = models.CharField(max_length=8, blank=True, default='')
+    patient_sex = models.CharField(max_length=16, blank=True, default='')
+    study_date = models.CharField(max_length=8, blank=True, default='', help_text='YYYYMMDD')
+    study_time = models.CharField(max_length=32, blank=True, default='')
+    study_id = models.CharField(max_length=64, blank=True, default='', help_text='DICOM StudyID')
+    accession_number = models.CharField(max_length=64, blank=True, default='')
+    study_description = models.CharField(max_length=255, blank=True, default='')
+    referring_physician_name = models.CharField(max_length=255, blank=True, default='')
+    modality = models.CharField(max_length=16, blank=True, default='', help_text='대표 Modality (첫 Series)')
+    modalities_in_study = models.CharField(max_length=64, blank=True, default='', help_text='\\ 구분')
+    series_count = models.IntegerField(default=0)
+    instances_count = models.IntegerField(default=0)
+    is_stable = models.BooleanField(default=False)
+    last_update = models.CharField(max_length=32, blank=True, default='', help_text='Orthanc LastUpdate')
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'catalog_study'
+        indexes = [
+            models.Index(fields=['study_instance_uid']),
+            models.Index(fields=['patient_id']),
+            models.Index(fields=['study_date']),
+            models.Index(fields=['modality']),
+            models.Index(fields=['accession_number']),
+            # OHIF Study 목록: StudyDate/StudyTime 역순 페이지 조회, 환자 이름 접두어 검색
+            models.Index(fields=['-study_date', '-study_time'], name='catalog_stu_date_time_idx'),
+            models.Index(fields=['patient_name']),
+        ]
+
+    def __str__(self):
+        return f"{self.patient_id} - {self.study_instance_uid}"
+
+
+class CatalogSeries(models.Model):
+    """Orthanc Series 카탈로그"""
+    orthanc_id = models.CharField(max_length=64, unique=True, help_text='Orthanc Series ID')
+    study = models.ForeignKey(CatalogStudy, on_delete=models.CASCADE, related_name='series')
+    series_instance_uid = models.CharField(max_length=255, help_text='SeriesInstanceUID')
+    modality = models.CharField(max_length=16, blank=True, default='')
+    series_number = models.CharField(max_length=16, blank=True, default='')
+    series_description = models.CharField(max_length=255, blank=True, default='')
+    body_part_examined = models.CharField(max_length=64, blank=True, default='')
+    instances_count = models.IntegerField(default=0)
+    is_stable = models.BooleanField(default=False)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'catalog_series'
+        indexes = [
+            models.Index(fields=['series_instance_uid']),
+            models.Index(fields=['modality']),
+            # ModalitiesInStudy 검색의 Study별 EXISTS 조회
+            models.Index(fields=['study', 'modality']),
+        ]
+
+    def __str__(self):
+        return f"{self.modality} - {self.series_instance_uid}"
+
+
+class CatalogCursor(models.Model):
+    """Orthanc /changes 피드 동기화 위치"""
+    name = models.CharField(max_length=50, unique=True)
+    last_seq = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'catalog_cursor'
+
+    def __str__(self):
+        return f"{self.name}: {self.last_seq}"
@@ -0,0 +1,419 @@
+# backend/medical_integration/ohif_async_proxy_views.py
+
+import asyncio
+import itertools
+import logging
+import weakref
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from .orthanc_api import ORTHANC_TIMEOUTS
+from .proxy_http import (
+    dicomweb_resource_key,
+    dicomweb_study_uid,
+    wado_resource_key,
+    orthanc_resource_key,
+    make_etag,
+    etag_matches,
+    parse_range,
+    RangeNotSatisfiable,
+    aslice_chunks,
+    aiter_file_range,
+)
+from .proxy_cache import proxy_cache
+from .proxy_singleflight import async_proxy_singleflight
+from . import ohif_proxy_views
+from .ohif_proxy_views import (
+    PROXY_CHUNK_SIZE,
+    ORTHANC_USER,
+    ORTHANC_PASSWORD,
+    add_cors_headers,
+    proxy_request_headers,
+    passthrough_headers,
+    build_streaming_response,
+    range_not_satisfiable_response,
+    requested_range,
+    cached_entry_headers,
+    proxy_cache_key,
+    not_modified_response,
+    stored_series_metadata,
+    series_metadata_headers,
+    series_metadata_not_modified,
+    SERIES_METADATA_CONTENT_TYPE,
+)
+
+logger = logging.getLogger('medical_integration')
+
+# 이벤트 루프별 공용 httpx 클라이언트 목록 (커넥션 풀은 루프에 묶이므로 루프마다 생성)
+_clients = weakref.WeakKeyDictionary()
+_next_client = itertools.count()
+
+
+def _build_async_clients():
+    """PROXY_MAX_CONNECTIONS를 PROXY_POOL_SHARDS개 풀로 나눈 클라이언트 목록
+
+    httpcore 커넥션 풀은 요청을 배정할 때마다 대기 요청 x 연결 수만큼 순회하므로
+    큰 풀 하나는 동시 요청이 많을수록 CPU를 급격히 소모합니다 (128 세션에서 p95 5초 이상).
+    작은 풀 여러 개에 돌아가며 배정하면 같은 연결 수로 지연이 대기 시간 수준에 머뭅니다.
+    """
+    config = getattr(settings, 'ASYNC_HTTP_CONFIG', {})
+    shards = max(1, config.get('PROXY_POOL_SHARDS', 16))
+    per_shard = max(1, config.get('PROXY_MAX_CONNECTIONS', 256) // shards)
+    return [
+        httpx.AsyncClient(
+            auth=(ORTHANC_USER, ORTHANC_PASSWORD),
+            limits=httpx.Limits(
+                max_connections=per_shard,
+                max_keepalive_connections=per_shard
+            ),
+        )
+        for _ in range(shards)
+    ]
+
+
+def get_async_orthanc_client():
+    """현재 이벤트 루프의 공용 Orthanc AsyncClient (keep-alive 커넥션 풀, 라운드로빈)
+
+    ASGI 서버(uvicorn/daphne)는 프로세스당 루프 하나를 쓰므로 프로세스의 모든
+    프록시 요청이 같은 풀을 공유합니다. 대기 중인 요청은 워커 스레드를 점유하지 않습니다.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _clients.get(loop)
+    if clients is None:
+        clients = _clients[loop] = _build_async_clients()
+        logger.info(f"Orthanc 공용 비동기 HTTP 클라이언트 생성 (풀 {len(clients)}개)")
+    return clients[next(_next_client) % len(clients)]
+
+
+async def close_async_orthanc_clients():
+    """현재 이벤트 루프의 공용 클라이언트 종료 (관리 명령 등 루프를 직접 만드는 경우)"""
+    for client in _clients.pop(asyncio.get_running_loop(), []):
+        await client.aclose()
+
+
+def _httpx_timeout(timeout_key):
+    connect, read = ORTHANC_TIMEOUTS[timeout_key]
+    return httpx.Timeout(read, connect=connect)
+
+
+async def open_upstream_async(method, url, headers, timeout_key, content=None):
+    """open_upstream()의 비동기 버전 (본문은 읽지 않은 스트리밍 응답 반환)"""
+    client = get_async_orthanc_client()
+    upstream_request = client.build_request(method, url, headers=headers, content=content,
+                                            timeout=_httpx_timeout(timeout_key))
+    return await client.send(upstream_request, stream=True)
+
+
+async def aiter_upstream(upstream):
+    """upstream 본문을 디코딩 없이 청크 단위로 전달하고 끝나면 연결 반환"""
+    try:
+        async for chunk in upstream.aiter_raw(PROXY_CHUNK_SIZE):
+            if chunk:
+                yield chunk
+    finally:
+        await upstream.aclose()
+
+
+async def streaming_passthrough_async(upstream, request=None, etag=None, cache_key=None, study_uid='',
+                                      flight=None):
+    """streaming_passthrough()의 비동기 버전"""
+    status_code, headers, span = passthrough_headers(upstream.status_code, upstream.headers, request, etag)
+    if status_code == 416:
+        await upstream.aclose()
+        async_proxy_singleflight.publish(flight)
+        return range_not_satisfiable_response(headers)
+
+    content_type = upstream.headers.get('Content-Type', 'application/octet-stream')
+    chunks = aiter_upstream(upstream)
+    cached = False
+    if span:
+        chunks = aslice_chunks(chunks, *span)
+    elif etag and cache_key and status_code == 200:
+        chunks = proxy_cache.astore(cache_key, chunks, upstream.headers,
+                                    study_uid=study_uid, upstream_path=upstream.url)
+        headers['X-Proxy-Cache'] = 'MISS'
+        cached = proxy_cache.enabled
+
+    if flight is not None:
+        if status_code == 200:
+            chunks = async_proxy_singleflight.tee(flight, chunks, status_code, headers, content_type, cached)
+        else:
+            async_proxy_singleflight.publish(flight)
+
+    return build_streaming_response(chunks, status_code, headers, content_type)
+
+
+async def upstream_error_response_async(upstream, label):
+    """upstream 오류 응답을 JSON으로 변환"""
+    try:
+        await upstream.aread()
+        details = upstream.text
+    finally:
+        await upstream.aclose()
+    logger.error(f"❌ {label} 요청 실패: {upstream.status_code} - {details}")
+    return JsonResponse({
+        'error': f'{label} request failed: {upstream.status_code}',
+        'details': details
+    }, status=upstream.status_code)
+
+
+def cached_response_async(entry, request, etag):
+    """cached_response()의 비동기 버전 (파일을 async iterator로 전송)
+
+    ASGI에서 FileResponse 같은 sync iterator는 본문 전체를 메모리에 모은 뒤 전송되므로
+    블록 단위 async iterator로 내보냅니다.
+    """
+    try:
+        span = parse_range(requested_range(request, etag), entry.size)
+    except RangeNotSatisfiable:
+        entry.close()
+        return range_not_satisfiable_response({'Content-Range': f'bytes */{entry.size}'})
+
+    body = entry.open()
+    start, end = span or (0, entry.size - 1)
+    headers = cached_entry_headers(entry, etag)
+    headers['Content-Length'] = str(end - start + 1)
+    if span:
+        headers['Content-Range'] = f'bytes {start}-{end}/{entry.size}'
+    return build_streaming_response(
+        aiter_file_range(body, start, end), 206 if span else 200, headers,
+        entry.headers.get('Content-Type', 'application/octet-stream')
+    )
+
+
+async def proxy_cache_get_async(cache_key):
+    """디스크 캐시 조회 (메타/본문 파일 열기는 스레드에서 수행해 이벤트 루프를 막지 않음)"""
+    return await sync_to_async(proxy_cache.get, thread_sensitive=False)(cache_key)
+
+
+async def lookup_proxy_cache_async(upstream_path, request, headers, etag):
+    """lookup_proxy_cache()의 비동기 뷰용 버전"""
+    if not proxy_cache.enabled:
+        return None, None
+    cache_key = proxy_cache_key(upstream_path, request, headers)
+    entry = await proxy_cache_get_async(cache_key)
+    return cache_key, cached_response_async(entry, request, etag) if entry else None
+
+
+async def series_metadata_response_async(entry, request):
+    """series_metadata_response()의 비동기 버전 (gzip 파일을 async iterator로 전송)"""
+    not_modified = series_metadata_not_modified(entry, request)
+    if not_modified:
+        return not_modified
+
+    headers, send_gzip = series_metadata_headers(entry, request)
+    if send_gzip:
+        try:
+            body = open(entry.body_path, 'rb')
+        except OSError:
+            return None
+        return build_streaming_response(aiter_file_range(body, 0, entry.size - 1), 200, headers,
+                                        SERIES_METADATA_CONTENT_TYPE)
+
+    # gzip을 받지 않는 클라이언트는 드묾: 스레드에서 풀어서 한 번에 응답
+    try:
+        body = await sync_to_async(entry.read_decompressed, thread_sensitive=False)()
+    except OSError:
+        return None
+    response = HttpResponse(body, content_type=SERIES_METADATA_CONTENT_TYPE)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+async def follower_response_async(flight, request, etag, cache_key):
+    """follower_response()의 비동기 버전"""
+    result = await flight.wait(async_proxy_singleflight.wait_timeout)
+    response = None
+    if result is not None and result.cached:
+        entry = await proxy_cache_get_async(cache_key) if cache_key else None
+        response = cached_response_async(entry, request, etag) if entry else None
+    elif result is not None:
+        response = result.to_response()
+    async_proxy_singleflight.record_follower(flight, response is not None)
+    return response
+
+
+async def proxy_get_async(orthanc_url, upstream_path, request, headers, timeout_key, label,
+                          etag=None, cache_key=None, study_uid=''):
+    """proxy_get()의 비동기 버전 (동일 GET은 single-flight로 합침)"""
+    flight, leader = None, True
+    if 'Range' not in headers:
+        flight, leader = async_proxy_singleflight.join(proxy_cache_key(upstream_path, request, headers))
+    if not leader:
+        response = await follower_response_async(flight, request, etag, cache_key)
+        if response is not None:
+            return response
+        flight = None  # 리더 실패/본문 초과: 직접 요청
+
+    try:
+        upstream = await open_upstream_async('GET', orthanc_url, headers, timeout_key)
+    except BaseException:
+        async_proxy_singleflight.publish(flight)
+        raise
+
+    if upstream.is_error:
+        async_proxy_singleflight.publish(flight)
+        return await upstream_error_response_async(upstream, label)
+    return await streaming_passthrough_async(upstream, request, etag, cache_key,
+                                             study_uid=study_uid, flight=flight)
+
+
+@csrf_exempt
+async def orthanc_proxy(request, path=""):
+    """Orthanc HTTP API 프록시 (ASGI) - ohif_proxy_views.orthanc_proxy와 동일한 동작"""
+    if request.method == 'OPTIONS':
+        response = HttpResponse()
+        return add_cors_headers(response)
+
+    try:
+        orthanc_url = f"{ohif_proxy_views.ORTHANC_HTTP_BASE}/{path}"
+
+        if request.GET:
+            query_string = request.GET.urlencode()
+            orthanc_url = f"{orthanc_url}?{query_string}"
+
+        logger.info(f"🌐 HTTP 프록시 요청(async): {request.method} {orthanc_url}")
+
+        headers = proxy_request_headers(request, 'application/json')
+
+        if request.META.get('CONTENT_TYPE'):
+            headers['Content-Type'] = request.META['CONTENT_TYPE']
+
+        # 🔥 Instance 리소스는 불변: ETag 일치 시 Orthanc 호출 없이 304
+        etag = None
+        resource_key = orthanc_resource_key(path) if request.method == 'GET' else None
+        if resource_key:
+            etag = make_etag(resource_key, request)
+            if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+                return add_cors_headers(not_modified_response(etag))
+            if requested_range(request, etag):
+                headers['Range'] = requested_range(request, etag)
+
+        if request.method == 'GET':
+            django_response = await proxy_get_async(orthanc_url, path, request, headers,
+                                                    'default', 'HTTP', etag)
+        elif request.method == 'POST':
+            upstream = await open_upstream_async('POST', orthanc_url, headers, 'default',
+                                                 content=request.body)
+            if not upstream.is_error:
+                django_response = await streaming_passthrough_async(upstream, request, etag)
+            else:
+                django_response = await upstream_error_response_async(upstream, 'HTTP')
+        else:
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+        return add_cors_headers(django_response)
+
+    except httpx.HTTPError as e:
+        logger.error(f"❌ HTTP 연결 실패: {e}")
+        django_response = JsonResponse({
+            'error': 'HTTP connection failed',
+            'details': str(e)
+        }, status=503)
+        return add_cors_headers(django_response)
+
+
+@csrf_exempt
+async def dicom_web_proxy(request, path=""):
+    """DICOMweb API 프록시 (ASGI) - ohif_proxy_views.dicom_web_proxy와 동일한 동작"""
+    if request.method == 'OPTIONS':
+        response = HttpResponse()
+        return add_cors_headers(response)
+
+    try:
+        if not path.startswith('dicom-web'):
+            path = f"dicom-web/{path.lstrip('/')}"
+
+        orthanc_url = f"{ohif_proxy_views.ORTHANC_HTTP_BASE}/{path}"
+
+        if request.GET:
+            query_string = request.GET.urlencode()
+            orthanc_url = f"{orthanc_url}?{query_string}"
+
+        logger.info(f"🏥 DICOMweb 프록시 요청(async): {request.method} {orthanc_url}")
+
+        headers = proxy_request_headers(request, 'application/dicom+json')
+
+        if request.method != 'GET':
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+        # 🔥 미리 만든 Series 메타데이터가 최신이면 Orthanc 호출 없이 응답 (신선도 확인은 DB 조회)
+        entry = await sync_to_async(stored_series_metadata)(path, request)
+        if entry:
+            django_response = await series_metadata_response_async(entry, request)
+            if django_response:
+                return add_cors_headers(django_response)
+
+        # 🔥 Instance 이하 리소스는 불변: ETag 일치 시 304, 디스크 캐시 히트 시 바로 응답
+        etag = None
+        cache_key = None
+        resource_key = dicomweb_resource_key(path)
+        if resource_key:
+            etag = make_etag(resource_key, request)
+            if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+                return add_cors_headers(not_modified_response(etag))
+            cache_key, cached = await lookup_proxy_cache_async(path, request, headers, etag)
+            if cached:
+                return add_cors_headers(cached)
+            if requested_range(request, etag):
+                headers['Range'] = requested_range(request, etag)
+
+        django_response = await proxy_get_async(orthanc_url, path, request, headers, 'download',
+                                                'DICOMweb', etag, cache_key, study_uid=dicomweb_study_uid(path))
+
+        return add_cors_headers(django_response)
+
+    except Exception as e:
+        logger.error(f"❌ DICOMweb 프록시 오류: {e}")
+        django_response = JsonResponse({
+            'error': 'DICOMweb proxy failed',
+            'details': str(e)
+        }, status=503)
+        return add_cors_headers(django_response)
+
+
+@csrf_exempt
+async def wado_proxy(request):
+    """WADO-URI 프록시 (ASGI) - ohif_proxy_views.wado_proxy와 동일한 동작"""
+    if request.method == 'OPTIONS':
+        response = HttpResponse()
+        return add_cors_headers(response)
+
+    try:
+        query_string = request.GET.urlencode()
+        orthanc_url = f"{ohif_proxy_views.ORTHANC_HTTP_BASE}/wado?{query_string}"
+
+        logger.info(f"🖼️ WADO 프록시 요청(async): {orthanc_url}")
+
+        headers = proxy_request_headers(request, 'image/*')
+
+        # 🔥 objectUID로 지정된 Instance는 불변: ETag 일치 시 304, 디스크 캐시 히트 시 바로 응답
+        etag = None
+        cache_key = None
+        resource_key = wado_resource_key(request.GET)
+        if resource_key:
+            etag = make_etag(resource_key, request)
+            if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+                return add_cors_headers(not_modified_response(etag))
+            cache_key, cached = await lookup_proxy_cache_async('wado', request, headers, etag)
+            if cached:
+                return add_cors_headers(cached)
+            if requested_range(request, etag):
+                headers['Range'] = requested_range(request, etag)
+
+        django_response = await proxy_get_async(orthanc_url, 'wado', request, headers, 'download',
+                                                'WADO', etag, cache_key,
+                                                study_uid=request.GET.get('studyUID', ''))
+
+        return add_cors_headers(django_response)
+
+    except Exception as e:
+        logger.error(f"❌ WADO 프록시 오류: {e}")
+        django_response = JsonResponse({
+            'error': 'WADO proxy failed',
+            'details': str(e)
+        }, status=503)
+        return add_cors_headers(django_response)
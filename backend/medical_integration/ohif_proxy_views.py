@@ -2,11 +2,33 @@
 
 import requests
 import json
-from django.http import JsonResponse, HttpResponse
+import re
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
 from requests.auth import HTTPBasicAuth
+from .models import CatalogSeries, CatalogStudy
+from .orthanc_api import OrthancAPI, get_orthanc_session, ORTHANC_TIMEOUTS
+from .proxy_http import (
+    IMMUTABLE_CACHE_CONTROL,
+    RangeNotSatisfiable,
+    dicomweb_resource_key,
+    dicomweb_study_uid,
+    wado_resource_key,
+    orthanc_resource_key,
+    series_metadata_uids,
+    accepts_dicom_json,
+    make_etag,
+    etag_matches,
+    parse_range,
+    slice_chunks,
+    iter_file_range,
+)
+from .proxy_cache import proxy_cache
+from .proxy_singleflight import proxy_singleflight, async_proxy_singleflight
+from .series_metadata import series_metadata_store
 import logging
 
 logger = logging.getLogger('medical_integration')
@@ -22,14 +44,306 @@ ORTHANC_PASSWORD = "orthanc"
 ORTHANC_HTTP_BASE = f"http://{ORTHANC_HOST}:{ORTHANC_HTTP_PORT}"
 ORTHANC_DICOM_BASE = f"dicom://{ORTHANC_HOST}:{ORTHANC_DICOM_PORT}"
 
+# 🔥 스트리밍 프록시: upstream 응답을 청크 단위로 그대로 전달
+PROXY_CHUNK_SIZE = 64 * 1024
+PASSTHROUGH_HEADERS = (
+    'Content-Length',
+    'Content-Encoding',
+    'Content-Disposition',
+    'Content-Range',
+    'Accept-Ranges',
+    'ETag',
+    'Last-Modified',
+)
+
 def add_cors_headers(response):
     """CORS 헤더 추가"""
     response['Access-Control-Allow-Origin'] = '*'
     response['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin'
+    response['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin, Range, If-None-Match'
+    response['Access-Control-Expose-Headers'] = 'ETag, Content-Length, Content-Range, Accept-Ranges, X-Total-Count, X-Total-Count-Capped, X-Has-More, X-Series-Metadata'
     response['Access-Control-Max-Age'] = '86400'
     return response
 
+def proxy_request_headers(request, default_accept):
+    """Orthanc로 전달할 요청 헤더"""
+    return {
+        'Accept': request.META.get('HTTP_ACCEPT', default_accept),
+        # 압축 여부는 클라이언트 요청을 따름 (본문을 디코딩 없이 전달하므로)
+        'Accept-Encoding': request.META.get('HTTP_ACCEPT_ENCODING', 'identity'),
+        'User-Agent': 'Django-OHIF-Proxy/1.0'
+    }
+
+def open_upstream(method, url, headers, timeout, data=None):
+    """Orthanc 요청을 보내고 본문은 읽지 않은 스트리밍 응답 반환 (공용 커넥션 풀 사용)"""
+    return get_orthanc_session().request(
+        method,
+        url,
+        headers=headers,
+        data=data,
+        auth=HTTPBasicAuth(ORTHANC_USER, ORTHANC_PASSWORD),
+        timeout=timeout,
+        stream=True
+    )
+
+def iter_upstream(upstream):
+    """upstream 본문을 디코딩 없이 청크 단위로 전달하고 끝나면 연결 반환"""
+    try:
+        for chunk in upstream.raw.stream(PROXY_CHUNK_SIZE, decode_content=False):
+            if chunk:
+                yield chunk
+    finally:
+        upstream.close()
+
+def passthrough_headers(status_code, upstream_headers, request=None, etag=None):
+    """upstream 응답으로 패스스루 응답의 (상태 코드, 헤더, 잘라낼 구간) 결정 (sync/async 공용)
+
+    etag가 주어지면 불변 리소스로 보고 ETag/Cache-Control을 붙이며,
+    upstream이 Range를 무시하고 200을 주면 요청 구간(span)을 돌려 206으로 응답하게 합니다.
+    Range가 본문 길이를 벗어나면 상태 코드 416과 Content-Range만 반환합니다.
+    """
+    headers = {h: upstream_headers[h] for h in PASSTHROUGH_HEADERS if h in upstream_headers}
+    span = None
+
+    if etag:
+        headers['ETag'] = etag
+        headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        headers['Vary'] = 'Accept, Accept-Encoding'
+
+        byte_range = requested_range(request, etag)
+        if byte_range and status_code == 200:
+            total = int(headers['Content-Length']) if 'Content-Length' in headers else None
+            try:
+                span = parse_range(byte_range, total)
+            except RangeNotSatisfiable:
+                return 416, {'Content-Range': f'bytes */{total}'}, None
+            if span:
+                start, end = span
+                status_code = 206
+                headers['Content-Range'] = f'bytes {start}-{end}/{total}'
+                headers['Content-Length'] = str(end - start + 1)
+        if 'Content-Length' in headers:
+            headers.setdefault('Accept-Ranges', 'bytes')
+
+    return status_code, headers, span
+
+def range_not_satisfiable_response(headers):
+    """Range가 본문 길이를 벗어난 경우의 416 응답"""
+    response = HttpResponse(status=416)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+def build_streaming_response(chunks, status_code, headers, content_type):
+    """청크 iterator(sync/async)로 스트리밍 응답 생성"""
+    response = StreamingHttpResponse(chunks, status=status_code, content_type=content_type)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+def streaming_passthrough(upstream, request=None, etag=None, cache_key=None, study_uid='', flight=None):
+    """upstream 응답을 버퍼링 없이 전달 (multipart boundary 포함 Content-Type 등 헤더 유지)
+
+    cache_key가 주어지고 전체 본문(200)을 받으면 전달하면서 디스크 캐시에 기록합니다.
+    flight(single-flight 리더)가 주어지면 전달이 끝난 뒤 대기 중인 팔로워에게 결과를 넘깁니다.
+    """
+    status_code, headers, span = passthrough_headers(upstream.status_code, upstream.headers, request, etag)
+    if status_code == 416:
+        upstream.close()
+        proxy_singleflight.publish(flight)
+        return range_not_satisfiable_response(headers)
+
+    content_type = upstream.headers.get('Content-Type', 'application/octet-stream')
+    chunks = iter_upstream(upstream)
+    cached = False
+    if span:
+        chunks = slice_chunks(chunks, *span)
+    elif etag and cache_key and status_code == 200:
+        chunks = proxy_cache.store(cache_key, chunks, upstream.headers,
+                                   study_uid=study_uid, upstream_path=upstream.url)
+        headers['X-Proxy-Cache'] = 'MISS'
+        cached = proxy_cache.enabled
+
+    if flight is not None:
+        if status_code == 200:
+            chunks = proxy_singleflight.tee(flight, chunks, status_code, headers, content_type, cached)
+        else:
+            proxy_singleflight.publish(flight)
+
+    return build_streaming_response(chunks, status_code, headers, content_type)
+
+def follower_response(flight, request, etag, cache_key):
+    """single-flight 팔로워: 리더 결과(디스크 캐시 또는 공유 본문)로 응답. 받을 수 없으면 None"""
+    result = flight.wait(proxy_singleflight.wait_timeout)
+    response = None
+    if result is not None and result.cached:
+        entry = proxy_cache.get(cache_key) if cache_key else None
+        response = cached_response(entry, request, etag) if entry else None
+    elif result is not None:
+        response = result.to_response()
+    proxy_singleflight.record_follower(flight, response is not None)
+    return response
+
+def proxy_get(orthanc_url, upstream_path, request, headers, timeout, label,
+              etag=None, cache_key=None, study_uid=''):
+    """upstream GET 후 스트리밍 응답 (같은 요청이 동시에 진행 중이면 그 결과를 기다려 사용)
+
+    Range 요청은 응답이 요청마다 달라 합치지 않습니다.
+    """
+    flight, leader = None, True
+    if 'Range' not in headers:
+        flight, leader = proxy_singleflight.join(proxy_cache_key(upstream_path, request, headers))
+    if not leader:
+        response = follower_response(flight, request, etag, cache_key)
+        if response is not None:
+            return response
+        flight = None  # 리더 실패/본문 초과: 직접 요청
+
+    try:
+        upstream = open_upstream('GET', orthanc_url, headers, timeout)
+    except BaseException:
+        proxy_singleflight.publish(flight)
+        raise
+
+    if not upstream.ok:
+        proxy_singleflight.publish(flight)
+        return upstream_error_response(upstream, label)
+    return streaming_passthrough(upstream, request, etag, cache_key, study_uid=study_uid, flight=flight)
+
+def requested_range(request, etag):
+    """적용할 Range 헤더 (If-Range가 현재 ETag와 다르면 None)"""
+    if request is None:
+        return None
+    byte_range = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not byte_range or (if_range and if_range != etag):
+        return None
+    return byte_range
+
+def cached_entry_headers(entry, etag):
+    """디스크 캐시 히트 응답 공통 헤더"""
+    headers = {h: entry.headers[h] for h in ('Content-Encoding', 'Content-Disposition') if h in entry.headers}
+    headers.update({
+        'ETag': etag,
+        'Cache-Control': IMMUTABLE_CACHE_CONTROL,
+        'Vary': 'Accept, Accept-Encoding',
+        'Accept-Ranges': 'bytes',
+        'X-Proxy-Cache': 'HIT',
+    })
+    return headers
+
+def cached_response(entry, request, etag):
+    """디스크 캐시 항목 응답 (Range 없으면 FileResponse로 sendfile 전송)"""
+    content_type = entry.headers.get('Content-Type', 'application/octet-stream')
+    try:
+        span = parse_range(requested_range(request, etag), entry.size)
+    except RangeNotSatisfiable:
+        entry.close()
+        return range_not_satisfiable_response({'Content-Range': f'bytes */{entry.size}'})
+
+    body = entry.open()
+
+    if span:
+        start, end = span
+        response = StreamingHttpResponse(iter_file_range(body, start, end), status=206,
+                                         content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{entry.size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(body, content_type=content_type)
+        response.headers.pop('Content-Disposition', None)
+
+    for header, value in cached_entry_headers(entry, etag).items():
+        response[header] = value
+    return response
+
+def proxy_cache_key(upstream_path, request, headers):
+    """디스크 캐시 키 (upstream 경로 + 쿼리 + 전달하는 Accept/Accept-Encoding)"""
+    return proxy_cache.make_key(upstream_path, request.META.get('QUERY_STRING', ''),
+                                headers['Accept'], headers['Accept-Encoding'])
+
+def lookup_proxy_cache(upstream_path, request, headers, etag):
+    """불변 리소스의 캐시 키와 (히트 시) 캐시 응답 반환"""
+    if not proxy_cache.enabled:
+        return None, None
+    cache_key = proxy_cache_key(upstream_path, request, headers)
+    entry = proxy_cache.get(cache_key)
+    return cache_key, cached_response(entry, request, etag) if entry else None
+
+def not_modified_response(etag):
+    """If-None-Match 일치 시 upstream 호출 없이 304 응답"""
+    response = HttpResponse(status=304)
+    response['ETag'] = etag
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response['Vary'] = 'Accept, Accept-Encoding'
+    return response
+
+def upstream_error_response(upstream, label):
+    """upstream 오류 응답을 JSON으로 변환 (오류 본문은 작으므로 읽어서 전달)"""
+    try:
+        details = upstream.text
+    finally:
+        upstream.close()
+    logger.error(f"❌ {label} 요청 실패: {upstream.status_code} - {details}")
+    return JsonResponse({
+        'error': f'{label} request failed: {upstream.status_code}',
+        'details': details
+    }, status=upstream.status_code)
+
+# 저장된 Series 메타데이터는 Instance가 추가되면 바뀌므로 매번 ETag로 재검증
+SERIES_METADATA_CACHE_CONTROL = 'private, no-cache'
+SERIES_METADATA_CONTENT_TYPE = 'application/dicom+json'
+
+def stored_series_metadata(path, request):
+    """요청에 그대로 쓸 수 있는 최신 Series 메타데이터 저장본 (없으면 None)"""
+    uids = series_metadata_uids(path)
+    if not uids or request.GET or not accepts_dicom_json(request.META.get('HTTP_ACCEPT')):
+        return None
+    return series_metadata_store.get(*uids)
+
+def series_metadata_headers(entry, request):
+    """저장본 응답 헤더와 gzip 그대로 전송 여부"""
+    send_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+    headers = {
+        'ETag': entry.etag,
+        'Cache-Control': SERIES_METADATA_CACHE_CONTROL,
+        'Vary': 'Accept, Accept-Encoding',
+        'X-Series-Metadata': 'STORED',
+    }
+    if send_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(entry.size)
+    return headers, send_gzip
+
+def series_metadata_not_modified(entry, request):
+    """If-None-Match 일치 시 304 (아니면 None)"""
+    if not etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), entry.etag):
+        return None
+    response = HttpResponse(status=304)
+    response['ETag'] = entry.etag
+    response['Cache-Control'] = SERIES_METADATA_CACHE_CONTROL
+    response['Vary'] = 'Accept, Accept-Encoding'
+    return response
+
+def series_metadata_response(entry, request):
+    """저장본 응답 (gzip을 받는 클라이언트에는 압축 파일을 sendfile로 그대로 전송)"""
+    not_modified = series_metadata_not_modified(entry, request)
+    if not_modified:
+        return not_modified
+
+    headers, send_gzip = series_metadata_headers(entry, request)
+    if send_gzip:
+        try:
+            response = FileResponse(open(entry.body_path, 'rb'), content_type=SERIES_METADATA_CONTENT_TYPE)
+        except OSError:
+            return None
+        response.headers.pop('Content-Disposition', None)
+    else:
+        response = StreamingHttpResponse(entry.iter_decompressed(), content_type=SERIES_METADATA_CONTENT_TYPE)
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
 @csrf_exempt
 @require_http_methods(["GET", "OPTIONS"])
 def ohif_config(request):
@@ -97,43 +411,36 @@ def orthanc_proxy(request, path=""):
         logger.info(f"🌐 HTTP 프록시 요청: {request.method} {orthanc_url}")
         
         # 요청 헤더 준비
-        headers = {
-            'Accept': request.META.get('HTTP_ACCEPT', 'application/json'),
-            'User-Agent': 'Django-OHIF-Proxy/1.0'
-        }
+        headers = proxy_request_headers(request, 'application/json')
         
         # Content-Type이 있으면 추가
         if request.META.get('CONTENT_TYPE'):
             headers['Content-Type'] = request.META['CONTENT_TYPE']
         
-        # 🔥 HTTP 인증만 사용
-        auth = HTTPBasicAuth(ORTHANC_USER, ORTHANC_PASSWORD)
+        # 🔥 Instance 리소스는 불변: ETag 일치 시 Orthanc 호출 없이 304
+        etag = None
+        resource_key = orthanc_resource_key(path) if request.method == 'GET' else None
+        if resource_key:
+            etag = make_etag(resource_key, request)
+            if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+                return add_cors_headers(not_modified_response(etag))
+            if requested_range(request, etag):
+                headers['Range'] = requested_range(request, etag)
         
         if request.method == 'GET':
-            response = requests.get(orthanc_url, headers=headers, auth=auth, timeout=30)
+            # 동일한 GET이 동시에 진행 중이면 합쳐서 처리 (single-flight)
+            django_response = proxy_get(orthanc_url, path, request, headers,
+                                        ORTHANC_TIMEOUTS['default'], 'HTTP', etag)
         elif request.method == 'POST':
-            response = requests.post(orthanc_url, 
-                                   data=request.body, 
-                                   headers=headers, 
-                                   auth=auth, 
-                                   timeout=30)
-        else:
-            return JsonResponse({'error': 'Method not allowed'}, status=405)
-        
-        # 응답 처리
-        if response.status_code == 200:
-            content_type = response.headers.get('content-type', 'application/json')
-            
-            if 'application/json' in content_type:
-                django_response = JsonResponse(response.json(), safe=False)
+            upstream = open_upstream('POST', orthanc_url, headers, ORTHANC_TIMEOUTS['default'],
+                                     data=request.body)
+            # 응답 처리 (성공 응답은 스트리밍 패스스루)
+            if upstream.ok:
+                django_response = streaming_passthrough(upstream, request, etag)
             else:
-                django_response = HttpResponse(response.content, content_type=content_type)
+                django_response = upstream_error_response(upstream, 'HTTP')
         else:
-            logger.error(f"❌ HTTP 요청 실패: {response.status_code} - {response.text}")
-            django_response = JsonResponse({
-                'error': f'HTTP request failed: {response.status_code}',
-                'details': response.text
-            }, status=response.status_code)
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
         
         return add_cors_headers(django_response)
         
@@ -165,34 +472,36 @@ def dicom_web_proxy(request, path=""):
         
         logger.info(f"🏥 DICOMweb 프록시 요청: {request.method} {orthanc_url}")
         
-        headers = {
-            'Accept': request.META.get('HTTP_ACCEPT', 'application/dicom+json'),
-            'User-Agent': 'Django-OHIF-Proxy/1.0'
-        }
+        headers = proxy_request_headers(request, 'application/dicom+json')
         
-        auth = HTTPBasicAuth(ORTHANC_USER, ORTHANC_PASSWORD)
-        
-        if request.method == 'GET':
-            response = requests.get(orthanc_url, headers=headers, auth=auth, timeout=60)
-        else:
+        if request.method != 'GET':
             return JsonResponse({'error': 'Method not allowed'}, status=405)
         
-        if response.status_code == 200:
-            content_type = response.headers.get('content-type', 'application/dicom+json')
-            
-            if 'json' in content_type:
-                try:
-                    django_response = JsonResponse(response.json(), safe=False)
-                except:
-                    django_response = HttpResponse(response.content, content_type=content_type)
-            else:
-                django_response = HttpResponse(response.content, content_type=content_type)
-        else:
-            logger.error(f"❌ DICOMweb 오류: {response.status_code} - {response.text}")
-            django_response = JsonResponse({
-                'error': f'DICOMweb request failed: {response.status_code}',
-                'details': response.text
-            }, status=response.status_code)
+        # 🔥 안정화 시 미리 만든 Series 메타데이터가 최신이면 Orthanc 호출 없이 응답
+        entry = stored_series_metadata(path, request)
+        if entry:
+            django_response = series_metadata_response(entry, request)
+            if django_response:
+                return add_cors_headers(django_response)
+        
+        # 🔥 Instance 이하 리소스(frames/rendered/bulk 등)는 불변: ETag 일치 시 304
+        etag = None
+        cache_key = None
+        resource_key = dicomweb_resource_key(path)
+        if resource_key:
+            etag = make_etag(resource_key, request)
+            if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+                return add_cors_headers(not_modified_response(etag))
+            # 🔥 디스크 캐시 히트 시 Orthanc 호출 없이 응답
+            cache_key, cached = lookup_proxy_cache(path, request, headers, etag)
+            if cached:
+                return add_cors_headers(cached)
+            if requested_range(request, etag):
+                headers['Range'] = requested_range(request, etag)
+        
+        # 동일한 GET이 동시에 진행 중이면 합쳐서 처리 (single-flight)
+        django_response = proxy_get(orthanc_url, path, request, headers, ORTHANC_TIMEOUTS['download'],
+                                    'DICOMweb', etag, cache_key, study_uid=dicomweb_study_uid(path))
         
         return add_cors_headers(django_response)
         
@@ -218,22 +527,26 @@ def wado_proxy(request):
         
         logger.info(f"🖼️ WADO 프록시 요청: {orthanc_url}")
         
-        headers = {
-            'Accept': request.META.get('HTTP_ACCEPT', 'image/*'),
-            'User-Agent': 'Django-OHIF-Proxy/1.0'
-        }
+        headers = proxy_request_headers(request, 'image/*')
         
-        auth = HTTPBasicAuth(ORTHANC_USER, ORTHANC_PASSWORD)
-        response = requests.get(orthanc_url, headers=headers, auth=auth, timeout=60)
+        # 🔥 objectUID로 지정된 Instance는 불변: ETag 일치 시 304
+        etag = None
+        cache_key = None
+        resource_key = wado_resource_key(request.GET)
+        if resource_key:
+            etag = make_etag(resource_key, request)
+            if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+                return add_cors_headers(not_modified_response(etag))
+            # 🔥 디스크 캐시 히트 시 Orthanc 호출 없이 응답
+            cache_key, cached = lookup_proxy_cache('wado', request, headers, etag)
+            if cached:
+                return add_cors_headers(cached)
+            if requested_range(request, etag):
+                headers['Range'] = requested_range(request, etag)
         
-        if response.status_code == 200:
-            content_type = response.headers.get('content-type', 'application/octet-stream')
-            django_response = HttpResponse(response.content, content_type=content_type)
-        else:
-            logger.error(f"❌ WADO 오류: {response.status_code}")
-            django_response = JsonResponse({
-                'error': f'WADO request failed: {response.status_code}'
-            }, status=response.status_code)
+        # 동일한 GET이 동시에 진행 중이면 합쳐서 처리 (single-flight)
+        django_response = proxy_get(orthanc_url, 'wado', request, headers, ORTHANC_TIMEOUTS['download'],
+                                    'WADO', etag, cache_key, study_uid=request.GET.get('studyUID', ''))
         
         return add_cors_headers(django_response)
         
@@ -245,61 +558,307 @@ def wado_proxy(request):
         }, status=503)
         return add_cors_headers(django_response)
 
+# OHIF(cornerstone) 기본 프레임 요청 형식 - prewarm 캐시 키를 뷰어 요청과 맞추기 위함
+OHIF_FRAME_ACCEPT = 'multipart/related; type="application/octet-stream"; transfer-syntax=*'
+BROWSER_ACCEPT_ENCODING = 'gzip, deflate'
+
+def warm_dicomweb_resource(path, accept):
+    """DICOMweb 리소스를 받아 디스크 캐시에 저장
+
+    Returns:
+        str: 'cached' (이미 있음) | 'stored' | 'failed'
+    """
+    cache_key = proxy_cache.make_key(path, '', accept, BROWSER_ACCEPT_ENCODING)
+    if proxy_cache.contains(cache_key):
+        return 'cached'
+
+    headers = {
+        'Accept': accept,
+        'Accept-Encoding': BROWSER_ACCEPT_ENCODING,
+        'User-Agent': 'Django-OHIF-Proxy/1.0'
+    }
+    upstream = open_upstream('GET', f"{ORTHANC_HTTP_BASE}/{path}", headers, ORTHANC_TIMEOUTS['download'])
+    if upstream.status_code != 200:
+        upstream.close()
+        return 'failed'
+    for _ in proxy_cache.store(cache_key, iter_upstream(upstream), upstream.headers,
+                               study_uid=dicomweb_study_uid(path), upstream_path=upstream.url):
+        pass
+    return 'stored' if proxy_cache.contains(cache_key) else 'failed'
+
+def prewarm_study(study_uid, accept=OHIF_FRAME_ACCEPT, rendered=False, cancelled=None):
+    """Study의 모든 Instance 프레임(선택 시 rendered/thumbnail 포함)을 디스크 캐시에 적재
+
+    cancelled(threading.Event)가 설정되면 남은 리소스를 건너뛰고 중단합니다 (prefetch 취소).
+    """
+    upstream = open_upstream('GET', f"{ORTHANC_HTTP_BASE}/dicom-web/studies/{study_uid}/instances",
+                             {'Accept': 'application/dicom+json'}, ORTHANC_TIMEOUTS['default'])
+    try:
+        upstream.raise_for_status()
+        instances = upstream.json() if upstream.status_code == 200 else []
+    finally:
+        upstream.close()
+
+    results = {'cached': 0, 'stored': 0, 'failed': 0}
+    for instance in instances:
+        series_uid = instance.get('0020000E', {}).get('Value', [''])[0]
+        sop_uid = instance.get('00080018', {}).get('Value', [''])[0]
+        frames = int((instance.get('00280008', {}).get('Value') or [1])[0] or 1)
+        base = f"dicom-web/studies/{study_uid}/series/{series_uid}/instances/{sop_uid}"
+
+        targets = [(f"{base}/frames/{frame}", accept) for frame in range(1, frames + 1)]
+        if rendered:
+            targets += [(f"{base}/rendered", 'image/jpeg'), (f"{base}/thumbnail", 'image/jpeg')]
+
+        for path, target_accept in targets:
+            if cancelled is not None and cancelled.is_set():
+                return results
+            try:
+                results[warm_dicomweb_resource(path, target_accept)] += 1
+            except Exception as e:
+                logger.warning(f"⚠️ prewarm 실패 ({path}): {e}")
+                results['failed'] += 1
+    return results
+
+@csrf_exempt
+def proxy_cache_stats(request):
+    """OHIF 프록시 디스크 캐시, single-flight(요청 합치기), Series 메타데이터 저장소 통계
+
+    single-flight와 hit/miss 카운터는 프로세스별입니다.
+    """
+    if request.method == 'OPTIONS':
+        response = HttpResponse()
+        return add_cors_headers(response)
+    return add_cors_headers(JsonResponse({
+        **proxy_cache.stats(),
+        'singleflight': {
+            'sync': proxy_singleflight.stats(),
+            'async': async_proxy_singleflight.stats(),
+        },
+        'series_metadata': series_metadata_store.stats(),
+    }))
+
+# QIDO-RS Study 응답 속성 (태그, VR, CatalogStudy 필드)
+QIDO_STUDY_ATTRIBUTES = (
+    ('00080020', 'DA', 'study_date'),
+    ('00080030', 'TM', 'study_time'),
+    ('00080050', 'SH', 'accession_number'),
+    ('00080061', 'CS', 'modalities_in_study'),
+    ('00080090', 'PN', 'referring_physician_name'),
+    ('00081030', 'LO', 'study_description'),
+    ('00100010', 'PN', 'patient_name'),
+    ('00100020', 'LO', 'patient_id'),
+    ('00100030', 'DA', 'patient_birth_date'),
+    ('00100040', 'CS', 'patient_sex'),
+    ('0020000D', 'UI', 'study_instance_uid'),
+    ('00200010', 'SH', 'study_id'),
+    ('00201206', 'IS', 'series_count'),
+    ('00201208', 'IS', 'instances_count'),
+)
+
+# QIDO-RS 검색 키 (키워드 -> 태그). 쿼리에는 키워드와 태그 번호 모두 사용 가능
+QIDO_STUDY_MATCH_KEYS = {
+    'PatientName': '00100010',
+    'PatientID': '00100020',
+    'ModalitiesInStudy': '00080061',
+    'StudyDate': '00080020',
+    'AccessionNumber': '00080050',
+    'StudyInstanceUID': '0020000D',
+}
+
+OHIF_STUDIES_DEFAULT_LIMIT = 100
+OHIF_STUDIES_MAX_LIMIT = 1000
+# count=true 요청 시 셀 최대 개수 (넘으면 X-Total-Count-Capped)
+OHIF_STUDIES_COUNT_CAP = 10000
+
+def qido_study_json(values):
+    """필드 값 dict를 QIDO-RS(DICOM JSON) Study 객체로 변환"""
+    result = {}
+    for tag, vr, field in QIDO_STUDY_ATTRIBUTES:
+        value = values.get(field)
+        if value in (None, ''):
+            result[tag] = {"vr": vr}
+        elif vr == 'PN':
+            result[tag] = {"vr": vr, "Value": [{"Alphabetic": value}]}
+        elif field == 'modalities_in_study':
+            result[tag] = {"vr": vr, "Value": [m for m in str(value).split('\\') if m]}
+        else:
+            result[tag] = {"vr": vr, "Value": [value]}
+    return result
+
+def catalog_study_to_ohif(study):
+    """CatalogStudy를 OHIF(QIDO-RS) Study 형식으로 변환"""
+    return qido_study_json({field: getattr(study, field) for _, _, field in QIDO_STUDY_ATTRIBUTES})
+
+def orthanc_study_to_ohif(study_data):
+    """Orthanc Study JSON(/tools/find Expand)을 OHIF(QIDO-RS) Study 형식으로 변환"""
+    main_tags = study_data.get('MainDicomTags', {})
+    patient_tags = study_data.get('PatientMainDicomTags', {})
+    return qido_study_json({
+        'study_date': main_tags.get('StudyDate', ''),
+        'study_time': main_tags.get('StudyTime', ''),
+        'accession_number': main_tags.get('AccessionNumber', ''),
+        'modalities_in_study': main_tags.get('ModalitiesInStudy', ''),
+        'referring_physician_name': main_tags.get('ReferringPhysicianName', ''),
+        'study_description': main_tags.get('StudyDescription', ''),
+        'patient_name': patient_tags.get('PatientName', ''),
+        'patient_id': patient_tags.get('PatientID', ''),
+        'patient_birth_date': patient_tags.get('PatientBirthDate', ''),
+        'patient_sex': patient_tags.get('PatientSex', ''),
+        'study_instance_uid': main_tags.get('StudyInstanceUID', ''),
+        'study_id': main_tags.get('StudyID', ''),
+        'series_count': len(study_data.get('Series', [])),
+    })
+
+def qido_study_filters(params):
+    """쿼리 파라미터에서 QIDO-RS 검색 조건 추출 ({키워드: 값})"""
+    filters = {}
+    for keyword, tag in QIDO_STUDY_MATCH_KEYS.items():
+        value = params.get(keyword) or params.get(tag)
+        if value:
+            filters[keyword] = value.strip()
+    # OHIF 일부 버전은 Modality 키를 사용
+    if 'ModalitiesInStudy' not in filters and params.get('Modality'):
+        filters['ModalitiesInStudy'] = params['Modality'].strip()
+    return filters
+
+def qido_paging(params):
+    """limit/offset 파라미터 (잘못된 값은 기본값, limit은 최대값으로 제한)"""
+    try:
+        limit = int(params.get('limit', OHIF_STUDIES_DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        limit = OHIF_STUDIES_DEFAULT_LIMIT
+    try:
+        offset = int(params.get('offset', 0))
+    except (TypeError, ValueError):
+        offset = 0
+    return max(1, min(limit, OHIF_STUDIES_MAX_LIMIT)), max(0, offset)
+
+def wildcard_q(field, value):
+    """DICOM 와일드카드('*', '?') 조건을 대소문자 무시 Q 조건으로 변환
+
+    'ABC*'처럼 와일드카드로 시작하지 않으면 첫 와일드카드 앞까지를 접두어(istartswith)로 찾아
+    인덱스 범위 조회가 되고, 남은 와일드카드는 그 범위 안에서만 패턴으로 확인합니다.
+    '*ABC*' 등 앞쪽 와일드카드는 의미를 바꾸지 않고 부분/끝 일치로 처리합니다 (인덱스 미사용).
+    """
+    if '*' not in value and '?' not in value:
+        return Q(**{f'{field}__iexact': value})
+    if not value.strip('*'):
+        return Q()
+    pattern = re.escape(value).replace('\\*', '.*').replace('\\?', '.')
+    prefix = re.split(r'[*?]', value, maxsplit=1)[0]
+    if prefix:
+        condition = Q(**{f'{field}__istartswith': prefix})
+        if value != f'{prefix}*':
+            condition &= Q(**{f'{field}__iregex': f'^{pattern}$'})
+        return condition
+    core = value.strip('*')
+    if '*' in core or '?' in core or value.startswith('?'):
+        return Q(**{f'{field}__iregex': f'^{pattern}$'})
+    if value.endswith('*'):
+        return Q(**{f'{field}__icontains': core})
+    return Q(**{f'{field}__iendswith': core})
+
+def date_range_q(field, value):
+    """DICOM 날짜 범위(YYYYMMDD, A-B, A-, -B) 조건"""
+    if '-' not in value:
+        return Q(**{field: value})
+    start, end = value.split('-', 1)
+    condition = Q()
+    if start:
+        condition &= Q(**{f'{field}__gte': start})
+    if end:
+        condition &= Q(**{f'{field}__lte': end})
+    return condition
+
+def catalog_studies_page(filters, limit, offset, with_count=False):
+    """로컬 카탈로그에서 Study 페이지 조회 (StudyDate/StudyTime 역순, 인덱스 사용)
+
+    전체 개수는 with_count일 때만 OHIF_STUDIES_COUNT_CAP까지 셉니다.
+    다음 페이지 여부는 limit + 1개를 읽어 판단하므로 COUNT 없이도 페이지를 넘길 수 있습니다.
+
+    Returns:
+        tuple: (QIDO Study 목록, 전체 개수 또는 None, 상한 도달 여부, 다음 페이지 여부)
+    """
+    queryset = CatalogStudy.objects.all()
+    if 'PatientName' in filters:
+        queryset = queryset.filter(wildcard_q('patient_name', filters['PatientName']))
+    if 'PatientID' in filters:
+        queryset = queryset.filter(wildcard_q('patient_id', filters['PatientID']))
+    if 'AccessionNumber' in filters:
+        queryset = queryset.filter(wildcard_q('accession_number', filters['AccessionNumber']))
+    if 'StudyInstanceUID' in filters:
+        queryset = queryset.filter(study_instance_uid__in=filters['StudyInstanceUID'].replace('\\', ',').split(','))
+    if 'ModalitiesInStudy' in filters:
+        # 대표 modality 컬럼 또는 Series 단위 modality 인덱스로 조회 (modalities_in_study 부분 문자열 검색 대신)
+        modalities = [m for m in re.split(r'[\\,]', filters['ModalitiesInStudy']) if m]
+        series = CatalogSeries.objects.filter(study=OuterRef('pk'), modality__in=modalities)
+        queryset = queryset.filter(Q(modality__in=modalities) | Exists(series))
+    if 'StudyDate' in filters:
+        queryset = queryset.filter(date_range_q('study_date', filters['StudyDate']))
+
+    rows = list(queryset.order_by('-study_date', '-study_time')[offset:offset + limit + 1])
+    has_more = len(rows) > limit
+    total, capped = None, False
+    if with_count:
+        total = queryset[:OHIF_STUDIES_COUNT_CAP + 1].count()
+        capped = total > OHIF_STUDIES_COUNT_CAP
+        total = min(total, OHIF_STUDIES_COUNT_CAP)
+    return [catalog_study_to_ohif(study) for study in rows[:limit]], total, capped, has_more
+
+def orthanc_find_studies_page(filters, limit, offset):
+    """카탈로그가 비어 있을 때 Orthanc /tools/find(Limit/Since)로 Study 페이지 조회
+
+    Orthanc 정렬 순서는 저장 순서이므로 StudyDate 정렬은 페이지 안에서만 적용됩니다.
+    """
+    query = {keyword: value.replace(',', '\\') if keyword == 'StudyInstanceUID' else value
+             for keyword, value in filters.items()}
+    results = OrthancAPI().find('Study', query, expand=True, limit=limit, since=offset)
+    if results is None:
+        raise Exception("Orthanc /tools/find request failed")
+    studies = [orthanc_study_to_ohif(study) for study in results]
+    studies.sort(key=lambda s: (s['00080020'].get('Value', [''])[0], s['00080030'].get('Value', [''])[0]),
+                 reverse=True)
+    return studies, None, False, len(results) >= limit
+
 @csrf_exempt
 def ohif_studies_list(request):
-    """OHIF용 Study 목록 조회 - HTTP API 사용"""
+    """OHIF용 Study 목록 조회 (QIDO-RS 호환)
+
+    Query params:
+        limit, offset: 페이지 (기본 100, 최대 1000)
+        PatientName, PatientID, AccessionNumber: 와일드카드(*, ?) 지원
+        ModalitiesInStudy (또는 Modality), StudyDate (YYYYMMDD 또는 범위 A-B)
+        StudyInstanceUID: 쉼표 구분 목록
+        count: true면 X-Total-Count 헤더 포함 (카탈로그 조회 시에만, 최대 OHIF_STUDIES_COUNT_CAP)
+    각 키는 태그 번호(예: 00100010)로도 지정할 수 있습니다.
+    이름/ID/Accession 검색은 'ABC*'처럼 와일드카드로 시작하지 않을 때 인덱스를 사용합니다.
+    다음 페이지가 있는지는 항상 X-Has-More 헤더로 알려줍니다.
+    """
     if request.method == 'OPTIONS':
         response = HttpResponse()
         return add_cors_headers(response)
     
     try:
-        # 🔥 HTTP API로 Study 목록 조회
-        auth = HTTPBasicAuth(ORTHANC_USER, ORTHANC_PASSWORD)
-        response = requests.get(f"{ORTHANC_HTTP_BASE}/studies", auth=auth, timeout=30)
-        
-        if response.status_code != 200:
-            raise Exception(f"Studies request failed: {response.status_code}")
-        
-        study_ids = response.json()
-        studies = []
-        
-        logger.info(f"📋 총 {len(study_ids)}개 Study 발견")
+        filters = qido_study_filters(request.GET)
+        limit, offset = qido_paging(request.GET)
         
-        # 각 Study의 상세 정보 조회 (HTTP API 사용)
-        for study_id in study_ids[:20]:  # 최대 20개로 제한
-            try:
-                study_response = requests.get(f"{ORTHANC_HTTP_BASE}/studies/{study_id}", 
-                                            auth=auth, timeout=10)
-                if study_response.status_code == 200:
-                    study_data = study_response.json()
-                    main_tags = study_data.get('MainDicomTags', {})
-                    patient_tags = study_data.get('PatientMainDicomTags', {})
-                    
-                    # OHIF 형식으로 변환
-                    ohif_study = {
-                        "00080020": {"Value": [main_tags.get('StudyDate', '')]},
-                        "00080030": {"Value": [main_tags.get('StudyTime', '')]},
-                        "00080050": {"Value": [main_tags.get('AccessionNumber', '')]},
-                        "00080061": {"Value": [main_tags.get('ModalitiesInStudy', '')]},
-                        "00080090": {"Value": [main_tags.get('ReferringPhysicianName', '')]},
-                        "00081030": {"Value": [main_tags.get('StudyDescription', '')]},
-                        "00100010": {"Value": [patient_tags.get('PatientName', '')]},
-                        "00100020": {"Value": [patient_tags.get('PatientID', '')]},
-                        "00100030": {"Value": [patient_tags.get('PatientBirthDate', '')]},
-                        "00100040": {"Value": [patient_tags.get('PatientSex', '')]},
-                        "0020000D": {"Value": [main_tags.get('StudyInstanceUID', '')]},
-                        "00200010": {"Value": [main_tags.get('StudyID', '')]},
-                        "00201206": {"Value": [len(study_data.get('Series', []))]},
-                        "00201208": {"Value": [study_data.get('Instances', {}).get('length', 0)]}
-                    }
-                    studies.append(ohif_study)
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ Study {study_id} 정보 조회 실패: {e}")
-                continue
+        # 로컬 카탈로그가 채워져 있으면 인덱스 조회, 아니면 Orthanc 서버 측 검색
+        if CatalogStudy.objects.exists():
+            with_count = request.GET.get('count', '').lower() in ('1', 'true', 'yes')
+            studies, total, capped, has_more = catalog_studies_page(filters, limit, offset, with_count)
+            source = 'catalog'
+        else:
+            studies, total, capped, has_more = orthanc_find_studies_page(filters, limit, offset)
+            source = 'orthanc'
         
-        logger.info(f"✅ {len(studies)}개 Study 정보 조회 완료")
+        logger.info(f"✅ {source}에서 {len(studies)}개 Study 조회 (offset={offset}, limit={limit})")
         django_response = JsonResponse(studies, safe=False)
+        django_response['X-Has-More'] = 'true' if has_more else 'false'
+        if total is not None:
+            django_response['X-Total-Count'] = str(total)
+            if capped:
+                django_response['X-Total-Count-Capped'] = 'true'
         return add_cors_headers(django_response)
         
     except Exception as e:
@@ -1,10 +1,16 @@
 # backend/medical_integration/ohif_urls.py
 
+from django.conf import settings
 from django.urls import path, re_path
-from . import ohif_proxy_views
+from . import ohif_proxy_views, ohif_async_proxy_views, pyramid_views
 
 app_name = 'ohif'
 
+# ASGI(uvicorn 등)로 배포할 때는 비동기 프록시 사용: upstream 대기 중 워커를 점유하지 않음
+PROXY_ASYNC = getattr(settings, 'ASYNC_HTTP_CONFIG', {}).get('PROXY_ASYNC')
+proxy_views = ohif_async_proxy_views if PROXY_ASYNC else ohif_proxy_views
+pyramid_progressive = pyramid_views.pyramid_progressive_async if PROXY_ASYNC else pyramid_views.pyramid_progressive
+
 urlpatterns = [
     # OHIF 설정
     path('config/', ohif_proxy_views.ohif_config, name='ohif_config'),
@@ -13,15 +19,24 @@ urlpatterns = [
     path('studies/', ohif_proxy_views.ohif_studies_list, name='ohif_studies'),
     
     # DICOMweb API 프록시 (QIDO-RS/WADO-RS)
-    re_path(r'^dicom-web/(?P<path>.*)$', ohif_proxy_views.dicom_web_proxy, name='dicomweb_proxy'),
+    re_path(r'^dicom-web/(?P<path>.*)$', proxy_views.dicom_web_proxy, name='dicomweb_proxy'),
     
     # WADO-URI 프록시
-    path('wado/', ohif_proxy_views.wado_proxy, name='wado_proxy'),
+    path('wado/', proxy_views.wado_proxy, name='wado_proxy'),
+    
+    # 큰 CR/DX 영상 다해상도 pyramid (작은 레벨 먼저 표시 후 점진적으로 선명하게)
+    path('pyramid/stats/', pyramid_views.pyramid_stats, name='pyramid_stats'),
+    path('pyramid/<str:instance_id>/', pyramid_views.pyramid_manifest, name='pyramid_manifest'),
+    path('pyramid/<str:instance_id>/progressive/', pyramid_progressive, name='pyramid_progressive'),
+    path('pyramid/<str:instance_id>/levels/<int:level>/', pyramid_views.pyramid_level, name='pyramid_level'),
+    
+    # 프록시 디스크 캐시 통계
+    path('cache/stats/', ohif_proxy_views.proxy_cache_stats, name='proxy_cache_stats'),
     
     # 일반 Orthanc API 프록시
-    re_path(r'^orthanc/(?P<path>.*)$', ohif_proxy_views.orthanc_proxy, name='orthanc_proxy'),
+    re_path(r'^orthanc/(?P<path>.*)$', proxy_views.orthanc_proxy, name='orthanc_proxy'),
     
     # 특정 OHIF 요구사항
-    path('studies/<str:study_uid>/metadata/', ohif_proxy_views.orthanc_proxy, {'path': 'studies'}, name='study_metadata'),
-    path('studies/<str:study_uid>/series/', ohif_proxy_views.orthanc_proxy, {'path': 'studies'}, name='study_series'),
+    path('studies/<str:study_uid>/metadata/', proxy_views.orthanc_proxy, {'path': 'studies'}, name='study_metadata'),
+    path('studies/<str:study_uid>/series/', proxy_views.orthanc_proxy, {'path': 'studies'}, name='study_series'),
 ]
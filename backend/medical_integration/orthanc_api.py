@@ -1,14 +1,90 @@
 # backend/medical_integration/orthanc_api.py (업데이트)
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 from django.conf import settings
+from .signals import study_deleted, patient_deleted
+from .orthanc_cache import orthanc_metadata_cache
 import logging
+import json
 import tempfile
+import threading
 import os
 
 logger = logging.getLogger('medical_integration')
 
+# 작업 종류별 타임아웃 예산 (connect, read) - 초 단위
+ORTHANC_TIMEOUTS = {
+    'default': (5, 30),
+    'system': (5, 10),
+    'lookup': (5, 10),
+    'preview': (5, 30),
+    'download': (5, 60),
+    'export': (5, 600),
+    'upload': (5, 120),
+    'delete': (5, 30),
+}
+
+# 재시도는 멱등 요청에만 적용 (POST 업로드는 재시도하지 않음)
+_RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'DELETE'])
+_RETRY_STATUS = (502, 503, 504)
+
+# get_study_with_series_and_instances 조회 깊이
+STUDY_TREE_DEPTHS = {
+    'study': 0,
+    'series': 1,
+    'instances': 2,
+}
+
+# 스트리밍 다운로드 청크 크기 / 메모리에 유지할 최대 크기 (초과분은 디스크로)
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_orthanc_session():
+    """커넥션 풀/재시도가 설정된 requests 세션 생성"""
+    pacs_config = getattr(settings, 'PACS_CONFIG', {})
+
+    retry = Retry(
+        total=pacs_config.get('MAX_RETRIES', 3),
+        backoff_factor=pacs_config.get('BACKOFF_FACTOR', 0.3),
+        status_forcelist=_RETRY_STATUS,
+        allowed_methods=_RETRY_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pacs_config.get('POOL_CONNECTIONS', 4),
+        pool_maxsize=pacs_config.get('POOL_MAXSIZE', 20),
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_orthanc_session():
+    """프로세스 공용 Orthanc HTTP 세션 (keep-alive 커넥션 풀)
+
+    OrthancAPI 인스턴스는 요청마다 새로 만들어지지만 TCP 연결은
+    이 세션의 풀을 통해 재사용됩니다. ai_analysis 등 다른 앱도
+    Orthanc 호출 시 이 세션을 사용합니다.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_orthanc_session()
+                logger.info("Orthanc 공용 HTTP 세션 생성")
+    return _session
+
+
 class OrthancAPI:
     """Orthanc API 통합 클래스 (DICOM 업로드 기능 추가)"""
     
@@ -17,6 +93,7 @@ class OrthancAPI:
         self.username = settings.EXTERNAL_SERVICES['orthanc']['username']
         self.password = settings.EXTERNAL_SERVICES['orthanc']['password']
         self.auth = HTTPBasicAuth(self.username, self.password)
+        self.session = get_orthanc_session()
     
     def get(self, endpoint):
         """일반 GET 요청"""
@@ -24,10 +101,10 @@ class OrthancAPI:
             if endpoint.startswith('/'):
                 endpoint = endpoint[1:]
                 
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/{endpoint}",
                 auth=self.auth,
-                timeout=30
+                timeout=ORTHANC_TIMEOUTS['default']
             )
             response.raise_for_status()
             return response.json()
@@ -48,14 +125,17 @@ class OrthancAPI:
             if content_type:
                 headers['Content-Type'] = content_type
             
-            response = requests.post(
+            # 파일/Content-Type이 없으면 JSON 본문으로 전송 (data와 json을 동시에 넘기면 json이 무시됨)
+            json_body = data if not files and not content_type else None
+            
+            response = self.session.post(
                 f"{self.base_url}/{endpoint}",
-                data=data,
+                data=data if json_body is None else None,
                 files=files,
-                json=data if not files and not content_type else None,
+                json=json_body,
                 auth=self.auth,
                 headers=headers,
-                timeout=60  # DICOM 업로드는 시간이 오래 걸릴 수 있음
+                timeout=ORTHANC_TIMEOUTS['upload']  # DICOM 업로드는 시간이 오래 걸릴 수 있음
             )
             response.raise_for_status()
             
@@ -74,25 +154,47 @@ class OrthancAPI:
             return None
     
     def upload_dicom(self, dicom_data):
-        """DICOM 파일을 Orthanc에 업로드"""
+        """DICOM 파일을 Orthanc에 업로드
+
+        bytes 외에 파일 객체/Django UploadedFile/청크 iterator를 넘기면
+        메모리에 모으지 않고 upload_dicom_stream으로 그대로 전송합니다.
+        """
+        if isinstance(dicom_data, (bytes, bytearray)):
+            return self._post_instance(dicom_data, len(dicom_data))
+        if not isinstance(dicom_data, str) and (hasattr(dicom_data, 'read') or hasattr(dicom_data, '__iter__')):
+            return self.upload_dicom_stream(dicom_data)
+        logger.error("올바르지 않은 DICOM 데이터 형식")
+        return None
+
+    def upload_dicom_stream(self, stream, length=None):
+        """파일 객체 또는 bytes 청크 iterator를 버퍼링 없이 Orthanc에 업로드
+
+        - 파일 객체/UploadedFile: Content-Length와 함께 블록 단위로 읽어 전송
+        - 청크 iterator (예: UploadedFile.chunks()): chunked 전송
+        """
+        if hasattr(stream, 'read'):
+            if hasattr(stream, 'seek'):
+                stream.seek(0)
+            if length is None:
+                length = getattr(stream, 'size', None)
+        return self._post_instance(stream, length)
+
+    def _post_instance(self, body, length=None):
+        """/instances POST 공통 처리"""
         try:
             logger.info("Orthanc에 DICOM 업로드 시작")
-            
-            # DICOM 데이터가 바이트가 아닌 경우 변환
-            if not isinstance(dicom_data, bytes):
-                if hasattr(dicom_data, 'read'):
-                    dicom_data = dicom_data.read()
-                else:
-                    logger.error("올바르지 않은 DICOM 데이터 형식")
-                    return None
-            
+
+            headers = {'Content-Type': 'application/dicom'}
+            if length is not None:
+                headers['Content-Length'] = str(length)
+
             # Orthanc instances API로 업로드
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/instances",
-                data=dicom_data,
+                data=body,
                 auth=self.auth,
-                headers={'Content-Type': 'application/dicom'},
-                timeout=120
+                headers=headers,
+                timeout=ORTHANC_TIMEOUTS['upload']
             )
             
             logger.info(f"Orthanc 업로드 응답 상태: {response.status_code}")
@@ -110,11 +212,10 @@ class OrthancAPI:
             return None
     
     def upload_dicom_file(self, file_path):
-        """파일 경로로 DICOM 업로드"""
+        """파일 경로로 DICOM 업로드 (파일 전체를 읽지 않고 스트리밍)"""
         try:
             with open(file_path, 'rb') as f:
-                dicom_data = f.read()
-            return self.upload_dicom(dicom_data)
+                return self.upload_dicom_stream(f, os.path.getsize(file_path))
         except Exception as e:
             logger.error(f"DICOM 파일 업로드 실패: {e}")
             return None
@@ -132,36 +233,40 @@ class OrthancAPI:
         return self.get(f"patients/{patient_id}/studies")
     
     def get_study(self, study_id):
-        """Study ID로 Study 정보 조회"""
-        return self.get(f"studies/{study_id}")
+        """Study ID로 Study 정보 조회 (메타데이터 캐시 사용)"""
+        return orthanc_metadata_cache.get_or_fetch(
+            'study', study_id, lambda: self.get(f"studies/{study_id}"))
     
     def get_study_series(self, study_id):
         """Study ID로 모든 Series 조회"""
         return self.get(f"studies/{study_id}/series")
     
     def get_series(self, series_id):
-        """Series ID로 Series 정보 조회"""
-        return self.get(f"series/{series_id}")
+        """Series ID로 Series 정보 조회 (메타데이터 캐시 사용)"""
+        return orthanc_metadata_cache.get_or_fetch(
+            'series', series_id, lambda: self.get(f"series/{series_id}"))
     
     def get_series_instances(self, series_id):
         """Series ID로 모든 Instance 조회"""
         return self.get(f"series/{series_id}/instances")
     
     def get_instance(self, instance_id):
-        """Instance ID로 Instance 정보 조회"""
-        return self.get(f"instances/{instance_id}")
+        """Instance ID로 Instance 정보 조회 (메타데이터 캐시 사용)"""
+        return orthanc_metadata_cache.get_or_fetch(
+            'instance', instance_id, lambda: self.get(f"instances/{instance_id}"))
     
     def get_instance_tags(self, instance_id):
-        """Instance ID로 DICOM 태그 조회"""
-        return self.get(f"instances/{instance_id}/tags")
+        """Instance ID로 DICOM 태그 조회 (메타데이터 캐시 사용)"""
+        return orthanc_metadata_cache.get_or_fetch(
+            'instance_tags', instance_id, lambda: self.get(f"instances/{instance_id}/tags"))
     
     def get_instance_preview(self, instance_id):
         """Instance ID로 미리보기 이미지 가져오기"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/instances/{instance_id}/preview",
                 auth=self.auth,
-                timeout=30
+                timeout=ORTHANC_TIMEOUTS['preview']
             )
             response.raise_for_status()
             return response.content
@@ -173,42 +278,135 @@ class OrthancAPI:
             return None
     
     def get_instance_file(self, instance_id):
-        """Instance ID로 DICOM 파일 다운로드"""
+        """Instance ID로 DICOM 파일 다운로드 (bytes)
+
+        큰 multi-frame 인스턴스는 iter_instance_file 또는
+        download_instance_file을 사용하세요.
+        """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/instances/{instance_id}/file",
                 auth=self.auth,
-                timeout=60
+                timeout=ORTHANC_TIMEOUTS['download']
             )
             response.raise_for_status()
             return response.content
         except Exception as e:
             logger.error(f"DICOM 파일 다운로드 실패 (instance_id: {instance_id}): {e}")
             return None
-    
-    def search_patients_by_name(self, patient_name):
-        """환자 이름으로 검색"""
+
+    def open_stream(self, method, endpoint, timeout_key='download', **kwargs):
+        """본문을 읽지 않은 상태의 스트리밍 응답 열기
+
+        상태 코드를 먼저 확인할 수 있도록 응답 객체를 그대로 반환하며,
+        HTTP 오류/연결 실패 시 requests 예외를 던집니다.
+        """
+        response = self.session.request(
+            method,
+            f"{self.base_url}/{endpoint.lstrip('/')}",
+            auth=self.auth,
+            timeout=ORTHANC_TIMEOUTS[timeout_key],
+            stream=True,
+            **kwargs
+        )
+        if response.status_code >= 400:
+            response.close()
+            response.raise_for_status()
+        return response
+
+    @staticmethod
+    def iter_response(response, chunk_size=DOWNLOAD_CHUNK_SIZE):
+        """open_stream 응답 본문을 chunk_size 단위로 내보내고 끝나면 연결 반환"""
         try:
-            all_patients = self.get_patients()
-            if not all_patients:
-                return []
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            response.close()
+
+    def iter_instance_file(self, instance_id, chunk_size=DOWNLOAD_CHUNK_SIZE):
+        """DICOM 파일을 chunk_size 단위로 내려받는 iterator
+
+        StreamingHttpResponse 등에 그대로 넘길 수 있으며, 연결 실패 시
+        requests 예외를 그대로 던집니다.
+        """
+        response = self.open_stream('GET', f"instances/{instance_id}/file")
+        yield from self.iter_response(response, chunk_size)
+
+    def open_study_archive(self, study_ids, media=False):
+        """Study ZIP(또는 DICOMDIR 포함 media ZIP) 스트림 열기
+
+        study_ids가 하나면 /studies/{id}/archive|media, 여러 개면
+        /tools/create-archive|create-media로 Orthanc가 만든 ZIP 하나를 받습니다.
+        """
+        if isinstance(study_ids, str):
+            endpoint = f"studies/{study_ids}/{'media' if media else 'archive'}"
+            return self.open_stream('GET', endpoint, timeout_key='export')
+
+        endpoint = 'tools/create-media' if media else 'tools/create-archive'
+        return self.open_stream('POST', endpoint, timeout_key='export',
+                                json={'Resources': list(study_ids), 'Synchronous': True})
+
+    def download_instance_file(self, instance_id, max_memory=SPOOL_MAX_MEMORY):
+        """DICOM 파일을 SpooledTemporaryFile로 다운로드 (실패 시 None)
+
+        max_memory를 넘는 파일은 디스크로 넘어가므로 인스턴스 크기와 관계없이
+        메모리 사용량이 일정합니다. 반환된 파일은 처음 위치로 되감겨 있으며
+        사용 후 close() 해야 합니다.
+        """
+        spooled = tempfile.SpooledTemporaryFile(max_size=max_memory, suffix='.dcm')
+        try:
+            for chunk in self.iter_instance_file(instance_id):
+                spooled.write(chunk)
+            spooled.seek(0)
+            return spooled
+        except Exception as e:
+            spooled.close()
+            logger.error(f"DICOM 파일 다운로드 실패 (instance_id: {instance_id}): {e}")
+            return None
+
+    def search_patients_by_name(self, patient_name, limit=None, since=None, use_db=False):
+        """환자 이름으로 검색
+
+        Orthanc /tools/find 와일드카드 조회로 서버에서 필터링합니다.
+        use_db=True이거나 REST 조회가 실패하면 orthanc_models DB를 직접 조회합니다.
+
+        Args:
+            patient_name: 검색어 (REST/DB 모두 대소문자 무시 부분 일치)
+            limit, since: 페이지네이션 (Orthanc Limit/Since)
+            use_db: Orthanc DB 직접 조회 사용 여부
+        """
+        try:
+            matched = None
+            if not use_db:
+                matched = self.find('Patient', {'PatientName': f"*{patient_name}*"}, limit=limit, since=since)
+                if matched is None:
+                    logger.warning(f"/tools/find 환자 검색 실패, DB 조회로 대체 (name: {patient_name})")
             
-            matching_patients = []
-            for patient_id in all_patients:
-                patient_info = self.get_patient(patient_id)
-                if patient_info and 'MainDicomTags' in patient_info:
-                    patient_name_in_dicom = patient_info['MainDicomTags'].get('PatientName', '')
-                    if patient_name.lower() in patient_name_in_dicom.lower():
-                        matching_patients.append({
-                            'patient_id': patient_id,
-                            'patient_info': patient_info
-                        })
+            if matched is None:
+                matched = self._search_patients_by_name_db(patient_name, limit, since)
             
-            return matching_patients
+            return [
+                {
+                    'patient_id': patient_info.get('ID'),
+                    'patient_info': patient_info
+                }
+                for patient_info in matched
+            ]
         except Exception as e:
             logger.error(f"환자 이름 검색 실패 (name: {patient_name}): {e}")
             return []
     
+    def _search_patients_by_name_db(self, patient_name, limit=None, since=None):
+        """orthanc_models 테이블 직접 조회 (Resources/DicomIdentifiers/MainDicomTags)"""
+        from orthanc_models.models import Resources
+        
+        return Resources.search_patients_by_name(
+            patient_name,
+            limit=limit or 100,
+            offset=since or 0
+        )
+    
     def search_studies_by_patient_id(self, patient_id):
         """환자 ID로 Study 검색 (상세 정보 포함)"""
         try:
@@ -216,12 +414,20 @@ class OrthancAPI:
             if not studies:
                 return []
             
+            # /patients/{id}/studies는 확장 JSON을 반환하므로 추가 조회가 필요 없음.
+            # ID 문자열만 온 경우에는 동시에 조회
+            study_ids = [study for study in studies if isinstance(study, str)]
+            if study_ids:
+                from .async_api import AsyncOrthancAPI, run_batch
+                fetched = run_batch(AsyncOrthancAPI, lambda api, study_id: api.get_study(study_id), study_ids)
+                fetched_by_id = dict(zip(study_ids, fetched))
+                studies = [fetched_by_id.get(study) if isinstance(study, str) else study for study in studies]
+            
             study_details = []
-            for study_id in studies:
-                study_info = self.get_study(study_id)
+            for study_info in studies:
                 if study_info:
                     study_details.append({
-                        'study_id': study_id,
+                        'study_id': study_info.get('ID'),
                         'study_instance_uid': study_info.get('MainDicomTags', {}).get('StudyInstanceUID'),
                         'study_date': study_info.get('MainDicomTags', {}).get('StudyDate'),
                         'study_time': study_info.get('MainDicomTags', {}).get('StudyTime'),
@@ -239,33 +445,92 @@ class OrthancAPI:
             logger.error(f"환자 Study 검색 실패 (patient_id: {patient_id}): {e}")
             return []
     
-    def get_study_with_series_and_instances(self, study_id):
-        """Study의 모든 Series와 Instance 정보 조회"""
+    def find(self, level, query, expand=True, limit=None, since=None):
+        """/tools/find 조회 (Orthanc 서버 측 검색)
+
+        Args:
+            level: 'Patient', 'Study', 'Series', 'Instance'
+            query: DICOM 태그 조건 (와일드카드 '*' 지원)
+            expand: True면 ID 대신 리소스 JSON 전체를 반환
+            limit, since: 페이지네이션
+        """
+        body = {
+            'Level': level,
+            'Query': query,
+            'Expand': expand,
+        }
+        if limit is not None:
+            body['Limit'] = int(limit)
+        if since is not None:
+            body['Since'] = int(since)
+        return self.post("tools/find", data=body)
+    
+    def _get_study_instances_bulk(self, study_info):
+        """Study의 모든 Instance를 한 번에 조회 (/tools/find Expand, 실패 시 확장 목록)"""
+        study_uid = study_info.get('MainDicomTags', {}).get('StudyInstanceUID')
+        instances = None
+        if study_uid:
+            instances = self.find('Instance', {'StudyInstanceUID': study_uid})
+        if not isinstance(instances, list):
+            instances = self.get(f"studies/{study_info['ID']}/instances")
+        return instances or []
+    
+    def _get_study_instances_by_series(self, study_info):
+        """Study의 Instance를 한 번에 조회해 ParentSeries별로 분류 ({series_id: [항목]})"""
+        instances_by_series = {}
+        for instance_info in self._get_study_instances_bulk(study_info):
+            instances_by_series.setdefault(instance_info.get('ParentSeries'), []).append({
+                'instance_id': instance_info.get('ID'),
+                'instance_info': instance_info
+            })
+        return instances_by_series
+    
+    @staticmethod
+    def _parse_study_tree_depth(depth):
+        """depth 값('study'/'series'/'instances' 또는 0~2)을 정수로 변환"""
+        if depth is None:
+            return STUDY_TREE_DEPTHS['instances']
+        if isinstance(depth, str) and not depth.isdigit():
+            return STUDY_TREE_DEPTHS.get(depth.lower(), STUDY_TREE_DEPTHS['instances'])
+        return max(0, min(int(depth), STUDY_TREE_DEPTHS['instances']))
+    
+    def get_study_with_series_and_instances(self, study_id, depth=None):
+        """Study의 모든 Series와 Instance 정보 조회
+
+        Series/Instance를 개별 GET 하지 않고 확장 목록과 /tools/find로
+        한꺼번에 가져오므로 Instance 수와 관계없이 최대 3번의 요청으로 끝납니다.
+
+        Args:
+            study_id: Orthanc Study ID
+            depth: 'study'(0), 'series'(1), 'instances'(2, 기본값)
+        """
         try:
+            depth = self._parse_study_tree_depth(depth)
             study_info = self.get_study(study_id)
             if not study_info:
                 return None
             
-            # Series 정보 추가
+            if depth < STUDY_TREE_DEPTHS['series']:
+                return study_info
+            
+            # Series 정보 (확장 목록 1회 호출)
+            series_infos = self.get_study_series(study_id) or []
+            
+            # Instance 정보 (1회 호출 후 Series별로 분류)
+            instances_by_series = {}
+            if depth >= STUDY_TREE_DEPTHS['instances']:
+                instances_by_series = self._get_study_instances_by_series(study_info)
+            
             series_list = []
-            for series_id in study_info.get('Series', []):
-                series_info = self.get_series(series_id)
-                if series_info:
-                    # Instance 정보 추가
-                    instances = []
-                    for instance_id in series_info.get('Instances', []):
-                        instance_info = self.get_instance(instance_id)
-                        if instance_info:
-                            instances.append({
-                                'instance_id': instance_id,
-                                'instance_info': instance_info
-                            })
-                    
-                    series_list.append({
-                        'series_id': series_id,
-                        'series_info': series_info,
-                        'instances': instances
-                    })
+            for series_info in series_infos:
+                series_id = series_info.get('ID')
+                series_entry = {
+                    'series_id': series_id,
+                    'series_info': series_info,
+                }
+                if depth >= STUDY_TREE_DEPTHS['instances']:
+                    series_entry['instances'] = instances_by_series.get(series_id, [])
+                series_list.append(series_entry)
             
             study_info['series_details'] = series_list
             return study_info
@@ -274,16 +539,62 @@ class OrthancAPI:
             logger.error(f"Study 상세 정보 조회 실패 (study_id: {study_id}): {e}")
             return None
     
+    def iter_study_tree_json(self, study_info, depth=None):
+        """Study 트리를 JSON 조각 단위로 생성 (StreamingHttpResponse용)
+
+        비스트리밍 경로와 같이 Series/Instance를 한 번씩 일괄 조회한 뒤(최대 3번의 요청)
+        Series 단위로 직렬화해 내보내고, 내보낸 Series의 Instance 목록은 바로 해제합니다.
+
+        Args:
+            study_info: get_study()로 미리 조회한 Study JSON
+            depth: get_study_with_series_and_instances와 동일
+        """
+        depth = self._parse_study_tree_depth(depth)
+        study_id = study_info['ID']
+        
+        head = json.dumps({'success': True, 'study_id': study_id}, ensure_ascii=False)[:-1]
+        study_json = json.dumps(study_info, ensure_ascii=False)
+        yield f'{head}, "study_details": {study_json[:-1]}'
+        
+        if depth >= STUDY_TREE_DEPTHS['series']:
+            yield ', "series_details": ['
+            series_infos = self.get_study_series(study_id) or []
+            instances_by_series = {}
+            if depth >= STUDY_TREE_DEPTHS['instances']:
+                instances_by_series = self._get_study_instances_by_series(study_info)
+            for index, series_info in enumerate(series_infos):
+                series_id = series_info.get('ID')
+                series_entry = {
+                    'series_id': series_id,
+                    'series_info': series_info,
+                }
+                if depth >= STUDY_TREE_DEPTHS['instances']:
+                    series_entry['instances'] = instances_by_series.pop(series_id, [])
+                separator = ', ' if index else ''
+                yield separator + json.dumps(series_entry, ensure_ascii=False)
+            yield ']'
+        
+        yield '}}'
+    
     def delete_patient(self, patient_id):
         """환자 데이터 삭제"""
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.base_url}/patients/{patient_id}",
                 auth=self.auth,
-                timeout=30
+                timeout=ORTHANC_TIMEOUTS['delete']
             )
             response.raise_for_status()
             logger.info(f"환자 삭제 성공: {patient_id}")
+            
+            from .models import CatalogPatient, CatalogStudy
+            study_ids = list(CatalogStudy.objects.filter(
+                catalog_patient__orthanc_id=patient_id
+            ).values_list('orthanc_id', flat=True))
+            CatalogPatient.objects.filter(orthanc_id=patient_id).delete()
+            for study_id in study_ids:
+                study_deleted.send(sender=self.__class__, orthanc_study_id=study_id)
+            patient_deleted.send(sender=self.__class__, orthanc_patient_id=patient_id)
             return True
         except Exception as e:
             logger.error(f"환자 삭제 실패 (patient_id: {patient_id}): {e}")
@@ -292,13 +603,17 @@ class OrthancAPI:
     def delete_study(self, study_id):
         """Study 데이터 삭제"""
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.base_url}/studies/{study_id}",
                 auth=self.auth,
-                timeout=30
+                timeout=ORTHANC_TIMEOUTS['delete']
             )
             response.raise_for_status()
             logger.info(f"Study 삭제 성공: {study_id}")
+            
+            from .models import CatalogStudy
+            CatalogStudy.objects.filter(orthanc_id=study_id).delete()
+            study_deleted.send(sender=self.__class__, orthanc_study_id=study_id)
             return True
         except Exception as e:
             logger.error(f"Study 삭제 실패 (study_id: {study_id}): {e}")
@@ -307,10 +622,10 @@ class OrthancAPI:
     def test_connection(self):
         """Orthanc 서버 연결 테스트"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/system",
                 auth=self.auth,
-                timeout=10
+                timeout=ORTHANC_TIMEOUTS['system']
             )
             response.raise_for_status()
             system_info = response.json()
@@ -319,83 +634,28 @@ class OrthancAPI:
             return True
         except Exception as e:
             logger.error(f"Orthanc 연결 실패: {e}")
-            return False\
-    
-    def upload_dicom(self, dicom_data):
-     try:
-        import logging
-        logger = logging.getLogger('medical_integration')
-        
-        logger.info("Orthanc에 DICOM 업로드 시작")
-        
-        # dicom_data가 bytes인지 확인
-        if not isinstance(dicom_data, bytes):
-            logger.error(f"DICOM 데이터가 bytes 타입이 아닙니다: {type(dicom_data)}")
-            return None
-        
-        response = requests.post(
-            f"{self.base_url}/instances",
-            data=dicom_data,  # JSON이 아닌 raw binary data
-            auth=self.auth,
-            headers={'Content-Type': 'application/dicom'},  # DICOM 전용 content-type
-            timeout=60
-        )
-        
-        logger.info(f"Orthanc 업로드 응답 상태: {response.status_code}")
-        
-        if response.status_code == 200:
-            result = response.json()
-            logger.info(f"DICOM 업로드 성공: {result}")
-            return result
-        else:
-            logger.error(f"DICOM 업로드 실패: HTTP {response.status_code}")
-            logger.error(f"응답 내용: {response.text}")
-            return None
-            
-     except Exception as e:
-        logger.error(f"DICOM 업로드 중 오류: {e}")
-        return None
+            return False
 
     def process_dicom_with_mapping(self, dicom_bytes, patient_uuid):
         """DICOM 업로드 후 자동 매핑 처리 (수정된 버전)"""
         try:
-            import tempfile
-            import pydicom
             from .models import PatientMapping
-            import logging
+            from .dicom_header import extract_patient_demographics
             
-            logger = logging.getLogger('medical_integration')
             logger.info("DICOM 업로드 후 자동 매핑 처리 시작")
             
-            # 🔥 수정: 임시 파일을 통해 pydicom으로 읽기
-            with tempfile.NamedTemporaryFile(suffix='.dcm', delete=False) as temp_file:
-                temp_file.write(dicom_bytes)
-                temp_file_path = temp_file.name
-            
-            try:
-                # 임시 파일에서 DICOM 읽기
-                dicom_ds = pydicom.dcmread(temp_file_path)
-                
-                # DICOM에서 환자 정보 추출
+            # DICOM 헤더만 메모리에서 파싱해 환자 정보 추출
+            demographics = extract_patient_demographics(dicom_bytes)
+            patient_info = None
+            if demographics:
                 patient_info = {
-                    'patient_name': str(dicom_ds.get('PatientName', '')),
-                    'patient_id': str(dicom_ds.get('PatientID', '')),
-                    'patient_birth_date': str(dicom_ds.get('PatientBirthDate', '')),
-                    'patient_sex': str(dicom_ds.get('PatientSex', '')),
-                    'study_instance_uid': str(dicom_ds.get('StudyInstanceUID', ''))
+                    'patient_name': demographics['patient_name'],
+                    'patient_id': demographics['patient_identifier'],
+                    'patient_birth_date': demographics['patient_birth_date'],
+                    'patient_sex': demographics['patient_sex'],
+                    'study_instance_uid': demographics['study_instance_uid']
                 }
-                
                 logger.info(f"DICOM 환자 정보 추출 성공: {patient_info}")
-                
-            except Exception as e:
-                logger.error(f"DICOM 환자 정보 추출 실패: {e}")
-                patient_info = None
-            finally:
-                # 임시 파일 삭제
-                try:
-                    os.unlink(temp_file_path)
-                except:
-                    pass
             
             if not patient_info:
                 logger.error("DICOM 환자 정보 추출 실패")
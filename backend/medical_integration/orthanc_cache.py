@@ -0,0 +1,203 @@
+# backend/medical_integration/orthanc_cache.py
+
+import logging
+import threading
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.core.cache.backends.locmem import LocMemCache
+from django.dispatch import receiver
+from .signals import study_deleted
+
+logger = logging.getLogger('medical_integration')
+
+CACHE_KEY_PREFIX = 'orthanc'
+
+# 캐시 대상 리소스 종류 (OrthancAPI.get_study/get_series/get_instance/get_instance_tags)
+CACHED_RESOURCES = ('study', 'series', 'instance', 'instance_tags')
+
+# Instance는 저장 후 내용이 바뀌지 않음 (수정 시 새 ID 생성)
+IMMUTABLE_RESOURCES = {'instance', 'instance_tags'}
+
+
+class OrthancMetadataCache:
+    """Orthanc 메타데이터 JSON 캐시 (Django cache 백엔드 사용)
+
+    - 크기 제한/LRU 제거는 캐시 백엔드가 담당 (기본 Redis 공용 캐시)
+    - Instance/태그와 안정화된 Study/Series는 기본 TTL, 나머지는 UNSTABLE_TTL 동안 유지
+    - 프로세스별 백엔드(LocMemCache)면 무효화가 다른 워커에 전달되지 않으므로
+      Study/Series는 PROCESS_LOCAL_TTL을 넘겨 유지하지 않음
+    - /changes 피드, Webhook, 삭제 Signal로 무효화
+    - 프로세스별 hit/miss 카운터 제공 (stats)
+    """
+
+    def __init__(self, alias='orthanc', unstable_ttl=10, process_local_ttl=30):
+        self.alias = alias
+        self.unstable_ttl = unstable_ttl
+        self.process_local_ttl = process_local_ttl
+        self._stats_lock = threading.Lock()
+        self._stats = {}
+        self.reset_stats()
+
+    @property
+    def cache(self):
+        try:
+            return caches[self.alias]
+        except InvalidCacheBackendError:
+            return caches['default']
+
+    @property
+    def process_local(self):
+        """다른 프로세스와 공유되지 않는 캐시 백엔드인지"""
+        return isinstance(self.cache, LocMemCache)
+
+    @staticmethod
+    def make_key(kind, resource_id):
+        return f"{CACHE_KEY_PREFIX}:{kind}:{resource_id}"
+
+    def _count(self, kind, field):
+        with self._stats_lock:
+            self._stats[kind][field] += 1
+
+    def get(self, kind, resource_id):
+        try:
+            data = self.cache.get(self.make_key(kind, resource_id))
+        except Exception as e:
+            logger.warning(f"Orthanc 캐시 조회 실패 ({kind}:{resource_id}): {e}")
+            data = None
+        self._count(kind, 'hits' if data is not None else 'misses')
+        return data
+
+    def set(self, kind, resource_id, data):
+        if data is None:
+            return
+        if kind in IMMUTABLE_RESOURCES:
+            timeout = None  # 백엔드 기본 TIMEOUT
+        elif isinstance(data, dict) and data.get('IsStable'):
+            timeout = self.process_local_ttl if self.process_local else None
+        else:
+            timeout = self.unstable_ttl
+        if timeout is not None and timeout <= 0:
+            return
+        try:
+            if timeout is None:
+                self.cache.set(self.make_key(kind, resource_id), data)
+            else:
+                self.cache.set(self.make_key(kind, resource_id), data, timeout)
+        except Exception as e:
+            logger.warning(f"Orthanc 캐시 저장 실패 ({kind}:{resource_id}): {e}")
+
+    def get_or_fetch(self, kind, resource_id, fetch):
+        """캐시에 없으면 fetch()로 조회 후 저장 (None은 저장하지 않음)"""
+        data = self.get(kind, resource_id)
+        if data is None:
+            data = fetch()
+            self.set(kind, resource_id, data)
+        return data
+
+    def _peek(self, key):
+        """무효화 연쇄용 조회 (통계 미반영, 백엔드 오류는 빈 dict)"""
+        try:
+            return self.cache.get(key) or {}
+        except Exception as e:
+            logger.warning(f"Orthanc 캐시 조회 실패 ({key}): {e}")
+            return {}
+
+    def _delete_many(self, keys):
+        if not keys:
+            return
+        try:
+            self.cache.delete_many(keys)
+        except Exception as e:
+            logger.warning(f"Orthanc 캐시 무효화 실패: {e}")
+
+    def invalidate_instance(self, instance_id):
+        self._delete_many([self.make_key('instance', instance_id),
+                           self.make_key('instance_tags', instance_id)])
+        self._count('instance', 'invalidations')
+
+    def invalidate_series(self, series_id, cascade=True):
+        """Series와 (캐시된 Series JSON에 나열된) 하위 Instance 무효화"""
+        key = self.make_key('series', series_id)
+        if cascade:
+            series_info = self._peek(key)
+            for instance_id in series_info.get('Instances', []):
+                self.invalidate_instance(instance_id)
+        self._delete_many([key])
+        self._count('series', 'invalidations')
+
+    def invalidate_study(self, study_id, cascade=True, include_instances=True):
+        """Study와 (캐시된 Study JSON에 나열된) 하위 Series/Instance 무효화
+
+        include_instances=False면 Series까지만 지웁니다 (Instance는 내용이 바뀌지 않음).
+        """
+        key = self.make_key('study', study_id)
+        if cascade:
+            study_info = self._peek(key)
+            for series_id in study_info.get('Series', []):
+                self.invalidate_series(series_id, cascade=include_instances)
+        self._delete_many([key])
+        self._count('study', 'invalidations')
+
+    def invalidate_change(self, change):
+        """/changes 항목 하나를 반영
+
+        새 하위 리소스가 추가되거나 안정화되면 해당 리소스만, 삭제되면 하위까지 지웁니다.
+        """
+        resource_type = change.get('ResourceType')
+        resource_id = change.get('ID')
+        cascade = change.get('ChangeType') == 'Deleted'
+        if not resource_id:
+            return
+        if resource_type == 'Study':
+            self.invalidate_study(resource_id, cascade=cascade)
+        elif resource_type == 'Series':
+            self.invalidate_series(resource_id, cascade=cascade)
+        elif resource_type == 'Instance':
+            self.invalidate_instance(resource_id)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats = {
+                kind: {'hits': 0, 'misses': 0, 'invalidations': 0}
+                for kind in CACHED_RESOURCES
+            }
+
+    def stats(self):
+        """종류별 hit/miss/무효화 횟수와 hit ratio"""
+        with self._stats_lock:
+            by_kind = {kind: dict(counts) for kind, counts in self._stats.items()}
+
+        for counts in by_kind.values():
+            lookups = counts['hits'] + counts['misses']
+            counts['hit_ratio'] = round(counts['hits'] / lookups, 4) if lookups else None
+
+        hits = sum(c['hits'] for c in by_kind.values())
+        misses = sum(c['misses'] for c in by_kind.values())
+        options = settings.CACHES.get(self.alias, {})
+        return {
+            'alias': self.alias,
+            'backend': options.get('BACKEND', ''),
+            'max_entries': options.get('OPTIONS', {}).get('MAX_ENTRIES'),
+            'ttl': options.get('TIMEOUT'),
+            'unstable_ttl': self.unstable_ttl,
+            'process_local': self.process_local,
+            'process_local_ttl': self.process_local_ttl,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+            'by_resource': by_kind,
+        }
+
+
+_cache_config = getattr(settings, 'ORTHANC_CACHE_CONFIG', {})
+orthanc_metadata_cache = OrthancMetadataCache(
+    alias=_cache_config.get('ALIAS', 'orthanc'),
+    unstable_ttl=_cache_config.get('UNSTABLE_TTL', 10),
+    process_local_ttl=_cache_config.get('PROCESS_LOCAL_TTL', 30),
+)
+
+
+@receiver(study_deleted)
+def _invalidate_deleted_study(sender, orthanc_study_id, **kwargs):
+    orthanc_metadata_cache.invalidate_study(orthanc_study_id)
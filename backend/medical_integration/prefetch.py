@@ -0,0 +1,261 @@
+# backend/medical_integration/prefetch.py
+
+import logging
+import queue
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from .models import CatalogStudy
+from .ohif_proxy_views import prewarm_study
+from .orthanc_api import OrthancAPI
+from .series_metadata import series_metadata_store
+from .thumbnail_store import thumbnail_store
+
+logger = logging.getLogger('medical_integration')
+
+VIEWER_SESSION_HEADER = 'HTTP_X_VIEWER_SESSION'
+
+
+class PrefetchJob:
+    """Study 하나의 prefetch 작업 (요청한 세션이 모두 취소하면 cancelled 설정)"""
+
+    def __init__(self, study_uid, reason):
+        self.study_uid = study_uid
+        self.reason = reason
+        self.sessions = set()
+        self.cancelled = threading.Event()
+        self.queued_at = time.time()
+
+
+class PrefetchService:
+    """판독 화면이 다음에 열 가능성이 높은 Study를 백그라운드에서 미리 준비
+
+    - 대상: 같은 환자의 이전 검사(같은 Modality/Body Part) + 워크리스트 다음 항목
+    - 작업 순서: Series 메타데이터 → 썸네일 → 프록시 캐시 프레임 (가벼운 것부터)
+    - 큐 크기가 제한되어 있어 가득 차면 새 작업은 버림 (뷰어 요청이 우선)
+    - 같은 뷰어 세션이 다른 Study를 열거나 취소를 요청하면 이전 작업을 취소
+      (다른 세션도 요청한 Study는 계속 진행)
+    """
+
+    def __init__(self, workers=2, queue_size=64, max_priors=3, prewarm_frames=True, enabled=True):
+        self.workers = workers
+        self.max_priors = max_priors
+        self.prewarm_frames = prewarm_frames
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._jobs = {}            # study_uid -> 대기/진행 중인 PrefetchJob
+        self._session_jobs = {}    # 세션 -> {study_uid}
+        self._counters = {'queued': 0, 'deduplicated': 0, 'dropped': 0, 'cancelled': 0,
+                          'completed': 0, 'failed': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    # ── 대상 선정 ────────────────────────────────────────
+
+    def prior_study_uids(self, study_uid, modality=None, body_part=None):
+        """같은 환자의 이전 Study UID 목록 (최신순, 같은 Modality/Body Part 우선)"""
+        current = CatalogStudy.objects.filter(study_instance_uid=study_uid).first()
+        if current is None or not current.patient_id:
+            return []
+
+        priors = CatalogStudy.objects.filter(patient_id=current.patient_id).exclude(pk=current.pk)
+        if current.study_date:
+            priors = priors.filter(study_date__lte=current.study_date)
+        modality = modality or current.modality
+        if modality:
+            priors = priors.filter(modalities_in_study__contains=modality)
+        priors = priors.order_by('-study_date', '-study_time')
+
+        if body_part:
+            same_part = priors.filter(series__body_part_examined__iexact=body_part).distinct()
+            uids = list(same_part.values_list('study_instance_uid', flat=True)[:self.max_priors])
+            if uids:
+                return uids
+        return list(priors.values_list('study_instance_uid', flat=True)[:self.max_priors])
+
+    # ── 큐 ──────────────────────────────────────────────
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for index in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._worker, name=f"prefetch-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, session, study_uids, reason=''):
+        """세션의 이전 작업을 취소하고 study_uids를 순서대로 큐에 추가
+
+        Returns:
+            int: 새로 큐에 넣은 Study 수
+        """
+        if not self.enabled:
+            return 0
+        study_uids = list(dict.fromkeys(uid for uid in study_uids if uid))
+        # 새 목록에도 있는 Study는 취소하지 않고 그대로 둠
+        self.cancel(session, keep=study_uids)
+        self._ensure_workers()
+
+        queued = 0
+        for study_uid in study_uids:
+            with self._lock:
+                job = self._jobs.get(study_uid)
+                if job is not None and session in job.sessions:
+                    continue
+                if job is not None:
+                    # 다른 세션이 이미 요청한 Study: 작업을 공유
+                    job.sessions.add(session)
+                    self._session_jobs.setdefault(session, set()).add(study_uid)
+                    self._counters['deduplicated'] += 1
+                    continue
+                job = PrefetchJob(study_uid, reason)
+                job.sessions.add(session)
+                try:
+                    self._queue.put_nowait(job)
+                except queue.Full:
+                    self._counters['dropped'] += 1
+                    logger.info(f"⚠️ prefetch 큐 가득 참: {study_uid} 건너뜀")
+                    break
+                self._jobs[study_uid] = job
+                self._session_jobs.setdefault(session, set()).add(study_uid)
+                self._counters['queued'] += 1
+            queued += 1
+        return queued
+
+    def cancel(self, session, keep=()):
+        """세션의 대기/진행 중인 작업(keep 제외) 취소 후 실제로 취소된 작업 수 반환"""
+        cancelled = 0
+        with self._lock:
+            study_uids = self._session_jobs.pop(session, set())
+            kept = study_uids & set(keep)
+            if kept:
+                self._session_jobs[session] = kept
+            for study_uid in study_uids - kept:
+                job = self._jobs.get(study_uid)
+                if job is None:
+                    continue
+                job.sessions.discard(session)
+                if not job.sessions:
+                    job.cancelled.set()
+                    del self._jobs[study_uid]
+                    cancelled += 1
+            self._counters['cancelled'] += cancelled
+        return cancelled
+
+    def _finish(self, job):
+        with self._lock:
+            if self._jobs.get(job.study_uid) is job:
+                del self._jobs[job.study_uid]
+            for session in job.sessions:
+                study_uids = self._session_jobs.get(session)
+                if study_uids is not None:
+                    study_uids.discard(job.study_uid)
+                    if not study_uids:
+                        del self._session_jobs[session]
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if not job.cancelled.is_set():
+                    self._prefetch(job)
+            except Exception as e:
+                logger.error(f"❌ prefetch 실패 ({job.study_uid}): {e}")
+                self._count('failed')
+            finally:
+                self._finish(job)
+                connection.close()
+                self._queue.task_done()
+
+    # ── 작업 ────────────────────────────────────────────
+
+    @staticmethod
+    def _orthanc_study_id(study_uid):
+        study_id = CatalogStudy.objects.filter(study_instance_uid=study_uid).values_list('orthanc_id', flat=True).first()
+        if study_id:
+            return study_id
+        found = OrthancAPI().find('Study', {'StudyInstanceUID': study_uid}, expand=False) or []
+        return found[0] if found else None
+
+    def _prefetch(self, job):
+        started = time.perf_counter()
+        orthanc_study_id = self._orthanc_study_id(job.study_uid)
+        if not orthanc_study_id:
+            self._count('failed')
+            return
+
+        steps = [
+            lambda: series_metadata_store.build_study(orthanc_study_id),
+            lambda: thumbnail_store.build_study(orthanc_study_id),
+        ]
+        if self.prewarm_frames:
+            steps.append(lambda: prewarm_study(job.study_uid, cancelled=job.cancelled))
+
+        for step in steps:
+            if job.cancelled.is_set():
+                logger.info(f"⏹️ prefetch 취소: {job.study_uid}")
+                return
+            step()
+
+        self._count('completed')
+        logger.info(f"✅ prefetch 완료 ({job.reason}): {job.study_uid} ({time.perf_counter() - started:.2f}s)")
+
+    # ── 뷰 연동 ─────────────────────────────────────────
+
+    @staticmethod
+    def session_key(request):
+        """뷰어 세션 식별자 (X-Viewer-Session 헤더 > 로그인 사용자 > 클라이언트 IP)"""
+        session = request.META.get(VIEWER_SESSION_HEADER) or request.GET.get('viewer_session')
+        if session:
+            return session
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f"user:{user.pk}"
+        return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+    def prefetch_for_viewer(self, request, study_uid, modality=None, body_part=None, next_study_uid=None):
+        """판독 화면에서 Study를 열 때 호출: 이전 검사 + 다음 워크리스트 항목 prefetch
+
+        뷰 응답을 막지 않도록 실패는 로그만 남깁니다.
+        """
+        if not self.enabled or not study_uid:
+            return 0
+        try:
+            targets = self.prior_study_uids(study_uid, modality, body_part)
+            if next_study_uid and next_study_uid != study_uid:
+                targets.append(next_study_uid)
+            return self.submit(self.session_key(request), targets, reason=f"viewer:{study_uid}")
+        except Exception as e:
+            logger.warning(f"⚠️ prefetch 예약 실패 ({study_uid}): {e}")
+            return 0
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            pending = len(self._jobs)
+            sessions = len(self._session_jobs)
+            workers = sum(1 for thread in self._threads if thread.is_alive())
+        return {
+            'enabled': self.enabled,
+            'workers': workers,
+            'queue_size': self._queue.qsize(),
+            'queue_max': self._queue.maxsize,
+            'pending': pending,
+            'sessions': sessions,
+            **counters,
+        }
+
+
+_prefetch_config = getattr(settings, 'VIEWER_PREFETCH', {})
+prefetch_service = PrefetchService(
+    workers=_prefetch_config.get('WORKERS', 2),
+    queue_size=_prefetch_config.get('QUEUE_SIZE', 64),
+    max_priors=_prefetch_config.get('MAX_PRIORS', 3),
+    prewarm_frames=_prefetch_config.get('PREWARM_FRAMES', True),
+    enabled=_prefetch_config.get('ENABLED', True),
+)
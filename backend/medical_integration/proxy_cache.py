@@ -0,0 +1,358 @@
+# backend/medical_integration/proxy_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+logger = logging.getLogger('medical_integration')
+
+# 캐시 항목과 함께 저장해 히트 시 그대로 돌려줄 응답 헤더
+STORED_HEADERS = ('Content-Type', 'Content-Encoding', 'Content-Disposition')
+
+# 예산을 넘으면 이 비율까지 줄임 (매 저장마다 정리하지 않도록 여유를 둠)
+EVICT_TARGET_RATIO = 0.9
+
+
+class CacheEntry:
+    """디스크 캐시 항목 (조회 시 열어 둔 본문 파일 + 메타데이터)
+
+    본문은 get()에서 미리 열어 두므로 이후 정리(evict/purge)로 파일이 삭제되어도
+    응답을 끝까지 보낼 수 있습니다. open()으로 넘겨받지 않으면 close()로 닫아야 합니다.
+    """
+
+    def __init__(self, body_path, meta, body=None):
+        self.body_path = body_path
+        self.meta = meta
+        self._body = body
+
+    def open(self):
+        """열어 둔 본문 파일을 넘겨줌 (닫는 책임도 함께 넘어감)"""
+        body, self._body = self._body, None
+        return body if body is not None else open(self.body_path, 'rb')
+
+    def close(self):
+        if self._body is not None:
+            self._body.close()
+            self._body = None
+
+    @property
+    def size(self):
+        return self.meta.get('size', 0)
+
+    @property
+    def headers(self):
+        return self.meta.get('headers', {})
+
+
+class _PendingEntry:
+    """기록 중인 캐시 항목 (MAX_ENTRY_BYTES를 넘으면 기록을 멈추고 버림)"""
+
+    def __init__(self, cache, temp_file, temp_path, body_path, meta_path, meta):
+        self.cache = cache
+        self.temp_file = temp_file
+        self.temp_path = temp_path
+        self.body_path = body_path
+        self.meta_path = meta_path
+        self.meta = meta
+        self.size = 0
+
+    def write(self, chunk):
+        if self.temp_file is None:
+            return
+        self.size += len(chunk)
+        if self.size > self.cache.max_entry_bytes:
+            self.temp_file.close()
+            self.temp_file = None
+        else:
+            self.temp_file.write(chunk)
+
+    def finish(self, completed):
+        """스트림이 끝까지 전달되었으면 등록, 아니면 임시 파일 삭제"""
+        overflowed = self.temp_file is None
+        if not overflowed:
+            self.temp_file.close()
+        if completed and not overflowed:
+            self.cache._commit(self.temp_path, self.body_path, self.meta_path, {
+                'size': self.size,
+                **self.meta,
+                'stored_at': time.time(),
+            })
+        else:
+            self.cache._discard(self.temp_path)
+
+
+class DiskResponseCache:
+    """OHIF 프록시 응답용 바이트 예산 기반 디스크 LRU 캐시
+
+    - 키: upstream 경로 + 쿼리 + Accept (+ gzip 여부)
+    - 본문을 임시 파일에 쓴 뒤 os.replace로 옮기므로 읽는 쪽은 완성된 파일만 봅니다
+      (메타 파일은 본문 다음에 기록되어 항목 존재 여부의 기준이 됩니다)
+    - 히트 시 mtime을 갱신하고, 예산 초과 시 mtime이 오래된 항목부터 제거
+    - 프로세스의 전체 크기는 첫 저장 때 백그라운드 스레드에서 한 번 집계 (요청 경로에서 디렉터리 전체를 훑지 않음)
+    - 여러 워커 프로세스가 같은 디렉터리를 공유해도 안전합니다
+    """
+
+    def __init__(self, root, max_bytes, max_entry_bytes=None, enabled=True):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._total_bytes = None
+        self._seeder = None
+        self._counters = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+    # ── 키/경로 ──────────────────────────────────────────
+
+    @staticmethod
+    def make_key(upstream_path, query_string='', accept='', accept_encoding=''):
+        source = '|'.join([
+            upstream_path.lstrip('/'),
+            query_string,
+            accept,
+            'gzip' if 'gzip' in accept_encoding else '',
+        ])
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    def _paths(self, key):
+        directory = os.path.join(self.root, key[:2])
+        return directory, os.path.join(directory, f"{key}.body"), os.path.join(directory, f"{key}.json")
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    # ── 조회/저장 ────────────────────────────────────────
+
+    def get(self, key):
+        """캐시 항목 조회 (없으면 None). 히트 시 LRU 순서를 갱신합니다.
+
+        메타 파일만 남고 본문이 사라진 항목은 미스로 집계하고 메타 파일도 정리합니다.
+        """
+        if not self.enabled:
+            return None
+        _, body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            self._count('misses')
+            return None
+        try:
+            body = open(body_path, 'rb')
+        except OSError:
+            self._discard(meta_path)
+            self._count('misses')
+            return None
+        try:
+            now = time.time()
+            os.utime(meta_path, (now, now))
+            os.utime(body_path, (now, now))
+        except OSError:
+            pass  # 방금 정리된 항목이어도 열어 둔 본문으로 응답 가능
+        self._count('hits')
+        return CacheEntry(body_path, meta, body)
+
+    def contains(self, key):
+        """통계에 반영하지 않는 존재 확인 (prewarm용)"""
+        _, _, meta_path = self._paths(key)
+        return self.enabled and os.path.exists(meta_path)
+
+    def _begin(self, key, headers, study_uid, upstream_path):
+        """임시 파일에 기록을 시작 (디렉터리 준비 실패 시 None)"""
+        directory, body_path, meta_path = self._paths(key)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        except OSError as e:
+            logger.warning(f"⚠️ 프록시 캐시 디렉터리 준비 실패: {e}")
+            return None
+        return _PendingEntry(self, os.fdopen(fd, 'wb'), temp_path, body_path, meta_path, {
+            'headers': {h: headers[h] for h in STORED_HEADERS if h in headers},
+            'study_uid': study_uid,
+            'path': str(upstream_path),
+        })
+
+    def store(self, key, chunks, headers, study_uid='', upstream_path=''):
+        """chunks를 그대로 내보내면서 캐시 파일로 기록하는 generator
+
+        스트림이 끝까지 전달된 경우에만 항목을 등록하며, 클라이언트가 중간에
+        끊거나 MAX_ENTRY_BYTES를 넘으면 임시 파일을 버립니다.
+        """
+        pending = self._begin(key, headers, study_uid, upstream_path) if self.enabled else None
+        if pending is None:
+            yield from chunks
+            return
+
+        completed = False
+        try:
+            for chunk in chunks:
+                pending.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+            pending.finish(completed)
+
+    async def astore(self, key, chunks, headers, study_uid='', upstream_path=''):
+        """store()의 async generator 버전 (async 프록시 뷰용)
+
+        청크 기록은 짧게 끝나므로 이벤트 루프에서 수행하고,
+        등록/정리(finish → _commit → evict)는 스레드에서 수행합니다.
+        """
+        pending = self._begin(key, headers, study_uid, upstream_path) if self.enabled else None
+        completed = False
+        try:
+            async for chunk in chunks:
+                if pending is not None:
+                    pending.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            if hasattr(chunks, 'aclose'):
+                await chunks.aclose()
+            if pending is not None:
+                await sync_to_async(pending.finish, thread_sensitive=False)(completed)
+
+    def _commit(self, temp_path, body_path, meta_path, meta):
+        # 메타 임시 파일까지 준비한 뒤 본문 → 메타 순으로 rename (실패 시 남는 파일 없음)
+        meta_temp = None
+        body_replaced = False
+        try:
+            meta_fd, meta_temp = tempfile.mkstemp(dir=os.path.dirname(meta_path), suffix='.tmp')
+            with os.fdopen(meta_fd, 'w') as f:
+                json.dump(meta, f)
+            os.replace(temp_path, body_path)
+            body_replaced = True
+            os.replace(meta_temp, meta_path)
+        except OSError as e:
+            logger.warning(f"⚠️ 프록시 캐시 저장 실패: {e}")
+            for path in (temp_path, meta_temp):
+                if path:
+                    self._discard(path)
+            if body_replaced:
+                # 이전 메타가 새 본문을 가리키지 않도록 항목 전체 제거
+                self._discard(meta_path)
+                self._discard(body_path)
+            return
+
+        self._count('stores')
+        with self._lock:
+            if self._total_bytes is None:
+                # 전체 크기를 모르면 백그라운드에서 집계 (예산 초과면 정리까지)
+                over_budget = False
+                if self._seeder is None or not self._seeder.is_alive():
+                    self._seeder = threading.Thread(target=self.evict, name='proxy-cache-seed', daemon=True)
+                    self._seeder.start()
+            else:
+                self._total_bytes += meta['size']
+                over_budget = self._total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    # ── 정리 ────────────────────────────────────────────
+
+    def _scan(self):
+        """(mtime, key, size, meta 경로) 목록"""
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith('.json'):
+                    continue
+                key = filename[:-5]
+                body_path = os.path.join(directory, f"{key}.body")
+                try:
+                    stat = os.stat(body_path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, key, stat.st_size, os.path.join(directory, filename)))
+        return entries
+
+    def _remove(self, key):
+        _, body_path, meta_path = self._paths(key)
+        self._discard(meta_path)
+        self._discard(body_path)
+
+    def evict(self):
+        """예산을 넘었으면 가장 오래 사용하지 않은 항목부터 제거하고 제거 개수 반환"""
+        entries = sorted(self._scan())
+        total = sum(size for _, _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        removed = 0
+
+        if total > self.max_bytes:
+            for _, key, size, _ in entries:
+                if total <= target:
+                    break
+                self._remove(key)
+                total -= size
+                removed += 1
+            logger.info(f"🧹 프록시 캐시 정리: {removed}개 제거 (현재 {total} bytes)")
+
+        with self._lock:
+            self._total_bytes = total
+            self._counters['evictions'] += removed
+        return removed
+
+    def purge(self, study_uid=None):
+        """전체 또는 특정 Study 항목 삭제 후 (개수, 바이트) 반환"""
+        count = 0
+        freed = 0
+        for _, key, size, meta_path in self._scan():
+            if study_uid:
+                try:
+                    with open(meta_path) as f:
+                        if json.load(f).get('study_uid') != study_uid:
+                            continue
+                except (OSError, ValueError):
+                    continue
+            self._remove(key)
+            count += 1
+            freed += size
+        with self._lock:
+            self._total_bytes = None
+        return count, freed
+
+    def stats(self):
+        entries = self._scan()
+        total = sum(size for _, _, size, _ in entries)
+        with self._lock:
+            self._total_bytes = total
+            counters = dict(self._counters)
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'enabled': self.enabled,
+            'dir': self.root,
+            'entries': len(entries),
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'max_entry_bytes': self.max_entry_bytes,
+            'usage_ratio': round(total / self.max_bytes, 4) if self.max_bytes else None,
+            'hit_ratio': round(counters['hits'] / lookups, 4) if lookups else None,
+            **counters,
+        }
+
+
+_cache_config = getattr(settings, 'OHIF_PROXY_CACHE', {})
+proxy_cache = DiskResponseCache(
+    root=str(_cache_config.get('DIR', os.path.join(settings.BASE_DIR, 'cache', 'ohif_proxy'))),
+    max_bytes=_cache_config.get('MAX_BYTES', 2 * 1024 ** 3),
+    max_entry_bytes=_cache_config.get('MAX_ENTRY_BYTES'),
+    enabled=_cache_config.get('ENABLED', True),
+)
@@ -0,0 +1,182 @@
+# backend/medical_integration/proxy_http.py
+
+import hashlib
+import re
+from asgiref.sync import sync_to_async
+
+# 저장 후 바뀌지 않는 리소스에 붙이는 캐시 정책 (환자 데이터이므로 공유 캐시 제외)
+IMMUTABLE_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+# DICOMweb Instance 이하 리소스 (instance, metadata, frames, rendered, thumbnail, bulk)
+_DICOMWEB_INSTANCE_RE = re.compile(
+    r'^(?:dicom-web/)?studies/(?P<study_uid>[^/]+)/series/[^/]+/instances/(?P<sop_uid>[^/]+)(?:/.*)?$'
+)
+# DICOMweb Series 메타데이터 (series_metadata 저장소 대상)
+_DICOMWEB_SERIES_METADATA_RE = re.compile(
+    r'^(?:dicom-web/)?studies/(?P<study_uid>[^/]+)/series/(?P<series_uid>[^/]+)/metadata/?$'
+)
+# Orthanc REST Instance 리소스 (file, preview, frames, tags 등)
+_ORTHANC_INSTANCE_RE = re.compile(r'^instances/(?P<orthanc_id>[0-9a-f-]+)(?:/.*)?$')
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """요청한 Range가 본문 길이를 벗어남 (416)"""
+
+
+def dicomweb_resource_key(path):
+    """DICOMweb 경로가 Instance 이하 리소스면 SOPInstanceUID 반환"""
+    match = _DICOMWEB_INSTANCE_RE.match(path.lstrip('/'))
+    return match.group('sop_uid') if match else None
+
+
+def dicomweb_study_uid(path):
+    """DICOMweb Instance 경로의 StudyInstanceUID (캐시 항목 Study 단위 삭제용)"""
+    match = _DICOMWEB_INSTANCE_RE.match(path.lstrip('/'))
+    return match.group('study_uid') if match else ''
+
+
+def series_metadata_uids(path):
+    """DICOMweb Series 메타데이터 경로면 (StudyInstanceUID, SeriesInstanceUID) 반환"""
+    match = _DICOMWEB_SERIES_METADATA_RE.match(path.lstrip('/'))
+    return (match.group('study_uid'), match.group('series_uid')) if match else None
+
+
+def accepts_dicom_json(accept):
+    """Accept 헤더가 DICOM JSON 응답을 허용하는지 (없거나 */*, application/dicom+json, application/json)"""
+    if not accept:
+        return True
+    types = [part.split(';')[0].strip() for part in accept.split(',')]
+    return any(t in ('*/*', 'application/*', 'application/dicom+json', 'application/json') for t in types)
+
+
+def wado_resource_key(params):
+    """WADO-URI 요청의 objectUID (SOPInstanceUID) 반환"""
+    return params.get('objectUID') or None
+
+
+def orthanc_resource_key(path):
+    """Orthanc REST 경로가 Instance 리소스면 Orthanc Instance ID 반환"""
+    match = _ORTHANC_INSTANCE_RE.match(path.lstrip('/'))
+    return match.group('orthanc_id') if match else None
+
+
+def make_etag(resource_key, request):
+    """불변 리소스용 strong ETag
+
+    SOPInstanceUID(또는 Orthanc ID)에 경로/쿼리/Accept/Accept-Encoding을 더해
+    같은 Instance의 다른 표현(frame, rendered, 압축 여부 등)을 구분합니다.
+    """
+    source = '|'.join([
+        resource_key,
+        request.path,
+        request.META.get('QUERY_STRING', ''),
+        request.META.get('HTTP_ACCEPT', ''),
+        'gzip' if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '') else '',
+    ])
+    return f'"{hashlib.sha1(source.encode()).hexdigest()}"'
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match 헤더에 etag가 포함되는지 확인 (W/ 접두어 무시)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def parse_range(range_header, total):
+    """단일 bytes Range 헤더 해석
+
+    Returns:
+        (start, end) 포함 구간, 또는 무시해야 하면 None (여러 구간/형식 오류/길이 모름)
+
+    Raises:
+        RangeNotSatisfiable: 시작 위치가 본문 길이 이상이거나 빈 본문에 suffix 구간을 요청한 경우
+    """
+    match = _RANGE_RE.match((range_header or '').strip())
+    if not match or total is None:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        suffix = int(end)
+        if suffix == 0 or total == 0:
+            raise RangeNotSatisfiable()
+        return max(total - suffix, 0), total - 1
+
+    start = int(start)
+    end = min(int(end), total - 1) if end else total - 1
+    if start >= total:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, end
+
+
+def slice_chunks(chunks, start, end):
+    """청크 스트림에서 [start, end] 구간만 내보냄 (버퍼링 없음)"""
+    position = 0
+    try:
+        for chunk in chunks:
+            chunk_end = position + len(chunk)
+            if chunk_end > start and position <= end:
+                yield chunk[max(start - position, 0):end - position + 1]
+            position = chunk_end
+            if position > end:
+                break
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+async def aslice_chunks(chunks, start, end):
+    """slice_chunks()의 async generator 버전"""
+    position = 0
+    try:
+        async for chunk in chunks:
+            chunk_end = position + len(chunk)
+            if chunk_end > start and position <= end:
+                yield chunk[max(start - position, 0):end - position + 1]
+            position = chunk_end
+            if position > end:
+                break
+    finally:
+        if hasattr(chunks, 'aclose'):
+            await chunks.aclose()
+
+
+def iter_file_range(file_obj, start, end, block_size=64 * 1024):
+    """파일의 [start, end] 구간을 block_size 단위로 읽고 끝나면 파일을 닫음"""
+    try:
+        file_obj.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = file_obj.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        file_obj.close()
+
+
+async def aiter_file_range(file_obj, start, end, block_size=64 * 1024):
+    """iter_file_range()의 async generator 버전 (파일 읽기는 스레드에서 수행)"""
+    read = sync_to_async(file_obj.read, thread_sensitive=False)
+    try:
+        file_obj.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = await read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+    finally:
+        file_obj.close()
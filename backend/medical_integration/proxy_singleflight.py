@@ -0,0 +1,256 @@
+# backend/medical_integration/proxy_singleflight.py
+
+import asyncio
+import logging
+import threading
+import time
+from django.conf import settings
+from django.http import HttpResponse
+
+logger = logging.getLogger('medical_integration')
+
+
+class FlightResult:
+    """리더 요청 결과 (cached=True면 본문은 디스크 캐시에 있음)"""
+
+    def __init__(self, status_code=200, headers=None, content_type='application/octet-stream',
+                 body=None, cached=False):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content_type = content_type
+        self.body = body
+        self.cached = cached
+
+    def to_response(self):
+        """공유 본문으로 팔로워 응답 생성"""
+        response = HttpResponse(self.body, status=self.status_code, content_type=self.content_type)
+        for header, value in self.headers.items():
+            response[header] = value
+        response['Content-Length'] = str(len(self.body))
+        response['X-Proxy-Cache'] = 'COALESCED'
+        return response
+
+
+class Flight:
+    """진행 중인 upstream 요청 하나 (리더가 결과를 publish하면 팔로워가 깨어남)"""
+
+    def __init__(self, key):
+        self.key = key
+        self.result = None
+        self.done = threading.Event()
+        self.started = time.monotonic()
+
+    def _set_done(self):
+        self.done.set()
+
+    def remaining(self, timeout):
+        """리더 시작 시점부터 timeout까지 남은 대기 시간 (늦게 합류한 팔로워도 같은 시각에 포기)"""
+        return max(0.0, self.started + timeout - time.monotonic())
+
+    def wait(self, timeout):
+        return self.result if self.done.wait(self.remaining(timeout)) else None
+
+
+class AsyncFlight(Flight):
+    """이벤트 루프용 Flight (publish는 Django가 close를 다른 스레드에서 호출해도 안전)"""
+
+    def __init__(self, key):
+        super().__init__(key)
+        self.loop = asyncio.get_running_loop()
+        self.done = asyncio.Event()
+
+    def _set_done(self):
+        self.loop.call_soon_threadsafe(self.done.set)
+
+    async def wait(self, timeout):
+        if self.done.is_set():
+            return self.result
+        try:
+            await asyncio.wait_for(self.done.wait(), self.remaining(timeout))
+        except asyncio.TimeoutError:
+            return None
+        return self.result
+
+
+class SingleFlight:
+    """동일한 upstream GET이 동시에 들어오면 하나만 보내고 결과를 나눠주는 single-flight
+
+    - 키: 프록시 디스크 캐시 키와 동일 (경로 + 쿼리 + Accept + gzip 여부)
+    - 리더는 평소처럼 스트리밍하고, 끝나면 결과를 publish
+      (불변 리소스는 디스크 캐시에 저장된 항목, 그 외는 MAX_BUFFER_BYTES 이하 본문)
+    - 팔로워는 결과를 기다렸다가 캐시/공유 본문으로 응답하고, 리더가 실패하거나
+      본문이 너무 크면 각자 upstream에 요청 (fallback)
+    - 리더 본문은 리더 클라이언트가 읽는 속도로 흐르므로, 리더 시작 후 wait_timeout(기본 5초)이
+      지나면 팔로워는 더 기다리지 않고 각자 요청합니다 (느린 리더 한 명이 모두를 붙잡지 않도록)
+    - 프로세스 단위로 동작합니다 (워커 프로세스 간에는 디스크 캐시가 중복을 흡수)
+    """
+
+    flight_class = Flight
+
+    def __init__(self, max_buffer_bytes, wait_timeout, enabled=True):
+        self.max_buffer_bytes = max_buffer_bytes
+        self.wait_timeout = wait_timeout
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._counters = {'leaders': 0, 'coalesced': 0, 'fallbacks': 0, 'timeouts': 0}
+
+    def count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def join(self, key):
+        """(flight, 리더 여부) 반환. 비활성화 상태면 (None, True)"""
+        if not self.enabled or key is None:
+            return None, True
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = self.flight_class(key)
+            self._counters['leaders'] += 1
+        return flight, True
+
+    def publish(self, flight, result=None):
+        """리더 결과 등록 (result=None이면 팔로워가 각자 요청). 여러 번 호출해도 한 번만 반영"""
+        if flight is None:
+            return
+        with self._lock:
+            if self._flights.get(flight.key) is not flight:
+                return
+            del self._flights[flight.key]
+        flight.result = result
+        flight._set_done()
+
+    def record_follower(self, flight, served):
+        """팔로워 처리 결과 집계 (served=False면 각자 upstream 요청)"""
+        if served:
+            self.count('coalesced')
+        else:
+            self.count('fallbacks' if flight.done.is_set() else 'timeouts')
+
+    def tee(self, flight, chunks, status_code, headers, content_type, cached):
+        return _FlightTee(self, flight, chunks, status_code, headers, content_type, cached)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            in_flight = len(self._flights)
+        requests = counters['leaders'] + counters['coalesced']
+        return {
+            'enabled': self.enabled,
+            'in_flight': in_flight,
+            'max_buffer_bytes': self.max_buffer_bytes,
+            # coalesced = 절약한 upstream 호출 수
+            'saved_upstream_calls': counters['coalesced'],
+            'saved_ratio': round(counters['coalesced'] / requests, 4) if requests else None,
+            **counters,
+        }
+
+
+class AsyncSingleFlight(SingleFlight):
+    """async 프록시 뷰용 SingleFlight (팔로워는 이벤트 루프에서 대기)"""
+
+    flight_class = AsyncFlight
+
+    def tee(self, flight, chunks, status_code, headers, content_type, cached):
+        return _AsyncFlightTee(self, flight, chunks, status_code, headers, content_type, cached)
+
+
+class _FlightTeeBase:
+    """리더 본문을 그대로 전달하면서 (필요하면) 모아 두었다가 끝나면 publish
+
+    generator 대신 클래스를 쓰는 이유: 응답이 시작되기 전에 닫혀도 close()가
+    호출되어 팔로워가 timeout까지 기다리지 않습니다.
+    """
+
+    def __init__(self, singleflight, flight, chunks, status_code, headers, content_type, cached):
+        self.singleflight = singleflight
+        self.flight = flight
+        self.chunks = chunks
+        self.status_code = status_code
+        self.headers = {h: v for h, v in headers.items() if h != 'X-Proxy-Cache'}
+        self.content_type = content_type
+        self.cached = cached
+        self.buffer = None if cached else bytearray()
+        self.completed = False
+
+    def _collect(self, chunk):
+        if self.buffer is not None:
+            if len(self.buffer) + len(chunk) > self.singleflight.max_buffer_bytes:
+                self.buffer = None
+            else:
+                self.buffer.extend(chunk)
+
+    def _result(self):
+        if not self.completed:
+            return None
+        if self.cached:
+            return FlightResult(cached=True)
+        if self.buffer is None:
+            return None
+        return FlightResult(self.status_code, self.headers, self.content_type, bytes(self.buffer))
+
+
+class _FlightTee(_FlightTeeBase):
+    """sync 프록시 뷰용"""
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.completed = True
+            self.close()
+            raise
+        except Exception:
+            self.close()
+            raise
+        self._collect(chunk)
+        return chunk
+
+    def close(self):
+        if hasattr(self.chunks, 'close'):
+            self.chunks.close()
+        self.singleflight.publish(self.flight, self._result())
+
+
+class _AsyncFlightTee(_FlightTeeBase):
+    """async 프록시 뷰용 (StreamingHttpResponse가 async iterator로 인식하도록 __iter__ 없음)"""
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            chunk = await self.chunks.__anext__()
+        except StopAsyncIteration:
+            self.completed = True
+            await self.aclose()
+            raise
+        except BaseException:
+            await self.aclose()
+            raise
+        self._collect(chunk)
+        return chunk
+
+    async def aclose(self):
+        if hasattr(self.chunks, 'aclose'):
+            await self.chunks.aclose()
+        self.singleflight.publish(self.flight, self._result())
+
+    def close(self):
+        # 응답 시작 전 종료 등 aclose가 불리지 않은 경우에도 팔로워를 깨움
+        self.singleflight.publish(self.flight, self._result())
+
+
+_singleflight_config = getattr(settings, 'OHIF_PROXY_SINGLEFLIGHT', {})
+_singleflight_options = dict(
+    max_buffer_bytes=_singleflight_config.get('MAX_BUFFER_BYTES', 16 * 1024 * 1024),
+    wait_timeout=_singleflight_config.get('WAIT_TIMEOUT', 5),
+    enabled=_singleflight_config.get('ENABLED', True),
+)
+proxy_singleflight = SingleFlight(**_singleflight_options)
+async_proxy_singleflight = AsyncSingleFlight(**_singleflight_options)
@@ -0,0 +1,163 @@
+# backend/medical_integration/pyramid_views.py
+
+import logging
+import os
+import uuid
+from django.http import JsonResponse, HttpResponse, FileResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from .image_pyramid import image_pyramid_store
+from .ohif_proxy_views import add_cors_headers
+from .proxy_http import IMMUTABLE_CACHE_CONTROL, etag_matches, iter_file_range, aiter_file_range
+
+logger = logging.getLogger('medical_integration')
+
+
+def options_response():
+    return add_cors_headers(HttpResponse())
+
+
+def pending_response(instance_id):
+    """pyramid가 아직 없으면 백그라운드 생성을 예약하고 202 (뷰어는 WADO 원본으로 대체)"""
+    image_pyramid_store.schedule_instance_build(instance_id)
+    return add_cors_headers(JsonResponse({'instance_id': instance_id, 'pending': True}, status=202))
+
+
+def manifest_etag(manifest):
+    return f'"{manifest["instance_id"]}-{int(manifest["built_at"])}"'
+
+
+def progressive_levels(manifest, request):
+    """가장 작은 레벨부터 요청한 레벨(to, 기본 0 = 원본)까지 (레벨 정보, 경로) 목록"""
+    try:
+        finest = max(0, int(request.GET.get('to', 0)))
+    except ValueError:
+        finest = 0
+    levels = []
+    for entry in sorted(manifest['levels'], key=lambda entry: -entry['level']):
+        if entry['level'] < finest:
+            break
+        path = image_pyramid_store.level_path(manifest['instance_id'], entry['level'])
+        if path is None:
+            return None
+        levels.append((entry, path))
+    return levels
+
+
+def part_header(boundary, entry, path, instance_id):
+    return (
+        f"--{boundary}\r\n"
+        f"Content-Type: image/png\r\n"
+        f"Content-Length: {os.path.getsize(path)}\r\n"
+        f"Content-Location: {reverse('ohif:pyramid_level', args=[instance_id, entry['level']])}\r\n"
+        f"X-Pyramid-Level: {entry['level']}\r\n"
+        f"X-Image-Size: {entry['width']}x{entry['height']}\r\n"
+        f"\r\n"
+    ).encode()
+
+
+def iter_progressive(boundary, levels, instance_id):
+    """multipart/mixed 본문: 작은 레벨 → 큰 레벨 순서로 PNG 파트 전송"""
+    for entry, path in levels:
+        yield part_header(boundary, entry, path, instance_id)
+        yield from iter_file_range(open(path, 'rb'), 0, os.path.getsize(path) - 1, block_size=256 * 1024)
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode()
+
+
+async def aiter_progressive(boundary, levels, instance_id):
+    """iter_progressive()의 async generator 버전 (ASGI 배포용)"""
+    for entry, path in levels:
+        yield part_header(boundary, entry, path, instance_id)
+        async for block in aiter_file_range(open(path, 'rb'), 0, os.path.getsize(path) - 1,
+                                            block_size=256 * 1024):
+            yield block
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode()
+
+
+@csrf_exempt
+def pyramid_manifest(request, instance_id):
+    """Instance pyramid 레벨 목록 (크기, 레벨별 URL, Window/픽셀 간격 등 표시 정보)"""
+    if request.method == 'OPTIONS':
+        return options_response()
+    manifest = image_pyramid_store.get_manifest(instance_id)
+    if manifest is None:
+        return pending_response(instance_id)
+
+    etag = manifest_etag(manifest)
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+        response = HttpResponse(status=304)
+    else:
+        response = JsonResponse({
+            **manifest,
+            'progressive_url': reverse('ohif:pyramid_progressive', args=[instance_id]),
+            'levels': [
+                {**entry, 'url': reverse('ohif:pyramid_level', args=[instance_id, entry['level']])}
+                for entry in manifest['levels']
+            ],
+        })
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return add_cors_headers(response)
+
+
+@csrf_exempt
+def pyramid_level(request, instance_id, level):
+    """레벨 하나의 16bit 무손실 PNG (Instance 픽셀은 바뀌지 않으므로 immutable)"""
+    if request.method == 'OPTIONS':
+        return options_response()
+    path = image_pyramid_store.level_path(instance_id, level)
+    if path is None:
+        return add_cors_headers(JsonResponse({'error': '레벨을 찾을 수 없습니다'}, status=404))
+
+    etag = f'"{instance_id}-{level}-{os.path.getsize(path)}"'
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+        response = HttpResponse(status=304)
+    else:
+        response = FileResponse(open(path, 'rb'), content_type='image/png')
+        response.headers.pop('Content-Disposition', None)
+    response['ETag'] = etag
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return add_cors_headers(response)
+
+
+def progressive_response(request, instance_id, stream_factory):
+    if request.method == 'OPTIONS':
+        return options_response()
+    manifest = image_pyramid_store.get_manifest(instance_id)
+    if manifest is None:
+        return pending_response(instance_id)
+    levels = progressive_levels(manifest, request)
+    if not levels:
+        return pending_response(instance_id)
+
+    boundary = uuid.uuid4().hex
+    response = StreamingHttpResponse(
+        stream_factory(boundary, levels, instance_id),
+        content_type=f'multipart/mixed; boundary={boundary}',
+    )
+    response['Cache-Control'] = 'private, no-cache'
+    # 프록시/nginx가 모아서 보내지 않도록 (작은 레벨이 먼저 도착해야 의미가 있음)
+    response['X-Accel-Buffering'] = 'no'
+    return add_cors_headers(response)
+
+
+@csrf_exempt
+def pyramid_progressive(request, instance_id):
+    """점진적 전송: 작은 레벨부터 원본(또는 ?to=레벨)까지 multipart/mixed로 한 번에 스트리밍
+
+    뷰어는 첫 파트(긴 변 ~256px)로 바로 그리고, 이후 파트가 올 때마다 더 선명한 레벨로 교체합니다.
+    """
+    return progressive_response(request, instance_id, iter_progressive)
+
+
+@csrf_exempt
+async def pyramid_progressive_async(request, instance_id):
+    """pyramid_progressive()의 async 버전 (ASGI에서 sync iterator를 버퍼링하지 않도록)"""
+    return progressive_response(request, instance_id, aiter_progressive)
+
+
+@csrf_exempt
+def pyramid_stats(request):
+    return add_cors_headers(JsonResponse(image_pyramid_store.stats()))
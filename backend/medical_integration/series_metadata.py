@@ -0,0 +1,325 @@
+# backend/medical_integration/series_metadata.py
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from django.dispatch import receiver
+from .models import CatalogSeries
+from .orthanc_api import OrthancAPI
+from .signals import study_deleted
+
+logger = logging.getLogger('medical_integration')
+
+# 파일 경로에 쓰는 UID는 DICOM UID 문자만 허용
+_UID_RE = re.compile(r'^[0-9.]{1,64}$')
+
+DECOMPRESS_CHUNK_SIZE = 64 * 1024
+
+
+class SeriesMetadataEntry:
+    """저장된 Series 메타데이터 (gzip 본문 경로 + 사이드카 메타)"""
+
+    def __init__(self, body_path, meta):
+        self.body_path = body_path
+        self.meta = meta
+
+    @property
+    def size(self):
+        return self.meta.get('size', 0)
+
+    @property
+    def instances_count(self):
+        return self.meta.get('instances_count', 0)
+
+    @property
+    def etag(self):
+        source = f"{self.meta.get('series_uid')}|{self.instances_count}|{self.meta.get('built_at')}"
+        return f'"{hashlib.sha1(source.encode()).hexdigest()}"'
+
+    def iter_decompressed(self, chunk_size=DECOMPRESS_CHUNK_SIZE):
+        """gzip을 받지 않는 클라이언트용: 풀어서 chunk_size 단위로 전달"""
+        with gzip.open(self.body_path, 'rb') as f:
+            while True:
+                block = f.read(chunk_size)
+                if not block:
+                    break
+                yield block
+
+    def read_decompressed(self):
+        with gzip.open(self.body_path, 'rb') as f:
+            return f.read()
+
+
+class SeriesMetadataStore:
+    """Series 단위 DICOMweb 메타데이터(JSON)를 미리 만들어 gzip으로 저장
+
+    - Study가 안정화되면(/changes StableStudy/StableSeries, Webhook) Orthanc의
+      /dicom-web/.../series/{uid}/metadata를 한 번 받아 공백 없는 JSON으로 압축 저장
+    - dicom_web_proxy는 저장본이 최신이면 Orthanc 호출 없이 그대로 응답
+    - 저장 시 Instance 수를 기록하고, 조회 시 카탈로그(CatalogSeries)의 현재 Instance
+      수와 다르면 오래된 것으로 보고 삭제 후 프록시로 넘김 (다음 안정화 때 다시 생성)
+    """
+
+    def __init__(self, root, enabled=True, compress_level=6):
+        self.root = root
+        self.enabled = enabled
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._building = set()
+        self._counters = {'hits': 0, 'misses': 0, 'stale': 0, 'builds': 0, 'build_failures': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def _paths(self, study_uid, series_uid):
+        """(디렉터리, 본문, 메타) 경로. UID 형식이 아니면 None"""
+        if not (_UID_RE.match(study_uid or '') and _UID_RE.match(series_uid or '')):
+            return None
+        directory = os.path.join(self.root, study_uid)
+        return (directory,
+                os.path.join(directory, f"{series_uid}.json.gz"),
+                os.path.join(directory, f"{series_uid}.meta.json"))
+
+    # ── 조회 ────────────────────────────────────────────
+
+    def load(self, study_uid, series_uid):
+        """신선도 확인 없이 저장본 조회 (없으면 None)"""
+        paths = self._paths(study_uid, series_uid)
+        if not self.enabled or paths is None:
+            return None
+        _, body_path, meta_path = paths
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(body_path):
+            return None
+        return SeriesMetadataEntry(body_path, meta)
+
+    @staticmethod
+    def expected_instances_count(series_uid, orthanc_series_id=None):
+        """현재 Series의 Instance 수 (카탈로그 우선, 없으면 Orthanc Series JSON)"""
+        series = CatalogSeries.objects.filter(series_instance_uid=series_uid).only('instances_count').first()
+        if series is not None:
+            return series.instances_count
+        if orthanc_series_id:
+            series_info = OrthancAPI().get_series(orthanc_series_id)
+            if series_info:
+                return len(series_info.get('Instances', []))
+        return None
+
+    def is_fresh(self, entry):
+        expected = self.expected_instances_count(entry.meta.get('series_uid'), entry.meta.get('orthanc_series_id'))
+        return expected is not None and expected == entry.instances_count
+
+    def get(self, study_uid, series_uid):
+        """최신 저장본 조회 (없거나 Instance가 추가/삭제되었으면 None, 오래된 것은 삭제)"""
+        entry = self.load(study_uid, series_uid)
+        if entry is None:
+            self._count('misses')
+            return None
+        if not self.is_fresh(entry):
+            logger.info(f"♻️ Series 메타데이터 갱신 필요: {series_uid}")
+            self.remove(study_uid, series_uid)
+            self._count('stale')
+            return None
+        self._count('hits')
+        return entry
+
+    # ── 생성 ────────────────────────────────────────────
+
+    def save(self, study_uid, series_uid, metadata, orthanc_study_id='', orthanc_series_id=''):
+        """메타데이터(list)를 공백 없는 JSON으로 압축해 원자적으로 저장"""
+        paths = self._paths(study_uid, series_uid)
+        if paths is None:
+            raise ValueError(f"Invalid UID: {study_uid}/{series_uid}")
+        directory, body_path, meta_path = paths
+        os.makedirs(directory, exist_ok=True)
+
+        raw = json.dumps(metadata, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        body = gzip.compress(raw, compresslevel=self.compress_level)
+        meta = {
+            'study_uid': study_uid,
+            'series_uid': series_uid,
+            'orthanc_study_id': orthanc_study_id,
+            'orthanc_series_id': orthanc_series_id,
+            'instances_count': len(metadata),
+            'raw_size': len(raw),
+            'size': len(body),
+            'built_at': time.time(),
+        }
+        self._write_atomic(directory, body_path, body)
+        self._write_atomic(directory, meta_path, json.dumps(meta).encode())
+        return SeriesMetadataEntry(body_path, meta)
+
+    @staticmethod
+    def _write_atomic(directory, path, data):
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def build_series(self, study_uid, series_uid, orthanc_api=None, orthanc_study_id='', orthanc_series_id=''):
+        """Orthanc DICOMweb에서 Series 메타데이터를 받아 저장 (실패 시 None)"""
+        orthanc_api = orthanc_api or OrthancAPI()
+        started = time.perf_counter()
+        try:
+            response = orthanc_api.open_stream(
+                'GET', f"dicom-web/studies/{study_uid}/series/{series_uid}/metadata",
+                headers={'Accept': 'application/dicom+json'}
+            )
+            try:
+                metadata = response.json()
+            finally:
+                response.close()
+            entry = self.save(study_uid, series_uid, metadata, orthanc_study_id, orthanc_series_id)
+        except Exception as e:
+            logger.error(f"❌ Series 메타데이터 생성 실패 ({series_uid}): {e}")
+            self._count('build_failures')
+            return None
+
+        self._count('builds')
+        logger.info(
+            f"✅ Series 메타데이터 저장: {series_uid} ({entry.instances_count}개 Instance, "
+            f"{entry.meta['raw_size']} -> {entry.size} bytes, {time.perf_counter() - started:.2f}s)"
+        )
+        return entry
+
+    def build_study(self, orthanc_study_id, orthanc_api=None, force=False):
+        """Study의 모든 Series 메타데이터 생성 (최신 저장본이 있는 Series는 건너뜀)
+
+        Returns:
+            int: 새로 만든 Series 수
+        """
+        if not self.enabled:
+            return 0
+        orthanc_api = orthanc_api or OrthancAPI()
+        study_info = orthanc_api.get_study(orthanc_study_id)
+        if not study_info:
+            return 0
+        study_uid = study_info.get('MainDicomTags', {}).get('StudyInstanceUID', '')
+
+        built = 0
+        for series_info in orthanc_api.get_study_series(orthanc_study_id) or []:
+            series_uid = series_info.get('MainDicomTags', {}).get('SeriesInstanceUID', '')
+            if not force:
+                entry = self.load(study_uid, series_uid)
+                if entry and entry.instances_count == len(series_info.get('Instances', [])):
+                    continue
+            if self.build_series(study_uid, series_uid, orthanc_api,
+                                 orthanc_study_id=orthanc_study_id,
+                                 orthanc_series_id=series_info.get('ID', '')):
+                built += 1
+        return built
+
+    def schedule_study_build(self, orthanc_study_id, refresh_catalog=True):
+        """백그라운드 스레드에서 build_study 실행 (같은 Study가 이미 진행 중이면 무시)
+
+        refresh_catalog=True면 먼저 카탈로그를 갱신해 신선도 비교 기준(Instance 수)을 맞춥니다.
+        """
+        if not self.enabled or not orthanc_study_id:
+            return False
+        with self._lock:
+            if orthanc_study_id in self._building:
+                return False
+            self._building.add(orthanc_study_id)
+
+        def run():
+            try:
+                if refresh_catalog:
+                    from .study_catalog import StudyCatalogSync
+                    StudyCatalogSync().refresh_study(orthanc_study_id)
+                self.build_study(orthanc_study_id)
+            except Exception as e:
+                logger.error(f"❌ Study 메타데이터 생성 실패 ({orthanc_study_id}): {e}")
+            finally:
+                with self._lock:
+                    self._building.discard(orthanc_study_id)
+                connection.close()
+
+        threading.Thread(target=run, name=f"series-metadata-{orthanc_study_id[:8]}", daemon=True).start()
+        return True
+
+    # ── 정리 ────────────────────────────────────────────
+
+    def remove(self, study_uid, series_uid):
+        paths = self._paths(study_uid, series_uid)
+        if paths is None:
+            return
+        for path in paths[1:]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _iter_meta(self):
+        if not os.path.isdir(self.root):
+            return
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith('.meta.json'):
+                    try:
+                        with open(os.path.join(directory, filename)) as f:
+                            yield json.load(f)
+                    except (OSError, ValueError):
+                        continue
+
+    def purge(self, orthanc_study_id=None):
+        """전체 또는 특정 Study(Orthanc ID)의 저장본 삭제 후 삭제한 Series 수 반환"""
+        removed = 0
+        for meta in list(self._iter_meta()):
+            if orthanc_study_id and meta.get('orthanc_study_id') != orthanc_study_id:
+                continue
+            self.remove(meta.get('study_uid'), meta.get('series_uid'))
+            removed += 1
+        return removed
+
+    def stats(self):
+        entries = list(self._iter_meta())
+        with self._lock:
+            counters = dict(self._counters)
+            building = len(self._building)
+        raw_size = sum(meta.get('raw_size', 0) for meta in entries)
+        size = sum(meta.get('size', 0) for meta in entries)
+        lookups = counters['hits'] + counters['misses'] + counters['stale']
+        return {
+            'enabled': self.enabled,
+            'dir': self.root,
+            'series': len(entries),
+            'bytes': size,
+            'raw_bytes': raw_size,
+            'compression_ratio': round(size / raw_size, 4) if raw_size else None,
+            'building': building,
+            'hit_ratio': round(counters['hits'] / lookups, 4) if lookups else None,
+            **counters,
+        }
+
+
+_store_config = getattr(settings, 'SERIES_METADATA_STORE', {})
+series_metadata_store = SeriesMetadataStore(
+    root=str(_store_config.get('DIR', os.path.join(settings.BASE_DIR, 'cache', 'series_metadata'))),
+    enabled=_store_config.get('ENABLED', True),
+    compress_level=_store_config.get('COMPRESS_LEVEL', 6),
+)
+
+
+@receiver(study_deleted)
+def _purge_deleted_study(sender, orthanc_study_id, **kwargs):
+    series_metadata_store.purge(orthanc_study_id)
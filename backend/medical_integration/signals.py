@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Orthanc 리소스 삭제 알림 (캐시/카탈로그 무효화용)
+# kwargs: orthanc_study_id
+study_deleted = Signal()
+# kwargs: orthanc_patient_id
+patient_deleted = Signal()
@@ -0,0 +1,327 @@
+# backend/medical_integration/study_catalog.py
+
+import logging
+from django.db import transaction
+from .models import CatalogPatient, CatalogStudy, CatalogSeries, CatalogCursor
+from .orthanc_api import OrthancAPI
+from .orthanc_cache import orthanc_metadata_cache
+from .series_metadata import series_metadata_store
+from .thumbnail_store import thumbnail_store
+from .image_pyramid import image_pyramid_store
+from .signals import study_deleted, patient_deleted
+
+logger = logging.getLogger('medical_integration')
+
+CHANGES_CURSOR_NAME = 'orthanc_changes'
+
+PATIENT_CHANGE_TYPES = {'NewPatient', 'StablePatient', 'UpdatedPatient'}
+STUDY_CHANGE_TYPES = {'NewStudy', 'StableStudy', 'UpdatedStudy'}
+SERIES_CHANGE_TYPES = {'NewSeries', 'StableSeries', 'CompletedSeries'}
+# 안정화 시 Series 메타데이터(DICOMweb JSON), 썸네일, CR/DX pyramid를 미리 생성
+STABLE_CHANGE_TYPES = {'StableStudy', 'StableSeries'}
+
+
+def fit_char_fields(model, values):
+    """CharField 값을 모델의 max_length로 자름 (긴 DICOM 태그 값으로 upsert가 실패하지 않도록)"""
+    fitted = dict(values)
+    for field in model._meta.concrete_fields:
+        value = fitted.get(field.name)
+        if isinstance(value, str) and field.max_length and len(value) > field.max_length:
+            fitted[field.name] = value[:field.max_length]
+    return fitted
+
+
+def resolve_orthanc_study_id(study_uid, orthanc_api=None):
+    """StudyInstanceUID → Orthanc Study ID (카탈로그 우선, 없으면 Orthanc 조회 / 못 찾으면 None)"""
+    study_id = CatalogStudy.objects.filter(study_instance_uid=study_uid).values_list('orthanc_id', flat=True).first()
+    if study_id:
+        return study_id
+    found = (orthanc_api or OrthancAPI()).find('Study', {'StudyInstanceUID': study_uid}, expand=False) or []
+    return found[0] if found else None
+
+
+class StudyCatalogSync:
+    """Orthanc /changes 피드를 따라 로컬 Study 카탈로그를 증분 동기화
+
+    변경 로그의 Seq를 CatalogCursor에 저장하므로 워커가 재시작돼도
+    마지막 위치부터 이어서 처리합니다. 같은 배치 안에서 여러 번 바뀐
+    리소스는 한 번만 다시 조회합니다.
+    """
+
+    def __init__(self, orthanc_api=None, batch_size=200, background_builds=True):
+        self.orthanc_api = orthanc_api or OrthancAPI()
+        self.batch_size = batch_size
+        # True면 안정화 Study 후처리를 각 저장소의 백그라운드 스레드에 맡겨 다음 배치를 막지 않음
+        self.background_builds = background_builds
+
+    def get_cursor(self):
+        cursor, _ = CatalogCursor.objects.get_or_create(name=CHANGES_CURSOR_NAME)
+        return cursor
+
+    def sync_changes(self, max_batches=None):
+        """새 변경 사항을 모두 반영하고 처리한 변경 개수를 반환"""
+        cursor = self.get_cursor()
+        processed = 0
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            changes = self.orthanc_api.get(f"changes?since={cursor.last_seq}&limit={self.batch_size}")
+            if not changes:
+                break
+
+            entries = changes.get('Changes', [])
+            # Orthanc 조회를 모두 끝낸 뒤 카탈로그와 커서만 짧은 트랜잭션으로 기록
+            collected = self.collect_changes(entries)
+            with transaction.atomic():
+                self.write_changes(collected)
+                cursor.last_seq = changes.get('Last', cursor.last_seq)
+                cursor.save(update_fields=['last_seq', 'updated_at'])
+
+            processed += len(entries)
+            batches += 1
+            if changes.get('Done', True):
+                break
+
+        if processed:
+            logger.info(f"Study 카탈로그 동기화: {processed}개 변경 반영 (seq={cursor.last_seq})")
+        return processed
+
+    def apply_changes(self, entries):
+        """/changes 항목 목록을 카탈로그에 반영 (Orthanc 조회 후 짧은 트랜잭션에서 기록)"""
+        collected = self.collect_changes(entries)
+        with transaction.atomic():
+            self.write_changes(collected)
+
+    def collect_changes(self, entries):
+        """/changes 항목 반영에 필요한 Orthanc 조회를 모두 수행 (DB 쓰기 없음)
+
+        Returns:
+            dict: removed [(ResourceType, ID)], patients {ID: Patient JSON},
+                  studies {ID: (Study JSON, Series 목록)}, stable_study_ids
+        """
+        removed = []
+        patient_ids = set()
+        study_ids = set()
+        stable_study_ids = set()
+
+        for entry in entries:
+            # 다시 조회하기 전에 메타데이터 캐시부터 무효화
+            orthanc_metadata_cache.invalidate_change(entry)
+            change_type = entry.get('ChangeType')
+            resource_type = entry.get('ResourceType')
+            resource_id = entry.get('ID')
+
+            if change_type == 'Deleted':
+                removed.append((resource_type, resource_id))
+                patient_ids.discard(resource_id)
+                study_ids.discard(resource_id)
+            elif change_type in PATIENT_CHANGE_TYPES:
+                patient_ids.add(resource_id)
+            elif change_type in STUDY_CHANGE_TYPES:
+                study_ids.add(resource_id)
+                if change_type in STABLE_CHANGE_TYPES:
+                    stable_study_ids.add(resource_id)
+            elif change_type in SERIES_CHANGE_TYPES:
+                series_info = self.orthanc_api.get_series(resource_id)
+                if series_info and series_info.get('ParentStudy'):
+                    study_ids.add(series_info['ParentStudy'])
+                    if change_type in STABLE_CHANGE_TYPES:
+                        stable_study_ids.add(series_info['ParentStudy'])
+
+        patients = {}
+        for patient_id in patient_ids:
+            patient_info = self.orthanc_api.get_patient(patient_id)
+            if patient_info:
+                patients[patient_id] = patient_info
+        studies = {}
+        for study_id in study_ids:
+            fetched = self.fetch_study(study_id)
+            if fetched:
+                studies[study_id] = fetched
+
+        return {
+            'removed': removed,
+            'patients': patients,
+            'studies': studies,
+            'stable_study_ids': stable_study_ids & set(studies),
+        }
+
+    def write_changes(self, collected):
+        """collect_changes() 결과를 카탈로그에 기록 (호출하는 쪽의 트랜잭션 안에서 실행)"""
+        for resource_type, resource_id in collected['removed']:
+            self.remove_resource(resource_type, resource_id)
+        for patient_id, patient_info in collected['patients'].items():
+            self._upsert_patient(patient_id, patient_info.get('MainDicomTags', {}),
+                                 patient_info.get('LastUpdate', ''))
+        for study_id, (study_info, series_infos) in collected['studies'].items():
+            self.save_study(study_id, study_info, series_infos)
+
+        # 메타데이터/썸네일/pyramid 생성은 Orthanc 요청이 길어 카탈로그 트랜잭션 커밋 후 수행
+        stable_study_ids = collected['stable_study_ids']
+        if stable_study_ids:
+            transaction.on_commit(lambda: self.build_stable_studies(stable_study_ids))
+
+    def build_stable_studies(self, study_ids):
+        """안정화된 Study의 Series 메타데이터/썸네일/pyramid 생성
+
+        background_builds면 webhook과 같이 schedule_study_build로 넘기고 바로 반환합니다
+        (같은 Study가 이미 진행 중이면 각 저장소가 건너뜀).
+        """
+        if not self.background_builds:
+            if series_metadata_store.enabled:
+                self.build_series_metadata(study_ids)
+            if thumbnail_store.enabled:
+                self.build_thumbnails(study_ids)
+            if image_pyramid_store.enabled:
+                self.build_pyramids(study_ids)
+            return
+        for study_id in study_ids:
+            series_metadata_store.schedule_study_build(study_id, refresh_catalog=False)
+            thumbnail_store.schedule_study_build(study_id)
+            image_pyramid_store.schedule_study_build(study_id)
+
+    def build_series_metadata(self, study_ids):
+        """안정화된 Study의 Series 메타데이터 생성 (최신 저장본은 건너뜀)"""
+        for study_id in study_ids:
+            try:
+                series_metadata_store.build_study(study_id, self.orthanc_api)
+            except Exception as e:
+                logger.error(f"Series 메타데이터 생성 실패 (study: {study_id}): {e}")
+
+    def build_pyramids(self, study_ids):
+        """안정화된 Study의 CR/DX Instance pyramid 생성 (이미 있는 Instance는 건너뜀)"""
+        for study_id in study_ids:
+            try:
+                image_pyramid_store.build_study(study_id, self.orthanc_api)
+            except Exception as e:
+                logger.error(f"pyramid 생성 실패 (study: {study_id}): {e}")
+
+    def build_thumbnails(self, study_ids):
+        """안정화된 Study의 Series 썸네일/미리보기 생성 (이미 있는 Series는 건너뜀)"""
+        for study_id in study_ids:
+            try:
+                thumbnail_store.build_study(study_id, self.orthanc_api)
+            except Exception as e:
+                logger.error(f"썸네일 생성 실패 (study: {study_id}): {e}")
+
+    def rebuild(self):
+        """카탈로그 전체 재구축 (최초 적재용)
+
+        현재 /changes 마지막 위치를 먼저 기록한 뒤 전체 Study를 적재하므로
+        재구축 중에 들어온 변경도 다음 sync_changes에서 반영됩니다.
+        """
+        last = self.orthanc_api.get("changes?last") or {}
+        study_ids = self.orthanc_api.get("studies") or []
+
+        for study_id in study_ids:
+            self.refresh_study(study_id)
+
+        cursor = self.get_cursor()
+        cursor.last_seq = last.get('Last', cursor.last_seq)
+        cursor.save(update_fields=['last_seq', 'updated_at'])
+        logger.info(f"Study 카탈로그 재구축 완료: {len(study_ids)}개 Study")
+        return len(study_ids)
+
+    def refresh_patient(self, orthanc_patient_id):
+        patient_info = self.orthanc_api.get_patient(orthanc_patient_id)
+        if not patient_info:
+            return None
+        return self._upsert_patient(orthanc_patient_id, patient_info.get('MainDicomTags', {}),
+                                    patient_info.get('LastUpdate', ''))
+
+    def refresh_study(self, orthanc_study_id):
+        """Study와 하위 Series를 다시 조회해 카탈로그에 저장 (요청 2회)"""
+        fetched = self.fetch_study(orthanc_study_id)
+        if not fetched:
+            return None
+        return self.save_study(orthanc_study_id, *fetched)
+
+    def fetch_study(self, orthanc_study_id):
+        """(Study JSON, Series 목록) 조회 (Study가 없으면 None)"""
+        study_info = self.orthanc_api.get_study(orthanc_study_id)
+        if not study_info:
+            return None
+        return study_info, self.orthanc_api.get_study_series(orthanc_study_id) or []
+
+    def save_study(self, orthanc_study_id, study_info, series_infos):
+        """조회한 Study/Series를 카탈로그에 저장 (Orthanc 요청 없음)"""
+        main_tags = study_info.get('MainDicomTags', {})
+        patient_tags = study_info.get('PatientMainDicomTags', {})
+        modalities = []
+        for series_info in series_infos:
+            modality = series_info.get('MainDicomTags', {}).get('Modality', '')
+            if modality and modality not in modalities:
+                modalities.append(modality)
+
+        with transaction.atomic():
+            catalog_patient = None
+            if study_info.get('ParentPatient'):
+                catalog_patient = self._upsert_patient(study_info['ParentPatient'], patient_tags)
+
+            study, _ = CatalogStudy.objects.update_or_create(
+                orthanc_id=orthanc_study_id,
+                defaults=fit_char_fields(CatalogStudy, {
+                    'catalog_patient': catalog_patient,
+                    'study_instance_uid': main_tags.get('StudyInstanceUID', ''),
+                    'patient_id': patient_tags.get('PatientID', ''),
+                    'patient_name': patient_tags.get('PatientName', ''),
+                    'patient_birth_date': patient_tags.get('PatientBirthDate', ''),
+                    'patient_sex': patient_tags.get('PatientSex', ''),
+                    'study_date': main_tags.get('StudyDate', ''),
+                    'study_time': main_tags.get('StudyTime', ''),
+                    'study_id': main_tags.get('StudyID', ''),
+                    'accession_number': main_tags.get('AccessionNumber', ''),
+                    'study_description': main_tags.get('StudyDescription', ''),
+                    'referring_physician_name': main_tags.get('ReferringPhysicianName', ''),
+                    'modality': modalities[0] if modalities else '',
+                    'modalities_in_study': '\\'.join(modalities),
+                    'series_count': len(series_infos),
+                    'instances_count': sum(len(s.get('Instances', [])) for s in series_infos),
+                    'is_stable': study_info.get('IsStable', False),
+                    'last_update': study_info.get('LastUpdate', ''),
+                })
+            )
+
+            for series_info in series_infos:
+                series_tags = series_info.get('MainDicomTags', {})
+                CatalogSeries.objects.update_or_create(
+                    orthanc_id=series_info.get('ID'),
+                    defaults=fit_char_fields(CatalogSeries, {
+                        'study': study,
+                        'series_instance_uid': series_tags.get('SeriesInstanceUID', ''),
+                        'modality': series_tags.get('Modality', ''),
+                        'series_number': series_tags.get('SeriesNumber', ''),
+                        'series_description': series_tags.get('SeriesDescription', ''),
+                        'body_part_examined': series_tags.get('BodyPartExamined', ''),
+                        'instances_count': len(series_info.get('Instances', [])),
+                        'is_stable': series_info.get('IsStable', False),
+                    })
+                )
+            study.series.exclude(orthanc_id__in=[s.get('ID') for s in series_infos]).delete()
+
+        return study
+
+    def remove_resource(self, resource_type, orthanc_id):
+        if resource_type == 'Patient':
+            CatalogPatient.objects.filter(orthanc_id=orthanc_id).delete()
+            patient_deleted.send(sender=self.__class__, orthanc_patient_id=orthanc_id)
+        elif resource_type == 'Study':
+            CatalogStudy.objects.filter(orthanc_id=orthanc_id).delete()
+            study_deleted.send(sender=self.__class__, orthanc_study_id=orthanc_id)
+        elif resource_type == 'Series':
+            CatalogSeries.objects.filter(orthanc_id=orthanc_id).delete()
+
+    def _upsert_patient(self, orthanc_patient_id, patient_tags, last_update=None):
+        defaults = {
+            'patient_id': patient_tags.get('PatientID', ''),
+            'patient_name': patient_tags.get('PatientName', ''),
+            'patient_birth_date': patient_tags.get('PatientBirthDate', ''),
+            'patient_sex': patient_tags.get('PatientSex', ''),
+        }
+        if last_update is not None:
+            defaults['last_update'] = last_update
+        patient, _ = CatalogPatient.objects.update_or_create(
+            orthanc_id=orthanc_patient_id,
+            defaults=fit_char_fields(CatalogPatient, defaults)
+        )
+        return patient
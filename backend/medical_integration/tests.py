@@ -0,0 +1,825 @@
+import asyncio
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, RequestFactory
+
+from .models import CatalogCursor, CatalogSeries, CatalogStudy
+from .ohif_proxy_views import catalog_studies_page, requested_range, wildcard_q
+from .orthanc_api import OrthancAPI
+from .orthanc_cache import OrthancMetadataCache
+from .proxy_cache import DiskResponseCache
+from .proxy_singleflight import AsyncSingleFlight, FlightResult, SingleFlight
+from .study_catalog import StudyCatalogSync
+from .proxy_http import (
+    RangeNotSatisfiable,
+    aslice_chunks,
+    etag_matches,
+    make_etag,
+    parse_range,
+    slice_chunks,
+)
+
+
+class TrackedChunks:
+    """소비한 청크 수와 close 여부를 기록하는 청크 iterator"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = next(self._chunks)
+        self.consumed += 1
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+TOTAL = 1000
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_satisfiable_or_ignored(self):
+        cases = [
+            # (Range 헤더, 본문 길이, 기대값)
+            (None, TOTAL, None),
+            ('', TOTAL, None),
+            ('bytes=0-99', TOTAL, (0, 99)),
+            ('bytes=0-0', TOTAL, (0, 0)),
+            (' bytes=10-19 ', TOTAL, (10, 19)),
+            ('bytes=500-', TOTAL, (500, 999)),              # open-ended
+            ('bytes=990-5000', TOTAL, (990, 999)),          # end가 길이를 넘으면 잘라냄
+            ('bytes=999-999', TOTAL, (999, 999)),
+            ('bytes=-100', TOTAL, (900, 999)),              # suffix
+            ('bytes=-1', TOTAL, (999, 999)),
+            ('bytes=-5000', TOTAL, (0, 999)),               # 길이보다 긴 suffix는 전체
+            ('bytes=0-1,5-6', TOTAL, None),                 # multi-range는 무시 (200 전체 응답)
+            ('bytes=0-99, 200-299', TOTAL, None),
+            ('items=0-99', TOTAL, None),
+            ('bytes=-', TOTAL, None),
+            ('bytes=abc-def', TOTAL, None),
+            ('bytes=50-10', TOTAL, None),                   # end < start는 무시
+            ('bytes=0-99', None, None),                     # 길이를 모르면 무시
+        ]
+        for header, total, expected in cases:
+            with self.subTest(header=header, total=total):
+                self.assertEqual(parse_range(header, total), expected)
+
+    def test_not_satisfiable(self):
+        cases = [
+            ('bytes=1000-', TOTAL),
+            ('bytes=1000-1001', TOTAL),
+            ('bytes=5000-6000', TOTAL),
+            ('bytes=-0', TOTAL),
+            ('bytes=0-', 0),
+            ('bytes=-10', 0),
+        ]
+        for header, total in cases:
+            with self.subTest(header=header, total=total):
+                with self.assertRaises(RangeNotSatisfiable):
+                    parse_range(header, total)
+
+
+class SliceChunksTests(SimpleTestCase):
+    CHUNKS = [b'abc', b'def', b'ghi']
+
+    def test_slices(self):
+        cases = [
+            ((0, 8), b'abcdefghi'),
+            ((0, 0), b'a'),
+            ((2, 4), b'cde'),
+            ((3, 5), b'def'),
+            ((1, 7), b'bcdefgh'),
+            ((8, 8), b'i'),
+            ((6, 100), b'ghi'),
+        ]
+        for (start, end), expected in cases:
+            with self.subTest(start=start, end=end):
+                self.assertEqual(b''.join(slice_chunks(iter(self.CHUNKS), start, end)), expected)
+
+    def test_stops_reading_after_end_and_closes_source(self):
+        chunks = TrackedChunks(self.CHUNKS)
+        self.assertEqual(b''.join(slice_chunks(chunks, 1, 4)), b'bcde')
+        self.assertEqual(chunks.consumed, 2)
+        self.assertTrue(chunks.closed)
+
+    def test_closes_source_when_client_disconnects(self):
+        chunks = TrackedChunks(self.CHUNKS)
+        sliced = slice_chunks(chunks, 0, 8)
+        next(sliced)
+        sliced.close()
+        self.assertTrue(chunks.closed)
+
+    def test_async_slices_match_sync(self):
+        async def collect(start, end):
+            async def source():
+                for chunk in self.CHUNKS:
+                    yield chunk
+            return b''.join([chunk async for chunk in aslice_chunks(source(), start, end)])
+
+        for start, end in [(0, 8), (2, 4), (8, 8), (4, 100)]:
+            with self.subTest(start=start, end=end):
+                expected = b''.join(slice_chunks(iter(self.CHUNKS), start, end))
+                self.assertEqual(async_to_sync(collect)(start, end), expected)
+
+
+class ETagTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def etag(self, path='/dicom-web/studies/1/series/2/instances/3', **extra):
+        return make_etag('3', self.factory.get(path, **extra))
+
+    def test_make_etag_is_strong_and_stable(self):
+        etag = self.etag(HTTP_ACCEPT='application/dicom')
+        self.assertRegex(etag, r'^"[0-9a-f]{40}"$')
+        self.assertEqual(etag, self.etag(HTTP_ACCEPT='application/dicom'))
+
+    def test_make_etag_varies_by_representation(self):
+        base = self.etag(HTTP_ACCEPT='application/dicom')
+        variants = {
+            'accept': self.etag(HTTP_ACCEPT='image/jpeg'),
+            'query': self.etag('/dicom-web/studies/1/series/2/instances/3?quality=90',
+                               HTTP_ACCEPT='application/dicom'),
+            'path': self.etag('/dicom-web/studies/1/series/2/instances/3/frames/1',
+                              HTTP_ACCEPT='application/dicom'),
+            'gzip': self.etag(HTTP_ACCEPT='application/dicom', HTTP_ACCEPT_ENCODING='gzip, br'),
+        }
+        for name, etag in variants.items():
+            with self.subTest(variant=name):
+                self.assertNotEqual(etag, base)
+        # gzip 이외의 Accept-Encoding 차이는 같은 표현
+        self.assertEqual(base, self.etag(HTTP_ACCEPT='application/dicom', HTTP_ACCEPT_ENCODING='br'))
+
+    def test_etag_matches(self):
+        etag = '"abc"'
+        cases = [
+            (None, False),
+            ('', False),
+            ('*', True),
+            (' * ', True),
+            ('"abc"', True),
+            ('W/"abc"', True),                  # If-None-Match는 weak 비교
+            ('"xyz", "abc"', True),
+            ('"xyz",W/"abc"', True),
+            ('"xyz"', False),
+            ('abc', False),                     # 따옴표 없는 값은 다른 태그
+            ('"abc-gzip"', False),
+        ]
+        for header, expected in cases:
+            with self.subTest(if_none_match=header):
+                self.assertEqual(etag_matches(header, etag), expected)
+
+
+class IfRangeTests(SimpleTestCase):
+    ETAG = '"abc"'
+
+    def test_requested_range(self):
+        factory = RequestFactory()
+        cases = [
+            ({}, None),
+            ({'HTTP_RANGE': 'bytes=0-9'}, 'bytes=0-9'),
+            ({'HTTP_RANGE': 'bytes=0-9', 'HTTP_IF_RANGE': '"abc"'}, 'bytes=0-9'),
+            ({'HTTP_RANGE': 'bytes=0-9', 'HTTP_IF_RANGE': '"xyz"'}, None),     # 바뀐 표현 → 전체 응답
+            ({'HTTP_RANGE': 'bytes=0-9', 'HTTP_IF_RANGE': 'W/"abc"'}, None),   # If-Range는 strong 비교만
+            ({'HTTP_IF_RANGE': '"abc"'}, None),
+        ]
+        for meta, expected in cases:
+            with self.subTest(**meta):
+                self.assertEqual(requested_range(factory.get('/', **meta), self.ETAG), expected)
+        self.assertIsNone(requested_range(None, self.ETAG))
+
+
+class DiskResponseCacheTests(SimpleTestCase):
+    HEADERS = {'Content-Type': 'application/dicom', 'X-Other': 'dropped'}
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='proxy-cache-test-')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.cache = DiskResponseCache(self.root, max_bytes=1000)
+        self.cache.stats()  # 전체 크기를 미리 집계해 두어 백그라운드 집계 스레드가 뜨지 않도록
+
+    def key(self, name):
+        return DiskResponseCache.make_key(f"instances/{name}/file")
+
+    def store(self, name, body, study_uid='', chunks=None):
+        return b''.join(self.cache.store(self.key(name), iter(chunks or [body]), self.HEADERS,
+                                         study_uid=study_uid, upstream_path=f"instances/{name}/file"))
+
+    def files(self, suffix=''):
+        return sorted(
+            filename
+            for _, _, filenames in os.walk(self.root)
+            for filename in filenames
+            if filename.endswith(suffix)
+        )
+
+    def set_last_used(self, name, timestamp):
+        _, body_path, meta_path = self.cache._paths(self.key(name))
+        for path in (body_path, meta_path):
+            os.utime(path, (timestamp, timestamp))
+
+    def read(self, name):
+        entry = self.cache.get(self.key(name))
+        if entry is None:
+            return None
+        with entry.open() as body:
+            return body.read()
+
+    def test_store_passes_chunks_through_and_hit_returns_body(self):
+        self.assertEqual(self.store('a', None, chunks=[b'ab', b'cd']), b'abcd')
+        entry = self.cache.get(self.key('a'))
+        self.assertEqual(entry.size, 4)
+        self.assertEqual(entry.headers, {'Content-Type': 'application/dicom'})
+        with entry.open() as body:
+            self.assertEqual(body.read(), b'abcd')
+        self.assertIsNone(self.cache.get(self.key('missing')))
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['stores']), (1, 1, 1))
+
+    def test_entry_is_invisible_until_stream_completes(self):
+        stream = self.cache.store(self.key('a'), iter([b'x' * 10, b'y' * 10]), self.HEADERS)
+        next(stream)
+        self.assertIsNone(self.cache.get(self.key('a')))
+        self.assertEqual(self.files('.json'), [])
+        self.assertEqual(len(self.files('.tmp')), 1)
+        list(stream)
+        self.assertEqual(self.read('a'), b'x' * 10 + b'y' * 10)
+        self.assertEqual(self.files('.tmp'), [])
+
+    def test_interrupted_stream_leaves_no_files(self):
+        stream = self.cache.store(self.key('a'), iter([b'x' * 10, b'y' * 10]), self.HEADERS)
+        next(stream)
+        stream.close()  # 클라이언트 연결 끊김
+        self.assertIsNone(self.cache.get(self.key('a')))
+        self.assertEqual(self.files(), [])
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = DiskResponseCache(self.root, max_bytes=1000, max_entry_bytes=15)
+        body = b''.join(cache.store(self.key('a'), iter([b'x' * 10, b'y' * 10]), self.HEADERS))
+        self.assertEqual(body, b'x' * 10 + b'y' * 10)
+        self.assertIsNone(cache.get(self.key('a')))
+        self.assertEqual(self.files(), [])
+
+    def test_failed_rename_leaves_no_files(self):
+        for failing_call in (1, 2):
+            with self.subTest(failing_call=failing_call):
+                real_replace = os.replace
+                calls = []
+
+                def replace(src, dst):
+                    calls.append(dst)
+                    if len(calls) == failing_call:
+                        raise OSError('disk full')
+                    return real_replace(src, dst)
+
+                with mock.patch('medical_integration.proxy_cache.os.replace', side_effect=replace), \
+                        self.assertLogs('medical_integration', 'WARNING'):
+                    self.assertEqual(self.store('a', b'body'), b'body')
+                self.assertIsNone(self.cache.get(self.key('a')))
+                self.assertEqual(self.files(), [])
+
+    def test_overwrite_replaces_body_atomically(self):
+        self.store('a', b'old')
+        entry = self.cache.get(self.key('a'))
+        self.store('a', b'new-body')
+        with entry.open() as body:
+            self.assertEqual(body.read(), b'old')  # 이미 연 항목은 이전 본문 그대로
+        self.assertEqual(self.read('a'), b'new-body')
+
+    def test_evicts_least_recently_used_down_to_ninety_percent(self):
+        past = time.time() - 1000
+        for i in range(10):
+            self.store(f"e{i}", bytes(100))
+            self.set_last_used(f"e{i}", past + i)
+        self.assertEqual(self.cache.stats()['bytes'], 1000)
+
+        self.assertIsNotNone(self.read('e0'))  # 히트로 가장 최근 사용이 됨
+        self.store('e10', bytes(100))  # 1100 > 1000 → 900까지 정리
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['bytes'], 900)
+        self.assertEqual(stats['entries'], 9)
+        self.assertEqual(stats['evictions'], 2)
+        for name in ('e1', 'e2'):
+            self.assertFalse(self.cache.contains(self.key(name)), name)
+        for name in ['e0', 'e10'] + [f"e{i}" for i in range(3, 10)]:
+            self.assertTrue(self.cache.contains(self.key(name)), name)
+
+    def test_purge_by_study(self):
+        self.store('a1', b'1' * 10, study_uid='1.2.3')
+        self.store('a2', b'2' * 20, study_uid='1.2.3')
+        self.store('b1', b'3' * 30, study_uid='9.9.9')
+
+        self.assertEqual(self.cache.purge('1.2.3'), (2, 30))
+        self.assertIsNone(self.read('a1'))
+        self.assertIsNone(self.read('a2'))
+        self.assertEqual(self.read('b1'), b'3' * 30)
+
+        self.assertEqual(self.cache.purge('unknown'), (0, 0))
+        self.assertEqual(self.cache.purge(), (1, 30))
+        self.assertEqual(self.files(), [])
+
+    def test_vanished_body_is_a_miss(self):
+        self.store('a', b'body')
+        _, body_path, meta_path = self.cache._paths(self.key('a'))
+        os.unlink(body_path)
+
+        self.assertIsNone(self.cache.get(self.key('a')))
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (0, 1))
+        self.assertFalse(os.path.exists(meta_path))  # 남은 메타 파일도 정리
+
+    def test_entry_survives_eviction_after_lookup(self):
+        self.store('a', b'body')
+        entry = self.cache.get(self.key('a'))
+        self.cache.purge()
+        with entry.open() as body:
+            self.assertEqual(body.read(), b'body')
+
+    def test_first_store_seeds_total_in_background(self):
+        cache = DiskResponseCache(self.root, max_bytes=1000)
+        scanning = threading.Event()
+        release = threading.Event()
+        real_scan = cache._scan
+
+        def slow_scan():
+            scanning.set()
+            release.wait(5)
+            return real_scan()
+
+        with mock.patch.object(cache, '_scan', side_effect=slow_scan):
+            # 집계가 끝나지 않아도 저장 스트림은 바로 끝남
+            self.assertEqual(b''.join(cache.store(self.key('a'), iter([b'ab']), self.HEADERS)), b'ab')
+            self.assertTrue(scanning.wait(5))
+            release.set()
+            cache._seeder.join(5)
+        self.assertEqual(cache._total_bytes, 2)
+
+    def test_async_store_commits_off_the_event_loop(self):
+        commit_threads = []
+        real_commit = self.cache._commit
+
+        def commit(*args):
+            commit_threads.append(threading.get_ident())
+            return real_commit(*args)
+
+        async def chunks():
+            yield b'ab'
+            yield b'cd'
+
+        async def consume():
+            body = b''.join([chunk async for chunk in self.cache.astore(self.key('a'), chunks(), self.HEADERS)])
+            return body, threading.get_ident()
+
+        with mock.patch.object(self.cache, '_commit', side_effect=commit):
+            body, loop_thread = async_to_sync(consume)()
+        self.assertEqual(body, b'abcd')
+        self.assertEqual(len(commit_threads), 1)
+        self.assertNotEqual(commit_threads[0], loop_thread)
+        self.assertEqual(self.read('a'), b'abcd')
+
+    def test_disabled_cache_passes_through(self):
+        cache = DiskResponseCache(self.root, max_bytes=1000, enabled=False)
+        self.assertEqual(b''.join(cache.store(self.key('a'), iter([b'ab']), self.HEADERS)), b'ab')
+        self.assertIsNone(cache.get(self.key('a')))
+        self.assertEqual(self.files(), [])
+
+
+class FailingChunks(TrackedChunks):
+    """몇 개의 청크 뒤 upstream 오류를 내는 청크 iterator"""
+
+    def __init__(self, chunks, fail_after):
+        super().__init__(chunks)
+        self.fail_after = fail_after
+
+    def __next__(self):
+        if self.consumed == self.fail_after:
+            raise ConnectionError('upstream reset')
+        return super().__next__()
+
+
+class SingleFlightTests(SimpleTestCase):
+    HEADERS = {'Content-Type': 'application/dicom+json', 'X-Proxy-Cache': 'MISS'}
+
+    def setUp(self):
+        self.singleflight = SingleFlight(max_buffer_bytes=8, wait_timeout=5)
+
+    def tee(self, flight, chunks, cached=False):
+        return self.singleflight.tee(flight, chunks, 200, self.HEADERS, 'application/dicom+json', cached)
+
+    def start_followers(self, flight, count=3, timeout=5):
+        """count개 팔로워 스레드가 flight 결과를 기다림 (결과는 results에 순서 무관하게 모임)"""
+        results = []
+        lock = threading.Lock()
+
+        def follower():
+            result = flight.wait(timeout)
+            with lock:
+                results.append(result)
+
+        threads = [threading.Thread(target=follower) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    @staticmethod
+    def join_all(threads):
+        for thread in threads:
+            thread.join(5)
+            assert not thread.is_alive(), 'follower did not wake up'
+
+    def test_join_elects_one_leader_per_key(self):
+        flight, leader = self.singleflight.join('a')
+        self.assertTrue(leader)
+        self.assertEqual(self.singleflight.join('a'), (flight, False))
+        other, other_leader = self.singleflight.join('b')
+        self.assertTrue(other_leader)
+        self.assertIsNot(other, flight)
+        self.assertEqual(self.singleflight.stats()['in_flight'], 2)
+
+    def test_disabled_or_keyless_requests_always_lead(self):
+        self.assertEqual(self.singleflight.join(None), (None, True))
+        disabled = SingleFlight(max_buffer_bytes=8, wait_timeout=5, enabled=False)
+        self.assertEqual(disabled.join('a'), (None, True))
+        self.singleflight.publish(None)  # 무시
+
+    def test_publish_once(self):
+        flight, _ = self.singleflight.join('a')
+        first = FlightResult(body=b'first')
+        self.singleflight.publish(flight, first)
+        self.singleflight.publish(flight, FlightResult(body=b'second'))
+        self.assertIs(flight.wait(0), first)
+
+        # 끝난 flight 이후의 요청은 새 리더가 됨 (이전 flight의 publish는 영향 없음)
+        new_flight, leader = self.singleflight.join('a')
+        self.assertTrue(leader)
+        self.singleflight.publish(flight, None)
+        self.assertFalse(new_flight.done.is_set())
+
+    def test_followers_receive_leader_body(self):
+        flight, _ = self.singleflight.join('a')
+        threads, results = self.start_followers(flight)
+
+        self.assertEqual(b''.join(self.tee(flight, TrackedChunks([b'ab', b'cd']))), b'abcd')
+        self.join_all(threads)
+
+        self.assertEqual(len(results), 3)
+        for result in results:
+            self.assertEqual(result.body, b'abcd')
+            self.assertNotIn('X-Proxy-Cache', result.headers)
+        response = results[0].to_response()
+        self.assertEqual(response.content, b'abcd')
+        self.assertEqual(response['Content-Length'], '4')
+        self.assertEqual(response['X-Proxy-Cache'], 'COALESCED')
+        self.assertIsNone(self.singleflight.join('a')[0].result)  # 새 flight
+
+    def test_cached_leader_publishes_cache_marker(self):
+        flight, _ = self.singleflight.join('a')
+        list(self.tee(flight, iter([b'x' * 100]), cached=True))  # 버퍼 한도와 무관
+        result = flight.wait(0)
+        self.assertTrue(result.cached)
+        self.assertIsNone(result.body)
+
+    def test_buffer_overflow_publishes_none(self):
+        flight, _ = self.singleflight.join('a')
+        threads, results = self.start_followers(flight)
+
+        self.assertEqual(b''.join(self.tee(flight, iter([b'12345', b'6789']))), b'123456789')
+        self.join_all(threads)
+        self.assertEqual(results, [None, None, None])
+
+    def test_leader_failure_wakes_followers_with_none(self):
+        flight, _ = self.singleflight.join('a')
+        threads, results = self.start_followers(flight)
+        chunks = FailingChunks([b'ab', b'cd'], fail_after=1)
+
+        tee = self.tee(flight, chunks)
+        self.assertEqual(next(tee), b'ab')
+        with self.assertRaises(ConnectionError):
+            next(tee)
+        self.join_all(threads)
+
+        self.assertEqual(results, [None, None, None])
+        self.assertTrue(chunks.closed)
+
+    def test_close_before_iterate_wakes_followers(self):
+        flight, _ = self.singleflight.join('a')
+        threads, results = self.start_followers(flight)
+        chunks = TrackedChunks([b'ab'])
+
+        started = time.monotonic()
+        self.tee(flight, chunks).close()  # 응답 전송 전에 종료
+        self.join_all(threads)
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(results, [None, None, None])
+        self.assertTrue(chunks.closed)
+
+    def test_slow_leader_does_not_hold_late_followers(self):
+        flight, _ = self.singleflight.join('a')
+        flight.started -= 10  # 리더 클라이언트가 느려 10초째 응답 중
+        started = time.monotonic()
+        self.assertIsNone(flight.wait(5))  # 리더 시작 기준으로 이미 timeout → 바로 각자 요청
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_record_follower_counters(self):
+        flight, _ = self.singleflight.join('a')
+        self.assertIsNone(flight.wait(0.01))  # 리더가 끝나지 않음
+        self.singleflight.record_follower(flight, False)
+
+        self.singleflight.publish(flight, None)
+        self.singleflight.record_follower(flight, False)
+        self.singleflight.record_follower(flight, True)
+        self.singleflight.record_follower(flight, True)
+
+        stats = self.singleflight.stats()
+        self.assertEqual(
+            (stats['leaders'], stats['coalesced'], stats['fallbacks'], stats['timeouts']),
+            (1, 2, 1, 1),
+        )
+        self.assertEqual(stats['saved_upstream_calls'], 2)
+        self.assertEqual(stats['saved_ratio'], round(2 / 3, 4))
+
+
+class AsyncSingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.singleflight = AsyncSingleFlight(max_buffer_bytes=8, wait_timeout=5)
+
+    @staticmethod
+    async def source(chunks):
+        for chunk in chunks:
+            yield chunk
+
+    def test_followers_receive_leader_body(self):
+        async def scenario():
+            flight, leader = self.singleflight.join('a')
+            followers = [asyncio.ensure_future(flight.wait(5)) for _ in range(3)]
+            tee = self.singleflight.tee(flight, self.source([b'ab', b'cd']), 200, {}, 'text/plain', False)
+            body = b''.join([chunk async for chunk in tee])
+            return leader, body, await asyncio.gather(*followers)
+
+        leader, body, results = async_to_sync(scenario)()
+        self.assertTrue(leader)
+        self.assertEqual(body, b'abcd')
+        self.assertEqual([result.body for result in results], [b'abcd'] * 3)
+
+    def test_sync_close_before_iterate_wakes_followers(self):
+        async def scenario():
+            flight, _ = self.singleflight.join('a')
+            follower = asyncio.ensure_future(flight.wait(5))
+            tee = self.singleflight.tee(flight, self.source([b'ab']), 200, {}, 'text/plain', False)
+            tee.close()  # Django가 응답 시작 전에 sync close()만 호출한 경우
+            return await asyncio.wait_for(follower, 1)
+
+        self.assertIsNone(async_to_sync(scenario)())
+
+    def test_wait_timeout_returns_none(self):
+        async def scenario():
+            flight, _ = self.singleflight.join('a')
+            result = await flight.wait(0.01)
+            self.singleflight.record_follower(flight, result is not None)
+            return result
+
+        self.assertIsNone(async_to_sync(scenario)())
+        self.assertEqual(self.singleflight.stats()['timeouts'], 1)
+
+
+    def test_slow_leader_does_not_hold_late_followers(self):
+        async def scenario():
+            flight, _ = self.singleflight.join('a')
+            flight.started -= 10
+            return await asyncio.wait_for(flight.wait(5), 1)
+
+        self.assertIsNone(async_to_sync(scenario)())
+
+
+class WildcardQTests(SimpleTestCase):
+    """DICOM 와일드카드 → Q 조건 (앞쪽 와일드카드가 없으면 접두어 조회)"""
+
+    def test_conditions(self):
+        cases = [
+            ('KIM', [('patient_name__iexact', 'KIM')]),
+            ('KIM*', [('patient_name__istartswith', 'KIM')]),
+            ('*KIM*', [('patient_name__icontains', 'KIM')]),
+            ('*SU', [('patient_name__iendswith', 'SU')]),
+            ('*K?M*', [('patient_name__iregex', '^.*K.M.*$')]),
+            ('K?M*', [('patient_name__istartswith', 'K'), ('patient_name__iregex', '^K.M.*$')]),
+            ('*', []),
+        ]
+        for value, expected in cases:
+            with self.subTest(value=value):
+                self.assertEqual(wildcard_q('patient_name', value).children, expected)
+
+
+class CatalogStudiesPageTests(TestCase):
+    """로컬 카탈로그 Study 목록 조회"""
+
+    @classmethod
+    def setUpTestData(cls):
+        studies = [
+            ('KIM^MINSU', '20240103', 'CT', ['CT']),
+            ('KIM^JIWON', '20240102', 'MR', ['MR', 'CT']),
+            ('LEE^SORA', '20240101', 'CR', ['CR']),
+        ]
+        for index, (name, study_date, modality, series_modalities) in enumerate(studies):
+            study = CatalogStudy.objects.create(
+                orthanc_id=f'study-{index}', study_instance_uid=f'1.2.{index}',
+                patient_name=name, study_date=study_date, modality=modality,
+            )
+            for number, series_modality in enumerate(series_modalities):
+                CatalogSeries.objects.create(
+                    orthanc_id=f'series-{index}-{number}', study=study,
+                    series_instance_uid=f'1.2.{index}.{number}', modality=series_modality,
+                )
+
+    def uids(self, studies):
+        return [study['0020000D']['Value'][0] for study in studies]
+
+    def test_filters(self):
+        cases = [
+            ({'PatientName': 'kim*'}, ['1.2.0', '1.2.1']),
+            ({'PatientName': '*LEE*'}, ['1.2.2']),
+            ({'PatientName': '*JIWON'}, ['1.2.1']),
+            ({'ModalitiesInStudy': 'CT'}, ['1.2.0', '1.2.1']),
+            ({'ModalitiesInStudy': 'MR\\CR'}, ['1.2.1', '1.2.2']),
+            ({'StudyDate': '20240102-'}, ['1.2.0', '1.2.1']),
+        ]
+        for filters, expected in cases:
+            with self.subTest(filters=filters):
+                studies, _, _, _ = catalog_studies_page(filters, 10, 0)
+                self.assertEqual(self.uids(studies), expected)
+
+    def test_count_only_when_requested(self):
+        studies, total, capped, has_more = catalog_studies_page({}, 2, 0)
+        self.assertEqual(self.uids(studies), ['1.2.0', '1.2.1'])
+        self.assertIsNone(total)
+        self.assertTrue(has_more)
+
+        _, total, capped, has_more = catalog_studies_page({}, 2, 2, with_count=True)
+        self.assertEqual(total, 3)
+        self.assertFalse(capped)
+        self.assertFalse(has_more)
+
+    def test_count_cap(self):
+        with mock.patch('medical_integration.ohif_proxy_views.OHIF_STUDIES_COUNT_CAP', 2):
+            _, total, capped, _ = catalog_studies_page({}, 1, 0, with_count=True)
+        self.assertEqual(total, 2)
+        self.assertTrue(capped)
+
+
+class StudyCatalogSyncTests(TestCase):
+    """Orthanc 응답 → 카탈로그 upsert"""
+
+    def test_long_tag_values_are_truncated(self):
+        orthanc_api = mock.Mock()
+        orthanc_api.get_study.return_value = {
+            'ParentPatient': 'patient-1',
+            'MainDicomTags': {'StudyInstanceUID': '1.2.3', 'StudyDate': '20240101' * 2,
+                              'StudyTime': '1' * 40, 'AccessionNumber': 'A' * 80},
+            'PatientMainDicomTags': {'PatientName': 'N' * 300, 'PatientBirthDate': '19800101XX'},
+        }
+        orthanc_api.get_study_series.return_value = [
+            {'ID': 'series-1', 'MainDicomTags': {'Modality': 'CT', 'BodyPartExamined': 'B' * 80}},
+        ]
+
+        study = StudyCatalogSync(orthanc_api=orthanc_api).refresh_study('study-1')
+
+        study.refresh_from_db()
+        self.assertEqual(len(study.patient_name), 255)
+        self.assertEqual(study.study_date, '20240101')
+        self.assertEqual(len(study.study_time), 32)
+        self.assertEqual(len(study.accession_number), 64)
+        self.assertEqual(study.catalog_patient.patient_birth_date, '19800101')
+        self.assertEqual(len(study.series.get().body_part_examined), 64)
+
+
+    def test_orthanc_requests_happen_outside_the_write_transaction(self):
+        savepoint_depths = []
+        baseline = len(connection.savepoint_ids)
+
+        def get_study(study_id):
+            savepoint_depths.append(len(connection.savepoint_ids) - baseline)
+            return {'MainDicomTags': {'StudyInstanceUID': '1.2.3'}}
+
+        orthanc_api = mock.Mock()
+        orthanc_api.get.return_value = {
+            'Changes': [{'ChangeType': 'NewStudy', 'ResourceType': 'Study', 'ID': 'study-1'}],
+            'Last': 7, 'Done': True,
+        }
+        orthanc_api.get_study.side_effect = get_study
+        orthanc_api.get_study_series.return_value = []
+
+        StudyCatalogSync(orthanc_api=orthanc_api).sync_changes()
+
+        self.assertEqual(savepoint_depths, [0])
+        self.assertTrue(CatalogStudy.objects.filter(orthanc_id='study-1').exists())
+        self.assertEqual(CatalogCursor.objects.get().last_seq, 7)
+
+    def test_stable_study_builds_are_scheduled_after_commit(self):
+        orthanc_api = mock.Mock()
+        orthanc_api.get_study.return_value = {'MainDicomTags': {'StudyInstanceUID': '1.2.3'}}
+        orthanc_api.get_study_series.return_value = []
+        stores = ('series_metadata_store', 'thumbnail_store', 'image_pyramid_store')
+        patches = [mock.patch(f'medical_integration.study_catalog.{name}') for name in stores]
+        mocks = [patcher.start() for patcher in patches]
+        for patcher in patches:
+            self.addCleanup(patcher.stop)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            StudyCatalogSync(orthanc_api=orthanc_api).apply_changes(
+                [{'ChangeType': 'StableStudy', 'ResourceType': 'Study', 'ID': 'study-1'}])
+            self.assertTrue(all(not store.schedule_study_build.called for store in mocks))
+
+        self.assertEqual(len(callbacks), 1)
+        for store in mocks:
+            store.schedule_study_build.assert_called_once()
+            self.assertEqual(store.schedule_study_build.call_args.args, ('study-1',))
+            store.build_study.assert_not_called()
+
+class StudyCommandTests(TestCase):
+    """관리 명령 --study 는 모두 StudyInstanceUID 를 받음"""
+
+    def test_study_uid_is_resolved_to_orthanc_id(self):
+        CatalogStudy.objects.create(orthanc_id='study-1', study_instance_uid='1.2.3')
+        for command, store in (('thumbnails', 'thumbnail_store'), ('image_pyramids', 'image_pyramid_store'),
+                               ('series_metadata', 'series_metadata_store')):
+            with self.subTest(command=command), \
+                    mock.patch(f'medical_integration.management.commands.{command}.{store}') as mocked, \
+                    mock.patch(f'medical_integration.management.commands.{command}.OrthancAPI'):
+                mocked.build_study.return_value = 1
+                call_command(command, study=['1.2.3'], stdout=io.StringIO())
+                self.assertEqual(mocked.build_study.call_args.args[0], 'study-1')
+
+    def test_unknown_study_uid_is_rejected(self):
+        with mock.patch('medical_integration.management.commands.thumbnails.thumbnail_store'), \
+                mock.patch('medical_integration.management.commands.thumbnails.OrthancAPI') as orthanc_api:
+            orthanc_api.return_value.find.return_value = []
+            with self.assertRaises(CommandError):
+                call_command('thumbnails', study=['9.9.9'])
+
+
+class OrthancMetadataCacheTests(SimpleTestCase):
+    """Orthanc 메타데이터 캐시 TTL 정책"""
+
+    def timeouts(self, backend):
+        metadata_cache = OrthancMetadataCache(unstable_ttl=10, process_local_ttl=30)
+        with mock.patch.object(OrthancMetadataCache, 'cache', new_callable=mock.PropertyMock,
+                               return_value=backend):
+            metadata_cache.set('instance', 'i1', {'ID': 'i1'})
+            metadata_cache.set('study', 's1', {'ID': 's1', 'IsStable': True})
+            metadata_cache.set('series', 'r1', {'ID': 'r1', 'IsStable': False})
+        return [call.args[2] if len(call.args) > 2 else None for call in backend.set.call_args_list]
+
+    def test_shared_backend_keeps_stable_resources_for_default_ttl(self):
+        self.assertEqual(self.timeouts(mock.Mock()), [None, None, 10])
+
+    def test_process_local_backend_caps_study_and_series_ttl(self):
+        self.assertEqual(self.timeouts(mock.Mock(spec=LocMemCache)), [None, 30, 10])
+
+
+class StudyTreeTests(SimpleTestCase):
+    """Study 트리 조회 (일괄 조회 / 스트리밍)"""
+
+    STUDY = {'ID': 'study-1', 'MainDicomTags': {'StudyInstanceUID': '1.2.3'}, 'Series': ['s1', 's2']}
+    SERIES = [{'ID': 's1'}, {'ID': 's2'}]
+    INSTANCES = [
+        {'ID': 'i1', 'ParentSeries': 's1'},
+        {'ID': 'i2', 'ParentSeries': 's2'},
+        {'ID': 'i3', 'ParentSeries': 's1'},
+    ]
+
+    def setUp(self):
+        self.api = OrthancAPI()
+        self.api.get_study = mock.Mock(side_effect=lambda study_id: dict(self.STUDY))
+        self.api.get_study_series = mock.Mock(return_value=self.SERIES)
+        self.api.find = mock.Mock(return_value=self.INSTANCES)
+        self.api.get_series_instances = mock.Mock()
+
+    def test_stream_matches_bulk_tree_with_one_instance_lookup(self):
+        streamed = json.loads(''.join(self.api.iter_study_tree_json(dict(self.STUDY))))
+        bulk = self.api.get_study_with_series_and_instances('study-1')
+
+        self.assertEqual(streamed['study_details']['series_details'], bulk['series_details'])
+        self.assertEqual(
+            [[i['instance_id'] for i in series['instances']] for series in bulk['series_details']],
+            [['i1', 'i3'], ['i2']],
+        )
+        self.assertEqual(self.api.find.call_count, 2)  # 경로별 1회
+        self.api.get_series_instances.assert_not_called()
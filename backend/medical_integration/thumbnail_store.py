@@ -0,0 +1,382 @@
+# backend/medical_integration/thumbnail_store.py
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from django.conf import settings
+from django.dispatch import receiver
+from .orthanc_api import OrthancAPI
+from .signals import study_deleted
+
+logger = logging.getLogger('medical_integration')
+
+_DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+_ORTHANC_ID_RE = re.compile(r'^[0-9a-f-]{8,64}$')
+
+# 원본 Orthanc /preview(PNG)를 그대로 보관할 때의 크기 이름
+ORIGINAL_SIZE = 'original'
+
+CONTENT_TYPES = {'jpg': 'image/jpeg', 'png': 'image/png'}
+
+
+def render_sizes(image_bytes, sizes, quality=85):
+    """미리보기 PNG를 여러 크기의 JPEG로 축소
+
+    Args:
+        image_bytes: Orthanc /preview 결과 (8bit PNG)
+        sizes: {이름: 긴 변 픽셀}
+
+    Returns:
+        dict: {이름: (JPEG bytes, width, height)}
+    """
+    from PIL import Image
+
+    source = Image.open(io.BytesIO(image_bytes))
+    source.load()
+    if source.mode not in ('L', 'RGB'):
+        source = source.convert('RGB')
+
+    rendered = {}
+    for name, edge in sorted(sizes.items(), key=lambda item: -item[1]):
+        image = source.copy()
+        # 원본보다 크게 늘리지 않음 (thumbnail은 비율을 유지하며 축소만 수행)
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=quality, optimize=True)
+        rendered[name] = (buffer.getvalue(), image.width, image.height)
+    return rendered
+
+
+class ThumbnailStore:
+    """Series 썸네일/축소 미리보기 이미지를 미리 만들어 두는 content-addressed 저장소
+
+    - blobs/<sha256 앞 2자리>/<sha256>.<ext>: 이미지 본문 (내용이 같으면 한 번만 저장)
+    - index/<Orthanc ID 앞 2자리>/<Orthanc ID>.json: Series/Instance → 크기별 digest
+    - Study가 들어오면(Webhook, /changes 안정화) Series마다 대표 Instance(가운데)의
+      Orthanc /preview를 한 번 받아 SIZES 크기별 JPEG로 축소 저장
+    - 본문은 digest로 주소가 정해지므로 불변: 전송 시 immutable 캐시 헤더 사용
+    """
+
+    def __init__(self, root, sizes, quality=85, keep_original=True, enabled=True, gc_grace_seconds=600):
+        self.root = root
+        self.sizes = sizes
+        self.quality = quality
+        self.keep_original = keep_original
+        self.enabled = enabled
+        self.gc_grace_seconds = gc_grace_seconds
+        self._lock = threading.Lock()
+        self._building = set()
+        self._counters = {'hits': 0, 'misses': 0, 'builds': 0, 'build_failures': 0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def size_names(self):
+        names = list(self.sizes)
+        if self.keep_original:
+            names.append(ORIGINAL_SIZE)
+        return names
+
+    # ── 경로 ────────────────────────────────────────────
+
+    def _blob_path(self, digest, ext):
+        return os.path.join(self.root, 'blobs', digest[:2], f"{digest}.{ext}")
+
+    def _index_path(self, orthanc_id):
+        if not _ORTHANC_ID_RE.match(orthanc_id or ''):
+            return None
+        return os.path.join(self.root, 'index', orthanc_id[:2], f"{orthanc_id}.json")
+
+    @staticmethod
+    def _write_atomic(path, data):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+
+    # ── 조회 ────────────────────────────────────────────
+
+    def get_index(self, orthanc_id):
+        """Series/Instance 인덱스 (없으면 None)"""
+        index_path = self._index_path(orthanc_id)
+        if not self.enabled or index_path is None:
+            return None
+        try:
+            with open(index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def lookup(self, orthanc_id, size):
+        """(본문 경로, 이미지 정보) 반환. 없으면 None"""
+        index = self.get_index(orthanc_id)
+        image = (index or {}).get('sizes', {}).get(size)
+        if not image:
+            self._count('misses')
+            return None
+        blob_path = self.blob_path(image['digest'])
+        if blob_path is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return blob_path, image
+
+    def blob_path(self, digest):
+        """digest에 해당하는 본문 경로 (없으면 None)"""
+        if not _DIGEST_RE.match(digest or ''):
+            return None
+        for ext in CONTENT_TYPES:
+            path = self._blob_path(digest, ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def read(self, orthanc_id, size=ORIGINAL_SIZE):
+        """저장된 이미지 bytes (없으면 None). AI 전처리 등 내부 사용용"""
+        found = self.lookup(orthanc_id, size)
+        if not found:
+            return None
+        try:
+            with open(found[0], 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    # ── 생성 ────────────────────────────────────────────
+
+    def put_blob(self, data, ext):
+        """본문 저장 후 digest 반환 (이미 있으면 mtime만 갱신)"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest, ext)
+        if os.path.exists(path):
+            now = time.time()
+            os.utime(path, (now, now))
+        else:
+            self._write_atomic(path, data)
+        return digest
+
+    def save_images(self, preview_bytes):
+        """미리보기 PNG에서 크기별 이미지를 만들어 저장하고 {크기: 이미지 정보} 반환"""
+        images = {}
+        for name, (data, width, height) in render_sizes(preview_bytes, self.sizes, self.quality).items():
+            images[name] = {
+                'digest': self.put_blob(data, 'jpg'),
+                'content_type': CONTENT_TYPES['jpg'],
+                'width': width,
+                'height': height,
+                'bytes': len(data),
+            }
+        if self.keep_original:
+            images[ORIGINAL_SIZE] = {
+                'digest': self.put_blob(preview_bytes, 'png'),
+                'content_type': CONTENT_TYPES['png'],
+                'bytes': len(preview_bytes),
+            }
+        return images
+
+    def save_index(self, orthanc_id, index):
+        index_path = self._index_path(orthanc_id)
+        if index_path is None:
+            raise ValueError(f"Invalid Orthanc ID: {orthanc_id}")
+        self._write_atomic(index_path, json.dumps({**index, 'built_at': time.time()}).encode())
+
+    @staticmethod
+    def representative_instance(instances):
+        """Series 대표 Instance (InstanceNumber 순서의 가운데, CR/DX는 유일한 Instance)"""
+        def instance_number(instance):
+            try:
+                return int(instance.get('MainDicomTags', {}).get('InstanceNumber', 0))
+            except (TypeError, ValueError):
+                return 0
+        ordered = sorted(instances, key=instance_number)
+        return ordered[len(ordered) // 2] if ordered else None
+
+    def build_series(self, series_id, orthanc_api=None, study_id=''):
+        """Series 대표 Instance의 미리보기를 받아 크기별 이미지 저장 (실패 시 None)"""
+        orthanc_api = orthanc_api or OrthancAPI()
+        started = time.perf_counter()
+        try:
+            instance = self.representative_instance(orthanc_api.get_series_instances(series_id) or [])
+            if instance is None:
+                return None
+            preview = orthanc_api.get_instance_preview(instance['ID'])
+            if not preview:
+                raise ValueError('미리보기 없음')
+            images = self.save_images(preview)
+            index = {'study_id': study_id, 'series_id': series_id, 'instance_id': instance['ID'], 'sizes': images}
+            self.save_index(instance['ID'], {**index, 'kind': 'instance'})
+            self.save_index(series_id, {**index, 'kind': 'series'})
+        except Exception as e:
+            logger.error(f"❌ 썸네일 생성 실패 (series: {series_id}): {e}")
+            self._count('build_failures')
+            return None
+
+        self._count('builds')
+        logger.info(f"🖼️ 썸네일 저장: {series_id} ({len(images)}개 크기, {time.perf_counter() - started:.2f}s)")
+        return index
+
+    def build_study(self, orthanc_study_id, orthanc_api=None, force=False):
+        """Study의 모든 Series 썸네일 생성 (이미 있는 Series는 건너뜀)
+
+        Returns:
+            int: 새로 만든 Series 수
+        """
+        if not self.enabled:
+            return 0
+        orthanc_api = orthanc_api or OrthancAPI()
+        built = 0
+        for series_info in orthanc_api.get_study_series(orthanc_study_id) or []:
+            series_id = series_info.get('ID', '')
+            if not force and self.get_index(series_id):
+                continue
+            if self.build_series(series_id, orthanc_api, study_id=orthanc_study_id):
+                built += 1
+        return built
+
+    def schedule_study_build(self, orthanc_study_id):
+        """백그라운드 스레드에서 build_study 실행 (같은 Study가 이미 진행 중이면 무시)"""
+        if not self.enabled or not orthanc_study_id:
+            return False
+        with self._lock:
+            if orthanc_study_id in self._building:
+                return False
+            self._building.add(orthanc_study_id)
+
+        def run():
+            try:
+                self.build_study(orthanc_study_id)
+            except Exception as e:
+                logger.error(f"❌ Study 썸네일 생성 실패 ({orthanc_study_id}): {e}")
+            finally:
+                with self._lock:
+                    self._building.discard(orthanc_study_id)
+
+        threading.Thread(target=run, name=f"thumbnails-{orthanc_study_id[:8]}", daemon=True).start()
+        return True
+
+    def study_manifest(self, orthanc_study_id, orthanc_api=None):
+        """Study의 Series별 썸네일 목록 ({series_id: 인덱스 또는 None})"""
+        orthanc_api = orthanc_api or OrthancAPI()
+        return {
+            series_id: self.get_index(series_id)
+            for series_id in (orthanc_api.get_study(orthanc_study_id) or {}).get('Series', [])
+        }
+
+    # ── 정리 ────────────────────────────────────────────
+
+    def _iter_index(self):
+        """(인덱스 경로, 인덱스) 목록"""
+        index_root = os.path.join(self.root, 'index')
+        if not os.path.isdir(index_root):
+            return
+        for directory, _, filenames in os.walk(index_root):
+            for filename in filenames:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    with open(path) as f:
+                        yield path, json.load(f)
+                except (OSError, ValueError):
+                    continue
+
+    def _iter_blobs(self):
+        """(digest, 경로, 크기, mtime) 목록"""
+        blob_root = os.path.join(self.root, 'blobs')
+        if not os.path.isdir(blob_root):
+            return
+        for directory, _, filenames in os.walk(blob_root):
+            for filename in filenames:
+                digest, _, ext = filename.partition('.')
+                if ext not in CONTENT_TYPES:
+                    continue
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield digest, path, stat.st_size, stat.st_mtime
+
+    def collect_garbage(self):
+        """어떤 인덱스에서도 참조하지 않는 본문 삭제 (생성 중인 본문 보호를 위해 유예 시간 적용)"""
+        referenced = {
+            image['digest']
+            for _, index in self._iter_index()
+            for image in index.get('sizes', {}).values()
+        }
+        cutoff = time.time() - self.gc_grace_seconds
+        removed = 0
+        for digest, path, _, mtime in list(self._iter_blobs()):
+            if digest in referenced or mtime > cutoff:
+                continue
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def purge(self, orthanc_study_id=None):
+        """전체 또는 특정 Study의 인덱스 삭제 후 참조 없는 본문 정리. 삭제한 인덱스 수 반환"""
+        removed = 0
+        for path, index in list(self._iter_index()):
+            if orthanc_study_id and index.get('study_id') != orthanc_study_id:
+                continue
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            self.collect_garbage()
+        return removed
+
+    def stats(self):
+        indexes = [index for _, index in self._iter_index()]
+        blobs = list(self._iter_blobs())
+        with self._lock:
+            counters = dict(self._counters)
+            building = len(self._building)
+        lookups = counters['hits'] + counters['misses']
+        return {
+            'enabled': self.enabled,
+            'dir': self.root,
+            'sizes': self.size_names(),
+            'series': sum(1 for index in indexes if index.get('kind') == 'series'),
+            'blobs': len(blobs),
+            'bytes': sum(size for _, _, size, _ in blobs),
+            'building': building,
+            'hit_ratio': round(counters['hits'] / lookups, 4) if lookups else None,
+            **counters,
+        }
+
+
+_store_config = getattr(settings, 'THUMBNAIL_STORE', {})
+thumbnail_store = ThumbnailStore(
+    root=str(_store_config.get('DIR', os.path.join(settings.BASE_DIR, 'cache', 'thumbnails'))),
+    sizes=_store_config.get('SIZES', {'thumb': 128, 'small': 256, 'preview': 1024}),
+    quality=_store_config.get('JPEG_QUALITY', 85),
+    keep_original=_store_config.get('KEEP_ORIGINAL', True),
+    enabled=_store_config.get('ENABLED', True),
+)
+
+
+@receiver(study_deleted)
+def _purge_deleted_study(sender, orthanc_study_id, **kwargs):
+    thumbnail_store.purge(orthanc_study_id)
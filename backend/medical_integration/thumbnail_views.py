@@ -0,0 +1,113 @@
+# backend/medical_integration/thumbnail_views.py
+
+import logging
+from django.http import JsonResponse, HttpResponse, FileResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from .orthanc_api import OrthancAPI
+from .proxy_http import IMMUTABLE_CACHE_CONTROL, etag_matches
+from .thumbnail_store import thumbnail_store, CONTENT_TYPES
+
+logger = logging.getLogger('medical_integration')
+
+# Series 썸네일은 재생성될 수 있으므로 짧게 캐시하고 ETag(digest)로 재검증
+THUMBNAIL_CACHE_CONTROL = 'private, max-age=300'
+
+
+def image_response(request, blob_path, digest, cache_control):
+    """저장된 이미지 응답 (If-None-Match 일치 시 304)"""
+    etag = f'"{digest}"'
+    if etag_matches(request.META.get('HTTP_IF_NONE_MATCH'), etag):
+        response = HttpResponse(status=304)
+    else:
+        try:
+            body = open(blob_path, 'rb')
+        except OSError:
+            return None
+        response = FileResponse(body, content_type=CONTENT_TYPES[blob_path.rsplit('.', 1)[-1]])
+        response.headers.pop('Content-Disposition', None)
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    return response
+
+
+def not_found(message):
+    return JsonResponse({'error': message}, status=404)
+
+
+@require_GET
+def thumbnail_image(request, orthanc_id):
+    """Series(또는 대표 Instance) 썸네일 이미지
+
+    Query:
+        size: THUMBNAIL_STORE['SIZES'] 이름 또는 'original' (기본 'thumb')
+    """
+    size = request.GET.get('size', 'thumb')
+    if size not in thumbnail_store.size_names():
+        return JsonResponse({'error': f'지원하지 않는 크기: {size}', 'sizes': thumbnail_store.size_names()}, status=400)
+
+    found = thumbnail_store.lookup(orthanc_id, size)
+    if not found:
+        # 파이프라인이 아직 만들지 않은 Series는 요청 시 생성
+        series_info = OrthancAPI().get_series(orthanc_id)
+        if not series_info or not thumbnail_store.build_series(orthanc_id, study_id=series_info.get('ParentStudy', '')):
+            return not_found('썸네일을 만들 수 없습니다')
+        found = thumbnail_store.lookup(orthanc_id, size)
+        if not found:
+            return not_found('썸네일을 찾을 수 없습니다')
+
+    blob_path, image = found
+    response = image_response(request, blob_path, image['digest'], THUMBNAIL_CACHE_CONTROL)
+    return response or not_found('썸네일을 찾을 수 없습니다')
+
+
+@require_GET
+def thumbnail_blob(request, digest):
+    """content-addressed 이미지 본문 (내용이 바뀌면 주소도 바뀌므로 immutable)"""
+    blob_path = thumbnail_store.blob_path(digest)
+    response = image_response(request, blob_path, digest, IMMUTABLE_CACHE_CONTROL) if blob_path else None
+    return response or not_found('이미지를 찾을 수 없습니다')
+
+
+@require_GET
+def study_thumbnails(request, orthanc_study_id):
+    """Study의 Series별 썸네일 URL 목록 (워크리스트/환자 화면용)
+
+    아직 만들어지지 않은 Series가 있으면 백그라운드 생성을 예약하고 pending으로 표시합니다.
+    """
+    manifest = thumbnail_store.study_manifest(orthanc_study_id)
+    if not manifest:
+        return not_found('Study를 찾을 수 없습니다')
+
+    series = []
+    pending = False
+    for series_id, index in manifest.items():
+        if not index:
+            pending = True
+            series.append({'series_id': series_id, 'pending': True})
+            continue
+        series.append({
+            'series_id': series_id,
+            'instance_id': index.get('instance_id'),
+            'pending': False,
+            'images': {
+                size: {
+                    'url': reverse('medical_integration:thumbnail_blob', args=[image['digest']]),
+                    'content_type': image.get('content_type'),
+                    'width': image.get('width'),
+                    'height': image.get('height'),
+                    'bytes': image.get('bytes'),
+                }
+                for size, image in index.get('sizes', {}).items()
+            },
+        })
+
+    if pending:
+        thumbnail_store.schedule_study_build(orthanc_study_id)
+    return JsonResponse({'study_id': orthanc_study_id, 'pending': pending, 'series': series})
+
+
+@require_GET
+def thumbnail_stats(request):
+    """썸네일 저장소 통계 (hit/miss는 프로세스별)"""
+    return JsonResponse(thumbnail_store.stats())
@@ -1,7 +1,7 @@
 # backend/medical_integration/urls.py (최종 업데이트)
 
 from django.urls import path
-from . import views
+from . import views, thumbnail_views
 from .views import (
     get_all_openmrs_patients,
     proxy_openmrs_providers,
@@ -21,6 +21,17 @@ urlpatterns = [
     # 시스템 상태
     path('health/', views.health_check, name='health_check'),
     path('test-connections/', views.test_all_connections, name='test_connections'),
+    path('orthanc/cache-stats/', views.orthanc_cache_stats, name='orthanc_cache_stats'),
+
+    # 판독 화면 prefetch (이전 검사 + 다음 워크리스트 항목)
+    path('prefetch/', views.viewer_prefetch, name='viewer_prefetch'),
+    path('prefetch/stats/', views.viewer_prefetch_stats, name='viewer_prefetch_stats'),
+
+    # 미리 생성한 썸네일/미리보기 이미지
+    path('thumbnails/stats/', thumbnail_views.thumbnail_stats, name='thumbnail_stats'),
+    path('thumbnails/blobs/<str:digest>/', thumbnail_views.thumbnail_blob, name='thumbnail_blob'),
+    path('thumbnails/studies/<str:orthanc_study_id>/', thumbnail_views.study_thumbnails, name='study_thumbnails'),
+    path('thumbnails/<str:orthanc_id>/', thumbnail_views.thumbnail_image, name='thumbnail_image'),
     
     # OCS 매핑관련
     path('openmrs/patients/map/',   views.list_openmrs_patients_map,    name='list_openmrs_patients_map'),
@@ -45,6 +56,8 @@ urlpatterns = [
     # 환자별 DICOM 조회
     path('patients/<str:patient_uuid>/dicom-studies/', views.get_patient_dicom_studies, name='get_patient_dicom_studies'),
     path('dicom/studies/<str:study_id>/details/', views.get_dicom_study_details, name='get_dicom_study_details'),
+    path('dicom/studies/<str:study_id>/export/', views.export_dicom_study, name='export_dicom_study'),
+    path('dicom/studies/export/', views.export_dicom_studies, name='export_dicom_studies'),
     
     # 환자 매핑 관리
     path('patient-mappings/', views.get_patient_mappings, name='get_patient_mappings'),
@@ -6,15 +6,16 @@ from django.conf import settings
 from datetime import datetime
 from .openmrs_api import OpenMRSAPI
 from .orthanc_api import OrthancAPI
+from .orthanc_cache import orthanc_metadata_cache
+from .prefetch import prefetch_service
+from .async_api import AsyncOrthancAPI, AsyncOpenMRSAPI, run_batch
 from .models import PatientMapping, Alert
 from .serializers import AlertSerializer
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods, require_GET
 from django.views.decorators.csrf import csrf_exempt
 from .dicom_patient_mapper import DicomPatientMapper
 from rest_framework.views import APIView
-import tempfile
-import os
 import requests
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import RequestException, ConnectionError, Timeout
@@ -32,6 +33,41 @@ def health_check(request):
         'service': 'Django 의료 통합 API'
     })
 
+@api_view(['GET', 'DELETE'])
+def orthanc_cache_stats(request):
+    """Orthanc 메타데이터 캐시 hit/miss 통계 (DELETE: 카운터 초기화)"""
+    if request.method == 'DELETE':
+        orthanc_metadata_cache.reset_stats()
+    return Response(orthanc_metadata_cache.stats())
+
+@api_view(['POST', 'DELETE'])
+def viewer_prefetch(request):
+    """판독 화면 prefetch 예약/취소
+
+    POST: study_uid(현재 Study)의 이전 검사와 next_study_uid를 prefetch (세션의 이전 작업은 취소)
+    DELETE: 화면을 벗어날 때 세션의 prefetch 취소
+    세션은 X-Viewer-Session 헤더로 구분합니다.
+    """
+    session = prefetch_service.session_key(request)
+    if request.method == 'DELETE':
+        return Response({'session': session, 'cancelled': prefetch_service.cancel(session)})
+
+    study_uid = request.data.get('study_uid')
+    if not study_uid:
+        return Response({'error': 'study_uid가 필요합니다'}, status=status.HTTP_400_BAD_REQUEST)
+    queued = prefetch_service.prefetch_for_viewer(
+        request, study_uid,
+        modality=request.data.get('modality'),
+        body_part=request.data.get('body_part'),
+        next_study_uid=request.data.get('next_study_uid'),
+    )
+    return Response({'session': session, 'queued': queued}, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+def viewer_prefetch_stats(request):
+    """prefetch 큐 통계 (프로세스별)"""
+    return Response(prefetch_service.stats())
+
 @api_view(['GET'])
 def test_all_connections(request):
     """모든 외부 서비스 연결 테스트"""
@@ -443,14 +479,31 @@ def sync_patient_mapping(request, mapping_id):
 
 @api_view(['GET'])
 def search_orthanc_patients(request):
-    """Orthanc에서 환자 검색"""
+    """Orthanc에서 환자 검색
+
+    Query params:
+        q: 환자 이름 (대소문자 무시 부분 일치, source와 관계없이 같은 결과)
+        limit, offset: 페이지네이션 (기본 50, 0)
+        source: 'db'면 Orthanc DB 직접 조회 (REST 조회 실패 시에도 자동 대체)
+    """
     query = request.query_params.get('q', '')
     if not query:
         return Response({'error': '검색어(q)가 필요합니다'}, status=status.HTTP_400_BAD_REQUEST)
     
+    try:
+        limit = int(request.query_params.get('limit', 50))
+        offset = int(request.query_params.get('offset', 0))
+    except ValueError:
+        return Response({'error': 'limit/offset은 정수여야 합니다'}, status=status.HTTP_400_BAD_REQUEST)
+    
     try:
         orthanc_api = OrthancAPI()
-        results = orthanc_api.search_patients_by_name(query)
+        results = orthanc_api.search_patients_by_name(
+            query,
+            limit=limit,
+            since=offset,
+            use_db=request.query_params.get('source') == 'db'
+        )
         
         patients = []
         for result in results:
@@ -470,7 +523,10 @@ def search_orthanc_patients(request):
         
         return Response({
             'results': patients,
-            'total': len(patients)
+            'total': len(patients),
+            'limit': limit,
+            'offset': offset,
+            'has_more': len(patients) == limit
         })
         
     except Exception as e:
@@ -523,65 +579,48 @@ def upload_dicom_with_auto_mapping(request):
         
         logger.info(f"DICOM 자동 매핑 업로드 시작: {dicom_file.name}")
         
-        # 임시 파일로 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.dcm') as temp_file:
-            for chunk in dicom_file.chunks():
-                temp_file.write(chunk)
-            temp_file_path = temp_file.name
+        # Orthanc에 업로드 (UploadedFile을 메모리에 모으지 않고 그대로 스트리밍)
+        orthanc_api = OrthancAPI()
+        upload_result = orthanc_api.upload_dicom_stream(dicom_file)
         
-        try:
-            # DICOM 데이터 읽기
-            with open(temp_file_path, 'rb') as f:
-                dicom_data = f.read()
-            
-            # Orthanc에 업로드
-            orthanc_api = OrthancAPI()
-            upload_result = orthanc_api.upload_dicom(dicom_data)
-            
-            if not upload_result:
-                # 에러 알림 생성
-                Alert.objects.create(
-                type='DELAY', 
-                message=f'DICOM 업로드 실패: 파일명 {dicom_file.name}'
-                )
-                return Response({
-                    'success': False,
-                    'error': 'Orthanc 업로드에 실패했습니다'
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-            logger.info(f"Orthanc 업로드 성공: {upload_result}")
-            
-            # 자동 매핑 처리
-            mapper = DicomPatientMapper()
-            mapping_result = mapper.process_dicom_upload(dicom_data, upload_result)
-            
-            # 응답 데이터 구성
-            response_data = {
-                'upload_result': {
-                    'orthanc_instance_id': upload_result.get('ID'),
-                    'orthanc_patient_id': upload_result.get('ParentPatient'),
-                    'orthanc_study_id': upload_result.get('ParentStudy'),
-                    'orthanc_series_id': upload_result.get('ParentSeries'),
-                    'status': upload_result.get('Status')
-                },
-                'mapping_result': mapping_result
-            }
-            
-            if mapping_result and mapping_result.get('success'):
-                response_data['success'] = True
-                response_data['message'] = 'DICOM 업로드 및 자동 매핑 완료'
-                return Response(response_data, status=status.HTTP_201_CREATED)
-            else:
-                response_data['success'] = False
-                response_data['message'] = 'DICOM 업로드 성공, 자동 매핑 실패'
-                return Response(response_data, status=status.HTTP_206_PARTIAL_CONTENT)
-            
-        finally:
-            # 임시 파일 정리
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
+        if not upload_result:
+            # 에러 알림 생성
+            Alert.objects.create(
+            type='DELAY', 
+            message=f'DICOM 업로드 실패: 파일명 {dicom_file.name}'
+            )
+            return Response({
+                'success': False,
+                'error': 'Orthanc 업로드에 실패했습니다'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        logger.info(f"Orthanc 업로드 성공: {upload_result}")
+        
+        # 자동 매핑 처리 (같은 업로드 파일을 처음부터 다시 읽음)
+        dicom_file.seek(0)
+        mapper = DicomPatientMapper()
+        mapping_result = mapper.process_dicom_upload(dicom_file, upload_result)
+        
+        # 응답 데이터 구성
+        response_data = {
+            'upload_result': {
+                'orthanc_instance_id': upload_result.get('ID'),
+                'orthanc_patient_id': upload_result.get('ParentPatient'),
+                'orthanc_study_id': upload_result.get('ParentStudy'),
+                'orthanc_series_id': upload_result.get('ParentSeries'),
+                'status': upload_result.get('Status')
+            },
+            'mapping_result': mapping_result
+        }
+        
+        if mapping_result and mapping_result.get('success'):
+            response_data['success'] = True
+            response_data['message'] = 'DICOM 업로드 및 자동 매핑 완료'
+            return Response(response_data, status=status.HTTP_201_CREATED)
+        else:
+            response_data['success'] = False
+            response_data['message'] = 'DICOM 업로드 성공, 자동 매핑 실패'
+            return Response(response_data, status=status.HTTP_206_PARTIAL_CONTENT)
         
     except Exception as e:
         # 전체 예외 처리
@@ -673,22 +712,27 @@ def get_unmapped_orthanc_patients(request):
             .values_list('orthanc_patient_id', flat=True)
         )
         
-        # 매핑되지 않은 환자들 찾기
+        # 매핑되지 않은 환자들 찾기 (상세 정보는 동시 조회)
+        unmapped_ids = [pid for pid in all_patients if pid not in mapped_patient_ids]
+        patient_infos = run_batch(
+            AsyncOrthancAPI,
+            lambda api, patient_id: api.get_patient(patient_id),
+            unmapped_ids
+        )
+        
         unmapped_patients = []
-        for patient_id in all_patients:
-            if patient_id not in mapped_patient_ids:
-                patient_info = orthanc_api.get_patient(patient_id)
-                if patient_info:
-                    main_tags = patient_info.get('MainDicomTags', {})
-                    unmapped_patients.append({
-                        'orthanc_patient_id': patient_id,
-                        'patient_name': main_tags.get('PatientName', ''),
-                        'patient_id_dicom': main_tags.get('PatientID', ''),
-                        'patient_birth_date': main_tags.get('PatientBirthDate', ''),
-                        'patient_sex': main_tags.get('PatientSex', ''),
-                        'studies_count': len(patient_info.get('Studies', [])),
-                        'last_update': patient_info.get('LastUpdate', '')
-                    })
+        for patient_id, patient_info in zip(unmapped_ids, patient_infos):
+            if patient_info:
+                main_tags = patient_info.get('MainDicomTags', {})
+                unmapped_patients.append({
+                    'orthanc_patient_id': patient_id,
+                    'patient_name': main_tags.get('PatientName', ''),
+                    'patient_id_dicom': main_tags.get('PatientID', ''),
+                    'patient_birth_date': main_tags.get('PatientBirthDate', ''),
+                    'patient_sex': main_tags.get('PatientSex', ''),
+                    'studies_count': len(patient_info.get('Studies', [])),
+                    'last_update': patient_info.get('LastUpdate', '')
+                })
         
         return Response({
             'success': True,
@@ -705,10 +749,29 @@ def get_unmapped_orthanc_patients(request):
 
 @api_view(['GET'])
 def get_dicom_study_details(request, study_id):
-    """DICOM Study 상세 정보 조회 (Series, Instance 포함)"""
+    """DICOM Study 상세 정보 조회 (Series, Instance 포함)
+
+    Query params:
+        depth: study | series | instances (기본값 instances)
+        stream: true면 Series 단위로 JSON을 스트리밍
+    """
     try:
         orthanc_api = OrthancAPI()
-        study_details = orthanc_api.get_study_with_series_and_instances(study_id)
+        depth = request.query_params.get('depth')
+        
+        if request.query_params.get('stream', '').lower() in ('1', 'true', 'yes'):
+            study_info = orthanc_api.get_study(study_id)
+            if not study_info:
+                return Response({
+                    'success': False,
+                    'error': f'Study를 찾을 수 없습니다: {study_id}'
+                }, status=status.HTTP_404_NOT_FOUND)
+            return StreamingHttpResponse(
+                orthanc_api.iter_study_tree_json(study_info, depth=depth),
+                content_type='application/json'
+            )
+        
+        study_details = orthanc_api.get_study_with_series_and_instances(study_id, depth=depth)
         
         if not study_details:
             return Response({
@@ -729,6 +792,78 @@ def get_dicom_study_details(request, study_id):
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _study_archive_response(orthanc_api, study_ids, media, filename):
+    """Orthanc ZIP 스트림을 그대로 전달하는 StreamingHttpResponse 생성"""
+    upstream = orthanc_api.open_study_archive(study_ids, media=media)
+    response = StreamingHttpResponse(
+        orthanc_api.iter_response(upstream),
+        content_type=upstream.headers.get('Content-Type', 'application/zip')
+    )
+    if upstream.headers.get('Content-Length'):
+        response['Content-Length'] = upstream.headers['Content-Length']
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+def _is_true(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+@api_view(['GET'])
+def export_dicom_study(request, study_id):
+    """Study ZIP 내보내기 (Orthanc /studies/{id}/archive 스트리밍 프록시)
+
+    Query params:
+        media: true면 DICOMDIR 포함 media ZIP (Orthanc /studies/{id}/media)
+    """
+    try:
+        media = _is_true(request.query_params.get('media', ''))
+        suffix = '-dicomdir' if media else ''
+        return _study_archive_response(OrthancAPI(), study_id, media, f"study-{study_id}{suffix}.zip")
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            return Response({
+                'success': False,
+                'error': f'Study를 찾을 수 없습니다: {study_id}'
+            }, status=status.HTTP_404_NOT_FOUND)
+        logger.error(f"Study 내보내기 실패 ({study_id}): {e}")
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_502_BAD_GATEWAY)
+    except Exception as e:
+        logger.error(f"Study 내보내기 실패 ({study_id}): {e}")
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET', 'POST'])
+def export_dicom_studies(request):
+    """여러 Study를 ZIP 하나로 내보내기 (Orthanc /tools/create-archive 스트리밍 프록시)
+
+    GET ?study_ids=a,b,c&media=true 또는 POST {"study_ids": [...], "media": true}
+    """
+    if request.method == 'POST':
+        study_ids = request.data.get('study_ids') or []
+        media = _is_true(request.data.get('media', ''))
+    else:
+        study_ids = [s for s in request.query_params.get('study_ids', '').split(',') if s]
+        media = _is_true(request.query_params.get('media', ''))
+
+    if not study_ids or not isinstance(study_ids, list):
+        return Response({
+            'success': False,
+            'error': 'study_ids가 필요합니다'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        suffix = '-dicomdir' if media else ''
+        filename = f"studies-{timezone.now().strftime('%Y%m%d%H%M%S')}{suffix}.zip"
+        return _study_archive_response(OrthancAPI(), study_ids, media, filename)
+    except requests.exceptions.HTTPError as e:
+        logger.error(f"Study 일괄 내보내기 실패 ({len(study_ids)}개): {e}")
+        status_code = e.response.status_code if e.response is not None else 502
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_404_NOT_FOUND if status_code == 404 else status.HTTP_502_BAD_GATEWAY)
+    except Exception as e:
+        logger.error(f"Study 일괄 내보내기 실패: {e}")
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['DELETE'])
 def delete_patient_mapping(request, mapping_id):
     """환자 매핑 삭제"""
@@ -756,6 +891,30 @@ def delete_patient_mapping(request, mapping_id):
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _resource_id(resource):
+    """Orthanc 목록 항목(ID 문자열 또는 확장 JSON)에서 ID 추출"""
+    return resource.get('ID') if isinstance(resource, dict) else resource
+
+async def _download_first_patient_instance(api, patient_id):
+    """환자의 첫 Study/Series/Instance를 따라가 DICOM 파일을 받음
+
+    Returns:
+        tuple: (DICOM 임시 파일 객체 또는 None, 실패 메시지) - 파일은 호출자가 close
+    """
+    studies = await api.get_patient_studies(patient_id)
+    if not studies:
+        return None, 'Study를 찾을 수 없음'
+    series_list = await api.get_study_series(_resource_id(studies[0]))
+    if not series_list:
+        return None, 'Series를 찾을 수 없음'
+    instances = await api.get_series_instances(_resource_id(series_list[0]))
+    if not instances:
+        return None, 'Instance를 찾을 수 없음'
+    dicom_data = await api.download_instance_file(_resource_id(instances[0]))
+    if dicom_data is None:
+        return None, 'DICOM 데이터를 읽을 수 없음'
+    return dicom_data, None
+
 @api_view(['POST'])
 def batch_auto_mapping(request):
     """기존 Orthanc 환자들에 대한 일괄 자동 매핑"""
@@ -786,63 +945,36 @@ def batch_auto_mapping(request):
                 'results': []
             })
         
-        # 일괄 매핑 처리
+        # 환자별 첫 번째 Instance DICOM 파일을 동시에 다운로드
+        downloads = run_batch(AsyncOrthancAPI, _download_first_patient_instance, unmapped_patients)
+        
+        # 일괄 매핑 처리 (DB/OpenMRS 매칭은 순차 처리)
         mapper = DicomPatientMapper()
         results = []
         
-        for patient_id in unmapped_patients:
+        for patient_id, download in zip(unmapped_patients, downloads):
             try:
-                # 환자의 첫 번째 Study에서 DICOM 정보 추출
-                studies = orthanc_api.get_patient_studies(patient_id)
-                if studies:
-                    study_id = studies[0]
-                    series_list = orthanc_api.get_study_series(study_id)
-                    if series_list:
-                        instances = orthanc_api.get_series_instances(series_list[0])
-                        if instances:
-                            # 첫 번째 인스턴스의 DICOM 파일 다운로드
-                            dicom_data = orthanc_api.get_instance_file(instances[0])
-                            if dicom_data:
-                                # 가짜 업로드 결과 생성 (이미 업로드된 상태)
-                                fake_upload_result = {'ParentPatient': patient_id}
-                                mapping_result = mapper.process_dicom_upload(dicom_data, fake_upload_result)
-                                
-                                results.append({
-                                    'orthanc_patient_id': patient_id,
-                                    'mapping_result': mapping_result
-                                })
-                            else:
-                                results.append({
-                                    'orthanc_patient_id': patient_id,
-                                    'mapping_result': {
-                                        'success': False,
-                                        'message': 'DICOM 데이터를 읽을 수 없음'
-                                    }
-                                })
-                        else:
-                            results.append({
-                                'orthanc_patient_id': patient_id,
-                                'mapping_result': {
-                                    'success': False,
-                                    'message': 'Instance를 찾을 수 없음'
-                                }
-                            })
-                    else:
-                        results.append({
-                            'orthanc_patient_id': patient_id,
-                            'mapping_result': {
-                                'success': False,
-                                'message': 'Series를 찾을 수 없음'
-                            }
-                        })
+                if download is None:
+                    download = (None, '처리 중 오류: DICOM 다운로드 실패')
+                dicom_data, error_message = download
+                
+                if dicom_data is not None:
+                    # 가짜 업로드 결과 생성 (이미 업로드된 상태)
+                    fake_upload_result = {'ParentPatient': patient_id}
+                    try:
+                        mapping_result = mapper.process_dicom_upload(dicom_data, fake_upload_result)
+                    finally:
+                        dicom_data.close()
                 else:
-                    results.append({
-                        'orthanc_patient_id': patient_id,
-                        'mapping_result': {
-                            'success': False,
-                            'message': 'Study를 찾을 수 없음'
-                        }
-                    })
+                    mapping_result = {
+                        'success': False,
+                        'message': error_message
+                    }
+                
+                results.append({
+                    'orthanc_patient_id': patient_id,
+                    'mapping_result': mapping_result
+                })
             except Exception as e:
                 logger.error(f"환자 {patient_id} 일괄 매핑 실패: {e}")
                 results.append({
@@ -1452,10 +1584,14 @@ def openmrs_patients_with_mapping(request):
     OpenMRS 환자 목록 + 매핑된 Orthanc ID 포함
     """
     result = []
-    mappings = PatientMapping.objects.filter(mapping_type="IDENTIFIER_BASED")
-
-    for mapping in mappings:
-        patient_data = OpenMRSAPI().get_patient(mapping.openmrs_patient_uuid)
+    mappings = list(PatientMapping.objects.filter(mapping_type="IDENTIFIER_BASED"))
+    patients = run_batch(
+        AsyncOpenMRSAPI,
+        lambda api, mapping: api.get_patient(mapping.openmrs_patient_uuid),
+        mappings
+    )
+
+    for mapping, patient_data in zip(mappings, patients):
         if patient_data:
             patient_data['orthanc_patient_id'] = mapping.orthanc_patient_id  # ✅ 추가
             result.append(patient_data)
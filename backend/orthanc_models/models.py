@@ -2,6 +2,14 @@
 
 from django.db import models
 
+# Patient 레벨 MainDicomTags (tagGroup, tagElement) -> 태그 이름
+PATIENT_MAIN_DICOM_TAGS = {
+    (0x0010, 0x0010): 'PatientName',
+    (0x0010, 0x0020): 'PatientID',
+    (0x0010, 0x0030): 'PatientBirthDate',
+    (0x0010, 0x0040): 'PatientSex',
+}
+
 class Resources(models.Model):
     """Orthanc 리소스 모델"""
     internalId = models.AutoField(primary_key=True)
@@ -42,6 +50,51 @@ class Resources(models.Model):
         """환자 타입의 리소스만 조회"""
         return cls.objects.filter(resourceType=0)  # 0 = Patient type
 
+    @classmethod
+    def search_patients_by_name(cls, patient_name, limit=100, offset=0):
+        """환자 이름으로 Orthanc DB 직접 검색 (REST API 대체 경로)
+
+        REST 경로(/tools/find '*name*')와 같은 부분 일치입니다. DicomIdentifiers의 PN 값은
+        대문자로 정규화되어 저장되므로 대문자로 비교하며, LIKE '%NAME%'는 value 인덱스를 쓰지 못해
+        (tagGroup, tagElement) 범위를 훑습니다. 이름 조건과 페이지(offset/limit)는 한 번의 SQL에서 적용됩니다.
+
+        Returns:
+            list: [{'ID', 'Type', 'MainDicomTags', 'Studies'}] (Orthanc REST 형식)
+        """
+        matched_ids = (
+            DicomIdentifiers.objects
+            .filter(tagGroup=0x0010, tagElement=0x0010, value__contains=patient_name.upper())
+            .values('id')
+        )
+        patients = list(
+            cls.objects
+            .filter(resourceType=0, internalId__in=matched_ids)
+            .order_by('internalId')[offset:offset + limit]
+        )
+        if not patients:
+            return []
+
+        internal_ids = [patient.internalId for patient in patients]
+        tags_by_patient = {}
+        for tag in MainDicomTags.objects.filter(id__in=internal_ids).values('id', 'tagGroup', 'tagElement', 'value'):
+            tag_name = PATIENT_MAIN_DICOM_TAGS.get((tag['tagGroup'], tag['tagElement']))
+            if tag_name:
+                tags_by_patient.setdefault(tag['id'], {})[tag_name] = tag['value']
+
+        studies_by_patient = {}
+        for parent_id, public_id in cls.objects.filter(resourceType=1, parentId__in=internal_ids).values_list('parentId', 'publicId'):
+            studies_by_patient.setdefault(parent_id, []).append(public_id)
+
+        return [
+            {
+                'ID': patient.publicId,
+                'Type': 'Patient',
+                'MainDicomTags': tags_by_patient.get(patient.internalId, {}),
+                'Studies': studies_by_patient.get(patient.internalId, []),
+            }
+            for patient in patients
+        ]
+
     def get_studies(self):
         """해당 환자의 모든 검사(Study) 조회"""
         return Resources.objects.filter(
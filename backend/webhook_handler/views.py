@@ -4,10 +4,24 @@ from django.views.decorators.http import require_http_methods
 import json
 import logging
 
+from medical_integration.models import CatalogStudy
+from medical_integration.orthanc_cache import orthanc_metadata_cache
+from medical_integration.series_metadata import series_metadata_store
+from medical_integration.thumbnail_store import thumbnail_store
+from medical_integration.image_pyramid import image_pyramid_store
 from .models import WebhookEvent
 
 logger = logging.getLogger(__name__)
 
+def _resolve_orthanc_study_id(data):
+    """Webhook 페이로드에서 Orthanc Study ID 확인 (study_uid만 있으면 카탈로그에서 조회)"""
+    if data.get('study_id'):
+        return data['study_id']
+    if data.get('study_uid'):
+        study = CatalogStudy.objects.filter(study_instance_uid=data['study_uid']).only('orthanc_id').first()
+        return study.orthanc_id if study else None
+    return None
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def webhook_study_complete(request):
@@ -31,6 +45,17 @@ def webhook_study_complete(request):
             orthanc_payload=data
         )
         
+        # 완료된 Study/Series의 Orthanc 메타데이터 캐시 무효화 (새 Series/Instance 반영)
+        orthanc_study_id = _resolve_orthanc_study_id(data)
+        if orthanc_study_id:
+            orthanc_metadata_cache.invalidate_study(orthanc_study_id, include_instances=False)
+            # 뷰어가 처음 여는 Series 메타데이터를 백그라운드에서 미리 생성
+            series_metadata_store.schedule_study_build(orthanc_study_id)
+            # 워크리스트/환자 화면용 썸네일도 미리 생성
+            thumbnail_store.schedule_study_build(orthanc_study_id)
+            # 큰 CR/DX 영상은 점진적 표시용 pyramid 생성
+            image_pyramid_store.schedule_study_build(orthanc_study_id)
+        
         logger.info(f"Webhook 수신: {patient_id} - {modality}")
         
         return JsonResponse({
@@ -70,4 +70,13 @@ class StudyRequest(models.Model):
         ordering = ['-id']  # 최신순 정렬
 
     def __str__(self):
-        return f"{self.patient_id} - {self.modality} - {self.study_status}"
\ No newline at end of file
+        return f"{self.patient_id} - {self.modality} - {self.study_status}"
+
+    def next_in_worklist(self):
+        """워크리스트(최신 요청순)에서 이 항목 다음의 판독 대기 중인 영상 검사"""
+        return (StudyRequest.objects
+                .filter(request_datetime__lt=self.request_datetime)
+                .exclude(study_uid__isnull=True).exclude(study_uid='')
+                .exclude(report_status='completed')
+                .order_by('-request_datetime')
+                .first())
\ No newline at end of file
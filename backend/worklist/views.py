@@ -6,6 +6,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from .models import StudyRequest
 from .serializers import StudyRequestSerializer
+from medical_integration.prefetch import prefetch_service
 from datetime import datetime
 
 
@@ -186,6 +187,16 @@ def work_list_detail(request, pk):
     try:
         study_request = StudyRequest.objects.get(pk=pk)
         
+        # 🔥 판독 화면 진입: 이전 검사와 다음 워크리스트 Study를 백그라운드에서 미리 준비
+        if study_request.study_uid:
+            next_request = study_request.next_in_worklist()
+            prefetch_service.prefetch_for_viewer(
+                request, study_request.study_uid,
+                modality=study_request.modality,
+                body_part=study_request.body_part,
+                next_study_uid=next_request.study_uid if next_request else None,
+            )
+        
         # 모든 필드 데이터 반환
         data = {
             'id': study_request.id,
@@ -4,6 +4,8 @@ SSD300 기반 DICOM 이미지 분석 모듈 (PyTorch 버전) - 의료 영상 특
 """
 
 import os
+import sys
+import importlib.util
 import cv2
 import numpy as np
 import pydicom
@@ -25,6 +27,23 @@ except ImportError:
 
 logger = logging.getLogger('SSDInference')
 
+
+def _load_detection_postprocess():
+    """Django(ai_analysis)와 공유하는 검출 후처리 모듈 로드
+    (docker-compose에서 backend/ai_analysis/detection_postprocess.py를 /models/common에 마운트)"""
+    if 'detection_postprocess' in sys.modules:
+        return sys.modules['detection_postprocess']
+    path = os.getenv('DETECTION_POSTPROCESS_PATH', os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common', 'detection_postprocess.py'))
+    spec = importlib.util.spec_from_file_location('detection_postprocess', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules['detection_postprocess'] = module
+    return module
+
+# torch가 있으면 후처리 모듈은 필수: 마운트 누락은 첫 분석이 아니라 서비스 시작 시점에 실패시킴
+detection_postprocess = _load_detection_postprocess() if TORCH_AVAILABLE else None
+
 class SSDAnalyzer:
     """SSD300 모델을 사용한 DICOM 이미지 분석 클래스"""
     
@@ -33,6 +52,7 @@ class SSDAnalyzer:
         self.model = None
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.confidence_threshold = 0.3
+        self.nms_iou_threshold = 0.45  # 클래스별 NMS (torchvision ssd300_vgg16 기본값과 동일)
         self.input_size = 300  # SSD300 입력 크기
         self.num_classes = 15  # 14개 클래스 + 배경
         self.class_names = self._get_class_names()
@@ -342,67 +362,54 @@ class SSDAnalyzer:
                 logger.info("검출된 객체 없음")
                 return detections
                 
-            # 신뢰도 임계값 적용
-            valid_indices = scores > self.confidence_threshold
-            valid_boxes = boxes[valid_indices]
-            valid_labels = labels[valid_indices]
-            valid_scores = scores[valid_indices]
-            
-            logger.info(f"🔍 임계값 {self.confidence_threshold} 이상: {len(valid_boxes)}개")
-            
             # 스케일링 비율 (SSD input -> 원본)
             scale_x = original_width / self.input_size
             scale_y = original_height / self.input_size
             
-            for i in range(len(valid_boxes)):
-                box = valid_boxes[i].cpu().numpy()
-                label = int(valid_labels[i].cpu().numpy())
-                score = float(valid_scores[i].cpu().numpy())
+            # 임계값 → 클래스별 NMS → 원본 해상도 변환/경계값 체크 → 유효 박스(5px 초과) → 상위 10개
+            # (박스 텐서 전체에 대해 한 번에 처리, host 전송 1회)
+            valid = detection_postprocess.postprocess_detections(
+                boxes, scores, labels,
+                score_threshold=self.confidence_threshold,
+                iou_threshold=self.nms_iou_threshold,
+                scale=(scale_x, scale_y),
+                image_size=(original_width, original_height),
+                truncate=True,
+                min_size=5,
+                top_k=10,
+            )
+            
+            logger.info(f"🔍 임계값 {self.confidence_threshold} 이상 유효 검출: {len(valid.scores)}개")
+            
+            for bbox, score, label in detection_postprocess.iter_detections(valid):
+                orig_x1, orig_y1, orig_x2, orig_y2 = [int(value) for value in bbox]
+                class_name = self.class_names.get(label, f'class_{label}')
                 
-                # 좌표 스케일링 (SSD input -> 원본)
-                x1, y1, x2, y2 = box
+                detection = {
+                    'bbox': {
+                        'x1': float(orig_x1),
+                        'y1': float(orig_y1),
+                        'x2': float(orig_x2),
+                        'y2': float(orig_y2),
+                        'width': float(orig_x2 - orig_x1),
+                        'height': float(orig_y2 - orig_y1)
+                    },
+                    'confidence': score,
+                    'class_id': label,
+                    'class_name': class_name,
+                    'area': float((orig_x2 - orig_x1) * (orig_y2 - orig_y1))
+                }
                 
-                # 원본 해상도로 변환
-                orig_x1 = int(x1 * scale_x)
-                orig_y1 = int(y1 * scale_y)
-                orig_x2 = int(x2 * scale_x)
-                orig_y2 = int(y2 * scale_y)
+                # 의료 영상 특화 정보 추가
+                detection['medical_info'] = self._extract_medical_features(
+                    detection, (original_height, original_width)
+                )
                 
-                # 경계값 체크
-                orig_x1 = max(0, min(orig_x1, original_width))
-                orig_y1 = max(0, min(orig_y1, original_height))
-                orig_x2 = max(0, min(orig_x2, original_width))
-                orig_y2 = max(0, min(orig_y2, original_height))
+                detections.append(detection)
                 
-                # 유효한 박스인지 확인
-                if orig_x2 > orig_x1 + 5 and orig_y2 > orig_y1 + 5:
-                    class_name = self.class_names.get(label, f'class_{label}')
-                    
-                    detection = {
-                        'bbox': {
-                            'x1': float(orig_x1),
-                            'y1': float(orig_y1),
-                            'x2': float(orig_x2),
-                            'y2': float(orig_y2),
-                            'width': float(orig_x2 - orig_x1),
-                            'height': float(orig_y2 - orig_y1)
-                        },
-                        'confidence': score,
-                        'class_id': label,
-                        'class_name': class_name,
-                        'area': float((orig_x2 - orig_x1) * (orig_y2 - orig_y1))
-                    }
-                    
-                    # 의료 영상 특화 정보 추가
-                    detection['medical_info'] = self._extract_medical_features(
-                        detection, (original_height, original_width)
-                    )
-                    
-                    detections.append(detection)
-                    
-                    logger.info(f"✅ SSD 검출: {class_name} ({score:.3f}) [{orig_x1},{orig_y1},{orig_x2},{orig_y2}]")
+                logger.info(f"✅ SSD 검출: {class_name} ({score:.3f}) [{orig_x1},{orig_y1},{orig_x2},{orig_y2}]")
             
-            return detections[:10]  # 최대 10개로 제한
+            return detections  # 최대 10개 (top_k)
             
         except Exception as e:
             logger.error(f"SSD 출력 파싱 실패: {e}")
@@ -649,7 +656,6 @@ def analyze(dicom_path):
 
 if __name__ == "__main__":
     # 테스트용 코드
-    import sys
     if len(sys.argv) > 1:
         result = analyze(sys.argv[1])
         print(f"분석 결과: {result}")
@@ -4,6 +4,8 @@ YOLOv8 기반 DICOM 이미지 분석 모듈 - 의료 영상 특화
 """
 
 import os
+import sys
+import importlib.util
 import cv2
 import numpy as np
 import pydicom
@@ -20,6 +22,23 @@ except ImportError:
 
 logger = logging.getLogger('YOLOInference')
 
+
+def _load_detection_postprocess():
+    """Django(ai_analysis)와 공유하는 검출 후처리 모듈 로드
+    (docker-compose에서 backend/ai_analysis/detection_postprocess.py를 /models/common에 마운트)"""
+    if 'detection_postprocess' in sys.modules:
+        return sys.modules['detection_postprocess']
+    path = os.getenv('DETECTION_POSTPROCESS_PATH', os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'common', 'detection_postprocess.py'))
+    spec = importlib.util.spec_from_file_location('detection_postprocess', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules['detection_postprocess'] = module
+    return module
+
+# ultralytics가 있으면 후처리 모듈은 필수: 마운트 누락은 첫 분석이 아니라 서비스 시작 시점에 실패시킴
+detection_postprocess = _load_detection_postprocess() if YOLO_AVAILABLE else None
+
 class YOLOv8Analyzer:
     """YOLOv8 모델을 사용한 DICOM 이미지 분석 클래스"""
     
@@ -265,40 +284,38 @@ class YOLOv8Analyzer:
                 if boxes is not None and len(boxes) > 0:
                     logger.info(f"YOLO에서 {len(boxes)}개 검출")
                     
-                    for box in boxes:
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0].cpu().numpy())
-                        class_id = int(box.cls[0].cpu().numpy())
-                        
+                    # 신뢰도 임계값 확인 (텐서 단위 마스킹, host 전송 1회)
+                    valid = detection_postprocess.yolo_detections(
+                        result, score_threshold=self.confidence_threshold, inclusive=True
+                    )
+                    for (x1, y1, x2, y2), confidence, class_id in detection_postprocess.iter_detections(valid):
                         # 클래스명 결정
                         if hasattr(self.model, 'names') and class_id in self.model.names:
                             class_name = self.model.names[class_id]
                         else:
                             class_name = self.class_names.get(class_id, f'class_{class_id}')
                         
-                        # 신뢰도 임계값 확인
-                        if confidence >= self.confidence_threshold:
-                            detection = {
-                                'bbox': {
-                                    'x1': float(x1),
-                                    'y1': float(y1),
-                                    'x2': float(x2),
-                                    'y2': float(y2),
-                                    'width': float(x2 - x1),
-                                    'height': float(y2 - y1)
-                                },
-                                'confidence': confidence,
-                                'class_id': class_id,
-                                'class_name': class_name,
-                                'area': float((x2 - x1) * (y2 - y1))
-                            }
-                            
-                            # 의료 영상 특화 정보 추가
-                            detection['medical_info'] = self._extract_medical_features(detection, image_shape)
-                            
-                            detections.append(detection)
-                            
-                            logger.info(f"✅ YOLO 검출: {class_name} ({confidence:.3f}) [{x1:.1f},{y1:.1f},{x2:.1f},{y2:.1f}]")
+                        detection = {
+                            'bbox': {
+                                'x1': float(x1),
+                                'y1': float(y1),
+                                'x2': float(x2),
+                                'y2': float(y2),
+                                'width': float(x2 - x1),
+                                'height': float(y2 - y1)
+                            },
+                            'confidence': confidence,
+                            'class_id': class_id,
+                            'class_name': class_name,
+                            'area': float((x2 - x1) * (y2 - y1))
+                        }
+                        
+                        # 의료 영상 특화 정보 추가
+                        detection['medical_info'] = self._extract_medical_features(detection, image_shape)
+                        
+                        detections.append(detection)
+                        
+                        logger.info(f"✅ YOLO 검출: {class_name} ({confidence:.3f}) [{x1:.1f},{y1:.1f},{x2:.1f},{y2:.1f}]")
             
             return detections
             
@@ -533,7 +550,6 @@ def analyze(dicom_path):
 
 if __name__ == "__main__":
     # 테스트용 코드
-    import sys
     if len(sys.argv) > 1:
         result = analyze(sys.argv[1])
         print(f"분석 결과: {result}")